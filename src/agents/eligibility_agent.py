@@ -69,6 +69,8 @@ import numpy as np
 
 from ..core.base_agent import BaseAgent
 from ..core.types import ExtractedData, ValidationReport, EligibilityResult
+from ..services.executors import run_cpu
+from ..services.timeline import timed
 
 
 class EligibilityAgent(BaseAgent):
@@ -78,6 +80,13 @@ class EligibilityAgent(BaseAgent):
     2. Policy-based rules and thresholds
     """
     
+    # Column order of the v3/v4 feature vector
+    FEATURE_ORDER = [
+        "monthly_income", "family_size", "net_worth", "total_assets", "total_liabilities",
+        "credit_score", "employment_years", "is_employed", "is_unemployed",
+        "owns_property", "rents", "lives_with_family"
+    ]
+    
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__("EligibilityAgent", config)
         self.logger = logging.getLogger("EligibilityAgent")
@@ -181,8 +190,8 @@ class EligibilityAgent(BaseAgent):
         # Step 1: Extract features for ML model
         features = self._extract_features(extracted_data)
         
-        # Step 2: ML Prediction
-        ml_prediction = self._run_ml_prediction(features)
+        # Step 2: ML Prediction (CPU pool - keeps the event loop responsive)
+        ml_prediction = await run_cpu(timed("ml_inference", "ml", self._run_ml_prediction), features)
         
         # Step 3: Policy Rules Check
         policy_rules_met = self._check_policy_rules(extracted_data)
@@ -345,6 +354,78 @@ class EligibilityAgent(BaseAgent):
         else:
             return {"prediction": 0, "probability": max(0.15, 1.0 - need_score), "model_version": "fallback_v2"}
     
+    def score_batch(self, features: Dict[str, np.ndarray],
+                    validation_report: ValidationReport = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorised eligibility score for many feature rows (sensitivity sweeps).
+
+        Same arithmetic as execute() - ML prediction, policy rules, need
+        assessment and validation bonus - with one predict_proba call for all rows.
+
+        Args:
+            features: Feature name → 1-D array (all the same length), keys as in _extract_features
+            validation_report: Report of the stored application (data quality bonus)
+
+        Returns:
+            {"eligibility_score", "is_eligible", "ml_probability", "policy_passed"} arrays
+        """
+        income = features["monthly_income"]
+        net_worth = features["net_worth"]
+        liabilities = features["total_liabilities"]
+        
+        prediction, probability = self._run_ml_prediction_batch(features)
+        ml_score = np.where(prediction == 1, probability, 1.0 - probability)
+        
+        # Policy rules (_check_policy_rules)
+        dti_ratio = np.divide(liabilities * 0.05 * 100, income, out=np.zeros_like(income), where=income > 0)
+        policy_passed = (
+            (income <= self.policy_rules["max_monthly_income"]).astype(int) +
+            (net_worth <= self.policy_rules["max_net_worth"]) +
+            (features["credit_score"] >= self.policy_rules["min_credit_score"]) +
+            (dti_ratio <= self.policy_rules["max_dti_ratio"])
+        )
+        
+        # Need assessment (_assess_income / _assess_wealth levels that need support)
+        need_score = ((income < 5000).astype(float) + (net_worth < 30000)) / 2.0
+        
+        validation_bonus = validation_report.confidence_score * 0.1 if validation_report is not None else 0.0
+        eligibility_score = np.clip(
+            ml_score * 0.40 + (policy_passed / 4.0) * 0.30 + need_score * 0.30 + validation_bonus,
+            0.0, 1.0
+        )
+        
+        return {
+            "eligibility_score": eligibility_score,
+            "is_eligible": eligibility_score >= 0.6,
+            "ml_probability": probability,
+            "policy_passed": policy_passed
+        }
+    
+    def _run_ml_prediction_batch(self, features: Dict[str, np.ndarray]):
+        """(prediction, probability of approval) arrays - _run_ml_prediction for many rows"""
+        if self.ml_model is not None and self.feature_scaler is not None:
+            try:
+                feature_matrix = np.column_stack([features[name] for name in self.FEATURE_ORDER])
+                probability = self.ml_model.predict_proba(self.feature_scaler.transform(feature_matrix))
+                return probability.argmax(axis=1), probability[:, 1]
+            except Exception as e:
+                self.logger.warning(f"Batch ML prediction failed: {e}, using fallback")
+        
+        # Rule-based fallback (same need score as _run_ml_prediction)
+        income = features["monthly_income"]
+        net_worth = features["net_worth"]
+        income_need = np.where(income <= 6000, 1.0, np.where(income <= 8000, 0.5, 0.0))
+        family_need = np.minimum(1.0, (features["family_size"] - 1) * 0.2)
+        wealth_need = np.where(net_worth <= 20000, 1.0, np.where(net_worth <= 50000, 0.5, 0.0))
+        need_score = (income_need * 0.5) + (family_need * 0.3) + (wealth_need * 0.2)
+        
+        prediction = (need_score >= 0.6).astype(int)
+        probability = np.where(
+            need_score >= 0.6, np.minimum(0.95, need_score + 0.2),
+            np.where(need_score >= 0.4, 0.5, np.maximum(0.15, 1.0 - need_score))
+        )
+        return prediction, probability
+    
     def _check_policy_rules(self, data: ExtractedData) -> Dict[str, bool]:
         """Check policy-based rules"""
         monthly_income = data.income_data.get("monthly_income", 0)
@@ -471,8 +552,8 @@ class EligibilityAgent(BaseAgent):
         wealth_need = 1.0 if wealth_assessment["needs_support"] else 0.0
         need_score = (income_need + wealth_need) / 2.0
         
-        # Validation confidence (data quality bonus)
-        validation_bonus = validation_report.confidence_score * 0.1
+        # Validation confidence (data quality bonus; none without a report)
+        validation_bonus = validation_report.confidence_score * 0.1 if validation_report is not None else 0.0
         
         # Weighted combination for SOCIAL SUPPORT
         final_score = (
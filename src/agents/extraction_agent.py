@@ -10,11 +10,25 @@ LANGGRAPH INTEGRATION:
 
 PURPOSE:
     Extracts structured data from all uploaded documents using:
-    - pdfplumber for PDFs with text
+    - PyMuPDF for PDFs with text (pdfplumber for pages without a usable text layer)
     - Tesseract OCR for images and scanned documents  
     - pandas for Excel files
     - Intelligent regex-based field extraction
 
+CONCURRENCY:
+    Documents are extracted concurrently in the shared process pool
+    (sized to the available cores, see executors.run_process), so an
+    application pays roughly its slowest document instead of the sum of all
+    of them. Results are merged in DOCUMENT_TYPE_ORDER, never in completion
+    order, so the same documents always produce the same ExtractedData.
+    EXTRACTION_EXECUTOR=thread runs them in the CPU thread pool instead.
+
+INCREMENTAL REPROCESSING:
+    With a NodeOutputCache, each document's fields are memoised under its
+    type, SHA-256 and extractor_config(), so after a re-upload only the
+    changed document is extracted again (status "cached" in document_timings
+    for the rest), and changed OCR settings or templates re-read everything.
+
 ARCHITECTURE PATTERN:
     This agent is a pure domain logic component. It doesn't inherit from
     LangGraph classes - instead, the LangGraph orchestrator wraps it in
@@ -23,12 +37,39 @@ ARCHITECTURE PATTERN:
 """
 import asyncio
 import logging
-from typing import Dict, Any
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
 from datetime import datetime
 
 from ..core.base_agent import BaseAgent
 from ..core.types import ExtractedData, Document
-from ..services.document_extractor import get_document_extractor
+from ..services.document_extractor import get_document_extractor, extract_document, extractor_config, EXTRACTOR_METHODS
+from ..services.executors import run_cpu, run_io, run_process
+from ..services.node_cache import NodeOutputCache, fingerprint, file_sha256
+from ..services.timeline import aspan, timed
+
+
+# Merge order, and the ExtractedData section each document type fills.
+# Later types win on overlapping keys (the employment letter over the resume).
+DOCUMENT_TYPE_ORDER = (
+    "emirates_id",
+    "bank_statement",
+    "resume",
+    "employment_letter",
+    "assets_liabilities",
+    "credit_report"
+)
+
+SECTION_BY_TYPE = {
+    "emirates_id": "applicant_info",
+    "bank_statement": "income_data",
+    "resume": "employment_data",
+    "employment_letter": "employment_data",
+    "assets_liabilities": "assets_liabilities",
+    "credit_report": "credit_data"
+}
 
 
 class DataExtractionAgent(BaseAgent):
@@ -36,13 +77,20 @@ class DataExtractionAgent(BaseAgent):
     Extracts structured data from uploaded documents using production-grade libraries
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, node_cache: Optional[NodeOutputCache] = None):
         super().__init__("DataExtractionAgent", config)
         self.logger = logging.getLogger("DataExtractionAgent")
         
         # Initialize document extractor
         self.extractor = get_document_extractor()
         
+        # Per-document memo keyed by content hash (optional)
+        self.node_cache = node_cache
+        
+        # Emirates ID OCR tiers: tier -> {"attempts": n, "resolved": n} (this process)
+        self._ocr_tier_counts: Dict[str, Dict[str, int]] = {}
+        self._ocr_tier_lock = threading.Lock()
+        
         self.logger.info("Document extractor initialized")
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -55,6 +103,9 @@ class DataExtractionAgent(BaseAgent):
         
         Output:
             - extracted_data: ExtractedData object
+            - extraction_time: Wall time for all documents (seconds)
+            - document_timings: Per-document status, wall time, in-worker extraction/CPU time,
+              for PDFs the text backend with per-page timings, for Emirates IDs the OCR tiers run
         """
         start_time = datetime.now()
         application_id = input_data.get("application_id", "unknown")
@@ -65,101 +116,160 @@ class DataExtractionAgent(BaseAgent):
             self.logger.warning(f"[{application_id}] No documents provided for extraction")
             return {
                 "extracted_data": ExtractedData(),
-                "extraction_time": 0.0
+                "extraction_time": 0.0,
+                "document_timings": []
             }
         
         self.logger.info(f"[{application_id}] Starting extraction for {len(documents)} documents")
         
+        outcomes = await asyncio.gather(*(
+            self._extract_document(application_id, index, doc) for index, doc in enumerate(documents)
+        ))
+        
+        # Deterministic merge: document-type order, then upload order within a type
         extracted_data = ExtractedData()
+        for outcome in sorted(outcomes, key=self._merge_key):
+            if outcome["data"]:
+                section = getattr(extracted_data, SECTION_BY_TYPE[outcome["timing"]["document_type"]])
+                section.update(outcome["data"])
         
-        # Process each document type
-        for doc in documents:
-            doc_type = doc["document_type"]
-            file_path = doc["file_path"]
-            
-            try:
-                if doc_type == "emirates_id":
-                    result = await self._extract_emirates_id(file_path)
-                    extracted_data.applicant_info.update(result)
-                    
-                elif doc_type == "bank_statement":
-                    result = await self._extract_bank_statement(file_path)
-                    extracted_data.income_data.update(result)
-                    
-                elif doc_type == "resume":
-                    result = await self._extract_resume(file_path)
-                    extracted_data.employment_data.update(result)
-                    
-                elif doc_type == "assets_liabilities":
-                    result = await self._extract_assets_liabilities(file_path)
-                    extracted_data.assets_liabilities.update(result)
-                    
-                elif doc_type == "credit_report":
-                    result = await self._extract_credit_report(file_path)
-                    extracted_data.credit_data.update(result)
-                    
-                elif doc_type == "employment_letter":
-                    result = await self._extract_employment_letter(file_path)
-                    extracted_data.employment_data.update(result)
-                
-                self.logger.info(f"[{application_id}] Extracted {doc_type}")
-                
-            except Exception as e:
-                self.logger.error(f"[{application_id}] Error extracting {doc_type}: {str(e)}")
-                # Continue with other documents
+        document_timings = [outcome["timing"] for outcome in outcomes]
         
         duration = (datetime.now() - start_time).total_seconds()
         self.logger.info(f"[{application_id}] Extraction completed in {duration:.2f}s")
         
         return {
             "extracted_data": extracted_data,
-            "extraction_time": duration
+            "extraction_time": duration,
+            "document_timings": document_timings
         }
     
-    async def _extract_emirates_id(self, file_path: str) -> Dict[str, Any]:
-        """Extract data from Emirates ID using OCR and intelligent parsing"""
-        try:
-            return self.extractor.extract_emirates_id(file_path)
-        except Exception as e:
-            self.logger.error(f"Emirates ID extraction failed: {e}")
-            return {}
+    @staticmethod
+    def _merge_key(outcome: Dict[str, Any]):
+        doc_type = outcome["timing"]["document_type"]
+        rank = DOCUMENT_TYPE_ORDER.index(doc_type) if doc_type in DOCUMENT_TYPE_ORDER else len(DOCUMENT_TYPE_ORDER)
+        return rank, outcome["timing"]["index"]
     
-    async def _extract_bank_statement(self, file_path: str) -> Dict[str, Any]:
-        """Extract income data from bank statement using PDF text extraction"""
-        try:
-            return self.extractor.extract_bank_statement(file_path)
-        except Exception as e:
-            self.logger.error(f"Bank statement extraction failed: {e}")
-            return {}
+    async def _extract_document(self, application_id: str, index: int, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract one document; failures are logged and yield empty data
+        
+        Returns:
+            {"data": extracted fields, "timing": per-document timing record}
+        """
+        doc_type = doc["document_type"]
+        timing = {
+            "index": index,
+            "document_type": doc_type,
+            "file_name": doc.get("filename") or doc.get("file_name") or os.path.basename(doc["file_path"]),
+            "status": "skipped",
+            "duration_ms": 0.0,
+            "extract_ms": None,
+            "cpu_ms": None,
+            "pdf": None,
+            "ocr": None,
+            "error": None
+        }
+        if doc_type not in EXTRACTOR_METHODS:
+            self.logger.warning(f"[{application_id}] No extractor for document type {doc_type}")
+            return {"data": {}, "timing": timing}
+        
+        async with aspan(f"extract:{doc_type}", "document", file_name=timing["file_name"]) as span:
+            outcome = await self._extract_or_reuse(application_id, doc, timing)
+            if span is not None:
+                span.attrs["status"] = timing["status"]
+                span.cpu_ms = timing["cpu_ms"]
+                if timing["pdf"]:
+                    span.attrs["pdf_backend"] = timing["pdf"]["backend"]
+                    span.attrs["pdf_pages"] = timing["pdf"]["page_count"]
+                if timing["ocr"]:
+                    span.attrs["ocr_tier"] = timing["ocr"]["tier"]
+                if timing["status"] == "failed":
+                    span.status = "failed"
+        return outcome
     
-    async def _extract_resume(self, file_path: str) -> Dict[str, Any]:
-        """Extract employment history from resume"""
+    async def _extract_or_reuse(self, application_id: str, doc: Dict[str, Any], timing: Dict[str, Any]) -> Dict[str, Any]:
+        """Cached fields for unchanged content, else extract in the pool and fill in `timing`"""
+        doc_type = doc["document_type"]
+        started = time.perf_counter()
+        cache_key = await self._cache_key(application_id, doc)
+        if cache_key is not None:
+            cached = await self._cache_call(application_id, self.node_cache.get, "extract_document", cache_key)
+            if cached is not None:
+                timing.update(status="cached", duration_ms=round((time.perf_counter() - started) * 1000, 1))
+                self.logger.info(f"[{application_id}] {doc_type} unchanged - reusing extracted fields")
+                return {"data": cached, "timing": timing}
+        
+        data: Dict[str, Any] = {}
         try:
-            return self.extractor.extract_resume(file_path)
+            if os.getenv("EXTRACTION_EXECUTOR", "process") == "thread":
+                data, extract_ms, cpu_ms, stats = await run_cpu(extract_document, doc_type, doc["file_path"])
+            else:
+                data, extract_ms, cpu_ms, stats = await run_process(extract_document, doc_type, doc["file_path"])
+            stats = stats or {}
+            timing.update(status="completed", extract_ms=extract_ms, cpu_ms=cpu_ms, pdf=stats.get("pdf"), ocr=stats.get("ocr"))
+            if stats.get("ocr"):
+                self._count_ocr_tiers(stats["ocr"])
+            self.logger.info(f"[{application_id}] Extracted {doc_type} in {extract_ms:.0f}ms")
+            if cache_key is not None and self._is_cacheable(data, stats):
+                await self._cache_call(application_id, timed("node_cache.put", "store", self.node_cache.put), "extract_document", cache_key, data)
         except Exception as e:
-            self.logger.error(f"Resume extraction failed: {e}")
-            return {}
+            self.logger.error(f"[{application_id}] Error extracting {doc_type}: {str(e)}")
+            timing.update(status="failed", error=str(e))
+            # Continue with other documents
+        
+        # Wall time including any wait for a pool worker
+        timing["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return {"data": data or {}, "timing": timing}
     
-    async def _extract_assets_liabilities(self, file_path: str) -> Dict[str, Any]:
-        """Extract assets and liabilities from Excel file"""
-        try:
-            return self.extractor.extract_assets_liabilities(file_path)
-        except Exception as e:
-            self.logger.error(f"Assets/liabilities extraction failed: {e}")
-            return {}
+    @staticmethod
+    def _is_cacheable(data: Dict[str, Any], stats: Dict[str, Any]) -> bool:
+        """
+        Only complete reads are cached under the content hash
+        
+        Empty results, pages whose OCR failed or was skipped by the page cap
+        and failed template crops may read correctly on a retry (tesseract
+        back, higher PDF_OCR_MAX_PAGES); caching them would pin the gaps to
+        the upload forever.
+        """
+        if not data:
+            return False
+        pdf = stats.get("pdf") or {}
+        if pdf.get("ocr_failed_pages") or pdf.get("ocr_skipped_pages"):
+            return False
+        ocr = stats.get("ocr") or {}
+        return not any(tier.get("failed") for tier in ocr.get("tiers", []))
     
-    async def _extract_credit_report(self, file_path: str) -> Dict[str, Any]:
-        """Extract credit information from credit report"""
+    async def _cache_key(self, application_id: str, doc: Dict[str, Any]) -> Optional[str]:
+        """Fingerprint of the document type, content (digest from upload, else hashed here) and extractor settings"""
+        if self.node_cache is None:
+            return None
         try:
-            return self.extractor.extract_credit_report(file_path)
-        except Exception as e:
-            self.logger.error(f"Credit report extraction failed: {e}")
-            return {}
+            digest = doc.get("sha256") or await run_io(file_sha256, doc["file_path"])
+        except OSError as e:
+            self.logger.warning(f"[{application_id}] Cannot hash {doc['file_path']}: {e}")
+            return None
+        return fingerprint(doc["document_type"], digest, extractor_config(doc["document_type"]))
+    
+    def _count_ocr_tiers(self, ocr: Dict[str, Any]):
+        with self._ocr_tier_lock:
+            for tier in ocr["tiers"]:
+                counts = self._ocr_tier_counts.setdefault(tier["tier"], {"attempts": 0, "resolved": 0})
+                counts["attempts"] += 1
+                counts["resolved"] += 0 if tier["missing"] else 1
+    
+    def get_ocr_tier_stats(self) -> Dict[str, Any]:
+        """Attempts and hit rate (all required fields read) of each Emirates ID OCR tier"""
+        with self._ocr_tier_lock:
+            return {
+                tier: {**counts, "hit_rate": round(counts["resolved"] / counts["attempts"], 3)}
+                for tier, counts in self._ocr_tier_counts.items()
+            }
     
-    async def _extract_employment_letter(self, file_path: str) -> Dict[str, Any]:
-        """Extract employment details from employment letter"""
+    async def _cache_call(self, application_id: str, func, *args):
+        """Cache access never fails extraction"""
         try:
-            return self.extractor.extract_employment_letter(file_path)
+            return await run_io(func, *args)
         except Exception as e:
-            self.logger.error(f"Employment letter extraction failed: {e}")
-            return {}
+            self.logger.warning(f"[{application_id}] Node cache unavailable: {e}")
+            return None
@@ -26,12 +26,15 @@ ARCHITECTURE PATTERN:
 """
 import logging
 import json
+import os
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from ..core.base_agent import BaseAgent
 from ..core.types import ApplicationState
 from ..services.rag_engine import RAGEngine
+from ..services.executors import run_io
 
 
 class RAGChatbotAgent(BaseAgent):
@@ -47,13 +50,16 @@ class RAGChatbotAgent(BaseAgent):
     - M1 8GB optimized
     """
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, db_manager=None):
         super().__init__("RAGChatbotAgent", config)
         self.logger = logging.getLogger("RAGChatbotAgent")
         
-        # Unified database manager (all 4 DBs)
-        from ..databases import UnifiedDatabaseManager
-        self.db_manager = UnifiedDatabaseManager()
+        # Unified database manager (all 4 DBs) - pass the shared one to avoid
+        # opening a second Chroma client / graph copy
+        if db_manager is None:
+            from ..databases import UnifiedDatabaseManager
+            db_manager = UnifiedDatabaseManager()
+        self.db_manager = db_manager
         
         # FAANG-grade RAG engine
         ollama_url = config.get('ollama_url', 'http://localhost:11434') if config else 'http://localhost:11434'
@@ -64,9 +70,11 @@ class RAGChatbotAgent(BaseAgent):
             ollama_model=ollama_model
         )
         
-        # Session management (stores last 10 messages per session)
-        self.active_sessions = {}
+        # Session management (stores last 10 messages per session, least
+        # recently used sessions beyond max_sessions are dropped)
+        self.active_sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.max_history_per_session = 10
+        self.max_sessions = int((config or {}).get('max_sessions') or os.getenv("RAG_MAX_SESSIONS", "1000"))
         
         self.logger.info("RAG Chatbot initialized: Advanced RAG + 4 DBs + Caching + Monitoring")
     
@@ -89,15 +97,16 @@ class RAGChatbotAgent(BaseAgent):
                 state = ApplicationState(application_id=application_id)
                 self.logger.warning(f"No app_state provided for {application_id}, creating minimal state")
             
-            # Use FAANG-grade RAG engine
-            result = self.rag_engine.generate_response(
+            # Use FAANG-grade RAG engine (blocking DB reads + Ollama HTTP call → IO pool)
+            result = await run_io(
+                self.rag_engine.generate_response,
                 query=query,
                 application_id=application_id,
                 query_type=query_type
             )
             
-            # Store in session
-            self._store_in_session(application_id, query, result['response'], result.get('cached', False))
+            # Store in session (TinyDB write → IO pool)
+            await run_io(self._store_in_session, application_id, query, result['response'], result.get('cached', False))
             
             return {
                 "response": result['response'],
@@ -154,6 +163,9 @@ class RAGChatbotAgent(BaseAgent):
                 'history': [],
                 'created_at': datetime.now().isoformat()
             }
+            while len(self.active_sessions) > self.max_sessions:
+                self.active_sessions.popitem(last=False)
+        self.active_sessions.move_to_end(session_id)
         
         message = {
             'timestamp': datetime.now().isoformat(),
@@ -6,7 +6,7 @@ Features:
 - Application processing endpoints (upload, process, status, results)
 - Database testing endpoints (SQLite, TinyDB, ChromaDB, NetworkX)
 - RAG chatbot with semantic search
-- What-if simulation engine
+- What-if simulation engine and sensitivity sweeps
 - System statistics and monitoring
 
 Architecture:
@@ -16,22 +16,22 @@ Architecture:
 - UnifiedDatabaseManager: Multi-level caching (L1/L2)
 """
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Query, Path as PathParam
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Query, Header, Path as PathParam
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
 from pydantic import BaseModel, Field
 import asyncio
 import logging
 from pathlib import Path
-import shutil
 import uuid
 import json
 from datetime import datetime
 import os
 
 # Langfuse for production-grade observability
-from langfuse import Langfuse
 
 from src.core.langgraph_orchestrator import LangGraphOrchestrator
 from src.core.langgraph_state import ApplicationGraphState
@@ -41,12 +41,24 @@ from src.databases.prod_sqlite_manager import SQLiteManager
 from src.databases.tinydb_manager import TinyDBManager
 from src.databases.chroma_manager import ChromaDBManager
 from src.databases.networkx_manager import NetworkXManager
-from src.agents.extraction_agent import DataExtractionAgent
-from src.agents.validation_agent import DataValidationAgent
-from src.agents.eligibility_agent import EligibilityAgent
-from src.agents.recommendation_agent import RecommendationAgent
-from src.agents.explanation_agent import ExplanationAgent
 from src.agents.rag_chatbot_agent import RAGChatbotAgent
+from src.services.application_processor import (
+    serialize_documents,
+    build_status_payload,
+    build_results_payload
+)
+from src.services.job_queue import JobQueue, get_job_queue
+from src.services.batch_processor import BatchProcessor
+from src.services.upload_writer import UploadWriter, UploadLimitExceeded, upload_filename
+from src.services.executors import run_cpu, run_io, get_executor_pools
+from src.services.loop_monitor import get_loop_monitor
+from src.services.metrics_sampler import get_metrics_sampler
+from src.services.container import ServiceContainer
+from src.services.state_store import ApplicationStateStore, InMemoryApplicationStateStore
+from src.services.simulation import SimulationEngine
+from src.services.progress_events import ProgressEventBus
+from src.services.outbox_projector import OutboxProjector
+from src.services.admission import AdmissionRejected, get_admission_controller
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -62,14 +74,91 @@ structured_logger = get_structured_logger("social_support_api")
 langfuse_logger = get_structured_logger("langfuse_comprehensive")  # Second log file
 conversation_manager = get_conversation_manager()
 
-# Initialize Langfuse for FastAPI endpoint tracing
-langfuse_client = Langfuse(
-    public_key=os.getenv("LANGFUSE_PUBLIC_KEY", "local-dev-key"),
-    secret_key=os.getenv("LANGFUSE_SECRET_KEY", "local-dev-secret"),
-    host=os.getenv("LANGFUSE_HOST", "http://localhost:3000"),
-    enabled=True
-)
-logger.info("Langfuse initialized for FastAPI observability")
+# ============================================================================
+# SERVICES - every store/agent is created once by the container
+# ============================================================================
+
+services = ServiceContainer(rag_config={
+    'ollama_url': 'http://localhost:11434',
+    'ollama_model': 'mistral:latest'
+})
+
+# Tracing facade for FastAPI endpoints - buffered, sampled, flushed in the background
+tracer = services.tracer
+
+# Bound by _bind_services() once the container is warm. Until then the
+# readiness gate answers 503 for everything except health/docs routes.
+orchestrator: Optional[LangGraphOrchestrator] = None
+unified_db: Optional[UnifiedDatabaseManager] = None
+sqlite_db: Optional[SQLiteManager] = None
+tinydb_cache: Optional[TinyDBManager] = None
+chroma_db: Optional[ChromaDBManager] = None
+networkx_db: Optional[NetworkXManager] = None
+rag_chatbot_agent: Optional[RAGChatbotAgent] = None
+
+# Application state shared by all API processes and job workers
+# (replaces the per-process active_applications dict)
+state_store: Optional[ApplicationStateStore] = None
+
+# Pipeline progress events written by workers, streamed by /events
+progress_events: Optional[ProgressEventBus] = None
+
+# What-if re-scoring with the orchestrator's eligibility/recommendation agents
+simulation_engine: Optional[SimulationEngine] = None
+
+# Warm in the background so liveness is served while stores load;
+# set WARM_IN_BACKGROUND=0 to finish warm-up before accepting requests
+WARM_IN_BACKGROUND = os.getenv("WARM_IN_BACKGROUND", "1") == "1"
+
+
+def _bind_services():
+    """Expose container instances under the module names used by the endpoints"""
+    global orchestrator, unified_db, sqlite_db, tinydb_cache, chroma_db, networkx_db, rag_chatbot_agent, state_store, progress_events
+    global simulation_engine
+    orchestrator = services.orchestrator
+    unified_db = services.unified_db
+    sqlite_db = services.sqlite
+    tinydb_cache = services.tinydb
+    chroma_db = services.chroma
+    networkx_db = services.networkx
+    rag_chatbot_agent = services.rag_chatbot
+    state_store = services.state_store
+    progress_events = services.progress_events
+    simulation_engine = SimulationEngine(orchestrator.eligibility_agent, orchestrator.recommendation_agent)
+
+
+async def _warm_services():
+    """Create all services in parallel, then start components that need them"""
+    await services.warm()
+    _bind_services()
+    logger.info("All 6 agents initialized and registered (including RAG chatbot)")
+    _start_metrics_sampler()
+    _start_embedded_worker()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: loop monitor + service warm-up. Shutdown: stop background tasks and pools."""
+    get_loop_monitor().start()
+    
+    warm_task = asyncio.create_task(_warm_services())
+    if not WARM_IN_BACKGROUND:
+        await warm_task
+    
+    try:
+        yield
+    finally:
+        if not warm_task.done():
+            warm_task.cancel()
+        if _embedded_worker:
+            _embedded_worker.stop()
+        if _outbox_projector:
+            await _outbox_projector.stop()
+        await get_metrics_sampler().stop()
+        await get_loop_monitor().stop()
+        await run_io(tracer.close)
+        get_executor_pools().shutdown(wait=False)
+
 
 # Initialize FastAPI with comprehensive metadata
 app = FastAPI(
@@ -102,7 +191,8 @@ Comprehensive testing endpoints for all 4 databases with example data in Swagger
 
 ---
 """
-
+,
+    lifespan=lifespan
 )
 
 # CORS middleware for Streamlit and web clients
@@ -114,10 +204,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip for responses above GZIP_MINIMUM_SIZE bytes, except streaming endpoints
+
+    SSE progress and NDJSON batch events must reach the client as they are
+    written, so those paths bypass compression.
+    """
+    STREAMING_PATH_SUFFIXES = ("/events", "/batch/process")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith(self.STREAMING_PATH_SUFFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compress large status/results payloads
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=int(os.getenv("GZIP_MINIMUM_SIZE", "1000")))
+
 # Production-grade audit middleware
 from fastapi import Request
 import time
 
+# Routes served before services are warm
+READINESS_EXEMPT_PATHS = {"/", "/health/live", "/health/ready", "/docs", "/redoc", "/openapi.json", "/api/system/loop-lag"}
+
+
+@app.middleware("http")
+async def readiness_gate(request: Request, call_next):
+    """Answer 503 until the service container is warm"""
+    if not services.ready and request.url.path not in READINESS_EXEMPT_PATHS:
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Service is starting up", "readiness": services.get_status()},
+            headers={"Retry-After": "2"}
+        )
+    return await call_next(request)
+
+
 @app.middleware("http")
 async def audit_middleware(request: Request, call_next):
     """
@@ -137,33 +263,37 @@ async def audit_middleware(request: Request, call_next):
         response = await call_next(request)
         response_time_ms = int((time.time() - start_time) * 1000)
         
-        # Log API access to audit log
-        audit_logger.log_api_access(
-            method=request.method,
-            endpoint=request.url.path,
-            application_id=application_id,
-            status_code=response.status_code,
-            response_time_ms=response_time_ms,
-            ip_address=request.client.host,
-            user_agent=request.headers.get("user-agent")
-        )
-        
-        # Log to langfuse comprehensive log
-        langfuse_logger.info(
-            f"API Request: {request.method} {request.url.path}",
-            application_id=application_id,
-            status_code=response.status_code,
-            response_time_ms=response_time_ms,
-            endpoint=request.url.path
-        )
+        def _log_request():
+            # Log API access to audit log
+            audit_logger.log_api_access(
+                method=request.method,
+                endpoint=request.url.path,
+                application_id=application_id,
+                status_code=response.status_code,
+                response_time_ms=response_time_ms,
+                ip_address=request.client.host,
+                user_agent=request.headers.get("user-agent")
+            )
+            
+            # Log to langfuse comprehensive log
+            langfuse_logger.info(
+                f"API Request: {request.method} {request.url.path}",
+                application_id=application_id,
+                status_code=response.status_code,
+                response_time_ms=response_time_ms,
+                endpoint=request.url.path
+            )
+            
+            # Log performance metric
+            audit_logger.log_metric(
+                f"api.{request.method}.response_time",
+                response_time_ms,
+                "ms",
+                {"method": request.method, "endpoint": request.url.path, "status": response.status_code}
+            )
         
-        # Log performance metric
-        audit_logger.log_metric(
-            f"api.{request.method}.response_time",
-            response_time_ms,
-            "ms",
-            {"method": request.method, "endpoint": request.url.path, "status": response.status_code}
-        )
+        # SQLite + log file writes → IO pool (never on the event loop)
+        await run_io(_log_request)
         
         # Add performance headers
         response.headers["X-Response-Time"] = f"{response_time_ms}ms"
@@ -174,7 +304,8 @@ async def audit_middleware(request: Request, call_next):
         response_time_ms = int((time.time() - start_time) * 1000)
         
         # Log failed request
-        audit_logger.log_audit_event(
+        await run_io(
+            audit_logger.log_audit_event,
             event_type="api_error",
             action=request.method,
             resource=request.url.path,
@@ -187,54 +318,90 @@ async def audit_middleware(request: Request, call_next):
         
         raise
 
-# Initialize orchestrator and unified database manager
-orchestrator = LangGraphOrchestrator()
-unified_db = UnifiedDatabaseManager()
-
-# Initialize individual database managers for testing endpoints
-sqlite_db = SQLiteManager("data/databases/applications.db")
-tinydb_cache = TinyDBManager("data/databases/cache.json")
-chroma_db = ChromaDBManager("data/databases/chromadb")  # Updated to use main chromadb with 828 documents
-networkx_db = NetworkXManager()
-
-# Load NetworkX graph from file
-try:
-    import networkx as nx
-    graph_path = Path("application_graph.graphml")
-    if graph_path.exists():
-        networkx_db.graph = nx.read_graphml(str(graph_path))
-        logger.info(f"NetworkX loaded: {networkx_db.graph.number_of_nodes()} nodes, {networkx_db.graph.number_of_edges()} edges")
-    else:
-        # Fresh system - graph will be created on first application
-        logger.debug("NetworkX graph file not found - will be created on first use")
-except Exception as e:
-    logger.error(f"NetworkX load failed: {e}")
-
-
-# Initialize and register all agents with comprehensive configuration
-extraction_agent = DataExtractionAgent()
-validation_agent = DataValidationAgent()
-eligibility_agent = EligibilityAgent()
-recommendation_agent = RecommendationAgent()
-explanation_agent = ExplanationAgent()
-rag_chatbot_agent = RAGChatbotAgent({
-    'db_path': 'data/databases/applications.db',
-    'ollama_url': 'http://localhost:11434',
-    'ollama_model': 'mistral:latest'
-})
 
-orchestrator.register_agents(
-    extraction_agent=extraction_agent,
-    validation_agent=validation_agent,
-    eligibility_agent=eligibility_agent,
-    recommendation_agent=recommendation_agent,
-    explanation_agent=explanation_agent,
-    rag_chatbot_agent=rag_chatbot_agent
-)
-logger.info("All 6 agents initialized and registered (including RAG chatbot)")
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """429 + Retry-After when a resource class is saturated"""
+    return JSONResponse(
+        status_code=429,
+        content={
+            "detail": f"Too many concurrent {exc.resource} requests ({exc.reason}), please retry later",
+            "resource": exc.resource,
+            "queue_depth": exc.queue_depth,
+            "retry_after_seconds": exc.retry_after
+        },
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
-# In-memory state storage (production: use Redis/Memcached with TTL)
-active_applications: Dict[str, ApplicationState] = {}
+# Per-resource-class capacity pools (ocr / ml / llm / db_write)
+admission = get_admission_controller()
+
+# Durable job queue - processing runs in worker processes (python -m src.worker)
+job_queue = get_job_queue()
+batch_processor = BatchProcessor(job_queue)
+upload_writer = UploadWriter()
+
+# Optional in-process worker for single-process development setups
+EMBEDDED_WORKERS = int(os.getenv("EMBEDDED_WORKERS", "0"))
+_embedded_worker = None
+_outbox_projector = None
+
+
+def _start_metrics_sampler():
+    """Collect system and store metrics in the background for /api/governance/metrics"""
+    sampler = get_metrics_sampler()
+    sampler.store_paths.update({
+        "sqlite": services.sqlite_path,
+        "tinydb": services.tinydb_path,
+        "chromadb": services.chroma_dir,
+        "networkx": services.graph_path,
+        "job_queue": job_queue.db_path,
+        "progress_events": services.events_path
+    })
+    sampler.register_gauge("networkx_nodes", lambda: networkx_db.graph.number_of_nodes())
+    sampler.register_gauge("networkx_edges", lambda: networkx_db.graph.number_of_edges())
+    sampler.register_gauge("active_applications", lambda: state_store.count())
+    if isinstance(state_store, InMemoryApplicationStateStore):
+        sampler.register_gauge("state_memory", state_store.get_stats)
+    sampler.register_gauge("jobs", lambda: job_queue.get_queue_stats()["counts"])
+    sampler.register_gauge("event_stream_subscribers", lambda: progress_events.subscriber_count())
+    sampler.register_gauge("admission", lambda: {
+        name: {"in_flight": pool["in_flight"], "queue_depth": pool["queue_depth"], "rejected": pool["rejected"]}
+        for name, pool in admission.get_stats()["pools"].items()
+    })
+    sampler.register_gauge(
+        "outbox",
+        lambda: _outbox_projector.get_stats() if _outbox_projector else sqlite_db.get_outbox_stats()
+    )
+    if services.node_cache is not None:
+        sampler.register_gauge("node_cache", lambda: services.node_cache.get_stats()["nodes"])
+    sampler.register_gauge("ocr_tiers", orchestrator.extraction_agent.get_ocr_tier_stats)
+    sampler.register_gauge("traces", services.trace_store.get_stats)
+    sampler.register_gauge("tracing", tracer.get_stats)
+    sampler.start()
+
+
+async def _sync_graph():
+    """Pick up graph projections written to the shared graphml file by worker processes"""
+    await run_io(networkx_db.sync_graphml, services.graph_path)
+
+
+def _start_embedded_worker():
+    """Run queued jobs (and their outbox projections) inside the API process when EMBEDDED_WORKERS > 0"""
+    global _embedded_worker, _outbox_projector
+    if EMBEDDED_WORKERS <= 0:
+        return
+    from src.worker import JobWorker
+    processor = services.application_processor()
+    _embedded_worker = JobWorker(
+        processor=processor,
+        job_queue=job_queue,
+        concurrency=EMBEDDED_WORKERS
+    )
+    asyncio.create_task(_embedded_worker.run())
+    _outbox_projector = OutboxProjector(processor.sqlite_db, processor.projection_handlers())
+    _outbox_projector.start()
+    logger.info(f"Embedded job worker started with {EMBEDDED_WORKERS} slot(s)")
 
 
 # ============================================================================
@@ -309,6 +476,43 @@ class SimulationQuery(BaseModel):
         example={"monthly_income": 8000, "employment_status": "Government Employee"},
         description="Changes to simulate (e.g., income increase, employment change)"
     )
+    narrative: bool = Field(
+        False,
+        description="Also ask the LLM for a narrative of the outcome (slower; subject to LLM admission)"
+    )
+
+
+class SensitivityAxis(BaseModel):
+    """One swept feature: explicit values, or start/stop/steps"""
+    feature: str = Field(..., example="monthly_income", description="Model feature to sweep")
+    values: Optional[List[float]] = Field(None, example=[1, 2, 3, 4, 5, 6], description="Values to score")
+    start: Optional[float] = Field(None, example=0, description="First value of an even grid")
+    stop: Optional[float] = Field(None, example=15000, description="Last value of an even grid")
+    steps: int = Field(21, ge=2, le=1000, description="Number of grid values")
+
+
+class SensitivityQuery(BaseModel):
+    """Input for a sensitivity sweep"""
+    axes: List[SensitivityAxis] = Field(..., min_length=1, max_length=2, description="One or two swept features")
+
+
+class BatchProcessRequest(BaseModel):
+    """Input for batch processing"""
+    application_ids: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=5000,
+        example=["APP_1A2B3C4D", "APP_5E6F7A8B"],
+        description="Applications to process (each must have uploaded documents)"
+    )
+    concurrency: int = Field(
+        default=int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "4")),
+        ge=1,
+        le=int(os.getenv("BATCH_MAX_CONCURRENCY", "64")),
+        description="Maximum applications from this batch queued or running at once"
+    )
+    item_timeout_seconds: float = Field(default=600.0, gt=0, description="Per-application timeout")
+    stream: bool = Field(default=True, description="Stream NDJSON events instead of one JSON summary")
 
 
 class ApplicationResponse(BaseModel):
@@ -323,6 +527,7 @@ class ProcessingStatusResponse(BaseModel):
     """Response for processing status"""
     application_id: str
     current_stage: str
+    progress_percentage: int = 0
     message: str
     data: Optional[Dict[str, Any]] = None
 
@@ -362,6 +567,28 @@ async def root():
 
 
 # API Version 1 Routes
+@app.get("/health/live", tags=["System"])
+async def health_live():
+    """
+    Liveness probe - the process is up and the event loop is responsive.
+    """
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+
+@app.get("/health/ready", tags=["System"])
+async def health_ready():
+    """
+    Readiness probe - all stores, agents and the orchestrator are initialised.
+    
+    **Returns:** `200` with per-component init timings once warm, `503` while starting
+    (or if warm-up failed - see `error`).
+    """
+    status = services.get_status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", **status})
+    return {"status": "ready", **status}
+
+
 @app.post("/api/v1/applications/create", response_model=ApplicationResponse, tags=["Applications v1"])
 @app.post("/api/applications/create", response_model=ApplicationResponse, tags=["Applications v1"], include_in_schema=False)
 async def create_application(applicant_name: str = Form(..., example="Ahmed Hassan Al Mazrouei")):
@@ -401,7 +628,7 @@ async def create_application(applicant_name: str = Form(..., example="Ahmed Hass
             "credit_score": 0,
             "emirates_id": ""
         }
-        sqlite_db.insert_application(app_data)
+        await run_io(sqlite_db.insert_application, app_data)
         
         # Create state
         state = ApplicationState(
@@ -409,7 +636,7 @@ async def create_application(applicant_name: str = Form(..., example="Ahmed Hass
             applicant_name=applicant_name.strip(),
             stage=ProcessingStage.PENDING
         )
-        active_applications[application_id] = state
+        await run_io(state_store.put, application_id, state)
         
         logger.info(f"Created application {application_id} for {applicant_name}")
         structured_logger.info(
@@ -420,7 +647,8 @@ async def create_application(applicant_name: str = Form(..., example="Ahmed Hass
         )
         
         # Audit logging for governance
-        audit_logger.log_audit_event(
+        await run_io(
+            audit_logger.log_audit_event,
             event_type="application_create",
             action="CREATE",
             application_id=application_id,
@@ -432,7 +660,8 @@ async def create_application(applicant_name: str = Form(..., example="Ahmed Hass
         )
         
         # Cache application context in TinyDB (6-hour TTL)
-        tinydb_cache.store_app_context(
+        await run_io(
+            tinydb_cache.store_app_context,
             application_id,
             {"applicant_name": applicant_name, "status": "PENDING", "created_at": state.created_at.isoformat()}
         )
@@ -449,6 +678,27 @@ async def create_application(applicant_name: str = Form(..., example="Ahmed Hass
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _documents_of(state: Any) -> List[Any]:
+    """Document list of an ApplicationState (object) or ApplicationGraphState (dict)"""
+    if isinstance(state, dict):
+        return state.setdefault("documents", [])
+    return state.documents
+
+
+def _doc_field(doc: Any, name: str) -> Any:
+    """Read a field from a Document or its serialized dict form"""
+    return doc.get(name) if isinstance(doc, dict) else getattr(doc, name, None)
+
+
+def _document_replacer(new_documents: List[Any]):
+    """State mutator adding documents, replacing stored ones with the same filename (same file on disk)"""
+    names = {doc.filename for doc in new_documents}
+    def replace(state):
+        docs = _documents_of(state)
+        docs[:] = [d for d in docs if _doc_field(d, "filename") not in names] + new_documents
+    return replace
+
+
 @app.post("/api/applications/{application_id}/upload", tags=["Applications"])
 async def upload_documents(
     application_id: str = PathParam(..., example="APP_12AB34CD", description="Application ID from create endpoint"),
@@ -477,31 +727,42 @@ async def upload_documents(
     
     **Process:**
     1. Validates application exists
-    2. Saves uploaded files to disk
+    2. Streams files to disk concurrently, computing SHA-256 per file; a file
+       named like an already uploaded document replaces it
     3. Classifies document types automatically
     4. Stores document metadata in database
     5. Ready for processing pipeline
     
+    **Limits (413 Payload Too Large when exceeded, nothing is stored):**
+    - Per file: UPLOAD_MAX_FILE_MB (20 MB), UPLOAD_MAX_PDF_PAGES (30 pages)
+    - Per application: UPLOAD_MAX_APPLICATION_MB (60 MB), UPLOAD_MAX_APPLICATION_PAGES (100 pages)
+    
     **Next Step:** Process application using `/api/applications/{application_id}/process`
     """
     try:
-        if application_id not in active_applications:
+        state = await run_io(state_store.get, application_id)
+        if state is None:
             raise HTTPException(status_code=404, detail="Application not found")
         
-        state = active_applications[application_id]
         upload_dir = Path(f"data/uploads/{application_id}")
-        upload_dir.mkdir(parents=True, exist_ok=True)
+        # A file named like a stored document replaces it, so that document leaves the budget
+        replaced_names = {upload_filename(upload) for upload in documents}
+        existing_docs = [d for d in _documents_of(state) if _doc_field(d, "filename") not in replaced_names]
+        
+        # Stream all files to disk concurrently; nothing is kept if any budget is exceeded
+        stored_files = await upload_writer.write_all(
+            documents,
+            upload_dir,
+            existing_bytes=sum(_doc_field(d, "size_bytes") or 0 for d in existing_docs),
+            existing_pages=sum(_doc_field(d, "page_count") or 0 for d in existing_docs)
+        )
         
         uploaded_files = []
+        new_documents = []
         
-        for file in documents:
-            # Save file
-            file_path = upload_dir / file.filename
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
+        for stored in stored_files:
             # Determine document type from filename
-            filename_lower = file.filename.lower()
+            filename_lower = stored.filename.lower()
             if "emirates" in filename_lower or ("id" in filename_lower and "credit" not in filename_lower):
                 doc_type = "emirates_id"
             elif "resume" in filename_lower or "cv" in filename_lower:
@@ -524,23 +785,33 @@ async def upload_documents(
             doc = Document(
                 document_id=f"DOC_{uuid.uuid4().hex[:8].upper()}",
                 document_type=doc_type,
-                filename=file.filename,
-                file_path=str(file_path)
+                filename=stored.filename,
+                file_path=stored.file_path,
+                sha256=stored.sha256,
+                size_bytes=stored.size_bytes,
+                page_count=stored.page_count
             )
-            state.documents.append(doc)
+            new_documents.append(doc)
             
             # Save to database
             # Note: Document metadata saved in SQLite via unified_db
             # unified_db.sqlite.add_document(application_id, doc.document_id, doc_type, str(file_path))
             
             uploaded_files.append({
-                "filename": file.filename,
+                "filename": stored.filename,
                 "document_type": doc_type,
-                "document_id": doc.document_id
+                "document_id": doc.document_id,
+                "sha256": stored.sha256,
+                "size_bytes": stored.size_bytes,
+                "page_count": stored.page_count
             })
         
+        # Swap in under the store's write lock so concurrent uploads don't drop documents
+        await run_io(state_store.update, application_id, _document_replacer(new_documents))
+        
         # Cache upload metadata in TinyDB (6-hour TTL)
-        tinydb_cache.store_app_context(
+        await run_io(
+            tinydb_cache.store_app_context,
             f"{application_id}_uploads",
             {"count": len(documents), "files": uploaded_files, "uploaded_at": datetime.now().isoformat()}
         )
@@ -554,7 +825,8 @@ async def upload_documents(
         )
         
         # Audit logging for document uploads
-        audit_logger.log_audit_event(
+        await run_io(
+            audit_logger.log_audit_event,
             event_type="document_upload",
             action="UPLOAD",
             application_id=application_id,
@@ -574,17 +846,122 @@ async def upload_documents(
             "message": f"Successfully uploaded {len(documents)} document(s)"
         }
     
+    except UploadLimitExceeded as e:
+        logger.warning(f"Upload rejected for {application_id}: {e}")
+        await run_io(
+            audit_logger.log_audit_event,
+            event_type="document_upload",
+            action="UPLOAD",
+            application_id=application_id,
+            resource="documents",
+            details={"limit": e.limit},
+            status="failure",
+            error_message=str(e)
+        )
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/applications/{application_id}/process", response_model=ProcessingStatusResponse, tags=["Applications"])
+def _build_process_payload(state: Any) -> Dict[str, Any]:
+    """Job payload for an in-memory application state"""
+    # Handle both ApplicationState and ApplicationGraphState (reprocessing)
+    if isinstance(state, dict):
+        return {
+            "applicant_name": state.get("applicant_name", ""),
+            "documents": serialize_documents(state.get("documents", []))
+        }
+    return {
+        "applicant_name": state.applicant_name,
+        "documents": serialize_documents(state.documents)
+    }
+
+
+async def _resolve_batch_payload(application_id: str) -> Optional[Dict[str, Any]]:
+    state = await run_io(state_store.get, application_id)
+    return _build_process_payload(state) if state is not None else None
+
+
+# NOTE: Must be declared before /api/applications/{application_id}/process,
+# otherwise "batch" is captured as an application_id
+@app.post("/api/applications/batch/process", tags=["Applications"])
+async def process_applications_batch(batch: BatchProcessRequest):
+    """
+    Process many applications with a bounded number in flight.
+    
+    **TEST DATA:**
+    ```json
+    {
+      "application_ids": ["APP_1A2B3C4D", "APP_5E6F7A8B"],
+      "concurrency": 8
+    }
+    ```
+    
+    **Process:**
+    - Each application is queued as a normal processing job
+    - At most `concurrency` jobs from this batch are queued/running at once
+    - Unknown application IDs are reported as `not_found` without failing the batch
+    
+    **Returns (stream=true):** `application/x-ndjson`, one event per line:
+    - `batch_started` - batch_id, total, concurrency
+    - `item_completed` - application_id, status (succeeded / failed / not_found / timeout),
+      job_id, final_stage, decision, error, duration_seconds
+    - `batch_completed` - per-status summary and total duration
+    
+    **Returns (stream=false):** One JSON document with the summary and all items.
+    
+    If the client disconnects, no further applications are submitted; jobs
+    already queued still complete and are visible via `/status`.
+    """
+    events = batch_processor.run(
+        batch.application_ids,
+        _resolve_batch_payload,
+        concurrency=batch.concurrency,
+        item_timeout=batch.item_timeout_seconds
+    )
+    
+    await run_io(
+        audit_logger.log_audit_event,
+        event_type="application_process",
+        action="BATCH_PROCESS_STARTED",
+        resource="batch",
+        details={"application_count": len(batch.application_ids), "concurrency": batch.concurrency},
+        status="success"
+    )
+    
+    if batch.stream:
+        async def ndjson():
+            async for event in events:
+                yield json.dumps(event, default=str) + "\n"
+        
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    items = []
+    completed = None
+    async for event in events:
+        if event["event"] == "item_completed":
+            items.append(event)
+        elif event["event"] == "batch_completed":
+            completed = event
+    
+    items.sort(key=lambda item: item["index"])
+    return {**completed, "items": items}
+
+
+@app.post("/api/applications/{application_id}/process", response_model=ProcessingStatusResponse, status_code=202, tags=["Applications"])
 async def process_application(
-    application_id: str = PathParam(..., example="APP-000001", description="Application ID to process")
+    response: Response,
+    application_id: str = PathParam(..., example="APP-000001", description="Application ID to process"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", max_length=255,
+        description="Client-generated key; retries with the same key return the original job"
+    )
 ):
     """
-    Process application through all 6 agents with full Langfuse observability.
+    Queue application for processing through all 6 agents.
     
     **TEST DATA:**
     ```
@@ -592,7 +969,7 @@ async def process_application(
     application_id: "APP-000010"  (Another test application)
     ```
     
-    **Processing Pipeline:**
+    **Processing Pipeline (run by `python -m src.worker`):**
     1. **Extraction Agent** → Extracts data from uploaded documents using OCR
     2. **Validation Agent** → Validates extracted data for completeness and accuracy
     3. **Eligibility Agent** → Determines eligibility based on policy rules + ML prediction
@@ -600,17 +977,28 @@ async def process_application(
     5. **Explanation Agent** → Generates human-readable explanation
     6. **RAG Chatbot** → Indexes application data for Q&A
     
-    **Expected Stages:**
-    - PENDING → EXTRACTING → VALIDATING → DECIDING → COMPLETED
+    **Returns:** `202 Accepted` with the job ID. The pipeline runs in a worker
+    process; follow progress with the `/api/applications/{application_id}/events`
+    stream, or poll `/status` or `/api/jobs/{job_id}`.
     
-    **Processing Time:** 30-60 seconds for full pipeline
+    **Single-flight:** While the application has a queued or running job, further
+    calls attach to that job (`data.outcome = "attached"`) instead of running the
+    pipeline again. A repeated `Idempotency-Key` returns the job originally created
+    for it, whatever its status (`"replayed"`, header `Idempotent-Replayed: true`).
     
-    **Langfuse Tracing:** Full trace exported to data/observability/langfuse_trace_{app_id}.json
+    **Backpressure:** `429 Too Many Requests` with `Retry-After` when the job
+    backlog is at `ADMISSION_MAX_QUEUED_JOBS`.
+    
+    **Expected Stages:**
+    - queued → running → COMPLETED / FAILED
+    
+    **Langfuse Tracing:** Run summary appended to the segmented trace store
+    (`GET /api/applications/{application_id}/trace`)
     
     **Next Step:** Check results using `/api/applications/{application_id}/results`
     """
-    # Start Langfuse trace for entire HTTP request
-    request_trace = langfuse_client.trace(
+    # Start Langfuse trace for the HTTP request
+    request_trace = tracer.trace(
         name="fastapi_process_application",
         id=f"api_trace_{application_id}_{int(datetime.now().timestamp())}",
         metadata={
@@ -623,379 +1011,363 @@ async def process_application(
     request_span = request_trace.span(name="process_application_endpoint")
     
     try:
-        if application_id not in active_applications:
+        state = await run_io(state_store.get, application_id)
+        if state is None:
             request_span.end(output={"success": False, "error": "Application not found"}, level="ERROR")
-            langfuse_client.flush()
             raise HTTPException(status_code=404, detail="Application not found")
         
-        state = active_applications[application_id]
-        
-        # Register application with orchestrator if not already registered
-        if application_id not in orchestrator.applications:
-            orchestrator.applications[application_id] = state
-        
-        # Process through orchestrator (this will create its own nested Langfuse trace)
-        langgraph_span = request_trace.span(name="langgraph_orchestrator_execution")
+        payload = _build_process_payload(state)
+        documents_list = payload["documents"]
         
-        # Convert documents from ApplicationState to list format required by LangGraphOrchestrator
-        documents_list = []
-        if hasattr(state, 'documents') and state.documents:
-            documents_list = [
-                {
-                    "document_id": doc.document_id,
-                    "document_type": doc.document_type,
-                    "file_path": doc.file_path,
-                    "filename": doc.filename
-                }
-                for doc in state.documents
-            ]
-        
-        try:
-            final_state = await orchestrator.process_application(
-                application_id=application_id,
-                applicant_name=state.applicant_name,
-                documents=documents_list
-            )
-            
-            # DEBUG: Log what name we're using
-            logger.info(f"[{application_id}] Processing with applicant_name: '{state.applicant_name}'")
-            
-            if final_state is None:
-                raise ValueError("Orchestrator returned None - workflow failed")
-            
-            langgraph_span.end(output={
-                "success": True,
-                "final_stage": final_state.get("stage") if final_state else "UNKNOWN",
-                "is_eligible": final_state.get("eligibility_result").is_eligible if (final_state and final_state.get("eligibility_result")) else False
-            })
-            
-        except Exception as workflow_error:
-            langgraph_span.end(output={"success": False, "error": str(workflow_error)}, level="ERROR")
-            raise
-        
-        # Save all results to database
-        db_span = request_trace.span(name="database_persistence")
-        
-        # Check if we have valid extracted data before accessing attributes
-        if final_state and final_state.get("extracted_data"):
-            extracted_data = final_state["extracted_data"]
-            # CRITICAL FIX: Add None checks for nested dictionaries
-            credit_data = extracted_data.credit_data if extracted_data.credit_data else {}
-            employment_data = extracted_data.employment_data if extracted_data.employment_data else {}
-            income_data = extracted_data.income_data if extracted_data.income_data else {}
-            applicant_info = extracted_data.applicant_info if extracted_data.applicant_info else {}
-            family_info = extracted_data.family_info if extracted_data.family_info else {}
-            assets_liabilities = extracted_data.assets_liabilities if extracted_data.assets_liabilities else {}
-            
-            # DEBUG: Log extracted data before saving
-            logger.info(f"[{application_id}] DEBUG - credit_data keys: {list(credit_data.keys())}")
-            logger.info(f"[{application_id}] DEBUG - credit_score value: {credit_data.get('credit_score')}")
-            logger.info(f"[{application_id}] DEBUG - employment_data keys: {list(employment_data.keys())}")
-            logger.info(f"[{application_id}] DEBUG - company_name value: {employment_data.get('company_name')}")
-            logger.info(f"[{application_id}] DEBUG - final_state['stage'] = {final_state['stage']}")
-            logger.info(f"[{application_id}] DEBUG - final_state['stage'] type = {type(final_state['stage'])}")
-            
-            # Prepare application data for database
-            # CRITICAL: Ensure all NOT NULL fields have valid defaults
-            app_data = {
-                "app_id": application_id,
-                "applicant_name": applicant_info.get("full_name", "Unknown"),
-                "emirates_id": applicant_info.get("id_number", ""),
-                "submission_date": datetime.now().strftime("%Y-%m-%d"),
-                "status": final_state["stage"].value if hasattr(final_state["stage"], 'value') else str(final_state["stage"]),
-                "monthly_income": float(income_data.get("monthly_income") or 0),
-                "monthly_expenses": float(income_data.get("monthly_expenses") or 0),
-                "family_size": int(family_info.get("family_size") or 1),
-                "employment_status": employment_data.get("employment_status") or "Unknown",
-                "total_assets": float(assets_liabilities.get("total_assets") or 0),
-                "total_liabilities": float(assets_liabilities.get("total_liabilities") or 0),
-                "credit_score": int(credit_data.get("credit_score") or 0),  # FIXED: Convert to int, default 0
-                "policy_score": final_state["eligibility_result"].eligibility_score if final_state.get("eligibility_result") else None,
-                "ml_prediction": str(final_state["eligibility_result"].ml_prediction) if final_state.get("eligibility_result") else None,
-                "ml_confidence": None,
-                "eligibility": "ELIGIBLE" if (final_state.get("eligibility_result") and final_state["eligibility_result"].is_eligible) else "NOT_ELIGIBLE",
-                "support_amount": float(final_state["recommendation"].financial_support_amount or 0) if final_state.get("recommendation") else 0.0,
-                # New fields from enhanced extraction (nullable fields can be None)
-                "company_name": employment_data.get("company_name"),
-                "current_position": employment_data.get("current_position"),
-                "join_date": employment_data.get("join_date"),
-                "credit_rating": credit_data.get("credit_rating"),
-                "credit_accounts": json.dumps(credit_data.get("credit_accounts", [])),
-                "payment_ratio": float(credit_data.get("payment_history", {}).get("payment_ratio", 0)) if (credit_data.get("payment_history") and credit_data.get("payment_history", {}).get("payment_ratio") is not None) else None,
-                "total_outstanding": float(credit_data.get("total_outstanding", 0)) if credit_data.get("total_outstanding") is not None else None,
-                "work_experience_years": int(employment_data.get("experience_years", 0)) if employment_data.get("experience_years") is not None else None,
-                "education_level": employment_data.get("education_level")
-            }
-            # DEBUG: Log prepared app_data before DB insert
-            logger.info(f"[{application_id}] DEBUG - app_data credit_score: {app_data.get('credit_score')}")
-            logger.info(f"[{application_id}] DEBUG - app_data company_name: {app_data.get('company_name')}")
-            logger.info(f"[{application_id}] DEBUG - app_data credit_rating: {app_data.get('credit_rating')}")
-            logger.info(f"[{application_id}] DEBUG - app_data status BEFORE save: {app_data.get('status')}")
-            # Save to SQLite
-            unified_db.sqlite.insert_application(app_data)
-            logger.info(f"Saved application data to SQLite for {application_id} with status: {app_data.get('status')}")
-        
-        if final_state.get("validation_report"):
-            validation_report = final_state["validation_report"]
-            validation_data = {
-                "is_valid": validation_report.is_valid,
-                "completeness_score": validation_report.data_completeness_score,
-                "confidence_score": validation_report.confidence_score,
-                "issues": [{"field": i.field, "severity": i.severity, "message": i.message} 
-                          for i in validation_report.issues]
-            }
-            # Store validation metrics in analytics
-            unified_db.sqlite.update_analytics(
-                f"{application_id}_validation",
-                validation_report.data_completeness_score,
-                validation_data
-            )
-            logger.info(f"Saved validation data for {application_id}")
-        
-        if final_state.get("eligibility_result") and final_state.get("recommendation"):
-            eligibility = final_state["eligibility_result"]
-            recommendation = final_state["recommendation"]
-            decision_data = {
-                "decision_id": f"DEC_{application_id}",
-                "app_id": application_id,
-                "decision": recommendation.decision.value if hasattr(recommendation.decision, 'value') else str(recommendation.decision),
-                "decision_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "decided_by": "SYSTEM",
-                "policy_score": eligibility.eligibility_score,
-                "ml_score": eligibility.ml_prediction.get("probability") if (eligibility.ml_prediction and isinstance(eligibility.ml_prediction, dict)) else None,
-                "priority": "high" if eligibility.is_eligible else "low",
-                "reasoning": json.dumps(eligibility.reasoning),
-                "support_type": recommendation.financial_support_type,
-                "support_amount": recommendation.financial_support_amount,
-                "duration_months": None,  # Duration not in Recommendation dataclass - set NULL
-                "conditions": json.dumps([prog.get("program_name") if isinstance(prog, dict) else prog for prog in recommendation.economic_enablement_programs]) if recommendation.economic_enablement_programs else None
-            }
-            # Save decision to SQLite
-            unified_db.sqlite.insert_decision(decision_data)
-            logger.info(f"Saved decision data to SQLite for {application_id}")
-        
-        if final_state.get("recommendation"):
-            recommendation = final_state["recommendation"]
-            recommendation_data = {
-                "decision_type": recommendation.decision.value if hasattr(recommendation.decision, 'value') else str(recommendation.decision),
-                "financial_support_amount": recommendation.financial_support_amount,
-                "financial_support_type": recommendation.financial_support_type,
-                "programs": recommendation.economic_enablement_programs,
-                "reasoning": recommendation.reasoning
-            }
-            # Store recommendation summary in analytics
-            unified_db.sqlite.update_analytics(
-                f"{application_id}_recommendation",
-                float(recommendation.financial_support_amount or 0),
-                recommendation_data
+        existing = await run_io(job_queue.get_job_by_idempotency_key, idempotency_key) if idempotency_key else None
+        if existing and existing["application_id"] != application_id:
+            request_span.end(output={"success": False, "error": "Idempotency-Key reused"}, level="ERROR")
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different application"
             )
-            logger.info(f"Saved recommendation data for {application_id}")
-        
-        db_span.end(output={"success": True, "records_saved": "application, validation, decision, recommendation"})
-        
-        # Update state
-        active_applications[application_id] = final_state
-        logger.info(f"Application {application_id} processing complete - all data saved to database")
-        
-        # Extract metrics for structured logging
-        recommendation = final_state.get('recommendation')
-        eligibility_result = final_state.get('eligibility_result')
-        
-        # Safely extract decision (handle both enum and string)
-        if recommendation:
-            decision_obj = recommendation.decision
-            decision = decision_obj.value if hasattr(decision_obj, 'value') else str(decision_obj)
-        else:
-            decision = 'unknown'
-        
-        eligibility_score = eligibility_result.eligibility_score if eligibility_result else 0
-        support_amount = recommendation.financial_support_amount if recommendation else 0
         
-        # Structured logging for observability
-        structured_logger.info(
-            "Application processing completed",
-            application_id=application_id,
-            decision=decision,
-            eligibility_score=eligibility_score,
-            support_amount=support_amount,
-            programs_recommended=len(recommendation.economic_enablement_programs) if recommendation else 0
+        if existing is None:
+            latest = await run_io(job_queue.get_latest_job_status, application_id)
+            if not (latest and latest["status"] in JobQueue.ACTIVE_STATUSES):
+                # Shed load before queueing: extraction (OCR) is the first stage every job needs
+                queue_stats = await run_io(job_queue.get_queue_stats)
+                try:
+                    admission.check_backlog(
+                        "ocr",
+                        queued=queue_stats["counts"][JobQueue.QUEUED],
+                        running=queue_stats["counts"][JobQueue.RUNNING],
+                        service_seconds=queue_stats["avg_service_seconds"]
+                    )
+                except AdmissionRejected:
+                    request_span.end(output={"success": False, "error": "Job backlog full"}, level="WARNING")
+                    raise
+        
+        # Attaches to an active job / replays the key's job instead of running twice
+        job, outcome = await run_io(
+            job_queue.enqueue_or_attach, application_id, payload, "process_application", idempotency_key
         )
+        if outcome == "created":
+            await run_io(progress_events.publish, application_id, "job_queued", job_id=job["job_id"])
+        if outcome == "replayed":
+            response.headers["Idempotent-Replayed"] = "true"
         
-        # Audit logging for compliance
-        audit_logger.log_audit_event(
+        await run_io(
+            audit_logger.log_audit_event,
             event_type="application_process",
-            action="PROCESS_COMPLETE",
+            action="PROCESS_QUEUED" if outcome == "created" else "PROCESS_DEDUPLICATED",
             application_id=application_id,
-            resource="application",
-            resource_id=application_id,
-            details={
-                "decision": decision,
-                "eligibility_score": eligibility_score,
-                "support_amount": support_amount,
-                "processing_stage": final_state["stage"].value if (final_state.get("stage") and hasattr(final_state["stage"], 'value')) else (str(final_state.get("stage", "unknown")))
-            },
+            resource="job",
+            resource_id=job["job_id"],
+            details={"document_count": len(documents_list), "outcome": outcome},
             status="success"
         )
         
-        # Cache final results AND full application data in TinyDB (6-hour TTL)
-        tinydb_cache.store_app_context(
-            f"{application_id}_result",
-            {
-                "decision": decision,
-                "eligibility_score": eligibility_score,
-                "support_amount": support_amount,
-                "processed_at": datetime.now().isoformat(),
-                "status": "COMPLETED"
-            }
-        )
+        request_span.end(output={"success": True, "job_id": job["job_id"], "outcome": outcome})
         
-        # CRITICAL: Update main application cache with completed status and ALL relevant fields
-        tinydb_cache.store_app_context(
-            application_id,
-            {
-                "applicant_name": app_data.get("applicant_name", ""),
-                "status": app_data.get("status", "completed"),
-                "created_at": app_data.get("created_at", ""),
-                "monthly_income": app_data.get("monthly_income", 0),
-                "monthly_expenses": app_data.get("monthly_expenses", 0),
-                "credit_score": app_data.get("credit_score", 0),
-                "credit_rating": app_data.get("credit_rating", "N/A"),
-                "employment_status": app_data.get("employment_status", "Unknown"),
-                "company_name": app_data.get("company_name", ""),
-                "current_position": app_data.get("current_position", ""),
-                "family_size": app_data.get("family_size", 1),
-                "total_assets": app_data.get("total_assets", 0),
-                "total_liabilities": app_data.get("total_liabilities", 0),
-                "payment_ratio": app_data.get("payment_ratio", 0),
-                "total_outstanding": app_data.get("total_outstanding", 0),
-                "decision": decision,
-                "eligibility": app_data.get("eligibility", ""),
-                "eligibility_score": eligibility_score,
-                "support_amount": support_amount,
-                "policy_score": app_data.get("policy_score", 0),
-                "updated_at": datetime.now().isoformat()
+        messages = {
+            "created": "Application queued for processing",
+            "attached": "Application is already being processed",
+            "replayed": "Returning the job created for this Idempotency-Key"
+        }
+        return ProcessingStatusResponse(
+            application_id=application_id,
+            current_stage=job["status"],
+            message=messages[outcome],
+            data={
+                "job_id": job["job_id"],
+                "status": job["status"],
+                "outcome": outcome,
+                "created_at": job["created_at"],
+                "status_url": f"/api/applications/{application_id}/status",
+                "events_url": f"/api/applications/{application_id}/events",
+                "job_url": f"/api/jobs/{job['job_id']}"
             }
         )
+    
+    except (HTTPException, AdmissionRejected):
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing application: {e}")
+        request_span.end(output={"success": False, "error": str(e)}, level="ERROR")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/applications/{application_id}/resume", response_model=ProcessingStatusResponse, status_code=202, tags=["Applications"])
+async def resume_application(
+    application_id: str = PathParam(..., example="APP-000001", description="Application ID to resume")
+):
+    """
+    Queue the application's last run to continue after its last successful node.
+    
+    **TEST DATA:**
+    ```
+    application_id: "APP-000001"  (Must have been processed, with a failed node)
+    ```
+    
+    **Process:**
+    1. Reads the run's LangGraph checkpoints (`thread_id` = application ID)
+    2. Finds the first node that recorded errors (or where a crashed run stopped)
+    3. Queues a `resume_application` job; the worker reuses the outputs of the
+       nodes before it, so extraction (OCR) is not repeated after a failed
+       `recommend` or `explain`
+    
+    **Returns:** `202 Accepted` with the job ID, the node the run resumes at
+    and the nodes whose results are reused.
+    
+    **Errors:** `404` when the application or its checkpoints are unknown
+    (process it first), `409` when a job is already active or the last run
+    finished without failed nodes.
+    """
+    try:
+        state = await run_io(state_store.get, application_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Application not found")
         
-        # Add/Update NetworkX graph with application data for similarity matching
-        try:
-            # Check if node exists, update if so, create if not
-            app_node = f"APP_{application_id}"
-            if app_node in networkx_db.graph:
-                # Update existing node
-                networkx_db.graph.nodes[app_node].update({
-                    'status': app_data.get('status', 'completed'),
-                    'monthly_income': app_data.get('monthly_income', 0),
-                    'employment_status': app_data.get('employment_status', 'Unknown'),
-                    'credit_score': app_data.get('credit_score', 0),
-                    'decision': decision,
-                    'eligibility_score': eligibility_score,
-                    'support_amount': support_amount,
-                    'updated_at': datetime.now().isoformat()
-                })
-            else:
-                # Create new application node
-                profile_data = {
-                    'monthly_income': app_data.get('monthly_income', 0),
-                    'employment_status': app_data.get('employment_status', 'Unknown'),
-                    'credit_score': app_data.get('credit_score', 0),
-                    'family_size': app_data.get('family_size', 1),
-                    'id_number': app_data.get('emirates_id', ''),
-                    'decision': decision,
-                    'eligibility_score': eligibility_score,
-                    'support_amount': support_amount
-                }
-                networkx_db.create_application_node(
-                    application_id,
-                    app_data.get('applicant_name', 'Unknown'),
-                    profile_data
-                )
-            
-            # Save updated graph to file
-            import networkx as nx
-            nx.write_graphml(networkx_db.graph, "application_graph.graphml")
-            logger.info(f"Updated NetworkX graph with {application_id}")
-        except Exception as e:
-            logger.warning(f"Failed to update NetworkX graph: {e}")
+        latest = await run_io(job_queue.get_latest_job_status, application_id)
+        if latest and latest["status"] in JobQueue.ACTIVE_STATUSES:
+            raise HTTPException(status_code=409, detail="Application is already being processed")
         
-        # Index to ChromaDB for semantic search
-        try:
-            # Index application summary
-            summary_data = {
-                'applicant_name': app_data.get('applicant_name', 'Unknown'),
-                'employment_status': app_data.get('employment_status', 'Unknown'),
-                'monthly_income': app_data.get('monthly_income', 0),
-                'family_size': app_data.get('family_size', 1),
-                'policy_score': eligibility_score,
-                'eligibility': app_data.get('eligibility', 'PENDING')
-            }
-            chroma_db.index_application_summary(application_id, summary_data)
-            
-            # Index income pattern
-            income_data = {
-                'monthly_income': app_data.get('monthly_income', 0),
-                'monthly_expenses': app_data.get('monthly_expenses', 0),
-                'employment_status': app_data.get('employment_status', 'Unknown'),
-                'credit_score': app_data.get('credit_score', 0),
-                'net_worth': app_data.get('total_assets', 0) - app_data.get('total_liabilities', 0)
-            }
-            chroma_db.index_income_pattern(application_id, income_data)
-            
-            # Index case decision
-            decision_data = {
-                'decision_type': decision,
-                'eligibility_score': eligibility_score,
-                'support_amount': support_amount,
-                'reasoning': f"Policy score: {eligibility_score}, Programs: {len(recommendation_data.get('programs', []))}"
-            }
-            chroma_db.index_case_decision(application_id, decision_data)
-            
-            logger.info(f"Indexed {application_id} to ChromaDB (3 collections)")
-        except Exception as e:
-            logger.warning(f"Failed to index to ChromaDB: {e}")
+        point = await orchestrator.get_resume_point(application_id)
+        if point is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No checkpoints for application {application_id}. Process it first using POST /api/applications/{{id}}/process"
+            )
+        if point["node"] is None:
+            raise HTTPException(status_code=409, detail="Last run finished without failed nodes; nothing to resume")
         
-        # Prepare response
-        progress = 100 if final_state["stage"] == ProcessingStage.COMPLETED else 50
+        job, outcome = await run_io(
+            job_queue.enqueue_or_attach, application_id, _build_process_payload(state), JobQueue.RESUME
+        )
+        if outcome == "created":
+            await run_io(progress_events.publish, application_id, "job_queued", job_id=job["job_id"])
         
-        response_data = ProcessingStatusResponse(
+        await run_io(
+            audit_logger.log_audit_event,
+            event_type="application_process",
+            action="RESUME_QUEUED" if outcome == "created" else "PROCESS_DEDUPLICATED",
+            application_id=application_id,
+            resource="job",
+            resource_id=job["job_id"],
+            details={"resume_node": point["node"], "completed_nodes": point["completed_nodes"]},
+            status="success"
+        )
+        
+        return ProcessingStatusResponse(
             application_id=application_id,
-            current_stage=final_state["stage"],
-            progress_percentage=progress,
-            message="Application processing completed",
+            current_stage=job["status"],
+            message=f"Application queued to resume at '{point['node']}'",
             data={
-                "extracted_data": final_state.get("extracted_data") is not None,
-                "validation_valid": final_state["validation_report"].is_valid if final_state.get("validation_report") else False,
-                "eligibility_score": final_state["eligibility_result"].eligibility_score if final_state.get("eligibility_result") else 0,
-                "decision": (final_state["recommendation"].decision.value if hasattr(final_state["recommendation"].decision, 'value') else str(final_state["recommendation"].decision)) if final_state.get("recommendation") else "PENDING"
+                "job_id": job["job_id"],
+                "status": job["status"],
+                "outcome": outcome,
+                "resume_node": point["node"],
+                "failed_node": point["failed_node"],
+                "completed_nodes": point["completed_nodes"],
+                "checkpoint_id": point["checkpoint_id"],
+                "status_url": f"/api/applications/{application_id}/status",
+                "events_url": f"/api/applications/{application_id}/events",
+                "job_url": f"/api/jobs/{job['job_id']}"
             }
         )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing resume: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/jobs/{job_id}", tags=["Applications"])
+async def get_job(
+    job_id: str = PathParam(..., example="JOB_1A2B3C4D5E6F", description="Job ID returned by the process endpoint")
+):
+    """
+    Get a processing job record.
+    
+    **Returns:** Job status (queued, running, succeeded, failed), attempts,
+    timestamps, error message and, once succeeded, the status payload.
+    """
+    job = await run_io(job_queue.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Results are served by /results; keep the job view light
+    result = job.pop("result", None)
+    job["status_payload"] = result.get("status") if result else None
+    return job
+
+
+async def _get_latest_job(application_id: str) -> Optional[Dict[str, Any]]:
+    """Latest processing job for an application (workers write final state to the state store)"""
+    return await run_io(job_queue.get_latest_job, application_id)
+
+
+async def _application_etag(application_id: str) -> Optional[str]:
+    """
+    Strong ETag for an application's status/results representation.
+    
+    Combines the state store version (bumped on every state write) with the
+    latest job's id/status/attempts. Both are single indexed lookups, so an
+    unchanged application is answered with 304 without building its payload.
+    None when the application only exists in the SQLite archive.
+    """
+    version, job = await asyncio.gather(
+        run_io(state_store.get_version, application_id),
+        run_io(job_queue.get_latest_job_status, application_id)
+    )
+    if version is None and job is None:
+        return None
+    job_part = f"{job['job_id']}.{job['status']}.{job['attempts']}" if job else "nojob"
+    return f'"{application_id}.v{version or 0}.{job_part}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as used for conditional GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def _set_etag(response: Response, etag: Optional[str]):
+    """Attach the ETag; clients must revalidate before reusing the body"""
+    if etag:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    """Encode a progress event as a Server-Sent Events message"""
+    return f"id: {event['event_id']}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+@app.get("/api/applications/{application_id}/events", tags=["Applications"])
+async def stream_application_events(
+    request: Request,
+    application_id: str = PathParam(..., example="APP_1A2B3C4D", description="Application ID to follow"),
+    last_event_id: Optional[int] = Query(None, ge=0, description="Resume after this event ID (overrides the Last-Event-ID header)"),
+    timeout: float = Query(600.0, gt=0, le=3600, description="Close the stream after this many seconds")
+):
+    """
+    Stream pipeline progress as Server-Sent Events (`text/event-stream`).
+    
+    **TEST DATA:**
+    ```
+    curl -N http://localhost:8000/api/applications/APP_1A2B3C4D/events
+    ```
+    
+    **Events** (SSE `event:` field; `data:` is the JSON event):
+    - `job_queued`, `job_started` - job_id, attempt, worker_id
+    - `pipeline_started` - document_count
+    - `pipeline_resumed` - node, completed_nodes, failed_node (resume jobs and retries)
+    - `node_started` / `node_completed` - node (extract, validate, eligibility_check,
+      recommend, explain), status, stage, duration_ms, errors
+    - `pipeline_completed` - final_stage, decision, is_eligible, eligibility_score,
+      support_amount, processing_time_seconds
+    - `pipeline_failed`, `job_retrying` - error
+    - `job_succeeded` / `job_failed` - end of stream
+    
+    Without `Last-Event-ID` the stream replays the current processing run from
+    its `job_queued` event, so clients connecting late still see every step.
+    Reconnecting clients resume from their last event ID (standard SSE behaviour).
+    A `: keep-alive` comment is sent every 15 seconds while idle.
+    """
+    if last_event_id is None:
+        header = request.headers.get("last-event-id")
+        last_event_id = int(header) if header and header.isdigit() else None
+    
+    if last_event_id is None and not await run_io(state_store.exists, application_id):
+        if not await run_io(sqlite_db.get_application, application_id):
+            raise HTTPException(status_code=404, detail="Application not found")
+    
+    async def sse():
+        async for event in progress_events.stream(application_id, after_id=last_event_id, timeout=timeout):
+            if await request.is_disconnected():
+                return
+            yield ": keep-alive\n\n" if event is None else _format_sse(event)
+    
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/applications/{application_id}/timeline", tags=["Applications"])
+async def get_application_timeline(
+    application_id: str = PathParam(..., example="APP_1A2B3C4D", description="Application ID"),
+    run_id: Optional[str] = Query(None, description="A specific run (default: the latest)")
+):
+    """
+    Span tree (waterfall) of the application's processing run.
+    
+    **TEST DATA:**
+    ```
+    application_id: "APP_1A2B3C4D"  (Must have been processed)
+    ```
+    
+    **Returns:** `tree` - nested spans with `name`, `kind` (pipeline, node,
+    document, ml, store, io), `start_ms` from the start of the run, `wall_ms`,
+    `cpu_ms`, `status` and `children`; plus `runs`, the application's recent runs.
+    
+    CPU time of synchronous work is measured in the thread that ran it; async
+    spans report their children's CPU. `cpu_ms` above `wall_ms` means children
+    (e.g. documents in the process pool) ran in parallel.
+    
+    **Errors:** `404` when the application has no recorded run.
+    """
+    try:
+        timeline_store = services.timeline_store
+        if timeline_store is None:
+            raise HTTPException(status_code=404, detail="Pipeline timelines are disabled (TIMELINE_ENABLED=0)")
         
-        # End request span with successful response
-        request_span.end(output={
-            "success": True,
-            "stage": final_state["stage"],
-            "is_eligible": final_state["eligibility_result"].is_eligible if final_state.get("eligibility_result") else False,
-            "support_amount": final_state["recommendation"].financial_support_amount if final_state.get("recommendation") else 0
-        })
-        
-        # Flush Langfuse to ensure trace is written
-        langfuse_client.flush()
-        
-        logger.info(f"Langfuse trace completed for API request: {application_id}")
+        run = await run_io(timeline_store.get_run, application_id, run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail=f"No timeline for application {application_id}")
         
-        return response_data
+        run["runs"] = await run_io(timeline_store.list_runs, application_id)
+        return run
     
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        error_trace = traceback.format_exc()
-        logger.error(f"Error processing application: {e}\n{error_trace}")
-        request_span.end(output={"success": False, "error": str(e)}, level="ERROR")
-        langfuse_client.flush()
+        logger.error(f"Error getting timeline: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/applications/{application_id}/trace", tags=["Applications"])
+async def get_application_trace(
+    application_id: str = PathParam(..., example="APP_1A2B3C4D", description="Application ID")
+):
+    """
+    Trace summary of the application's latest processing run.
+    
+    **Returns:** trace_id, processing_time_seconds, per-stage success flags,
+    final_decision and errors, as recorded when the run finished.
+    
+    **Errors:** `404` when no run of the application has been recorded.
+    """
+    try:
+        trace = await run_io(services.trace_store.get, application_id)
+        if trace is None:
+            raise HTTPException(status_code=404, detail=f"No trace for application {application_id}")
+        return trace
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting trace: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/applications/{application_id}/status", response_model=ProcessingStatusResponse, tags=["Applications"])
 async def get_application_status(
+    request: Request,
+    response: Response,
     application_id: str = PathParam(..., example="APP-000001", description="Application ID to check")
 ):
     """
@@ -1032,11 +1404,40 @@ async def get_application_status(
       }
     }
     ```
+    
+    **Conditional GET:** Responses carry a strong `ETag` that changes whenever the
+    application state or its job changes. Send it back in `If-None-Match` to get
+    `304 Not Modified` (no body) while nothing has changed.
     """
     try:
-        if application_id not in active_applications:
+        etag = await _application_etag(application_id)
+        if etag and _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        _set_etag(response, etag)
+        
+        # Queued/processed applications: the job record is the source of truth
+        job = await _get_latest_job(application_id)
+        if job and job["status"] in JobQueue.ACTIVE_STATUSES:
+            return ProcessingStatusResponse(
+                application_id=application_id,
+                current_stage=job["status"],
+                message=f"Job {job['job_id']} is {job['status']}",
+                data={"job_id": job["job_id"], "attempts": job["attempts"], "started_at": job["started_at"]}
+            )
+        if job and job["status"] == JobQueue.SUCCEEDED and job["result"]:
+            return ProcessingStatusResponse(**job["result"]["status"])
+        if job and job["status"] == JobQueue.FAILED:
+            return ProcessingStatusResponse(
+                application_id=application_id,
+                current_stage=ProcessingStage.FAILED.value,
+                message=f"Processing failed: {job['error']}",
+                data={"job_id": job["job_id"], "attempts": job["attempts"], "error": job["error"]}
+            )
+        
+        state = await run_io(state_store.get, application_id)
+        if state is None:
             # Try to load from database
-            app_data = sqlite_db.get_application(application_id)
+            app_data = await run_io(sqlite_db.get_application, application_id)
             if not app_data:
                 raise HTTPException(status_code=404, detail="Application not found")
             
@@ -1048,56 +1449,12 @@ async def get_application_status(
                 data=app_data
             )
         
-        state = active_applications[application_id]
-        
-        # Handle both ApplicationState (old) and ApplicationGraphState (new dict from LangGraph)
-        if isinstance(state, dict):
-            # LangGraph state (dict)
-            stage = state.get("stage", "PENDING")
-            documents_count = len(state.get("documents", []))
-            has_extracted = state.get("extracted_data") is not None
-            has_validation = state.get("validation_report") is not None
-            has_eligibility = state.get("eligibility_result") is not None
-            has_recommendation = state.get("recommendation") is not None
-        else:
-            # Old ApplicationState object
-            stage = state.stage.value if hasattr(state.stage, 'value') else state.stage
-            documents_count = len(state.documents)
-            has_extracted = state.extracted_data is not None
-            has_validation = state.validation_report is not None
-            has_eligibility = state.eligibility_result is not None
-            has_recommendation = state.recommendation is not None
-        
-        stage_progress = {
-            "PENDING": 0,
-            "EXTRACTING": 20,
-            "extracting": 20,
-            "VALIDATING": 40,
-            "validating": 40,
-            "CHECKING_ELIGIBILITY": 60,
-            "checking_eligibility": 60,
-            "GENERATING_RECOMMENDATION": 80,
-            "generating_recommendation": 80,
-            "COMPLETED": 100,
-            "completed": 100,
-            "FAILED": 0,
-            "failed": 0
-        }
-        
         return ProcessingStatusResponse(
-            application_id=application_id,
-            current_stage=stage,
-            progress_percentage=stage_progress.get(stage, 0),
-            message=f"Application is in {stage} stage",
-            data={
-                "documents_count": documents_count,
-                "has_extracted_data": has_extracted,
-                "has_validation": has_validation,
-                "has_eligibility": has_eligibility,
-                "has_recommendation": has_recommendation
-            }
+            **build_status_payload(application_id, state)
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1105,6 +1462,8 @@ async def get_application_status(
 
 @app.get("/api/applications/{application_id}/results", tags=["Applications"])
 async def get_application_results(
+    request: Request,
+    response: Response,
     application_id: str = PathParam(..., example="APP-000001", description="Application ID to get results for")
 ):
     """
@@ -1163,11 +1522,30 @@ async def get_application_results(
       "explanation": {...}
     }
     ```
+    
+    **Conditional GET:** Same `ETag` / `If-None-Match` handling as `/status`;
+    large bodies are gzip-compressed for clients sending `Accept-Encoding: gzip`.
     """
     try:
-        if application_id not in active_applications:
-            # Try to load from database if not in memory
-            db_data = sqlite_db.get_application(application_id)
+        etag = await _application_etag(application_id)
+        if etag and _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        _set_etag(response, etag)
+        
+        # Applications processed by a worker: serve the result stored on the job
+        job = await _get_latest_job(application_id)
+        if job and job["status"] in JobQueue.ACTIVE_STATUSES:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Application {application_id} is still {job['status']} (job {job['job_id']})"
+            )
+        if job and job["status"] == JobQueue.SUCCEEDED and job["result"]:
+            return job["result"]["results"]
+        
+        state = await run_io(state_store.get, application_id)
+        if state is None:
+            # Try to load from database if not in the state store
+            db_data = await run_io(sqlite_db.get_application, application_id)
             if not db_data:
                 raise HTTPException(
                     status_code=404, 
@@ -1183,29 +1561,9 @@ async def get_application_results(
                 "note": "For real-time agent processing, create a new application and upload documents."
             }
         
-        state = active_applications[application_id]
-        
-        # Handle both ApplicationState (old) and ApplicationGraphState (new dict from LangGraph)
-        if isinstance(state, dict):
-            # LangGraph state (dict)
-            stage = state.get("stage", "UNKNOWN")
-            extracted_data = state.get("extracted_data")
-            validation_report = state.get("validation_report")
-            eligibility_result = state.get("eligibility_result")
-            recommendation = state.get("recommendation")
-            explanation = state.get("explanation")
-        else:
-            # Old ApplicationState object
-            stage = state.stage.value if hasattr(state.stage, 'value') else state.stage
-            extracted_data = state.extracted_data
-            validation_report = state.validation_report
-            eligibility_result = state.eligibility_result
-            recommendation = state.recommendation
-            explanation = state.explanation
-        
         # Get complete data from database
         try:
-            full_data = sqlite_db.get_application(application_id)
+            full_data = await run_io(sqlite_db.get_application, application_id)
             if not full_data:
                 logger.warning(f"Application {application_id} not found in SQLite database")
                 full_data = {}
@@ -1213,58 +1571,10 @@ async def get_application_results(
             logger.error(f"Error retrieving application from database: {e}")
             full_data = {}
         
-        return {
-            "application_id": application_id,
-            "current_stage": stage,
-            "extracted_data": {
-                "applicant_info": extracted_data.applicant_info,
-                "income_data": extracted_data.income_data,
-                "employment_data": extracted_data.employment_data,
-                "assets_liabilities": extracted_data.assets_liabilities,
-                "credit_data": extracted_data.credit_data,
-                "family_info": extracted_data.family_info,
-            } if extracted_data else None,
-            "database_stored_fields": {
-                "company_name": full_data.get('company_name'),
-                "current_position": full_data.get('current_position'),
-                "join_date": full_data.get('join_date'),
-                "credit_score": full_data.get('credit_score'),
-                "credit_rating": full_data.get('credit_rating'),
-                "payment_ratio": full_data.get('payment_ratio'),
-                "total_outstanding": full_data.get('total_outstanding'),
-                "work_experience_years": full_data.get('work_experience_years'),
-                "education_level": full_data.get('education_level')
-            } if full_data else None,
-            "validation": {
-                "is_valid": validation_report.is_valid,
-                "completeness_score": validation_report.data_completeness_score,
-                "confidence_score": validation_report.confidence_score,
-                "issues": [{"field": i.field, "severity": i.severity, "message": i.message}
-                          for i in validation_report.issues]
-            } if validation_report else None,
-            "eligibility": {
-                "is_eligible": eligibility_result.is_eligible,
-                "eligibility_score": eligibility_result.eligibility_score,
-                "ml_prediction": eligibility_result.ml_prediction,
-                "policy_rules_met": eligibility_result.policy_rules_met,
-                "reasoning": eligibility_result.reasoning
-            } if eligibility_result else None,
-            "recommendation": {
-                "decision": recommendation.decision.value if hasattr(recommendation.decision, 'value') else str(recommendation.decision),
-                "support_amount": recommendation.financial_support_amount,
-                "support_type": recommendation.financial_support_type,
-                "programs": recommendation.economic_enablement_programs,
-                "reasoning": recommendation.reasoning,
-                "key_factors": recommendation.key_factors
-            } if recommendation else None,
-            "explanation": {
-                "summary": explanation.summary,
-                "detailed_reasoning": explanation.detailed_reasoning,
-                "factors_analysis": explanation.factors_analysis
-            } if explanation else None,
-            "database_data": full_data
-        }
+        return build_results_payload(application_id, state, full_data)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting results: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1336,12 +1646,16 @@ async def chat_with_agent(chat_query: ChatQuery):
     4. Caches in TinyDB for fast repeated queries
     5. Saves conversation history
     
-    **Langfuse Tracing:** Full chat trace exported
+    **Langfuse Tracing:** Chat trace buffered and exported in the background
+    (sampled per `TRACING_SAMPLE_RATES`)
     
     **Response Time:** 1-3 seconds (with ChromaDB + GPT-4)
+    
+    **Backpressure:** `429 Too Many Requests` with `Retry-After` when the LLM
+    pool and its wait queue are full.
     """
     # Start Langfuse trace for chat request
-    chat_trace = langfuse_client.trace(
+    chat_trace = tracer.trace(
         name="fastapi_chat_request",
         id=f"chat_trace_{chat_query.application_id}_{int(datetime.now().timestamp())}",
         metadata={
@@ -1357,10 +1671,10 @@ async def chat_with_agent(chat_query: ChatQuery):
     try:
         application_id = chat_query.application_id
         
-        # PRODUCTION FIX: Load application data from database if not in active sessions
-        if application_id not in active_applications:
+        # PRODUCTION FIX: Load application data from database if not in the state store
+        if not await run_io(state_store.exists, application_id):
             # Retrieve full application data from database
-            db_data = sqlite_db.get_application(application_id)
+            db_data = await run_io(sqlite_db.get_application, application_id)
             
             if not db_data:
                 raise HTTPException(
@@ -1421,19 +1735,17 @@ async def chat_with_agent(chat_query: ChatQuery):
                 state.eligibility_result = eligibility_dict
                 state.stage = ProcessingStage.COMPLETED
             
-            # Add to orchestrator's applications dictionary AND active_applications
-            orchestrator.applications[application_id] = state
-            active_applications[application_id] = state
-        else:
-            state = active_applications[application_id]
+            # Shared with the orchestrator through the state store
+            await run_io(state_store.put, application_id, state)
         
         # Handle chat query via orchestrator (will use RAG with full database context)
         start_time = time.time()
         
         rag_span = chat_trace.span(name="rag_agent_execution")
-        response = await orchestrator.handle_chat_query(
-            application_id, chat_query.query, chat_query.query_type
-        )
+        async with admission.admit("llm"):
+            response = await orchestrator.handle_chat_query(
+                application_id, chat_query.query, chat_query.query_type
+            )
         response_time_ms = int((time.time() - start_time) * 1000)
         
         # Extract response text
@@ -1448,7 +1760,8 @@ async def chat_with_agent(chat_query: ChatQuery):
         
         # PRODUCTION-GRADE: Save conversation to persistent storage
         persistence_span = chat_trace.span(name="conversation_persistence")
-        conversation_manager.save_conversation(
+        await run_io(
+            conversation_manager.save_conversation,
             application_id=application_id,
             user_query=chat_query.query,
             assistant_response=response_text,
@@ -1460,7 +1773,8 @@ async def chat_with_agent(chat_query: ChatQuery):
         persistence_span.end(output={"success": True, "saved_to": "conversation_manager"})
         
         # Log audit event
-        audit_logger.log_audit_event(
+        await run_io(
+            audit_logger.log_audit_event,
             event_type="chat_query",
             action="chat",
             application_id=application_id,
@@ -1476,8 +1790,8 @@ async def chat_with_agent(chat_query: ChatQuery):
             "chatbot_enabled": True
         })
         
-        # Flush Langfuse
-        langfuse_client.flush()
+        # Hand the trace to the background flusher (does not wait)
+        tracer.flush()
         
         logger.info(f"Langfuse trace completed for chat request: {application_id}")
         
@@ -1488,13 +1802,44 @@ async def chat_with_agent(chat_query: ChatQuery):
             "chatbot_enabled": True
         }
     
+    except AdmissionRejected:
+        chat_span.end(output={"success": False, "error": "LLM pool saturated"}, level="WARNING")
+        raise
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         chat_span.end(output={"success": False, "error": str(e)}, level="ERROR")
-        langfuse_client.flush()
+        tracer.flush()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _load_processed_state(application_id: str):
+    """Stored state of a fully processed application (404 unknown, 400 not processed yet)"""
+    state = await run_io(state_store.get, application_id)
+    if state is None:
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Application {application_id} not found in active sessions. Please process the application first using POST /api/applications/{{id}}/process"
+        )
+    
+    # Handle both dict and object state
+    if isinstance(state, dict):
+        extracted_data = state.get("extracted_data")
+        eligibility_result = state.get("eligibility_result")
+        stage = state.get("stage", "UNKNOWN")
+    else:
+        extracted_data = state.extracted_data
+        eligibility_result = state.eligibility_result
+        stage = state.stage.value if hasattr(state.stage, 'value') else state.stage
+    
+    # Validate that application has been processed
+    if not extracted_data or not eligibility_result:
+        raise HTTPException(
+            status_code=400,
+            detail="Application must be fully processed before running simulations. Current stage: " + stage
+        )
+    return state
+
+
 @app.post("/api/applications/{application_id}/simulate", tags=["Applications"])
 async def simulate_changes(simulation: SimulationQuery):
     """
@@ -1556,11 +1901,12 @@ async def simulate_changes(simulation: SimulationQuery):
     ```
     
     **How It Works:**
-    1. Takes original application data
-    2. Applies your "what-if" changes
-    3. Re-runs eligibility + recommendation agents
-    4. Shows new decision and support amount
-    5. Compares original vs simulated outcomes
+    1. Takes a copy of the stored extracted data
+    2. Applies your "what-if" changes (net worth follows assets/liabilities)
+    3. Re-runs the eligibility (ML + policy rules) and recommendation agents in-process
+    4. Returns the exact new score, decision and support amount
+    5. Compares current vs simulated outcomes
+    6. Optionally (`"narrative": true`) adds an LLM narrative
     
     **Use Cases:**
     - "What if I get a job?" → Change employment_status
@@ -1568,61 +1914,116 @@ async def simulate_changes(simulation: SimulationQuery):
     - "What if I improve credit?" → Increase credit_score
     - "What if income increases?" → Increase monthly_income
     
-    **Response Time:** 2-5 seconds (re-running agents)
+    **Returns:** `current`, `simulated` (eligibility_score, is_eligible, decision,
+    support_amount, support_type), `delta`, `changed_fields`, `duration_ms` and a
+    one-line `simulation_result` (the narrative when requested)
+    
+    **Errors:** `404` unknown application, `400` not processed yet, `422` unknown
+    field or non-numeric value
+    
+    **Response Time:** milliseconds (one model inference); seconds with `narrative`
     """
     try:
         application_id = simulation.application_id
+        state = await _load_processed_state(application_id)
         
-        if application_id not in active_applications:
-            raise HTTPException(
-                status_code=404, 
-                detail=f"Application {application_id} not found in active sessions. Please process the application first using POST /api/applications/{{id}}/process"
-            )
-        
-        state = active_applications[application_id]
-        
-        # Handle both dict and object state
-        if isinstance(state, dict):
-            extracted_data = state.get("extracted_data")
-            eligibility_result = state.get("eligibility_result")
-            stage = state.get("stage", "UNKNOWN")
-        else:
-            extracted_data = state.extracted_data
-            eligibility_result = state.eligibility_result
-            stage = state.stage.value if hasattr(state.stage, 'value') else state.stage
-        
-        # Validate that application has been processed
-        if not extracted_data or not eligibility_result:
-            raise HTTPException(
-                status_code=400,
-                detail="Application must be fully processed before running simulations. Current stage: " + stage
-            )
-        
-        # Build simulation query
-        changes_str = ', '.join([f'{k}={v}' for k, v in simulation.changes.items()])
-        query = f"What if: {changes_str}"
-        
-        # Handle chat query via orchestrator (pass application_id, not state object)
+        # Re-score in-process with the pipeline's agents
         try:
-            response = await orchestrator.handle_chat_query(
-                application_id, query, "simulation"
-            )
-        except TypeError as e:
-            logger.error(f"Error in orchestrator.handle_chat_query: {e}")
-            # Fallback: Return simulation explanation
-            response = f"Simulating changes: {changes_str}. To see the impact, please re-run the eligibility and recommendation agents with the new values."
+            result = await simulation_engine.simulate(application_id, state, simulation.changes)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        current, simulated = result["current"], result["simulated"]
+        summary = (
+            f"Score {current['eligibility_score']} → {simulated['eligibility_score']}, "
+            f"decision {current['decision']} → {simulated['decision']}, "
+            f"support {current['support_amount'] or 0:.2f} → {simulated['support_amount'] or 0:.2f} AED"
+        )
+        
+        # Optional LLM narrative, grounded in the computed outcome
+        if simulation.narrative:
+            changes_str = ', '.join([f'{k}={v}' for k, v in simulation.changes.items()])
+            async with admission.admit("llm"):
+                summary = await orchestrator.handle_chat_query(
+                    application_id, f"What if: {changes_str}. Simulated outcome: {summary}", "simulation"
+                )
         
         return {
             "application_id": application_id,
             "changes": simulation.changes,
-            "simulation_result": response
+            **result,
+            "simulation_result": summary
         }
     
+    except (HTTPException, AdmissionRejected):
+        raise
     except Exception as e:
         logger.error(f"Error in simulation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/applications/{application_id}/sensitivity", tags=["Applications"])
+async def sensitivity_sweep(application_id: str, sweep: SensitivityQuery):
+    """
+    Sweep one or two features and find where the eligibility decision flips.
+    
+    **TEST DATA (Copy for Swagger UI - Request Body):**
+    
+    **At what income does this family lose eligibility?**
+    ```json
+    {
+      "axes": [
+        {"feature": "monthly_income", "start": 0, "stop": 15000, "steps": 61}
+      ]
+    }
+    ```
+    
+    **Income × family size:**
+    ```json
+    {
+      "axes": [
+        {"feature": "monthly_income", "start": 0, "stop": 15000, "steps": 31},
+        {"feature": "family_size", "values": [1, 2, 3, 4, 5, 6, 7, 8]}
+      ]
+    }
+    ```
+    
+    **How It Works:**
+    1. Takes the stored application's model features
+    2. Builds the grid (every combination of the axis values); other features keep their stored values
+    3. Scores all scenarios in one vectorised model call plus vectorised policy rules
+    4. Reports where along the first axis the decision flips, for each value of the second axis
+    
+    **Features:** monthly_income, family_size, net_worth, total_assets,
+    total_liabilities, credit_score, employment_years
+    
+    **Returns:** `axes`, `current` (stored values and score), `scores` and `eligible`
+    grids indexed [first axis][second axis], `boundary` (intervals with
+    `eligible_after`), `scenarios`, `duration_ms`
+    
+    **Errors:** `404` unknown application, `400` not processed yet, `422` unknown
+    feature, bad axis or too many scenarios (SENSITIVITY_MAX_SCENARIOS, default 10000)
+    
+    **Response Time:** about one simulation, for hundreds or thousands of scenarios
+    """
+    try:
+        state = await _load_processed_state(application_id)
+        try:
+            result = await simulation_engine.sensitivity(
+                application_id, state, [axis.model_dump(exclude_none=True) for axis in sweep.axes]
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        
+        return {"application_id": application_id, **result}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in sensitivity sweep: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/statistics", tags=["System"])
 async def get_statistics():
     """
@@ -1638,7 +2039,9 @@ async def get_statistics():
     """
     try:
         # Collect statistics from all databases
-        sqlite_stats = sqlite_db.get_eligibility_stats() if hasattr(sqlite_db, 'get_eligibility_stats') else {}
+        sqlite_stats = await run_io(sqlite_db.get_eligibility_stats) if hasattr(sqlite_db, 'get_eligibility_stats') else {}
+        
+        await _sync_graph()
         
         # ChromaDB collection counts
         chromadb_stats = {}
@@ -1646,7 +2049,7 @@ async def get_statistics():
         for collection_name in ['application_summaries', 'resumes', 'income_patterns', 'case_decisions']:
             collection = getattr(chroma_db, collection_name, None)
             if collection:
-                count = collection.count()
+                count = await run_io(collection.count)
                 chromadb_stats[collection_name] = count
                 total_docs += count
         
@@ -1668,8 +2071,8 @@ async def get_statistics():
                 "nodes": networkx_db.graph.number_of_nodes() if networkx_db.graph else 0,
                 "edges": networkx_db.graph.number_of_edges() if networkx_db.graph else 0
             },
-            "active_applications": len(active_applications),
-            "tinydb_cache_stats": tinydb_cache.get_cache_stats() if hasattr(tinydb_cache, 'get_cache_stats') else {"status": "operational"}
+            "active_applications": await run_io(state_store.count),
+            "tinydb_cache_stats": await run_io(tinydb_cache.get_cache_stats) if hasattr(tinydb_cache, 'get_cache_stats') else {"status": "operational"}
         }
     
     except Exception as e:
@@ -1677,6 +2080,130 @@ async def get_statistics():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/system/loop-lag", tags=["System"])
+async def get_loop_lag():
+    """
+    Event loop health and executor pool utilisation.
+    
+    **Metrics:**
+    - Loop lag percentiles (p50/p95/p99/max) - time the loop was blocked
+    - CPU/IO pool sizes, active and queued tasks
+    
+    **Use Case:** A rising p99 means something is running on the event loop
+    that should go through `run_cpu` / `run_io`.
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "loop_lag": get_loop_monitor().get_stats(),
+        "executors": get_executor_pools().get_stats()
+    }
+
+
+@app.get("/api/system/admission", tags=["System"])
+async def get_admission_stats():
+    """
+    Admission control state per resource class.
+    
+    **Metrics (per class: ocr, ml, llm, db_write):**
+    - capacity, in_flight, queue_depth, max_queue
+    - ewma_service_seconds - smoothed service time, basis of `Retry-After`
+    - admitted / rejected / completed counters
+    
+    **Job backlog:** queued/running jobs against `ADMISSION_MAX_QUEUED_JOBS`
+    (this API process only sees its own pools; workers keep their own).
+    """
+    queue_stats = await run_io(job_queue.get_queue_stats)
+    return {
+        "timestamp": datetime.now().isoformat(),
+        **admission.get_stats(),
+        "job_backlog": {
+            "queued": queue_stats["counts"][JobQueue.QUEUED],
+            "running": queue_stats["counts"][JobQueue.RUNNING],
+            "avg_service_seconds": queue_stats["avg_service_seconds"]
+        }
+    }
+
+
+@app.get("/api/system/timeline", tags=["System"])
+async def get_timeline_aggregate(
+    limit: int = Query(100, ge=1, le=5000, description="Number of most recent runs to aggregate"),
+    kind: Optional[str] = Query(None, description="Only spans of this kind (node, document, ml, store, io)")
+):
+    """
+    Where pipeline time goes, aggregated over recent runs.
+    
+    **Metrics (per span name and kind, largest total wall time first):**
+    - count, runs, errors
+    - wall_ms_total / mean / p50 / p95 / max, cpu_ms_mean
+    - wall_share - the span's share of the wall time of the runs it appeared in
+    
+    **Use Case:** Pick the next optimisation target, e.g. compare
+    `extract:emirates_id` against `ml_inference` or `checkpoint.put`.
+    """
+    try:
+        timeline_store = services.timeline_store
+        if timeline_store is None:
+            raise HTTPException(status_code=404, detail="Pipeline timelines are disabled (TIMELINE_ENABLED=0)")
+        return {
+            "timestamp": datetime.now().isoformat(),
+            **await run_io(timeline_store.aggregate, limit, kind)
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error aggregating timelines: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/system/traces", tags=["System"])
+async def query_traces(
+    since_hours: Optional[float] = Query(None, gt=0, description="Only runs recorded in the last N hours"),
+    application_id: Optional[List[str]] = Query(None, description="Only these applications (repeatable)"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum traces to return")
+):
+    """
+    Latest trace per application from the segmented trace store, newest first.
+    
+    **Storage:** run summaries are appended to size-rotated JSONL segments by
+    a background writer; a SQLite index maps each application to its record.
+    `stats` shows segment count, bytes, live vs. superseded records and the
+    writer's queued / dropped counters.
+    """
+    try:
+        trace_store = services.trace_store
+        since = time.time() - since_hours * 3600 if since_hours else None
+        traces = await run_io(trace_store.query, application_id, since, None, limit)
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "count": len(traces),
+            "traces": traces,
+            "stats": await run_io(trace_store.get_stats)
+        }
+    
+    except Exception as e:
+        logger.error(f"Error querying traces: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/system/traces/maintain", tags=["System"])
+async def maintain_traces():
+    """
+    Run trace retention and compaction now (also runs every 1000 written traces).
+    
+    **Process:**
+    1. Prune traces older than `TRACE_RETENTION_HOURS` and delete segments with nothing live
+    2. Compact closed segments whose live fraction is below `TRACE_COMPACT_RATIO`
+    """
+    try:
+        result = await run_io(services.trace_store.maintain)
+        return {"timestamp": datetime.now().isoformat(), **result, "stats": await run_io(services.trace_store.get_stats)}
+    
+    except Exception as e:
+        logger.error(f"Error maintaining traces: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ============================================================================
 # ML MODEL ENDPOINTS - FAANG-GRADE PRODUCTION
 # ============================================================================
@@ -1826,7 +2353,7 @@ async def explain_ml_decision(application_id: str):
     """
     try:
         # Get application from database with decision data
-        app_data = sqlite_db.get_application(application_id)
+        app_data = await run_io(sqlite_db.get_application, application_id)
         
         if not app_data:
             raise HTTPException(status_code=404, detail=f"Application {application_id} not found")
@@ -1936,10 +2463,10 @@ async def test_sqlite_insert(application_data: ApplicationInput):
     - Index usage on app_id
     """
     try:
-        sqlite_db.insert_application(application_data.dict())
+        await run_io(sqlite_db.insert_application, application_data.dict())
         
         # Verify insertion
-        result = sqlite_db.get_application_status(application_data.app_id)
+        result = await run_io(sqlite_db.get_application_status, application_data.app_id)
         
         return {
             "status": "success",
@@ -1973,7 +2500,7 @@ async def test_sqlite_get(app_id: str = PathParam(..., example="APP-000001", des
     - Query performance (<10ms)
     """
     try:
-        result = sqlite_db.get_application_status(app_id)
+        result = await run_io(sqlite_db.get_application_status, app_id)
         
         if not result:
             raise HTTPException(status_code=404, detail=f"Application {app_id} not found")
@@ -2023,7 +2550,7 @@ async def test_sqlite_similarity(
     - Response time <50ms
     """
     try:
-        results = sqlite_db.search_similar_cases(income, family_size, limit)
+        results = await run_io(sqlite_db.search_similar_cases, income, family_size, limit)
         
         return {
             "status": "success",
@@ -2063,7 +2590,7 @@ async def test_sqlite_fts(
     - Performance <100ms
     """
     try:
-        results = sqlite_db.full_text_search(query, limit)
+        results = await run_io(sqlite_db.full_text_search, query, limit)
         
         return {
             "status": "success",
@@ -2104,7 +2631,7 @@ async def test_sqlite_stats():
     - Performance on large datasets (>1000 rows <100ms)
     """
     try:
-        stats = sqlite_db.get_eligibility_stats()
+        stats = await run_io(sqlite_db.get_eligibility_stats)
         
         return {
             "status": "success",
@@ -2163,10 +2690,10 @@ async def test_tinydb_session(session: SessionInput):
     - JSON serialization
     """
     try:
-        tinydb_cache.store_session(session.session_id, session.data)
+        await run_io(tinydb_cache.store_session, session.session_id, session.data)
         
         # Verify storage
-        retrieved = tinydb_cache.get_session(session.session_id)
+        retrieved = await run_io(tinydb_cache.get_session, session.session_id)
         
         return {
             "status": "success",
@@ -2200,7 +2727,7 @@ async def test_tinydb_get_session(
     - Response time <5ms
     """
     try:
-        session = tinydb_cache.get_session(session_id)
+        session = await run_io(tinydb_cache.get_session, session_id)
         
         if not session:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found or expired")
@@ -2238,7 +2765,7 @@ async def test_tinydb_stats():
     - Hit rate computation (hits / (hits + misses))
     """
     try:
-        stats = tinydb_cache.get_cache_stats()
+        stats = await run_io(tinydb_cache.get_cache_stats)
         
         return {
             "status": "success",
@@ -2293,7 +2820,7 @@ async def test_chromadb_search(rag_query: RAGQueryInput):
     - Metadata filtering
     """
     try:
-        results = chroma_db.query(rag_query.query, n_results=rag_query.n_results)
+        results = await run_cpu(chroma_db.query, rag_query.query, n_results=rag_query.n_results)
         
         return {
             "status": "success",
@@ -2340,8 +2867,8 @@ async def test_chromadb_info():
         for collection_name in ['application_summaries', 'resumes', 'income_patterns', 'case_decisions']:
             collection = getattr(chroma_db, collection_name, None)
             if collection:
-                count = collection.count()
-                peek = collection.peek(limit=2) if count > 0 else {'ids': [], 'metadatas': []}
+                count = await run_io(collection.count)
+                peek = await run_io(collection.peek, limit=2) if count > 0 else {'ids': [], 'metadatas': []}
                 collections_info[collection_name] = {
                     "document_count": count,
                     "sample_ids": peek.get('ids', [])[:2]
@@ -2411,6 +2938,7 @@ async def test_networkx_query(query: GraphQueryInput):
     - Response limit (20 nodes max for performance)
     """
     try:
+        await _sync_graph()
         if networkx_db.graph.number_of_nodes() == 0:
             raise HTTPException(status_code=400, detail="Graph not loaded. Run populate_databases.py first")
         
@@ -2471,6 +2999,7 @@ async def test_networkx_neighbors(
     - Performance <50ms
     """
     try:
+        await _sync_graph()
         if networkx_db.graph.number_of_nodes() == 0:
             raise HTTPException(status_code=400, detail="Graph not loaded")
         
@@ -2526,6 +3055,7 @@ async def test_networkx_stats():
     - Node type aggregation
     """
     try:
+        await _sync_graph()
         if networkx_db.graph.number_of_nodes() == 0:
             raise HTTPException(status_code=400, detail="Graph not loaded")
         
@@ -2595,7 +3125,7 @@ async def test_integration():
         
         # Test SQLite
         try:
-            sqlite_stats = sqlite_db.get_eligibility_stats()
+            sqlite_stats = await run_io(sqlite_db.get_eligibility_stats)
             results['sqlite'] = {
                 "status": "operational",
                 "applications": sqlite_stats.get('total_applications', 0)
@@ -2605,7 +3135,7 @@ async def test_integration():
         
         # Test TinyDB
         try:
-            cache_stats = tinydb_cache.get_cache_stats()
+            cache_stats = await run_io(tinydb_cache.get_cache_stats)
             results['tinydb'] = {
                 "status": "operational",
                 "cache_entries": cache_stats.get('rag_cache_entries', 0) + cache_stats.get('sessions', 0)
@@ -2619,7 +3149,7 @@ async def test_integration():
             for collection_name in ['application_summaries', 'resumes', 'income_patterns', 'case_decisions']:
                 collection = getattr(chroma_db, collection_name, None)
                 if collection:
-                    total_docs += collection.count()
+                    total_docs += await run_io(collection.count)
             
             results['chromadb'] = {
                 "status": "operational",
@@ -2630,6 +3160,7 @@ async def test_integration():
         
         # Test NetworkX
         try:
+            await _sync_graph()
             results['networkx'] = {
                 "status": "operational" if networkx_db.graph.number_of_nodes() > 0 else "not_loaded",
                 "nodes": networkx_db.graph.number_of_nodes(),
@@ -2672,7 +3203,7 @@ async def get_conversation_history(
     """
     try:
         if format == "txt":
-            file_path = conversation_manager.export_to_txt(application_id)
+            file_path = await run_io(conversation_manager.export_to_txt, application_id)
             return JSONResponse({
                 "application_id": application_id,
                 "format": "txt",
@@ -2682,7 +3213,7 @@ async def get_conversation_history(
             })
         
         elif format == "html":
-            file_path = conversation_manager.export_to_html(application_id)
+            file_path = await run_io(conversation_manager.export_to_html, application_id)
             return JSONResponse({
                 "application_id": application_id,
                 "format": "html",
@@ -2693,8 +3224,8 @@ async def get_conversation_history(
             })
         
         else:  # json (default)
-            conversations = conversation_manager.get_conversation_history(application_id, limit=limit)
-            stats = conversation_manager.get_statistics(application_id)
+            conversations = await run_io(conversation_manager.get_conversation_history, application_id, limit=limit)
+            stats = await run_io(conversation_manager.get_statistics, application_id)
             
             return {
                 "application_id": application_id,
@@ -2725,11 +3256,11 @@ async def export_conversations(
     """
     try:
         if format == "txt":
-            file_path = conversation_manager.export_to_txt(application_id)
+            file_path = await run_io(conversation_manager.export_to_txt, application_id)
         elif format == "html":
-            file_path = conversation_manager.export_to_html(application_id)
+            file_path = await run_io(conversation_manager.export_to_html, application_id)
         else:  # json
-            file_path = conversation_manager.export_to_json(application_id)
+            file_path = await run_io(conversation_manager.export_to_json, application_id)
         
         return {
             "application_id": application_id,
@@ -2764,7 +3295,8 @@ async def get_audit_trail(
     - `chat_query`, `api_error`, `data_access`, `application_create`, etc.
     """
     try:
-        audit_trail = audit_logger.get_audit_trail(
+        audit_trail = await run_io(
+            audit_logger.get_audit_trail,
             application_id=application_id,
             event_type=event_type,
             limit=limit
@@ -2785,54 +3317,54 @@ async def get_audit_trail(
 
 
 @app.get("/api/governance/metrics", tags=["Governance"])
-async def get_system_metrics():
+async def get_system_metrics(
+    series_points: int = Query(60, ge=0, le=720, description="Number of recent samples to include in the time series")
+):
     """
     Get system performance metrics and health indicators
     
+    Served from the background metrics sampler (no blocking calls in the request).
+    
     **Metrics:**
-    - API response times
-    - Database performance
+    - Process and system CPU, process RSS, open file descriptors, threads
     - Memory usage
-    - Request rates
-    - Error rates
+    - Event loop lag (last, p99)
+    - Store sizes on disk (SQLite, TinyDB, ChromaDB, NetworkX, job queue)
+    - Graph size, active applications, job counts
+    
+    **Returns:** Latest snapshot plus a time series of the last `series_points` samples
     """
     try:
-        # In production, this would query the performance_metrics table
-        # For now, return basic system info
-        from psutil import virtual_memory, cpu_percent
+        sampler = get_metrics_sampler()
+        latest = sampler.latest()
+        if latest is None:
+            # Sampler not started yet (first request right after boot)
+            latest = await sampler.sample_now()
         
-        memory = virtual_memory()
+        system = dict(latest.get("system", {}))
+        if system:
+            system["mistral_memory_gb"] = 5.3  # Known from user
         
         return {
             "timestamp": datetime.now().isoformat(),
-            "system": {
-                "memory_used_gb": round(memory.used / (1024**3), 2),
-                "memory_total_gb": round(memory.total / (1024**3), 2),
-                "memory_percent": memory.percent,
-                "cpu_percent": cpu_percent(interval=1),
-                "mistral_memory_gb": 5.3  # Known from user
-            },
+            "sampled_at": latest["timestamp"],
+            "sample_interval_seconds": sampler.interval,
+            "system": system,
+            "process": latest.get("process", {}),
+            "loop_lag": latest.get("loop_lag", {}),
+            "stores": latest.get("stores", {}),
+            "gauges": latest.get("gauges", {}),
             "databases": {
                 "sqlite": {"status": "operational"},
                 "tinydb": {"status": "operational"},
                 "chromadb": {"status": "operational"},
                 "networkx": {"status": "operational"}
             },
+            "series": sampler.series(series_points),
             "message": "M1 8GB optimized - Mistral uses 5.3GB, remaining for API operations"
+            if system else "Install psutil for detailed metrics: poetry add psutil"
         }
     
-    except ImportError:
-        # psutil not available, return minimal info
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "message": "Install psutil for detailed metrics: poetry add psutil",
-            "databases": {
-                "sqlite": {"status": "operational"},
-                "tinydb": {"status": "operational"},
-                "chromadb": {"status": "operational"},
-                "networkx": {"status": "operational"}
-            }
-        }
     except Exception as e:
         logger.error(f"Error retrieving metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,5 @@
 """Core orchestration components"""
 from .types import *
-from .langgraph_orchestrator import LangGraphOrchestrator
 
 __all__ = [
     'LangGraphOrchestrator',
@@ -8,3 +7,13 @@ __all__ = [
     'ProcessingStage',
     'DecisionType',
 ]
+
+
+def __getattr__(name):
+    # Imported on first use: the orchestrator pulls in src.services, whose
+    # state store and node cache import src.core.state_codec, so an eager
+    # import here would make `import src.services.state_store` circular.
+    if name == 'LangGraphOrchestrator':
+        from .langgraph_orchestrator import LangGraphOrchestrator
+        return LangGraphOrchestrator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
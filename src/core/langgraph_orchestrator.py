@@ -32,24 +32,38 @@ Langfuse Integration:
     - Traces every agent execution with timing and context
     - Captures input/output for each LangGraph node
     - Records ML model predictions with feature importance
-    - Exports traces to JSON for analysis
+    - Appends a run summary per application to the segmented trace store
+    - Goes through the buffered, sampled tracer (services/tracing.py):
+      nothing is sent or flushed on the request path
     - Provides end-to-end pipeline visibility
 
+Pipeline Timeline:
+    Each run also records a span tree with wall and CPU time (nodes,
+    per-document extraction, ML inference, store writes); see
+    services/timeline.py and GET /api/applications/{id}/timeline.
+
 """
 
 import logging
 import os
-import json
-from pathlib import Path
+import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
-from langfuse import Langfuse
 
 from .langgraph_state import ApplicationGraphState, create_initial_state
 from .types import ProcessingStage
 from ..core.base_agent import BaseAgent
+from ..services.executors import run_io
+from ..services.admission import get_admission_controller
+from ..services.state_store import ApplicationStateStore, InMemoryApplicationStateStore
+from ..services.progress_events import ProgressEventBus
+from ..services.node_cache import NodeOutputCache, fingerprint
+from ..services.timeline import TimelineStore, aspan, record, timed
+from ..services.trace_store import SegmentedTraceStore, get_trace_store
+from ..services.tracing import Tracer, get_tracer
 
 logger = logging.getLogger("LangGraphOrchestrator")
 
@@ -65,7 +79,8 @@ class LangGraphOrchestrator:
         - StateGraph: Manages workflow state and transitions
         - Nodes: 6 agent nodes (extract, validate, eligibility, recommend, explain, chat)
         - Edges: Define workflow flow (normal + conditional)
-        - Checkpointer: MemorySaver for state persistence
+        - Checkpointer: SQLite-backed in production (thread_id = application_id),
+          so a run can resume after its last successful node
         
     Advantages of LangGraph:
         1. Framework-native multi-agent coordination
@@ -79,22 +94,44 @@ class LangGraphOrchestrator:
         orchestrator = LangGraphOrchestrator()
         orchestrator.register_agents(extraction, validation, ...)
         result = await orchestrator.process_application(app_id, name, docs)
+        result = await orchestrator.resume_application(app_id)  # after a failed node
     """
     
-    def __init__(self):
-        """Initialize LangGraph orchestrator with Langfuse tracing"""
+    def __init__(
+        self,
+        state_store: Optional[ApplicationStateStore] = None,
+        event_bus: Optional[ProgressEventBus] = None,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        node_cache: Optional[NodeOutputCache] = None,
+        timeline_store: Optional[TimelineStore] = None,
+        trace_store: Optional[SegmentedTraceStore] = None,
+        tracer: Optional[Tracer] = None
+    ):
+        """
+        Initialize LangGraph orchestrator with Langfuse tracing
+        
+        Args:
+            state_store: Shared application state store (in-memory if omitted)
+            event_bus: Receives node start/finish progress events (optional)
+            checkpointer: LangGraph checkpointer (MemorySaver if omitted;
+                see services/checkpoint_store.py for the SQLite one)
+            node_cache: Memoises node outputs by input fingerprint, so reruns
+                only recompute nodes whose inputs changed (optional)
+            timeline_store: Stores each run's span tree (optional; runs are
+                not timed without it unless a caller is already recording)
+            trace_store: Receives each run's trace summary (process-wide
+                store from TRACE_STORE_DIR if omitted)
+            tracer: Buffered tracing facade (process-wide TRACING_BACKEND
+                tracer if omitted)
+        """
         self.logger = logging.getLogger("LangGraphOrchestrator")
         
-        # Initialize Langfuse client (local mode - no cloud needed)
-        self.langfuse = Langfuse(
-            public_key=os.getenv("LANGFUSE_PUBLIC_KEY", "local-dev-key"),
-            secret_key=os.getenv("LANGFUSE_SECRET_KEY", "local-dev-secret"),
-            host=os.getenv("LANGFUSE_HOST", "http://localhost:3000")
-        )
+        # Tracing facade - spans are buffered and delivered by a background thread
+        self.langfuse = tracer or get_tracer()
         
-        # Trace storage (for local observability)
-        self.trace_dir = Path("data/observability")
-        self.trace_dir.mkdir(parents=True, exist_ok=True)
+        # Trace storage (for local observability) - appended by a background writer
+        self.trace_store = trace_store or get_trace_store()
+        self.trace_dir = self.trace_store.base_dir
         
         # Agents (injected via register_agents)
         self.extraction_agent = None
@@ -108,8 +145,23 @@ class LangGraphOrchestrator:
         self.workflow = None
         self.compiled_graph = None
         
-        # State storage (in-memory for now, can be replaced with Redis/Postgres)
-        self.applications: Dict[str, ApplicationGraphState] = {}
+        # State storage - shared with the API through the configured backend
+        self.state_store = state_store or InMemoryApplicationStateStore()
+        
+        # Progress events for GET /api/applications/{id}/events
+        self.event_bus = event_bus
+        
+        # Per-node checkpoints, used to resume failed runs
+        self.checkpointer = checkpointer or MemorySaver()
+        
+        # Outputs of validate ... explain keyed by their inputs (see _execute_cached)
+        self.node_cache = node_cache
+        
+        # Per-run span trees (wall/CPU time per node, document and write)
+        self.timeline_store = timeline_store
+        
+        # Chat turns kept in the state (the conversation manager keeps the full history)
+        self.chat_history_limit = int(os.getenv("CHAT_HISTORY_LIMIT", "50"))
         
         self.logger.info("LangGraph Orchestrator initialized with Langfuse tracing")
         self.logger.info(f"Langfuse traces will be saved to: {self.trace_dir}")
@@ -180,11 +232,12 @@ class LangGraphOrchestrator:
         workflow = StateGraph(ApplicationGraphState)
         
         # Add nodes (each agent is a node)
-        workflow.add_node("extract", self._extract_node)
-        workflow.add_node("validate", self._validate_node)
-        workflow.add_node("eligibility_check", self._eligibility_node)
-        workflow.add_node("recommend", self._recommend_node)
-        workflow.add_node("explain", self._explain_node)
+        # (wrapped to publish node_started / node_completed progress events)
+        workflow.add_node("extract", self._with_progress("extract", self._extract_node))
+        workflow.add_node("validate", self._with_progress("validate", self._validate_node))
+        workflow.add_node("eligibility_check", self._with_progress("eligibility_check", self._eligibility_node))
+        workflow.add_node("recommend", self._with_progress("recommend", self._recommend_node))
+        workflow.add_node("explain", self._with_progress("explain", self._explain_node))
         
         # Define edges (workflow flow)
         
@@ -209,12 +262,109 @@ class LangGraphOrchestrator:
         workflow.add_edge("recommend", "explain")
         workflow.add_edge("explain", END)
         
-        # Compile the graph with checkpointer
-        checkpointer = MemorySaver()  # Can be replaced with Redis/Postgres
-        self.compiled_graph = workflow.compile(checkpointer=checkpointer)
+        # Compile the graph with checkpointer (one checkpoint per completed node)
+        self.compiled_graph = workflow.compile(checkpointer=self.checkpointer)
         
         self.logger.info("LangGraph workflow compiled successfully")
     
+    # ========== Progress Events ==========
+    
+    async def _emit(self, application_id: str, event_type: str, **data):
+        """Publish a progress event; never fails the pipeline"""
+        if self.event_bus is None:
+            return
+        try:
+            await run_io(timed("progress_events.publish", "store", self.event_bus.publish), application_id, event_type, **data)
+        except Exception as e:
+            self.logger.warning(f"[{application_id}] Failed to publish {event_type} event: {e}")
+    
+    def _with_progress(self, node_name: str, node_fn):
+        """
+        Wrap a node function with start/finish progress events.
+        
+        Nodes record their own failures in state["errors"], so a node whose
+        run added errors is reported with status "failed".
+        """
+        async def node(state: ApplicationGraphState) -> ApplicationGraphState:
+            app_id = state["application_id"]
+            # Nodes append to errors in place; a fresh list keeps the previous
+            # checkpoint's copy intact, which resume relies on to find failed nodes
+            state["errors"] = list(state.get("errors", []))
+            errors_before = len(state["errors"])
+            await self._emit(app_id, "node_started", node=node_name)
+            
+            started = time.perf_counter()
+            async with aspan(node_name, "node") as span:
+                result = await node_fn(state)
+                new_errors = result.get("errors", [])[errors_before:]
+                if span is not None and new_errors:
+                    span.status = "failed"
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            
+            await self._emit(
+                app_id,
+                "node_completed",
+                node=node_name,
+                status="failed" if new_errors else "completed",
+                stage=result.get("stage"),
+                duration_ms=duration_ms,
+                errors=new_errors
+            )
+            return result
+        
+        node.__name__ = getattr(node_fn, "__name__", node_name)
+        return node
+    
+    # ========== Node Output Cache ==========
+    
+    async def _execute_cached(
+        self,
+        node_name: str,
+        agent: BaseAgent,
+        input_data: Dict[str, Any],
+        *inputs: Any,
+        resource: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run agent.execute, or reuse its output for unchanged inputs.
+        
+        Args:
+            node_name: Cache namespace
+            agent: Agent to run on a miss
+            input_data: Agent input
+            inputs: The values the agent reads; their fingerprint (with the
+                application id) is the cache key
+            resource: Admission class held while the agent runs (cache hits skip it)
+        """
+        if self.node_cache is None:
+            return await self._execute_admitted(agent, input_data, resource)
+        
+        app_id = input_data["application_id"]
+        key = fingerprint(node_name, app_id, *inputs)
+        try:
+            cached = await run_io(self.node_cache.get, node_name, key)
+        except Exception as e:
+            self.logger.warning(f"[{app_id}] Node cache unavailable: {e}")
+            return await self._execute_admitted(agent, input_data, resource)
+        
+        if cached is not None:
+            self.logger.info(f"[{app_id}] {node_name} inputs unchanged - reusing cached output")
+            return cached
+        
+        result = await self._execute_admitted(agent, input_data, resource)
+        try:
+            await run_io(timed("node_cache.put", "store", self.node_cache.put), node_name, key, result)
+        except Exception as e:
+            self.logger.warning(f"[{app_id}] Failed to cache {node_name} output: {e}")
+        return result
+    
+    async def _execute_admitted(self, agent: BaseAgent, input_data: Dict[str, Any], resource: Optional[str]) -> Dict[str, Any]:
+        if resource is None:
+            return await agent.execute(input_data)
+        # Accepted work waits for a slot instead of being rejected
+        async with get_admission_controller().admit(resource, wait=True):
+            return await agent.execute(input_data)
+    
     # ========== LangGraph Node Functions ==========
     
     async def _extract_node(self, state: ApplicationGraphState) -> ApplicationGraphState:
@@ -265,7 +415,9 @@ class LangGraphOrchestrator:
                 "documents": state["documents"]
             }
             
-            result = await self.extraction_agent.execute(input_data)
+            # Accepted work waits for an OCR slot instead of being rejected
+            async with get_admission_controller().admit("ocr", wait=True):
+                result = await self.extraction_agent.execute(input_data)
             
             # Update state with extraction results
             state["extracted_data"] = result["extracted_data"]
@@ -277,7 +429,8 @@ class LangGraphOrchestrator:
                 output={
                     "success": True,
                     "has_data": extracted_data is not None,
-                    "extraction_time": result.get("extraction_time", 0)
+                    "extraction_time": result.get("extraction_time", 0),
+                    "document_timings": result.get("document_timings", [])
                 }
             )
             
@@ -324,7 +477,10 @@ class LangGraphOrchestrator:
                 "applicant_name": state.get("applicant_name")
             }
             
-            result = await self.validation_agent.execute(input_data)
+            result = await self._execute_cached(
+                "validate", self.validation_agent, input_data,
+                state["extracted_data"], state.get("applicant_name")
+            )
             state["validation_report"] = result["validation_report"]
             state["updated_at"] = datetime.now().isoformat()
             
@@ -369,7 +525,11 @@ class LangGraphOrchestrator:
                 "validation_report": state.get("validation_report")  # Use .get() for optional field
             }
             
-            result = await self.eligibility_agent.execute(input_data)
+            result = await self._execute_cached(
+                "eligibility_check", self.eligibility_agent, input_data,
+                state["extracted_data"], state.get("validation_report"),
+                resource="ml"
+            )
             state["eligibility_result"] = result["eligibility_result"]
             state["updated_at"] = datetime.now().isoformat()
             
@@ -425,7 +585,10 @@ class LangGraphOrchestrator:
                 "eligibility_result": state["eligibility_result"]
             }
             
-            result = await self.recommendation_agent.execute(input_data)
+            result = await self._execute_cached(
+                "recommend", self.recommendation_agent, input_data,
+                state["extracted_data"], state["eligibility_result"]
+            )
             state["recommendation"] = result["recommendation"]
             state["updated_at"] = datetime.now().isoformat()
             
@@ -491,7 +654,11 @@ class LangGraphOrchestrator:
                 "recommendation": state["recommendation"]
             }
             
-            result = await self.explanation_agent.execute(input_data)
+            result = await self._execute_cached(
+                "explain", self.explanation_agent, input_data,
+                state["extracted_data"], state["eligibility_result"], state["recommendation"],
+                resource="llm"
+            )
             state["explanation"] = result["explanation"]
             
             # Mark as completed
@@ -561,10 +728,11 @@ class LangGraphOrchestrator:
         
         This is the main entry point that:
         1. Creates initial state
-        2. Starts Langfuse trace
-        3. Invokes the compiled LangGraph
-        4. Exports trace to JSON file
-        5. Returns final state after all nodes execute
+        2. Drops checkpoints of earlier runs of the application
+        3. Starts Langfuse trace
+        4. Invokes the compiled LangGraph (checkpointed after every node)
+        5. Exports trace to JSON file
+        6. Returns final state after all nodes execute
         
         Args:
             application_id: Unique identifier
@@ -580,8 +748,12 @@ class LangGraphOrchestrator:
         initial_state = create_initial_state(application_id, applicant_name, documents)
         initial_state["processing_start_time"] = start_time.isoformat()
         
-        # Store in memory
-        self.applications[application_id] = initial_state
+        # Store so the API can see that processing started
+        await run_io(self.state_store.put, application_id, initial_state)
+        await self._emit(application_id, "pipeline_started", document_count=len(documents))
+        
+        # A new run replaces the checkpoints of earlier runs of this application
+        await self._delete_checkpoints(application_id)
         
         self.logger.info(f"[{application_id}] Starting LangGraph workflow with Langfuse tracing")
         
@@ -597,20 +769,163 @@ class LangGraphOrchestrator:
             }
         )
         
+        # Invoke LangGraph - this runs the entire workflow
+        config = {"configurable": {"thread_id": application_id}}
+        return await self._run_graph(application_id, initial_state, config, trace, start_time)
+    
+    async def resume_application(self, application_id: str) -> ApplicationGraphState:
+        """
+        Continue an application's last run after its last successful node.
+        
+        Nodes before the resume point are not executed again: their outputs
+        (extraction, validation, ...) come from the checkpoint. A run that
+        finished without failed nodes is returned as-is.
+        
+        Raises:
+            LookupError: No checkpoints exist for the application
+        """
+        point = await self.get_resume_point(application_id)
+        if point is None:
+            raise LookupError(f"No checkpoints for application {application_id}")
+        
+        if point["node"] is None:
+            self.logger.info(f"[{application_id}] Last run finished without failed nodes - nothing to resume")
+            snapshot = await self.compiled_graph.aget_state(point["config"])
+            return snapshot.values
+        
+        start_time = datetime.now()
+        self.logger.info(
+            f"[{application_id}] Resuming at node '{point['node']}' "
+            f"(completed: {', '.join(point['completed_nodes']) or 'none'})"
+        )
+        await self._emit(
+            application_id,
+            "pipeline_resumed",
+            node=point["node"],
+            completed_nodes=point["completed_nodes"],
+            failed_node=point["failed_node"]
+        )
+        
+        trace = self.langfuse.trace(
+            name="application_processing",
+            id=f"trace_{application_id}",
+            metadata={
+                "application_id": application_id,
+                "resumed_at_node": point["node"],
+                "start_time": start_time.isoformat()
+            }
+        )
+        
+        # None input + checkpoint_id: LangGraph continues from that checkpoint
+        return await self._run_graph(application_id, None, point["config"], trace, start_time)
+    
+    async def get_resume_point(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Find where the application's last run should continue.
+        
+        Walks the checkpoint chain of the last run (newest to its input
+        checkpoint). The first node whose run added errors is the failed one;
+        the run continues from the checkpoint taken just before it. A run that
+        stopped mid-node (worker crash) continues from its latest checkpoint.
+        
+        Returns:
+            None if there are no checkpoints, else {
+                "node": node to run next (None if the run finished cleanly),
+                "failed_node": node that recorded errors, if any,
+                "completed_nodes": nodes whose outputs are reused,
+                "checkpoint_id": checkpoint to continue from,
+                "config": LangGraph config for that checkpoint
+            }
+        """
+        snapshot = await self.compiled_graph.aget_state({"configurable": {"thread_id": application_id}})
+        if not snapshot.values:
+            return None
+        
+        # Oldest first, following parents so abandoned branches of earlier resumes are skipped
+        chain = [snapshot]
+        while chain[-1].parent_config and (chain[-1].metadata or {}).get("source") != "input":
+            chain.append(await self.compiled_graph.aget_state(chain[-1].parent_config))
+        chain.reverse()
+        
+        resume_from, failed_node = None, None
+        for before, after in zip(chain, chain[1:]):
+            if len(before.next) == 1 and len(after.values.get("errors", [])) > len(before.values.get("errors", [])):
+                resume_from, failed_node = before, before.next[0]
+                break
+        if resume_from is None and chain[-1].next:
+            resume_from = chain[-1]
+        
+        target = resume_from or chain[-1]
+        completed = []
+        for checkpoint in chain:
+            if checkpoint is target:
+                break
+            completed.extend(checkpoint.next)
+        
+        return {
+            "node": resume_from.next[0] if resume_from else None,
+            "failed_node": failed_node,
+            "completed_nodes": [node for node in completed if node != "__start__"],
+            "checkpoint_id": target.config["configurable"]["checkpoint_id"],
+            "config": target.config
+        }
+    
+    async def _delete_checkpoints(self, application_id: str):
+        delete_thread = getattr(self.checkpointer, "delete_thread", None)
+        if delete_thread is None:
+            return
+        try:
+            await run_io(delete_thread, application_id)
+        except Exception as e:
+            self.logger.warning(f"[{application_id}] Failed to delete old checkpoints: {e}")
+    
+    async def _run_graph(
+        self,
+        application_id: str,
+        graph_input: Optional[ApplicationGraphState],
+        config: Dict[str, Any],
+        trace,
+        start_time: datetime
+    ) -> ApplicationGraphState:
+        """Invoke the compiled graph and record the outcome (state store, events, trace, timeline)"""
+        # The run's state stays in memory (never spilled) until it finishes
+        with self.state_store.in_flight(application_id):
+            async with record(self.timeline_store, application_id, "langgraph", resumed=graph_input is None):
+                return await self._invoke_graph(application_id, graph_input, config, trace, start_time)
+    
+    async def _invoke_graph(
+        self,
+        application_id: str,
+        graph_input: Optional[ApplicationGraphState],
+        config: Dict[str, Any],
+        trace,
+        start_time: datetime
+    ) -> ApplicationGraphState:
         try:
-            # Invoke LangGraph - this runs the entire workflow
-            config = {"configurable": {"thread_id": application_id}}
-            final_state = await self.compiled_graph.ainvoke(initial_state, config)
+            final_state = await self.compiled_graph.ainvoke(graph_input, config)
             
             # Update stored state
-            self.applications[application_id] = final_state
+            await run_io(timed("state_store.put", "store", self.state_store.put), application_id, final_state)
             
             # Calculate total processing time
             end_time = datetime.now()
             processing_time = (end_time - start_time).total_seconds()
             
-            # End root trace with summary
             eligibility_result = final_state.get("eligibility_result")
+            recommendation = final_state.get("recommendation")
+            await self._emit(
+                application_id,
+                "pipeline_completed",
+                final_stage=final_state.get("stage"),
+                decision=getattr(recommendation.decision, "value", recommendation.decision) if recommendation else None,
+                is_eligible=eligibility_result.is_eligible if eligibility_result else None,
+                eligibility_score=eligibility_result.eligibility_score if eligibility_result else None,
+                support_amount=recommendation.financial_support_amount if recommendation else None,
+                processing_time_seconds=processing_time,
+                errors=final_state.get("errors", [])
+            )
+            
+            # End root trace with summary
             trace.update(
                 output={
                     "success": True,
@@ -621,19 +936,20 @@ class LangGraphOrchestrator:
                 }
             )
             
-            # Flush Langfuse to ensure trace is written
+            # Hand the trace to the background flusher (does not wait)
             self.langfuse.flush()
             
-            # Export trace to JSON file for local observability
-            self._export_trace_to_json(application_id, final_state, processing_time)
+            # Run summary for local observability (queued; written off the request path)
+            self.trace_store.append(self._build_trace_record(application_id, final_state, processing_time))
             
             self.logger.info(f"[{application_id}] LangGraph workflow completed in {processing_time:.2f}s")
-            self.logger.info(f"[{application_id}] Langfuse trace exported to {self.trace_dir}")
+            self.logger.info(f"[{application_id}] Trace queued for {self.trace_dir}")
             
             return final_state
             
         except Exception as e:
             self.logger.error(f"[{application_id}] LangGraph workflow failed: {e}")
+            await self._emit(application_id, "pipeline_failed", error=str(e))
             trace.update(
                 output={"success": False, "error": str(e)},
                 level="ERROR"
@@ -641,54 +957,59 @@ class LangGraphOrchestrator:
             self.langfuse.flush()
             raise
     
-    def _export_trace_to_json(self, application_id: str, final_state: ApplicationGraphState, processing_time: float):
-        """Export Langfuse trace to JSON file for local observability"""
-        try:
-            trace_data = {
-                "trace_id": f"trace_{application_id}",
-                "application_id": application_id,
-                "applicant_name": final_state.get("applicant_name"),
-                "timestamp": datetime.now().isoformat(),
-                "processing_time_seconds": processing_time,
-                "stages": {
-                    "extraction": {
-                        "success": final_state.get("extracted_data") is not None,
-                        "has_data": final_state.get("extracted_data") is not None
-                    },
-                    "validation": {
-                        "success": final_state.get("validation_report") is not None,
-                        "validation_score": final_state.get("validation_report").data_completeness_score if final_state.get("validation_report") else 0.0
-                    },
-                    "eligibility": {
-                        "success": final_state.get("eligibility_result") is not None,
-                        "is_eligible": final_state.get("eligibility_result").is_eligible if final_state.get("eligibility_result") else None,
-                        "eligibility_score": final_state.get("eligibility_result").eligibility_score if final_state.get("eligibility_result") else 0.0
-                    },
-                    "recommendation": {
-                        "success": final_state.get("recommendation") is not None,
-                        "support_amount": final_state.get("recommendation").financial_support_amount if final_state.get("recommendation") else 0.0
-                    }
+    def _build_trace_record(self, application_id: str, final_state: ApplicationGraphState, processing_time: float) -> Dict[str, Any]:
+        """Run summary stored in the trace store (one live record per application)"""
+        return {
+            "trace_id": f"trace_{application_id}",
+            "application_id": application_id,
+            "applicant_name": final_state.get("applicant_name"),
+            "timestamp": datetime.now().isoformat(),
+            "processing_time_seconds": processing_time,
+            "stages": {
+                "extraction": {
+                    "success": final_state.get("extracted_data") is not None,
+                    "has_data": final_state.get("extracted_data") is not None
                 },
-                "final_decision": {
+                "validation": {
+                    "success": final_state.get("validation_report") is not None,
+                    "validation_score": final_state.get("validation_report").data_completeness_score if final_state.get("validation_report") else 0.0
+                },
+                "eligibility": {
+                    "success": final_state.get("eligibility_result") is not None,
                     "is_eligible": final_state.get("eligibility_result").is_eligible if final_state.get("eligibility_result") else None,
-                    "support_amount": final_state.get("recommendation").financial_support_amount if final_state.get("recommendation") else 0.0
+                    "eligibility_score": final_state.get("eligibility_result").eligibility_score if final_state.get("eligibility_result") else 0.0
                 },
-                "errors": final_state.get("errors", [])
-            }
-            
-            # Save to file
-            trace_file = self.trace_dir / f"langfuse_trace_{application_id}.json"
-            with open(trace_file, 'w') as f:
-                json.dump(trace_data, f, indent=2)
-            
-            self.logger.info(f"Trace exported: {trace_file}")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to export trace: {e}")
+                "recommendation": {
+                    "success": final_state.get("recommendation") is not None,
+                    "support_amount": final_state.get("recommendation").financial_support_amount if final_state.get("recommendation") else 0.0
+                }
+            },
+            "final_decision": {
+                "is_eligible": final_state.get("eligibility_result").is_eligible if final_state.get("eligibility_result") else None,
+                "support_amount": final_state.get("recommendation").financial_support_amount if final_state.get("recommendation") else 0.0
+            },
+            "errors": final_state.get("errors", [])
+        }
+    
+    def _chat_history_appender(self, entry: Dict[str, Any]):
+        """State mutator adding a chat entry to graph-state dicts and ApplicationState alike"""
+        limit = self.chat_history_limit
+        
+        def append(state):
+            if isinstance(state, dict):
+                history = state.setdefault("chat_history", [])
+            else:
+                if state.chat_history is None:
+                    state.chat_history = []
+                history = state.chat_history
+            history.append(entry)
+            del history[:-limit]
+        
+        return append
     
     def get_application(self, application_id: str) -> Optional[ApplicationGraphState]:
         """Retrieve application state"""
-        return self.applications.get(application_id)
+        return self.state_store.get(application_id)
     
     def get_status(self, application_id: str) -> Dict[str, Any]:
         """Get current application status"""
@@ -722,7 +1043,7 @@ class LangGraphOrchestrator:
         Note: Chat is handled independently, not as part of the main
         LangGraph workflow, since it's interactive and triggered by user.
         """
-        state = self.get_application(application_id)
+        state = await run_io(self.get_application, application_id)
         
         if not state:
             return {"error": "Application not found"}
@@ -739,15 +1060,14 @@ class LangGraphOrchestrator:
             
             result = await self.rag_chatbot_agent.execute(chat_input)
             
-            # Update chat history
-            state["chat_history"].append({
+            # Update chat history (atomic, so a pipeline result stored meanwhile is kept)
+            entry = {
                 "timestamp": datetime.now().isoformat(),
                 "query": query,
                 "query_type": query_type,
                 "response": result
-            })
-            
-            self.applications[application_id] = state
+            }
+            await run_io(self.state_store.update, application_id, self._chat_history_appender(entry))
             
             return result
         else:
@@ -0,0 +1,138 @@
+"""
+State Codec - JSON serialisation for ApplicationState / ApplicationGraphState
+
+Application state mixes plain dicts with dataclasses (ExtractedData,
+ValidationReport, ...), enums (ProcessingStage, DecisionType) and datetimes.
+The codec writes those as tagged JSON objects so they round-trip to the same
+types, without pickle:
+
+    datetime           -> {"__type__": "datetime", "value": "2024-12-01T10:00:00"}
+    ProcessingStage.X  -> {"__type__": "enum", "class": "ProcessingStage", "value": "x"}
+    ExtractedData(...) -> {"__type__": "dataclass", "class": "ExtractedData", "fields": {...}}
+
+Only registered classes are rebuilt on decode (all dataclasses and enums in
+src.core.types are registered by default; see register_type).
+"""
+import dataclasses
+import json
+import logging
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Type
+
+from . import types as core_types
+
+logger = logging.getLogger("StateCodec")
+
+TYPE_KEY = "__type__"
+
+_registry: Dict[str, Type] = {}
+
+
+def register_type(cls: Type) -> Type:
+    """Allow a dataclass or Enum to be rebuilt on decode (usable as a decorator)"""
+    _registry[cls.__name__] = cls
+    return cls
+
+
+for _name in dir(core_types):
+    _obj = getattr(core_types, _name)
+    if isinstance(_obj, type) and _obj.__module__ == core_types.__name__:
+        if dataclasses.is_dataclass(_obj) or issubclass(_obj, Enum):
+            register_type(_obj)
+
+
+def to_jsonable(obj: Any) -> Any:
+    """Convert state to JSON-compatible structures with type tags"""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+
+    if isinstance(obj, Enum):
+        return {TYPE_KEY: "enum", "class": type(obj).__name__, "value": to_jsonable(obj.value)}
+
+    if isinstance(obj, datetime):
+        return {TYPE_KEY: "datetime", "value": obj.isoformat()}
+
+    if isinstance(obj, date):
+        return {TYPE_KEY: "date", "value": obj.isoformat()}
+
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {
+            TYPE_KEY: "dataclass",
+            "class": type(obj).__name__,
+            "fields": {f.name: to_jsonable(getattr(obj, f.name)) for f in dataclasses.fields(obj)}
+        }
+
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj) and TYPE_KEY not in obj:
+            return {k: to_jsonable(v) for k, v in obj.items()}
+        return {TYPE_KEY: "dict", "items": [[to_jsonable(k), to_jsonable(v)] for k, v in obj.items()]}
+
+    if isinstance(obj, list):
+        return [to_jsonable(v) for v in obj]
+
+    if isinstance(obj, tuple):
+        return {TYPE_KEY: "tuple", "items": [to_jsonable(v) for v in obj]}
+
+    if isinstance(obj, (set, frozenset)):
+        return {TYPE_KEY: "set", "items": [to_jsonable(v) for v in obj]}
+
+    if isinstance(obj, Path):
+        return str(obj)
+
+    # numpy scalars/arrays from ML predictions
+    if hasattr(obj, "item") and hasattr(obj, "dtype"):
+        return to_jsonable(obj.tolist() if getattr(obj, "ndim", 0) else obj.item())
+
+    logger.warning(f"Storing unsupported type {type(obj).__name__} as string")
+    return str(obj)
+
+
+def from_jsonable(data: Any) -> Any:
+    """Rebuild state from to_jsonable output"""
+    if isinstance(data, list):
+        return [from_jsonable(v) for v in data]
+
+    if not isinstance(data, dict):
+        return data
+
+    tag = data.get(TYPE_KEY)
+    if tag is None:
+        return {k: from_jsonable(v) for k, v in data.items()}
+
+    if tag == "datetime":
+        return datetime.fromisoformat(data["value"])
+    if tag == "date":
+        return date.fromisoformat(data["value"])
+    if tag == "tuple":
+        return tuple(from_jsonable(v) for v in data["items"])
+    if tag == "set":
+        return set(from_jsonable(v) for v in data["items"])
+    if tag == "dict":
+        return {from_jsonable(k): from_jsonable(v) for k, v in data["items"]}
+
+    cls = _registry.get(data.get("class"))
+    if cls is None:
+        raise ValueError(f"Cannot decode unregistered type: {data.get('class')}")
+
+    if tag == "enum":
+        return cls(from_jsonable(data["value"]))
+
+    if tag == "dataclass":
+        # Ignore fields removed from the class since the state was written
+        known = {f.name for f in dataclasses.fields(cls)}
+        kwargs = {k: from_jsonable(v) for k, v in data["fields"].items() if k in known}
+        return cls(**kwargs)
+
+    raise ValueError(f"Unknown type tag: {tag}")
+
+
+def encode_state(state: Any) -> str:
+    """Serialise application state to a JSON string"""
+    return json.dumps(to_jsonable(state), separators=(",", ":"))
+
+
+def decode_state(text: str) -> Any:
+    """Deserialise application state written by encode_state"""
+    return from_jsonable(json.loads(text))
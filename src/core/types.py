@@ -35,6 +35,9 @@ class Document:
     file_path: str
     uploaded_at: datetime = field(default_factory=datetime.now)
     processed: bool = False
+    sha256: Optional[str] = None  # Content hash computed while writing the upload
+    size_bytes: Optional[int] = None
+    page_count: Optional[int] = None  # PDFs only
 
 
 @dataclass
@@ -11,11 +11,18 @@ Benefits over Neo4j for Macbook M1 8GB RAM:
 
 import networkx as nx
 from typing import Dict, List, Any, Optional, Tuple
+from contextlib import contextmanager
 from datetime import datetime
 import json
 import logging
+import os
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock on the graphml file
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +39,9 @@ class NetworkXManager:
         # Create directed graph for application flows
         self.graph = nx.DiGraph()
         
+        # (mtime_ns, size, inode) of the graphml file as last loaded/written
+        self._graphml_signature: Optional[Tuple[int, int, int]] = None
+        
         # Node type prefixes for easy identification
         self.NODE_TYPES = {
             'application': 'APP',
@@ -477,6 +487,66 @@ class NetworkXManager:
             logger.error(f"Failed to load graph: {e}")
             return False
     
+    # ========== Shared graphml file (API + worker processes) ==========
+    
+    def sync_graphml(self, path: str) -> bool:
+        """
+        Merge the graphml file into the in-memory graph if another process rewrote it
+        
+        The first load replaces the in-memory graph. Later loads merge: nodes
+        and edges on disk win over the in-memory copy, nodes only held in
+        memory are kept. The result replaces self.graph in one assignment, so
+        readers iterating the previous graph are not disturbed.
+        Returns True if the file was loaded.
+        """
+        file_path = Path(path)
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return False
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._graphml_signature:
+            return False
+        
+        disk_graph = nx.read_graphml(str(file_path))
+        if disk_graph.is_directed() != self.graph.is_directed():
+            disk_graph = self.graph.__class__(disk_graph)
+        if self._graphml_signature is None:
+            self.graph = disk_graph
+        else:
+            self.graph = nx.compose(self.graph, disk_graph)
+        self._graphml_signature = signature
+        logger.info(f"Graph synced from {file_path}: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges")
+        return True
+    
+    @contextmanager
+    def graphml_transaction(self, path: str):
+        """
+        Exclusive read-merge-write of the shared graphml file
+        
+        Every projector (API and worker processes) writes the same file; holding
+        a file lock across sync -> update -> write means no process overwrites
+        nodes added by another. The file is replaced atomically, so readers never
+        see a partial write.
+        """
+        file_path = Path(path)
+        lock_path = file_path.with_name(f"{file_path.name}.lock")
+        with open(lock_path, "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.sync_graphml(path)
+                yield self.graph
+                
+                tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
+                nx.write_graphml(self.graph, str(tmp_path))
+                os.replace(tmp_path, file_path)
+                stat = file_path.stat()
+                self._graphml_signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
     def export_to_cypher(self, filename: str = "neo4j_import.cypher") -> None:
         """Export graph as Neo4j Cypher queries for future migration"""
         file_path = self.persist_path / filename
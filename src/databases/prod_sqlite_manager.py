@@ -10,6 +10,7 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 from contextlib import contextmanager
 import threading
+import time
 
 
 class SQLiteManager:
@@ -22,6 +23,7 @@ class SQLiteManager:
     3. documents: Document metadata and extraction status
     4. conversations: Chat history for context-aware responses
     5. analytics: Pre-computed aggregations for fast queries
+    6. outbox: Pending cache/graph/vector projections (transactional outbox)
     
     Indexing Strategy:
     - Primary keys: app_id, decision_id, document_id
@@ -63,6 +65,36 @@ class SQLiteManager:
             self._local.conn.rollback()
             raise
     
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one atomic commit
+        
+        Write methods called inside the block (insert_application,
+        insert_decision, update_analytics, add_outbox_event, ...) skip their
+        own commit; everything commits together at the end or rolls back
+        on error. Nested blocks join the outer transaction.
+        """
+        with self.get_connection() as conn:
+            if getattr(self._local, 'in_transaction', False):
+                yield conn
+                return
+            
+            self._local.in_transaction = True
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                self._local.in_transaction = False
+    
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit unless inside transaction()"""
+        if not getattr(self._local, 'in_transaction', False):
+            conn.commit()
+    
     def _init_schema(self):
         """Initialize database schema"""
         with self.get_connection() as conn:
@@ -146,6 +178,22 @@ class SQLiteManager:
                     metric_details TEXT,
                     computed_at TEXT NOT NULL DEFAULT (datetime('now'))
                 );
+                
+                -- Outbox table (projections committed with the decision)
+                CREATE TABLE IF NOT EXISTS outbox (
+                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    aggregate_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    claimed_by TEXT,
+                    lease_expires_at REAL,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    processed_at REAL
+                );
             """)
             conn.commit()
     
@@ -174,6 +222,12 @@ class SQLiteManager:
                 CREATE INDEX IF NOT EXISTS idx_conv_session ON conversations(session_id);
                 CREATE INDEX IF NOT EXISTS idx_conv_app ON conversations(app_id);
                 CREATE INDEX IF NOT EXISTS idx_conv_time ON conversations(timestamp);
+                
+                -- Outbox indexes
+                CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON outbox(status, next_attempt_at);
+                CREATE INDEX IF NOT EXISTS idx_outbox_aggregate ON outbox(aggregate_id, event_type);
+                CREATE INDEX IF NOT EXISTS idx_outbox_aggregate_status ON outbox(aggregate_id, status);
+                CREATE INDEX IF NOT EXISTS idx_outbox_status_processed ON outbox(status, processed_at);
             """)
             conn.commit()
     
@@ -442,7 +496,7 @@ class SQLiteManager:
                 rag_context,
                 response_time_ms
             ))
-            conn.commit()
+            self._commit(conn)
     
     def get_conversation_context(self, session_id: str, last_n: int = 5) -> List[Dict]:
         """
@@ -491,7 +545,7 @@ class SQLiteManager:
                 app_data.get('credit_rating'), app_data.get('credit_accounts'), app_data.get('payment_ratio'),
                 app_data.get('total_outstanding'), app_data.get('work_experience_years'), app_data.get('education_level')
             ))
-            conn.commit()
+            self._commit(conn)
     
     def insert_decision(self, decision_data: Dict):
         """Insert decision record"""
@@ -510,7 +564,7 @@ class SQLiteManager:
                 decision_data.get('support_type'), decision_data.get('support_amount'),
                 decision_data.get('duration_months'), decision_data.get('conditions')
             ))
-            conn.commit()
+            self._commit(conn)
     
     def insert_document(self, doc_data: Dict):
         """Insert document metadata"""
@@ -529,7 +583,7 @@ class SQLiteManager:
                 doc_data.get('extracted_text'),
                 json.dumps(doc_data.get('metadata')) if doc_data.get('metadata') else None
             ))
-            conn.commit()
+            self._commit(conn)
     
     def update_analytics(self, metric_name: str, metric_value: float, metric_details: Optional[Dict] = None):
         """Update analytics metric"""
@@ -541,7 +595,126 @@ class SQLiteManager:
                 metric_name, metric_value,
                 json.dumps(metric_details) if metric_details else None
             ))
-            conn.commit()
+            self._commit(conn)
+    
+    # ============================================================================
+    # OUTBOX - Projections to TinyDB / NetworkX / ChromaDB
+    # ============================================================================
+    
+    def add_outbox_event(self, aggregate_id: str, event_type: str, payload: Dict):
+        """Record a projection to apply later (use inside transaction())"""
+        now = time.time()
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO outbox (aggregate_id, event_type, payload, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (aggregate_id, event_type, json.dumps(payload, default=str), now, now))
+            self._commit(conn)
+    
+    def claim_outbox_events(self, consumer_id: str, limit: int = 20, lease_seconds: float = 120) -> List[Dict]:
+        """
+        Claim due events for one projector, oldest first
+        
+        Events whose lease expired (crashed projector) are claimed again.
+        Claims are serialised per aggregate: while another projector holds a
+        live lease on any event of an application, none of that application's
+        events are handed out, so snapshots are applied in commit order.
+        """
+        now = time.time()
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                UPDATE outbox
+                SET status = 'processing', claimed_by = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE event_id IN (
+                    SELECT o.event_id FROM outbox o
+                    WHERE ((o.status = 'pending' AND o.next_attempt_at <= ?)
+                        OR (o.status = 'processing' AND o.lease_expires_at < ?))
+                      AND NOT EXISTS (
+                          SELECT 1 FROM outbox held
+                          WHERE held.aggregate_id = o.aggregate_id
+                            AND held.status = 'processing'
+                            AND held.lease_expires_at >= ?
+                      )
+                    ORDER BY o.event_id
+                    LIMIT ?
+                )
+                RETURNING *
+            """, (consumer_id, now + lease_seconds, now, now, now, limit)).fetchall()
+            self._commit(conn)
+        
+        events = [dict(row) for row in rows]
+        for event in events:
+            event['payload'] = json.loads(event['payload'])
+        return sorted(events, key=lambda e: e['event_id'])
+    
+    def complete_outbox_event(self, event_id: int) -> int:
+        """
+        Mark an event applied
+        
+        Older pending events of the same type for the same aggregate carry
+        stale snapshots and are marked superseded. Returns how many.
+        """
+        now = time.time()
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT aggregate_id, event_type FROM outbox WHERE event_id = ?", (event_id,)
+            ).fetchone()
+            conn.execute("""
+                UPDATE outbox SET status = 'done', processed_at = ?, lease_expires_at = NULL, last_error = NULL
+                WHERE event_id = ?
+            """, (now, event_id))
+            superseded = 0
+            if row:
+                superseded = conn.execute("""
+                    UPDATE outbox SET status = 'superseded', processed_at = ?
+                    WHERE aggregate_id = ? AND event_type = ? AND event_id < ? AND status = 'pending'
+                """, (now, row['aggregate_id'], row['event_type'], event_id)).rowcount
+            self._commit(conn)
+        return superseded
+    
+    def fail_outbox_event(self, event_id: int, error: str, retry_at: Optional[float] = None):
+        """Record a failed attempt; retried at retry_at, or dead-lettered if None"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                UPDATE outbox
+                SET status = ?, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at),
+                    lease_expires_at = NULL, processed_at = ?
+                WHERE event_id = ?
+            """, (
+                'pending' if retry_at is not None else 'dead',
+                error, retry_at,
+                None if retry_at is not None else time.time(),
+                event_id
+            ))
+            self._commit(conn)
+    
+    def prune_outbox(self, max_age_seconds: float) -> int:
+        """Delete done/superseded events processed before the retention window; returns rows removed"""
+        cutoff = time.time() - max_age_seconds
+        with self.get_connection() as conn:
+            removed = conn.execute("""
+                DELETE FROM outbox
+                WHERE status IN ('done', 'superseded') AND processed_at < ?
+            """, (cutoff,)).rowcount
+            self._commit(conn)
+        return removed
+    
+    def get_outbox_stats(self) -> Dict[str, Any]:
+        """Event counts by status and projection lag (age of the oldest unapplied event)"""
+        with self.get_connection() as conn:
+            counts = {
+                row['status']: row['count'] for row in conn.execute(
+                    "SELECT status, COUNT(*) AS count FROM outbox GROUP BY status"
+                )
+            }
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'processing')"
+            ).fetchone()[0]
+        return {
+            "counts": counts,
+            "backlog": counts.get('pending', 0) + counts.get('processing', 0),
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0
+        }
     
     def close(self):
         """Close all connections"""
@@ -162,9 +162,23 @@ class UnifiedDatabaseManager:
     - Thread-safe operations
     """
     
-    def __init__(self, config: Optional[Dict] = None):
+    def __init__(
+        self,
+        config: Optional[Dict] = None,
+        sqlite=None,
+        tinydb=None,
+        chromadb=None,
+        networkx=None
+    ):
         self.config = config or {}
         
+        # Injected stores are shared with the caller (see ServiceContainer);
+        # only missing ones are created here
+        self.sqlite = sqlite
+        self.tinydb = tinydb
+        self.chromadb = chromadb
+        self.networkx = networkx
+        
         # Initialize databases
         self._init_databases()
         
@@ -182,50 +196,54 @@ class UnifiedDatabaseManager:
         logger.info("Unified Database Manager initialized")
     
     def _init_databases(self):
-        """Initialize all database connections"""
-        try:
-            # SQLite - primary data store
-            from .prod_sqlite_manager import SQLiteManager
-            self.sqlite = SQLiteManager()
-            logger.info("SQLite initialized")
-        except Exception as e:
-            logger.error(f"SQLite init failed: {e}")
-            self.sqlite = None
+        """Initialize database connections that were not injected"""
+        if self.sqlite is None:
+            try:
+                # SQLite - primary data store
+                from .prod_sqlite_manager import SQLiteManager
+                self.sqlite = SQLiteManager()
+                logger.info("SQLite initialized")
+            except Exception as e:
+                logger.error(f"SQLite init failed: {e}")
+                self.sqlite = None
         
-        try:
-            # TinyDB - cache layer
-            from .tinydb_manager import TinyDBManager
-            self.tinydb = TinyDBManager()
-            logger.info("TinyDB initialized")
-        except Exception as e:
-            logger.error(f"TinyDB init failed: {e}")
-            self.tinydb = None
+        if self.tinydb is None:
+            try:
+                # TinyDB - cache layer
+                from .tinydb_manager import TinyDBManager
+                self.tinydb = TinyDBManager()
+                logger.info("TinyDB initialized")
+            except Exception as e:
+                logger.error(f"TinyDB init failed: {e}")
+                self.tinydb = None
         
-        try:
-            # ChromaDB - semantic search
-            from .chroma_manager import ChromaDBManager
-            self.chromadb = ChromaDBManager()
-            logger.info("ChromaDB initialized")
-        except Exception as e:
-            logger.error(f"ChromaDB init failed: {e}")
-            self.chromadb = None
+        if self.chromadb is None:
+            try:
+                # ChromaDB - semantic search
+                from .chroma_manager import ChromaDBManager
+                self.chromadb = ChromaDBManager()
+                logger.info("ChromaDB initialized")
+            except Exception as e:
+                logger.error(f"ChromaDB init failed: {e}")
+                self.chromadb = None
         
-        try:
-            # NetworkX - graph database
-            from .networkx_manager import NetworkXManager
-            self.networkx = NetworkXManager()
-            # Load graph from file
-            graph_path = Path("application_graph.graphml")
-            if graph_path.exists():
-                import networkx as nx
-                self.networkx.graph = nx.read_graphml(str(graph_path))
-                logger.info(f"NetworkX initialized ({self.networkx.graph.number_of_nodes()} nodes)")
-            else:
-                # Fresh system - graph will be created on first application
-                logger.debug("NetworkX graph file not found - will be created on first use")
-        except Exception as e:
-            logger.error(f"NetworkX init failed: {e}")
-            self.networkx = None
+        if self.networkx is None:
+            try:
+                # NetworkX - graph database
+                from .networkx_manager import NetworkXManager
+                self.networkx = NetworkXManager()
+                # Load graph from file
+                graph_path = Path("application_graph.graphml")
+                if graph_path.exists():
+                    import networkx as nx
+                    self.networkx.graph = nx.read_graphml(str(graph_path))
+                    logger.info(f"NetworkX initialized ({self.networkx.graph.number_of_nodes()} nodes)")
+                else:
+                    # Fresh system - graph will be created on first application
+                    logger.debug("NetworkX graph file not found - will be created on first use")
+            except Exception as e:
+                logger.error(f"NetworkX init failed: {e}")
+                self.networkx = None
     
     # ============================================================================
     # HIGH-LEVEL QUERY METHODS (Used by Chatbot)
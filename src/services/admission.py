@@ -0,0 +1,269 @@
+"""
+Admission Control - Bounded concurrency and queues per resource class
+FAANG Standards: Shed load early, degrade gracefully instead of timing out together
+
+Each resource class has its own pool, so a burst of chat requests cannot
+starve OCR and vice versa:
+
+    ocr       document extraction (pytesseract / pdfplumber) - memory heavy
+    ml        eligibility model inference
+    llm       Ollama calls (chat, simulation, explanations)
+    db_write  result persistence
+
+A pool admits `capacity` callers at once and lets up to `max_queue` more
+wait in FIFO order. Anything beyond that is rejected with AdmissionRejected,
+which the API turns into `429 Too Many Requests` + `Retry-After`. The retry
+hint is derived from an EWMA of observed service times:
+
+    retry_after = ewma_service_seconds * (queued_ahead + 1) / capacity
+
+Pipeline nodes in the worker use `admit(..., wait=True)`: they are never
+rejected (the job is already accepted) but still respect the capacity.
+
+Limits are configurable per class with ADMISSION_<CLASS>_CAPACITY and
+ADMISSION_<CLASS>_QUEUE (e.g. ADMISSION_LLM_CAPACITY=1).
+
+Usage:
+    admission = get_admission_controller()
+
+    async with admission.admit("llm"):
+        response = await orchestrator.handle_chat_query(...)
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("AdmissionController")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a resource class is saturated; maps to HTTP 429"""
+
+    def __init__(self, resource: str, retry_after: int, queue_depth: int, reason: str = "queue full"):
+        self.resource = resource
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+        self.reason = reason
+        super().__init__(f"{resource} {reason} ({queue_depth} waiting), retry after {retry_after}s")
+
+
+class ResourcePool:
+    """
+    Capacity-limited pool with a bounded FIFO wait queue
+
+    Args:
+        name: Resource class name
+        capacity: Callers served concurrently
+        max_queue: Callers allowed to wait for a slot before new ones are rejected
+        initial_service_seconds: Service time estimate until real samples arrive
+        alpha: EWMA smoothing factor for observed service times
+        max_retry_after: Upper bound for the Retry-After hint in seconds
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        max_queue: int,
+        initial_service_seconds: float,
+        alpha: float = 0.2,
+        max_retry_after: int = 300
+    ):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.max_queue = max(0, max_queue)
+        self.alpha = alpha
+        self.max_retry_after = max_retry_after
+
+        self.ewma_service_seconds = initial_service_seconds
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.last_retry_after: Optional[int] = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self, ahead: Optional[int] = None) -> int:
+        """Seconds until a new caller would likely get a slot"""
+        ahead = self.waiting if ahead is None else ahead
+        estimate = self.ewma_service_seconds * (ahead + 1) / self.capacity
+        return max(1, min(self.max_retry_after, math.ceil(estimate)))
+
+    def _reject(self, queue_depth: int, retry_after: int, reason: str = "queue full") -> AdmissionRejected:
+        self.rejected += 1
+        self.last_retry_after = retry_after
+        logger.warning(f"Rejected {self.name} request: {reason} ({queue_depth} waiting), retry after {retry_after}s")
+        return AdmissionRejected(self.name, retry_after, queue_depth, reason)
+
+    async def acquire(self, wait: bool = False):
+        """
+        Take a slot
+
+        Args:
+            wait: Wait for a slot even when the queue is full (accepted work)
+
+        Raises:
+            AdmissionRejected: The queue is full and wait is False
+        """
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if not wait and self.waiting >= self.max_queue:
+            raise self._reject(self.waiting, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just before cancellation - pass it on
+                self._release_slot()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        self.admitted += 1
+
+    def release(self, service_seconds: Optional[float] = None):
+        """Return a slot and record how long it was held"""
+        if service_seconds is not None:
+            self.completed += 1
+            self.ewma_service_seconds = (
+                self.alpha * service_seconds + (1 - self.alpha) * self.ewma_service_seconds
+            )
+        self._release_slot()
+
+    def _release_slot(self):
+        # Hand the slot directly to the next waiter so it cannot be taken by a newcomer
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "utilization": round(self.in_flight / self.capacity, 2),
+            "ewma_service_seconds": round(self.ewma_service_seconds, 3),
+            "retry_after_seconds": self.retry_after(),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "last_retry_after": self.last_retry_after
+        }
+
+
+class AdmissionController:
+    """
+    One ResourcePool per resource class, shared by the whole process
+
+    Args:
+        limits: Optional overrides {class: {"capacity": n, "max_queue": n}}
+        max_queued_jobs: Backlog limit for the durable job queue (ADMISSION_MAX_QUEUED_JOBS)
+    """
+
+    # class: (capacity, max_queue, initial service seconds)
+    RESOURCE_CLASSES = {
+        "ocr": (2, 8, 30.0),
+        "ml": (4, 16, 1.0),
+        "llm": (2, 8, 10.0),
+        "db_write": (4, 32, 0.5)
+    }
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, int]]] = None, max_queued_jobs: Optional[int] = None):
+        limits = limits or {}
+        self.pools: Dict[str, ResourcePool] = {}
+        for name, (capacity, max_queue, service_seconds) in self.RESOURCE_CLASSES.items():
+            override = limits.get(name, {})
+            env = name.upper()
+            self.pools[name] = ResourcePool(
+                name,
+                capacity=override.get("capacity", int(os.getenv(f"ADMISSION_{env}_CAPACITY", capacity))),
+                max_queue=override.get("max_queue", int(os.getenv(f"ADMISSION_{env}_QUEUE", max_queue))),
+                initial_service_seconds=service_seconds
+            )
+        self.max_queued_jobs = max_queued_jobs or int(os.getenv("ADMISSION_MAX_QUEUED_JOBS", "100"))
+
+    def pool(self, resource: str) -> ResourcePool:
+        try:
+            return self.pools[resource]
+        except KeyError:
+            raise ValueError(f"Unknown resource class: {resource}")
+
+    @asynccontextmanager
+    async def admit(self, resource: str, wait: bool = False):
+        """
+        Hold a slot of `resource` for the duration of the block
+
+        Raises:
+            AdmissionRejected: The pool's queue is full and wait is False
+        """
+        pool = self.pool(resource)
+        await pool.acquire(wait=wait)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            pool.release(time.perf_counter() - started)
+
+    def check_backlog(self, resource: str, queued: int, running: int = 0,
+                      service_seconds: Optional[float] = None):
+        """
+        Admit work into the durable job queue
+
+        Jobs are executed by worker processes, so the in-process pool cannot
+        see them; the queue depth from SQLite is checked instead.
+
+        Args:
+            resource: Class of the first stage the job needs (e.g. "ocr")
+            queued: Jobs waiting in the queue
+            running: Jobs currently being processed (≈ busy worker slots)
+            service_seconds: Recent average job duration, if known
+
+        Raises:
+            AdmissionRejected: The backlog is at max_queued_jobs
+        """
+        if queued < self.max_queued_jobs:
+            return
+        pool = self.pool(resource)
+        per_job = service_seconds or pool.ewma_service_seconds
+        servers = max(1, running)
+        estimate = per_job * (queued - self.max_queued_jobs + 1) / servers
+        retry_after = max(1, min(pool.max_retry_after, math.ceil(estimate)))
+        raise pool._reject(queued, retry_after, reason="job backlog full")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-class capacity, queue depth, service time and rejection counters"""
+        return {
+            "max_queued_jobs": self.max_queued_jobs,
+            "pools": {name: pool.snapshot() for name, pool in self.pools.items()}
+        }
+
+
+# Singleton instance
+_admission_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get singleton admission controller"""
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+    return _admission_controller
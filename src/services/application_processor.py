@@ -0,0 +1,614 @@
+"""
+Application Processor - Runs the LangGraph pipeline and persists its outcome
+
+Shared by the API (status/results payloads) and the background worker
+(`python -m src.worker`), so both produce identical database records and
+response shapes regardless of which process ran the pipeline.
+
+Persistence targets:
+    - SQLite: application row, validation/recommendation analytics, decision
+    - TinyDB: result + application context cache (6-hour TTL)
+    - NetworkX: application node for similarity matching (shared graphml, merged under a file lock)
+    - ChromaDB: summary, income pattern and case decision embeddings
+
+SQLite is the source of truth. Its rows commit in one transaction together
+with an outbox event per derived store (cache.update, graph.update,
+vectors.index); OutboxProjector applies those in the background, so a job
+finishes without waiting for TinyDB flushes, graphml writes or embeddings.
+
+With a TimelineStore, each process() call is recorded as one timeline run
+(pipeline nodes plus the persistence writes; see services/timeline.py).
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from .governance import get_audit_logger, get_structured_logger
+from .admission import get_admission_controller
+from .executors import run_io
+from .timeline import record, span
+
+logger = logging.getLogger("ApplicationProcessor")
+
+
+# Progress percentage reported for each pipeline stage
+STAGE_PROGRESS = {
+    "PENDING": 0,
+    "pending": 0,
+    "queued": 5,
+    "running": 10,
+    "EXTRACTING": 20,
+    "extracting": 20,
+    "VALIDATING": 40,
+    "validating": 40,
+    "CHECKING_ELIGIBILITY": 60,
+    "checking_eligibility": 60,
+    "GENERATING_RECOMMENDATION": 80,
+    "generating_recommendation": 80,
+    "COMPLETED": 100,
+    "completed": 100,
+    "FAILED": 0,
+    "failed": 0
+}
+
+
+def _enum_value(value: Any) -> Any:
+    """Return enum value or the value itself"""
+    return value.value if hasattr(value, 'value') else value
+
+
+def serialize_documents(documents: List[Any]) -> List[Dict[str, Any]]:
+    """Convert Document objects to the list format required by LangGraphOrchestrator"""
+    return [
+        dict(doc) if isinstance(doc, dict) else {
+            "document_id": doc.document_id,
+            "document_type": doc.document_type,
+            "file_path": doc.file_path,
+            "filename": doc.filename,
+            "sha256": getattr(doc, "sha256", None),
+            "size_bytes": getattr(doc, "size_bytes", None),
+            "page_count": getattr(doc, "page_count", None)
+        }
+        for doc in documents or []
+    ]
+
+
+def build_status_payload(application_id: str, state: Any) -> Dict[str, Any]:
+    """
+    Build /status payload from ApplicationState (object) or ApplicationGraphState (dict)
+    """
+    # Handle both ApplicationState (old) and ApplicationGraphState (new dict from LangGraph)
+    if isinstance(state, dict):
+        stage = state.get("stage", "PENDING")
+        documents_count = len(state.get("documents", []))
+        has_extracted = state.get("extracted_data") is not None
+        has_validation = state.get("validation_report") is not None
+        has_eligibility = state.get("eligibility_result") is not None
+        has_recommendation = state.get("recommendation") is not None
+    else:
+        stage = _enum_value(state.stage)
+        documents_count = len(state.documents)
+        has_extracted = state.extracted_data is not None
+        has_validation = state.validation_report is not None
+        has_eligibility = state.eligibility_result is not None
+        has_recommendation = state.recommendation is not None
+
+    stage = _enum_value(stage)
+
+    return {
+        "application_id": application_id,
+        "current_stage": stage,
+        "progress_percentage": STAGE_PROGRESS.get(stage, 0),
+        "message": f"Application is in {stage} stage",
+        "data": {
+            "documents_count": documents_count,
+            "has_extracted_data": has_extracted,
+            "has_validation": has_validation,
+            "has_eligibility": has_eligibility,
+            "has_recommendation": has_recommendation
+        }
+    }
+
+
+def build_results_payload(application_id: str, state: Any, full_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build /results payload from pipeline state plus the stored SQLite row
+    """
+    full_data = full_data or {}
+
+    if isinstance(state, dict):
+        stage = state.get("stage", "UNKNOWN")
+        extracted_data = state.get("extracted_data")
+        validation_report = state.get("validation_report")
+        eligibility_result = state.get("eligibility_result")
+        recommendation = state.get("recommendation")
+        explanation = state.get("explanation")
+    else:
+        stage = _enum_value(state.stage)
+        extracted_data = state.extracted_data
+        validation_report = state.validation_report
+        eligibility_result = state.eligibility_result
+        recommendation = state.recommendation
+        explanation = state.explanation
+
+    return {
+        "application_id": application_id,
+        "current_stage": _enum_value(stage),
+        "extracted_data": {
+            "applicant_info": extracted_data.applicant_info,
+            "income_data": extracted_data.income_data,
+            "employment_data": extracted_data.employment_data,
+            "assets_liabilities": extracted_data.assets_liabilities,
+            "credit_data": extracted_data.credit_data,
+            "family_info": extracted_data.family_info,
+        } if extracted_data else None,
+        "database_stored_fields": {
+            "company_name": full_data.get('company_name'),
+            "current_position": full_data.get('current_position'),
+            "join_date": full_data.get('join_date'),
+            "credit_score": full_data.get('credit_score'),
+            "credit_rating": full_data.get('credit_rating'),
+            "payment_ratio": full_data.get('payment_ratio'),
+            "total_outstanding": full_data.get('total_outstanding'),
+            "work_experience_years": full_data.get('work_experience_years'),
+            "education_level": full_data.get('education_level')
+        } if full_data else None,
+        "validation": {
+            "is_valid": validation_report.is_valid,
+            "completeness_score": validation_report.data_completeness_score,
+            "confidence_score": validation_report.confidence_score,
+            "issues": [{"field": i.field, "severity": i.severity, "message": i.message}
+                       for i in validation_report.issues]
+        } if validation_report else None,
+        "eligibility": {
+            "is_eligible": eligibility_result.is_eligible,
+            "eligibility_score": eligibility_result.eligibility_score,
+            "ml_prediction": eligibility_result.ml_prediction,
+            "policy_rules_met": eligibility_result.policy_rules_met,
+            "reasoning": eligibility_result.reasoning
+        } if eligibility_result else None,
+        "recommendation": {
+            "decision": _enum_value(recommendation.decision),
+            "support_amount": recommendation.financial_support_amount,
+            "support_type": recommendation.financial_support_type,
+            "programs": recommendation.economic_enablement_programs,
+            "reasoning": recommendation.reasoning,
+            "key_factors": recommendation.key_factors
+        } if recommendation else None,
+        "explanation": {
+            "summary": explanation.summary,
+            "detailed_reasoning": explanation.detailed_reasoning,
+            "factors_analysis": explanation.factors_analysis
+        } if explanation else None,
+        "database_data": full_data
+    }
+
+
+class ApplicationProcessor:
+    """
+    Runs an application through the orchestrator and writes the outcome
+    to all four databases
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        sqlite_db,
+        tinydb_cache,
+        chroma_db,
+        networkx_db,
+        graph_path: str = "application_graph.graphml",
+        use_outbox: bool = False,
+        timeline_store=None
+    ):
+        """
+        Args:
+            use_outbox: Defer cache/graph/vector writes to the outbox projector
+                (False applies them inline, before persist() returns)
+            timeline_store: Stores a span tree per processed application (optional)
+        """
+        self.orchestrator = orchestrator
+        self.sqlite_db = sqlite_db
+        self.tinydb_cache = tinydb_cache
+        self.chroma_db = chroma_db
+        self.networkx_db = networkx_db
+        self.graph_path = graph_path
+        self.use_outbox = use_outbox
+        self.timeline_store = timeline_store
+
+        self.audit_logger = get_audit_logger()
+        self.structured_logger = get_structured_logger("social_support_api")
+
+    async def process(
+        self,
+        application_id: str,
+        applicant_name: str,
+        documents: List[Dict[str, Any]],
+        trace=None,
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the LangGraph workflow and persist results
+
+        Args:
+            application_id: Application to process
+            applicant_name: Applicant's name
+            documents: Serialized documents (see serialize_documents)
+            trace: Optional Langfuse trace to attach spans to
+            resume: Continue the last run from its checkpoints when there are
+                any (nodes that succeeded are not run again)
+
+        Returns:
+            Final ApplicationGraphState
+        """
+        async with record(self.timeline_store, application_id, "process_application", resume=resume):
+            return await self._process(application_id, applicant_name, documents, trace, resume)
+
+    async def _process(
+        self,
+        application_id: str,
+        applicant_name: str,
+        documents: List[Dict[str, Any]],
+        trace,
+        resume: bool
+    ) -> Dict[str, Any]:
+        langgraph_span = trace.span(name="langgraph_orchestrator_execution") if trace else None
+
+        try:
+            resume_point = await self.orchestrator.get_resume_point(application_id) if resume else None
+            if resume_point is not None:
+                if langgraph_span:
+                    langgraph_span.update(metadata={"resumed_at_node": resume_point["node"]})
+                final_state = await self.orchestrator.resume_application(application_id)
+            else:
+                final_state = await self.orchestrator.process_application(
+                    application_id=application_id,
+                    applicant_name=applicant_name,
+                    documents=documents
+                )
+
+            logger.info(f"[{application_id}] Processing with applicant_name: '{applicant_name}'")
+
+            if final_state is None:
+                raise ValueError("Orchestrator returned None - workflow failed")
+
+            if langgraph_span:
+                langgraph_span.end(output={
+                    "success": True,
+                    "final_stage": final_state.get("stage"),
+                    "is_eligible": final_state["eligibility_result"].is_eligible if final_state.get("eligibility_result") else False
+                })
+
+        except Exception as workflow_error:
+            if langgraph_span:
+                langgraph_span.end(output={"success": False, "error": str(workflow_error)}, level="ERROR")
+            raise
+
+        # Database writes are blocking → IO pool, bounded by the db_write class
+        async with get_admission_controller().admit("db_write", wait=True):
+            await run_io(self.persist, application_id, final_state, trace)
+        return final_state
+
+    def persist(self, application_id: str, final_state: Dict[str, Any], trace=None) -> Dict[str, Any]:
+        """
+        Save pipeline outcome to SQLite and queue the TinyDB, NetworkX and
+        ChromaDB projections (one transaction)
+
+        Returns:
+            The application row written to SQLite
+        """
+        db_span = trace.span(name="database_persistence") if trace else None
+
+        app_data: Dict[str, Any] = {}
+        recommendation_data: Dict[str, Any] = {}
+
+        recommendation = final_state.get('recommendation')
+        eligibility_result = final_state.get('eligibility_result')
+
+        decision = _enum_value(recommendation.decision) if recommendation else 'unknown'
+        eligibility_score = eligibility_result.eligibility_score if eligibility_result else 0
+        support_amount = recommendation.financial_support_amount if recommendation else 0
+
+        with span("sqlite.persist", "store", outbox=self.use_outbox), self.sqlite_db.transaction():
+            # Check if we have valid extracted data before accessing attributes
+            if final_state.get("extracted_data"):
+                app_data = self._build_application_record(application_id, final_state)
+                self.sqlite_db.insert_application(app_data)
+
+            if final_state.get("validation_report"):
+                validation_report = final_state["validation_report"]
+                validation_data = {
+                    "is_valid": validation_report.is_valid,
+                    "completeness_score": validation_report.data_completeness_score,
+                    "confidence_score": validation_report.confidence_score,
+                    "issues": [{"field": i.field, "severity": i.severity, "message": i.message}
+                               for i in validation_report.issues]
+                }
+                # Store validation metrics in analytics
+                self.sqlite_db.update_analytics(
+                    f"{application_id}_validation",
+                    validation_report.data_completeness_score,
+                    validation_data
+                )
+
+            if eligibility_result and recommendation:
+                decision_data = {
+                    "decision_id": f"DEC_{application_id}",
+                    "app_id": application_id,
+                    "decision": decision,
+                    "decision_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "decided_by": "SYSTEM",
+                    "policy_score": eligibility_result.eligibility_score,
+                    "ml_score": eligibility_result.ml_prediction.get("probability") if (eligibility_result.ml_prediction and isinstance(eligibility_result.ml_prediction, dict)) else None,
+                    "priority": "high" if eligibility_result.is_eligible else "low",
+                    "reasoning": json.dumps(eligibility_result.reasoning),
+                    "support_type": recommendation.financial_support_type,
+                    "support_amount": recommendation.financial_support_amount,
+                    "duration_months": None,  # Duration not in Recommendation dataclass - set NULL
+                    "conditions": json.dumps([prog.get("program_name") if isinstance(prog, dict) else prog for prog in recommendation.economic_enablement_programs]) if recommendation.economic_enablement_programs else None
+                }
+                self.sqlite_db.insert_decision(decision_data)
+
+            if recommendation:
+                recommendation_data = {
+                    "decision_type": decision,
+                    "financial_support_amount": recommendation.financial_support_amount,
+                    "financial_support_type": recommendation.financial_support_type,
+                    "programs": recommendation.economic_enablement_programs,
+                    "reasoning": recommendation.reasoning
+                }
+                # Store recommendation summary in analytics
+                self.sqlite_db.update_analytics(
+                    f"{application_id}_recommendation",
+                    float(recommendation.financial_support_amount or 0),
+                    recommendation_data
+                )
+
+            projection = {
+                "app_data": app_data,
+                "decision": decision,
+                "eligibility_score": eligibility_score,
+                "support_amount": support_amount,
+                "recommendation_data": recommendation_data
+            }
+            if self.use_outbox:
+                for event_type in self.projection_handlers():
+                    self.sqlite_db.add_outbox_event(application_id, event_type, projection)
+
+        logger.info(f"Saved application, validation, decision and recommendation data to SQLite for {application_id}")
+
+        if db_span:
+            db_span.end(output={"success": True, "records_saved": "application, validation, decision, recommendation", "outbox": self.use_outbox})
+
+        # Structured logging for observability
+        self.structured_logger.info(
+            "Application processing completed",
+            application_id=application_id,
+            decision=decision,
+            eligibility_score=eligibility_score,
+            support_amount=support_amount,
+            programs_recommended=len(recommendation.economic_enablement_programs) if recommendation else 0
+        )
+
+        # Audit logging for compliance
+        self.audit_logger.log_audit_event(
+            event_type="application_process",
+            action="PROCESS_COMPLETE",
+            application_id=application_id,
+            resource="application",
+            resource_id=application_id,
+            details={
+                "decision": decision,
+                "eligibility_score": eligibility_score,
+                "support_amount": support_amount,
+                "processing_stage": str(_enum_value(final_state.get("stage", "unknown")))
+            },
+            status="success"
+        )
+
+        if self.use_outbox:
+            logger.info(f"Application {application_id} saved - cache, graph and vector projections queued")
+        else:
+            for event_type, handler in self.projection_handlers().items():
+                try:
+                    with span(event_type, "store"):
+                        handler(application_id, projection)
+                except Exception as e:
+                    logger.warning(f"Failed to apply {event_type} for {application_id}: {e}")
+            logger.info(f"Application {application_id} processing complete - all data saved to database")
+        return app_data
+
+    def projection_handlers(self) -> Dict[str, Any]:
+        """Outbox event type -> handler(application_id, projection) for OutboxProjector"""
+        return {
+            "cache.update": self._update_cache,
+            "graph.update": self._update_graph,
+            "vectors.index": self._index_vectors
+        }
+
+    def _build_application_record(self, application_id: str, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten pipeline outputs into the SQLite applications row"""
+        extracted_data = final_state["extracted_data"]
+        credit_data = extracted_data.credit_data or {}
+        employment_data = extracted_data.employment_data or {}
+        income_data = extracted_data.income_data or {}
+        applicant_info = extracted_data.applicant_info or {}
+        family_info = extracted_data.family_info or {}
+        assets_liabilities = extracted_data.assets_liabilities or {}
+
+        eligibility_result = final_state.get("eligibility_result")
+        recommendation = final_state.get("recommendation")
+
+        # CRITICAL: Ensure all NOT NULL fields have valid defaults
+        return {
+            "app_id": application_id,
+            "applicant_name": applicant_info.get("full_name", "Unknown"),
+            "emirates_id": applicant_info.get("id_number", ""),
+            "submission_date": datetime.now().strftime("%Y-%m-%d"),
+            "status": str(_enum_value(final_state["stage"])),
+            "monthly_income": float(income_data.get("monthly_income") or 0),
+            "monthly_expenses": float(income_data.get("monthly_expenses") or 0),
+            "family_size": int(family_info.get("family_size") or 1),
+            "employment_status": employment_data.get("employment_status") or "Unknown",
+            "total_assets": float(assets_liabilities.get("total_assets") or 0),
+            "total_liabilities": float(assets_liabilities.get("total_liabilities") or 0),
+            "credit_score": int(credit_data.get("credit_score") or 0),
+            "policy_score": eligibility_result.eligibility_score if eligibility_result else None,
+            "ml_prediction": str(eligibility_result.ml_prediction) if eligibility_result else None,
+            "ml_confidence": None,
+            "eligibility": "ELIGIBLE" if (eligibility_result and eligibility_result.is_eligible) else "NOT_ELIGIBLE",
+            "support_amount": float(recommendation.financial_support_amount or 0) if recommendation else 0.0,
+            # New fields from enhanced extraction (nullable fields can be None)
+            "company_name": employment_data.get("company_name"),
+            "current_position": employment_data.get("current_position"),
+            "join_date": employment_data.get("join_date"),
+            "credit_rating": credit_data.get("credit_rating"),
+            "credit_accounts": json.dumps(credit_data.get("credit_accounts", [])),
+            "payment_ratio": float(credit_data.get("payment_history", {}).get("payment_ratio", 0)) if (credit_data.get("payment_history") and credit_data.get("payment_history", {}).get("payment_ratio") is not None) else None,
+            "total_outstanding": float(credit_data.get("total_outstanding", 0)) if credit_data.get("total_outstanding") is not None else None,
+            "work_experience_years": int(employment_data.get("experience_years", 0)) if employment_data.get("experience_years") is not None else None,
+            "education_level": employment_data.get("education_level")
+        }
+
+    def _update_cache(self, application_id: str, projection: Dict[str, Any]):
+        """Cache final results AND full application data in TinyDB (6-hour TTL)"""
+        app_data = projection["app_data"]
+        decision = projection["decision"]
+        eligibility_score = projection["eligibility_score"]
+        support_amount = projection["support_amount"]
+
+        self.tinydb_cache.store_app_context(
+            f"{application_id}_result",
+            {
+                "decision": decision,
+                "eligibility_score": eligibility_score,
+                "support_amount": support_amount,
+                "processed_at": datetime.now().isoformat(),
+                "status": "COMPLETED"
+            }
+        )
+
+        # CRITICAL: Update main application cache with completed status and ALL relevant fields
+        self.tinydb_cache.store_app_context(
+            application_id,
+            {
+                "applicant_name": app_data.get("applicant_name", ""),
+                "status": app_data.get("status", "completed"),
+                "created_at": app_data.get("created_at", ""),
+                "monthly_income": app_data.get("monthly_income", 0),
+                "monthly_expenses": app_data.get("monthly_expenses", 0),
+                "credit_score": app_data.get("credit_score", 0),
+                "credit_rating": app_data.get("credit_rating", "N/A"),
+                "employment_status": app_data.get("employment_status", "Unknown"),
+                "company_name": app_data.get("company_name", ""),
+                "current_position": app_data.get("current_position", ""),
+                "family_size": app_data.get("family_size", 1),
+                "total_assets": app_data.get("total_assets", 0),
+                "total_liabilities": app_data.get("total_liabilities", 0),
+                "payment_ratio": app_data.get("payment_ratio", 0),
+                "total_outstanding": app_data.get("total_outstanding", 0),
+                "decision": decision,
+                "eligibility": app_data.get("eligibility", ""),
+                "eligibility_score": eligibility_score,
+                "support_amount": support_amount,
+                "policy_score": app_data.get("policy_score", 0),
+                "updated_at": datetime.now().isoformat()
+            }
+        )
+
+    def _update_graph(self, application_id: str, projection: Dict[str, Any]):
+        """Add/Update NetworkX graph with application data for similarity matching"""
+        app_data = projection["app_data"]
+        decision = projection["decision"]
+        eligibility_score = projection["eligibility_score"]
+        support_amount = projection["support_amount"]
+
+        app_node = f"APP_{application_id}"
+        # Reload + merge the shared graphml under a file lock so other processes' nodes survive the write
+        with self.networkx_db.graphml_transaction(self.graph_path) as graph:
+            if app_node in graph:
+                graph.nodes[app_node].update({
+                    'status': app_data.get('status', 'completed'),
+                    'monthly_income': app_data.get('monthly_income', 0),
+                    'employment_status': app_data.get('employment_status', 'Unknown'),
+                    'credit_score': app_data.get('credit_score', 0),
+                    'decision': decision,
+                    'eligibility_score': eligibility_score,
+                    'support_amount': support_amount,
+                    'updated_at': datetime.now().isoformat()
+                })
+            else:
+                profile_data = {
+                    'monthly_income': app_data.get('monthly_income', 0),
+                    'employment_status': app_data.get('employment_status', 'Unknown'),
+                    'credit_score': app_data.get('credit_score', 0),
+                    'family_size': app_data.get('family_size', 1),
+                    'id_number': app_data.get('emirates_id', ''),
+                    'decision': decision,
+                    'eligibility_score': eligibility_score,
+                    'support_amount': support_amount
+                }
+                self.networkx_db.create_application_node(
+                    application_id,
+                    app_data.get('applicant_name', 'Unknown'),
+                    profile_data
+                )
+
+        logger.info(f"Updated NetworkX graph with {application_id}")
+
+    def _index_vectors(self, application_id: str, projection: Dict[str, Any]):
+        """Index to ChromaDB for semantic search"""
+        app_data = projection["app_data"]
+        decision = projection["decision"]
+        eligibility_score = projection["eligibility_score"]
+        support_amount = projection["support_amount"]
+        recommendation_data = projection["recommendation_data"]
+
+        summary_data = {
+            'applicant_name': app_data.get('applicant_name', 'Unknown'),
+            'employment_status': app_data.get('employment_status', 'Unknown'),
+            'monthly_income': app_data.get('monthly_income', 0),
+            'family_size': app_data.get('family_size', 1),
+            'policy_score': eligibility_score,
+            'eligibility': app_data.get('eligibility', 'PENDING')
+        }
+        self.chroma_db.index_application_summary(application_id, summary_data)
+
+        income_data = {
+            'monthly_income': app_data.get('monthly_income', 0),
+            'monthly_expenses': app_data.get('monthly_expenses', 0),
+            'employment_status': app_data.get('employment_status', 'Unknown'),
+            'credit_score': app_data.get('credit_score', 0),
+            'net_worth': app_data.get('total_assets', 0) - app_data.get('total_liabilities', 0)
+        }
+        self.chroma_db.index_income_pattern(application_id, income_data)
+
+        decision_data = {
+            'decision_type': decision,
+            'eligibility_score': eligibility_score,
+            'support_amount': support_amount,
+            'reasoning': f"Policy score: {eligibility_score}, Programs: {len(recommendation_data.get('programs', []))}"
+        }
+        self.chroma_db.index_case_decision(application_id, decision_data)
+
+        logger.info(f"Indexed {application_id} to ChromaDB (3 collections)")
+
+
+def build_job_result(application_id: str, final_state: Dict[str, Any], full_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Result stored on the job record: status + results payloads"""
+    stage = _enum_value(final_state.get("stage"))
+    status = build_status_payload(application_id, final_state)
+    status["message"] = "Application processing completed"
+    status["data"].update({
+        "validation_valid": final_state["validation_report"].is_valid if final_state.get("validation_report") else False,
+        "eligibility_score": final_state["eligibility_result"].eligibility_score if final_state.get("eligibility_result") else 0,
+        "decision": _enum_value(final_state["recommendation"].decision) if final_state.get("recommendation") else "PENDING",
+        "errors": final_state.get("errors", [])
+    })
+
+    return {
+        "status": status,
+        "results": build_results_payload(application_id, final_state, full_data),
+        "final_stage": stage
+    }
@@ -0,0 +1,194 @@
+"""
+Batch Processor - Runs many applications through the job queue with a concurrency cap
+
+Each application is enqueued as a normal processing job; at most
+`concurrency` jobs from one batch are queued or running at a time, so a
+month-end backlog cannot starve interactive requests sharing the workers.
+
+Jobs go through JobQueue.enqueue_or_attach, so an application that is
+already queued or running (from /process or another batch) is waited on
+rather than processed twice; concurrent batches in this process share one
+submit-and-wait per application via SingleFlight.
+
+Outcomes are yielded as events in completion order:
+    batch_started   -> once, before any work
+    item_completed  -> once per application (succeeded / failed / not_found / timeout)
+    batch_completed -> once, with per-status counts
+
+Usage:
+    processor = BatchProcessor(job_queue)
+    async for event in processor.run(app_ids, resolve_payload, concurrency=8):
+        ...
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .job_queue import JobQueue
+from .executors import run_io
+from .single_flight import SingleFlight
+
+logger = logging.getLogger("BatchProcessor")
+
+# Item outcomes
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+NOT_FOUND = "not_found"
+TIMEOUT = "timeout"
+
+PayloadResolver = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class BatchProcessor:
+    """
+    Submits a batch of applications to the job queue and waits for each job
+
+    Args:
+        job_queue: Queue shared with the worker processes
+        poll_interval: Seconds between job status checks per in-flight item
+    """
+
+    def __init__(self, job_queue: JobQueue, poll_interval: float = 1.0):
+        self.job_queue = job_queue
+        self.poll_interval = poll_interval
+        self.flights = SingleFlight()
+
+    async def run(
+        self,
+        application_ids: List[str],
+        resolve_payload: PayloadResolver,
+        concurrency: int = 4,
+        item_timeout: float = 600.0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a batch, yielding progress events as items finish
+
+        Args:
+            application_ids: Applications to process (duplicates are dropped)
+            resolve_payload: Coroutine returning the job payload for an application,
+                             or None if it cannot be processed
+            concurrency: Maximum jobs from this batch queued/running at once
+            item_timeout: Seconds to wait for a single job before reporting a timeout
+
+        If the consumer stops iterating (e.g. client disconnect), no further
+        items are submitted; jobs already enqueued still run to completion.
+        """
+        batch_id = f"BATCH_{uuid.uuid4().hex[:12].upper()}"
+        unique_ids = list(dict.fromkeys(application_ids))
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        yield {
+            "event": "batch_started",
+            "batch_id": batch_id,
+            "total": len(unique_ids),
+            "duplicates_removed": len(application_ids) - len(unique_ids),
+            "concurrency": concurrency,
+            "timestamp": datetime.now().isoformat()
+        }
+
+        async def process_item(index: int, application_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._process_item(batch_id, index, application_id, resolve_payload, item_timeout)
+
+        tasks = [
+            asyncio.create_task(process_item(index, app_id))
+            for index, app_id in enumerate(unique_ids)
+        ]
+        summary = {SUCCEEDED: 0, FAILED: 0, NOT_FOUND: 0, TIMEOUT: 0}
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                summary[item["status"]] += 1
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        duration = time.perf_counter() - started
+        logger.info(f"{batch_id} finished {len(unique_ids)} application(s) in {duration:.1f}s: {summary}")
+
+        yield {
+            "event": "batch_completed",
+            "batch_id": batch_id,
+            "total": len(unique_ids),
+            "summary": summary,
+            "duration_seconds": round(duration, 2),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def _process_item(
+        self,
+        batch_id: str,
+        index: int,
+        application_id: str,
+        resolve_payload: PayloadResolver,
+        item_timeout: float
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        item = {
+            "event": "item_completed",
+            "batch_id": batch_id,
+            "index": index,
+            "application_id": application_id,
+            "job_id": None,
+            "status": None,
+            "final_stage": None,
+            "decision": None,
+            "error": None
+        }
+
+        try:
+            payload = await resolve_payload(application_id)
+            if payload is None:
+                item.update(status=NOT_FOUND, error="Application not found")
+                return item
+
+            job = await self.flights.do(
+                application_id,
+                lambda: self._submit_and_wait(application_id, payload, item_timeout)
+            )
+            item["job_id"] = job["job_id"]
+
+            if job["status"] == JobQueue.SUCCEEDED:
+                result = job.get("result") or {}
+                item.update(
+                    status=SUCCEEDED,
+                    final_stage=result.get("final_stage"),
+                    decision=(result.get("status") or {}).get("data", {}).get("decision")
+                )
+            elif job["status"] in JobQueue.ACTIVE_STATUSES:
+                item.update(status=TIMEOUT, error=f"Job did not finish within {item_timeout:g}s")
+            else:
+                item.update(status=FAILED, error=job.get("error"))
+
+        except Exception as e:
+            logger.error(f"[{application_id}] Batch item failed: {e}")
+            item.update(status=FAILED, error=str(e))
+
+        finally:
+            item["duration_seconds"] = round(time.perf_counter() - started, 2)
+
+        return item
+
+    async def _submit_and_wait(self, application_id: str, payload: Dict[str, Any], item_timeout: float) -> Dict[str, Any]:
+        """Queue (or attach to) the application's job; returns it once finished, or still active on timeout"""
+        job, _ = await run_io(self.job_queue.enqueue_or_attach, application_id, payload, "process_application")
+        try:
+            return await asyncio.wait_for(self._wait_for_job(job["job_id"]), timeout=item_timeout)
+        except asyncio.TimeoutError:
+            return job
+
+    async def _wait_for_job(self, job_id: str) -> Dict[str, Any]:
+        """Poll until the job reaches a terminal status"""
+        while True:
+            job = await run_io(self.job_queue.get_job, job_id)
+            if job is None:
+                raise RuntimeError(f"Job {job_id} disappeared from the queue")
+            if job["status"] not in JobQueue.ACTIVE_STATUSES:
+                return job
+            await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,400 @@
+"""
+Checkpoint Store - SQLite-backed LangGraph checkpointer
+
+Replaces MemorySaver so pipeline checkpoints survive restarts and are shared
+by every worker process. Threads are keyed by application id
+(`thread_id=application_id`), so a failed or interrupted run can be resumed
+from the checkpoint before the node that failed instead of redoing OCR and
+extraction (see LangGraphOrchestrator.resume_application).
+
+Each checkpoint row holds the full serialised checkpoint (channel values
+included), written with LangGraph's own serializer so Pydantic state objects
+round-trip exactly as they did with MemorySaver. Pending writes of
+interrupted steps are kept in a second table.
+
+Retention:
+    - A new processing run deletes the application's previous checkpoints
+    - Threads with no checkpoint newer than the retention window are pruned
+      (default: CHECKPOINT_RETENTION_HOURS, 72h), every `prune_every` puts
+
+Usage:
+    checkpointer = SQLiteCheckpointSaver("data/databases/checkpoints.db")
+    graph = workflow.compile(checkpointer=checkpointer)
+"""
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata
+)
+
+from .executors import run_io
+from .timeline import timed
+
+logger = logging.getLogger("CheckpointStore")
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpoint saver on a SQLite file shared across processes
+
+    Args:
+        db_path: SQLite file (created if missing)
+        retention_seconds: Threads idle for longer are pruned
+            (default: CHECKPOINT_RETENTION_HOURS, 72h)
+        prune_every: Prune after this many checkpoint writes
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/databases/checkpoints.db",
+        retention_seconds: Optional[float] = None,
+        prune_every: int = 200
+    ):
+        super().__init__()
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("CHECKPOINT_RETENTION_HOURS", "72")) * 3600
+        self.retention_seconds = retention_seconds
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._puts = 0
+        self._init_schema()
+        logger.info(f"Checkpoint store ready: {self.db_path}")
+
+    @contextmanager
+    def get_connection(self):
+        """Get thread-local database connection"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                check_same_thread=False
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+
+        yield self._local.conn
+
+    def _init_schema(self):
+        """Initialize checkpoint tables"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    checkpoint_type TEXT NOT NULL,
+                    checkpoint BLOB NOT NULL,
+                    metadata_type TEXT NOT NULL,
+                    metadata BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    value_type TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_checkpoints_created ON checkpoints(created_at)")
+            conn.commit()
+
+    # ========== BaseCheckpointSaver ==========
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Checkpoint named by config, or the thread's latest one"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self.get_connection() as conn:
+            if checkpoint_id:
+                row = conn.execute("""
+                    SELECT * FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+                """, (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+            else:
+                row = conn.execute("""
+                    SELECT * FROM checkpoints
+                    WHERE thread_id = ? AND checkpoint_ns = ?
+                    ORDER BY checkpoint_id DESC LIMIT 1
+                """, (thread_id, checkpoint_ns)).fetchone()
+            return self._row_to_tuple(conn, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints newest first, optionally per thread / before a checkpoint / by metadata"""
+        clauses, params = [], []
+        if config:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params.append(configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(configurable["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            clauses.append("checkpoint_id < ?")
+            params.append(get_checkpoint_id(before))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params
+            ).fetchall()
+
+            remaining = limit
+            for row in rows:
+                if remaining is not None and remaining <= 0:
+                    break
+                checkpoint_tuple = self._row_to_tuple(conn, row)
+                # Metadata is serialised, so it is filtered here rather than in SQL
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                if remaining is not None:
+                    remaining -= 1
+                yield checkpoint_tuple
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        """Store a checkpoint (with its channel values) and return its config"""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO checkpoints (
+                    thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                    checkpoint_type, checkpoint, metadata_type, metadata, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                thread_id, checkpoint_ns, checkpoint["id"], configurable.get("checkpoint_id"),
+                checkpoint_type, checkpoint_blob, metadata_type, metadata_blob, time.time()
+            ))
+            conn.commit()
+
+        self._puts += 1
+        if self.prune_every and self._puts % self.prune_every == 0:
+            self.prune()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"]
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        """Store writes of a task that finished before its step was checkpointed"""
+        configurable = config["configurable"]
+        key = (configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+        replace, keep = [], []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_blob = self.serde.dumps_typed(value)
+            idx = WRITES_IDX_MAP.get(channel, idx)
+            # Special writes (errors, interrupts) replace earlier ones; regular writes are kept once
+            (replace if idx < 0 else keep).append((*key, task_id, idx, channel, value_type, value_blob))
+
+        with self.get_connection() as conn:
+            for verb, rows in (("INSERT OR REPLACE", replace), ("INSERT OR IGNORE", keep)):
+                if rows:
+                    conn.executemany(f"""
+                        {verb} INTO checkpoint_writes (
+                            thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, value_type, value
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+            conn.commit()
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """Monotonic string versions (same scheme as MemorySaver)"""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # Async variants run the blocking SQLite calls in the IO pool (writes are timeline spans)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await run_io(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await run_io(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await run_io(timed("checkpoint.put", "store", self.put), config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        await run_io(timed("checkpoint.put_writes", "store", self.put_writes), config, writes, task_id, task_path)
+
+    # ========== Retention ==========
+
+    def delete_thread(self, thread_id: str) -> int:
+        """Delete all checkpoints and writes of a thread; returns checkpoints removed"""
+        with self.get_connection() as conn:
+            cursor = conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            conn.execute("DELETE FROM checkpoint_writes WHERE thread_id = ?", (thread_id,))
+            conn.commit()
+        return cursor.rowcount
+
+    def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete threads whose latest checkpoint is older than the retention window"""
+        cutoff = time.time() - (max_age_seconds if max_age_seconds is not None else self.retention_seconds)
+        with self.get_connection() as conn:
+            stale = [row[0] for row in conn.execute("""
+                SELECT thread_id FROM checkpoints
+                GROUP BY thread_id
+                HAVING MAX(created_at) < ?
+            """, (cutoff,)).fetchall()]
+            for thread_id in stale:
+                conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                conn.execute("DELETE FROM checkpoint_writes WHERE thread_id = ?", (thread_id,))
+            conn.commit()
+        if stale:
+            logger.info(f"Pruned checkpoints of {len(stale)} threads")
+        return len(stale)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Thread and checkpoint counts and on-disk size"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT COUNT(DISTINCT thread_id) AS threads, COUNT(*) AS checkpoints,
+                       COALESCE(SUM(LENGTH(checkpoint)), 0) AS bytes
+                FROM checkpoints
+            """).fetchone()
+            writes = conn.execute("SELECT COUNT(*) FROM checkpoint_writes").fetchone()[0]
+        return {
+            "threads": row["threads"],
+            "checkpoints": row["checkpoints"],
+            "pending_writes": writes,
+            "checkpoint_bytes": row["bytes"],
+            "retention_hours": round(self.retention_seconds / 3600, 2)
+        }
+
+    # ========== Helpers ==========
+
+    def _row_to_tuple(self, conn: sqlite3.Connection, row: sqlite3.Row) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id = row["thread_id"], row["checkpoint_ns"], row["checkpoint_id"]
+        writes = conn.execute("""
+            SELECT task_id, channel, value_type, value FROM checkpoint_writes
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+            ORDER BY task_id, idx
+        """, (thread_id, checkpoint_ns, checkpoint_id)).fetchall()
+
+        parent_id = row["parent_checkpoint_id"]
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id
+                }
+            },
+            checkpoint=self.serde.loads_typed((row["checkpoint_type"], row["checkpoint"])),
+            metadata=self.serde.loads_typed((row["metadata_type"], row["metadata"])),
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_id
+                }
+            } if parent_id else None,
+            pending_writes=[
+                (w["task_id"], w["channel"], self.serde.loads_typed((w["value_type"], w["value"])))
+                for w in writes
+            ]
+        )
+
+
+def create_checkpointer(backend: Optional[str] = None, db_path: Optional[str] = None):
+    """
+    Build the configured LangGraph checkpointer
+
+    Args:
+        backend: "sqlite" or "memory" (default: CHECKPOINT_BACKEND env, then sqlite)
+        db_path: SQLite file (default: CHECKPOINT_PATH env, then data/databases/checkpoints.db)
+    """
+    backend = (backend or os.getenv("CHECKPOINT_BACKEND", "sqlite")).lower()
+    if backend == "memory":
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+    if backend == "sqlite":
+        return SQLiteCheckpointSaver(db_path or os.getenv("CHECKPOINT_PATH", "data/databases/checkpoints.db"))
+    raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend}")
@@ -0,0 +1,317 @@
+"""
+Service Container - Creates every store, agent and the orchestrator exactly once
+
+One Chroma PersistentClient per directory, one TinyDB handle on cache.json
+and a single read_graphml load per process: the API, the RAG chatbot's
+UnifiedDatabaseManager and the worker all share the container's instances.
+
+Components are created lazily on first access (thread-safe), and `warm()`
+creates the independent ones in parallel on the executor pools:
+
+    stores  (sqlite, tinydb, chroma, networkx,  ┐
+             state_store, progress_events,      │
+             checkpointer, node_cache,          │
+             timeline_store, trace_store,       │
+             tracer)                            │
+    agents  (extraction ... explanation)        ┴─> unified_db ─> rag_chatbot ─> orchestrator
+
+Usage:
+    services = ServiceContainer()
+    await services.warm()          # API lifespan / worker start
+    services.sqlite.get_application(app_id)
+"""
+import asyncio
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .executors import run_cpu, run_io
+
+logger = logging.getLogger("ServiceContainer")
+
+
+class ServiceContainer:
+    """
+    Lazily constructed, process-wide components
+
+    Args:
+        sqlite_path: SQLite application database
+        tinydb_path: TinyDB cache file
+        chroma_dir: ChromaDB persistence directory
+        graph_path: NetworkX graphml file shared by all processes (re-synced when rewritten)
+        state_store_path: SQLite file for application state (STATE_STORE_PATH if omitted)
+        events_path: SQLite file for pipeline progress events
+        checkpoint_path: SQLite file for LangGraph checkpoints (CHECKPOINT_PATH if omitted)
+        node_cache_path: SQLite file for memoised node outputs (NODE_CACHE_PATH if omitted)
+        timeline_path: SQLite file for pipeline timelines (TIMELINE_PATH if omitted)
+        trace_dir: Directory of trace segments (process-wide TRACE_STORE_DIR store if omitted)
+        rag_config: Config for RAGChatbotAgent (ollama_url, ollama_model)
+        include_chatbot: Create and register the RAG chatbot (not needed by workers)
+    """
+
+    def __init__(
+        self,
+        sqlite_path: str = "data/databases/applications.db",
+        tinydb_path: str = "data/databases/cache.json",
+        chroma_dir: str = "data/databases/chromadb",
+        graph_path: str = "application_graph.graphml",
+        state_store_path: Optional[str] = None,
+        events_path: str = "data/databases/progress_events.db",
+        checkpoint_path: Optional[str] = None,
+        node_cache_path: Optional[str] = None,
+        timeline_path: Optional[str] = None,
+        trace_dir: Optional[str] = None,
+        rag_config: Optional[Dict[str, Any]] = None,
+        include_chatbot: bool = True
+    ):
+        self.sqlite_path = sqlite_path
+        self.tinydb_path = tinydb_path
+        self.chroma_dir = chroma_dir
+        self.graph_path = graph_path
+        self.state_store_path = state_store_path
+        self.events_path = events_path
+        self.checkpoint_path = checkpoint_path
+        self.node_cache_path = node_cache_path
+        self.timeline_path = timeline_path
+        self.trace_dir = trace_dir
+        self.rag_config = rag_config or {}
+        self.include_chatbot = include_chatbot
+
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        self._component_status: Dict[str, Dict[str, Any]] = {}
+        self._warm_error: Optional[str] = None
+        self._warm_started_at: Optional[float] = None
+        self._warm_seconds: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Lazy construction
+    # ------------------------------------------------------------------
+
+    def _get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the single instance of `name`, creating it on first use"""
+        if name in self._instances:
+            return self._instances[name]
+
+        with self._locks_guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+
+        with lock:
+            if name not in self._instances:
+                started = time.perf_counter()
+                try:
+                    self._instances[name] = factory()
+                except Exception as e:
+                    self._component_status[name] = {"status": "failed", "error": str(e)}
+                    raise
+                seconds = time.perf_counter() - started
+                self._component_status[name] = {"status": "ready", "seconds": round(seconds, 3)}
+                logger.info(f"{name} initialized in {seconds:.2f}s")
+        return self._instances[name]
+
+    @property
+    def sqlite(self):
+        from ..databases.prod_sqlite_manager import SQLiteManager
+        return self._get("sqlite", lambda: SQLiteManager(self.sqlite_path))
+
+    @property
+    def tinydb(self):
+        from ..databases.tinydb_manager import TinyDBManager
+        return self._get("tinydb", lambda: TinyDBManager(self.tinydb_path))
+
+    @property
+    def chroma(self):
+        from ..databases.chroma_manager import ChromaDBManager
+        return self._get("chroma", lambda: ChromaDBManager(self.chroma_dir))
+
+    @property
+    def networkx(self):
+        return self._get("networkx", self._create_networkx)
+
+    def _create_networkx(self):
+        from ..databases.networkx_manager import NetworkXManager
+        manager = NetworkXManager()
+        graph_path = Path(self.graph_path)
+        if manager.sync_graphml(str(graph_path)):
+            logger.info(f"NetworkX loaded: {manager.graph.number_of_nodes()} nodes, {manager.graph.number_of_edges()} edges")
+        else:
+            # Fresh system - graph will be created on first application
+            logger.debug("NetworkX graph file not found - will be created on first use")
+        return manager
+
+    @property
+    def state_store(self):
+        """Shared application state (STATE_STORE_BACKEND: sqlite or memory)"""
+        from .state_store import create_state_store
+        return self._get("state_store", lambda: create_state_store(db_path=self.state_store_path))
+
+    @property
+    def progress_events(self):
+        """Pipeline progress events shared by workers and API processes"""
+        from .progress_events import ProgressEventBus
+        return self._get("progress_events", lambda: ProgressEventBus(self.events_path))
+
+    @property
+    def unified_db(self):
+        from ..databases.unified_database_manager import UnifiedDatabaseManager
+        return self._get("unified_db", lambda: UnifiedDatabaseManager(
+            sqlite=self.sqlite,
+            tinydb=self.tinydb,
+            chromadb=self.chroma,
+            networkx=self.networkx
+        ))
+
+    @property
+    def agents(self) -> Dict[str, Any]:
+        """Pipeline agents keyed by orchestrator registration name"""
+        return self._get("agents", self._create_agents)
+
+    def _create_agents(self) -> Dict[str, Any]:
+        from ..agents.extraction_agent import DataExtractionAgent
+        from ..agents.validation_agent import DataValidationAgent
+        from ..agents.eligibility_agent import EligibilityAgent
+        from ..agents.recommendation_agent import RecommendationAgent
+        from ..agents.explanation_agent import ExplanationAgent
+        return {
+            "extraction_agent": DataExtractionAgent(node_cache=self.node_cache),
+            "validation_agent": DataValidationAgent(),
+            "eligibility_agent": EligibilityAgent(),
+            "recommendation_agent": RecommendationAgent(),
+            "explanation_agent": ExplanationAgent()
+        }
+
+    @property
+    def rag_chatbot(self):
+        from ..agents.rag_chatbot_agent import RAGChatbotAgent
+        return self._get("rag_chatbot", lambda: RAGChatbotAgent(
+            {"db_path": self.sqlite_path, **self.rag_config},
+            db_manager=self.unified_db
+        ))
+
+    @property
+    def checkpointer(self):
+        """LangGraph checkpointer shared by workers and API (CHECKPOINT_BACKEND: sqlite or memory)"""
+        from .checkpoint_store import create_checkpointer
+        return self._get("checkpointer", lambda: create_checkpointer(db_path=self.checkpoint_path))
+
+    @property
+    def node_cache(self):
+        """Node outputs keyed by input fingerprints (None when NODE_CACHE_ENABLED=0)"""
+        from .node_cache import create_node_cache
+        return self._get("node_cache", lambda: create_node_cache(db_path=self.node_cache_path))
+
+    @property
+    def timeline_store(self):
+        """Per-run span trees for /timeline (None when TIMELINE_ENABLED=0)"""
+        from .timeline import create_timeline_store
+        return self._get("timeline_store", lambda: create_timeline_store(db_path=self.timeline_path))
+
+    @property
+    def trace_store(self):
+        """Append-only run summaries in JSONL segments"""
+        from .trace_store import SegmentedTraceStore, get_trace_store
+        return self._get(
+            "trace_store",
+            lambda: get_trace_store() if self.trace_dir is None else SegmentedTraceStore(self.trace_dir)
+        )
+
+    @property
+    def tracer(self):
+        """Buffered tracing facade (TRACING_BACKEND: langfuse, local or noop)"""
+        from .tracing import get_tracer
+        return self._get("tracer", get_tracer)
+
+    @property
+    def orchestrator(self):
+        return self._get("orchestrator", self._create_orchestrator)
+
+    def _create_orchestrator(self):
+        from ..core.langgraph_orchestrator import LangGraphOrchestrator
+        orchestrator = LangGraphOrchestrator(
+            state_store=self.state_store,
+            event_bus=self.progress_events,
+            checkpointer=self.checkpointer,
+            node_cache=self.node_cache,
+            timeline_store=self.timeline_store,
+            trace_store=self.trace_store,
+            tracer=self.tracer
+        )
+        agents = dict(self.agents)
+        if self.include_chatbot:
+            agents["rag_chatbot_agent"] = self.rag_chatbot
+        orchestrator.register_agents(**agents)
+        logger.info(f"{len(agents)} agents registered with orchestrator")
+        return orchestrator
+
+    def application_processor(self):
+        """ApplicationProcessor wired to the shared orchestrator and stores"""
+        from .application_processor import ApplicationProcessor
+        return ApplicationProcessor(
+            orchestrator=self.orchestrator,
+            sqlite_db=self.sqlite,
+            tinydb_cache=self.tinydb,
+            chroma_db=self.chroma,
+            networkx_db=self.networkx,
+            graph_path=self.graph_path,
+            use_outbox=True,
+            timeline_store=self.timeline_store
+        )
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    async def warm(self):
+        """
+        Create all components, independent ones in parallel
+
+        Safe to call more than once; components are only built the first time.
+        """
+        self._warm_started_at = time.time()
+        started = time.perf_counter()
+        try:
+            # Stores and pipeline agents do not depend on each other
+            await asyncio.gather(
+                run_io(lambda: self.sqlite),
+                run_io(lambda: self.tinydb),
+                run_io(lambda: self.chroma),
+                run_io(lambda: self.networkx),
+                run_io(lambda: self.state_store),
+                run_io(lambda: self.progress_events),
+                run_io(lambda: self.checkpointer),
+                run_io(lambda: self.node_cache),
+                run_io(lambda: self.timeline_store),
+                run_io(lambda: self.trace_store),
+                run_io(lambda: self.tracer),
+                run_cpu(lambda: self.agents)
+            )
+            # These only wire together what already exists
+            await run_io(lambda: self.unified_db)
+            if self.include_chatbot:
+                await run_io(lambda: self.rag_chatbot)
+            await run_io(lambda: self.orchestrator)
+        except Exception as e:
+            self._warm_error = str(e)
+            logger.error(f"Service warm-up failed: {e}", exc_info=True)
+            raise
+        self._warm_seconds = time.perf_counter() - started
+        logger.info(f"All services warm in {self._warm_seconds:.2f}s")
+
+    @property
+    def ready(self) -> bool:
+        """True once warm() has completed successfully"""
+        return self._warm_seconds is not None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Readiness and per-component initialisation timings"""
+        return {
+            "ready": self.ready,
+            "error": self._warm_error,
+            "warm_started_at": self._warm_started_at,
+            "warm_seconds": round(self._warm_seconds, 3) if self._warm_seconds is not None else None,
+            "components": dict(self._component_status)
+        }
@@ -1,58 +1,267 @@
 """
 Production-Grade Document Extraction Service
 Uses proper libraries for each document type - NO LLM for basic extraction
+
+PDF text backends (PDF_TEXT_BACKEND):
+    auto        PyMuPDF per page; pages without a usable text layer (fewer than
+                PDF_MIN_PAGE_CHARS characters, or undecodable glyphs) are
+                re-read with pdfplumber (default)
+    pymupdf     PyMuPDF only
+    pdfplumber  pdfplumber only (the previous behaviour)
+
+PyMuPDF is several times faster on multi-page statements. Its words are
+joined into lines by position, like pdfplumber's extract_text, so the
+line-based parsers see the same text. The backend used and the time per page
+are reported with each extraction (see extract_document).
+
+Scanned pages (still no usable text layer, but carrying an image) are
+rasterised with PyMuPDF in greyscale at PDF_OCR_DPI (default 200 - Tesseract
+gains little above that for statement-sized print, and time grows with the
+pixel count) and OCR'd with Tesseract (PDF_OCR_LANG, default eng). Each page
+runs in its own tesseract process, PDF_OCR_WORKERS (default up to 4) at a
+time, so a 20-page scan costs about a fifth of doing the pages one by one.
+At most PDF_OCR_MAX_PAGES (default 20) pages are OCR'd per document; the rest
+are reported as skipped. Page text is cached under the digest of the rendered
+page (PDF_OCR_CACHE_DIR, default data/cache/ocr_pages), so a re-uploaded scan
+with one changed page OCRs only that page. PDF_OCR_ENABLED=0 turns the path
+off.
+
+Extractions are memoised by the node cache under the document's content hash
+plus extractor_config() - EXTRACTOR_VERSION, the settings above and the OCR
+templates - so changing any of them re-reads previously cached uploads.
 """
+import hashlib
 import logging
 import re
 import os
 import json
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
 from pathlib import Path
 from datetime import datetime
 
 import pdfplumber
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageOps, ImageStat
 import pandas as pd
 
+from .ocr_templates import FieldRegion, OcrTemplate, find_template, get_templates
+
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    pymupdf = None
+    PYMUPDF_AVAILABLE = False
+
+# Bump when parsing logic changes output for the same file and settings
+EXTRACTOR_VERSION = "2"
+
+PDF_TEXT_BACKENDS = ("auto", "pymupdf", "pdfplumber")
+
+EMIRATES_ID_OCR_TIERS = ("template", "fast", "full")
+
+# Validation cannot proceed without these (name match, ID format, age)
+EMIRATES_ID_REQUIRED_FIELDS = ("full_name", "id_number", "date_of_birth")
+
 
 class DocumentExtractor:
     """
     High-quality document extraction using specialized libraries
-    - PDFs with text: pdfplumber (direct text extraction)
-    - Scanned PDFs/Images: Tesseract OCR
+    - PDFs with text: PyMuPDF, pdfplumber per page where needed
+    - Scanned PDFs/Images: Tesseract OCR (scanned PDF pages rendered with PyMuPDF)
     - Excel files: pandas/openpyxl
     - Intelligent field extraction with regex patterns
     """
     
-    def __init__(self):
+    def __init__(self, pdf_backend: Optional[str] = None, min_page_chars: Optional[int] = None,
+                 ocr_cache: Optional["OcrPageCache"] = None):
         self.logger = logging.getLogger("DocumentExtractor")
-        self.logger.info("Document extractor initialized")
+        
+        self.pdf_backend = (pdf_backend or os.getenv("PDF_TEXT_BACKEND", "auto")).lower()
+        if self.pdf_backend not in PDF_TEXT_BACKENDS:
+            raise ValueError(f"Unknown PDF_TEXT_BACKEND {self.pdf_backend!r} (expected one of {', '.join(PDF_TEXT_BACKENDS)})")
+        if self.pdf_backend != "pdfplumber" and not PYMUPDF_AVAILABLE:
+            self.logger.warning("PyMuPDF not installed - using pdfplumber for PDF text")
+            self.pdf_backend = "pdfplumber"
+        self.min_page_chars = min_page_chars if min_page_chars is not None else int(os.getenv("PDF_MIN_PAGE_CHARS", "20"))
+        
+        # Scanned-page OCR
+        self.ocr_enabled = os.getenv("PDF_OCR_ENABLED", "1") != "0" and PYMUPDF_AVAILABLE
+        self.ocr_dpi = int(os.getenv("PDF_OCR_DPI", "200"))
+        self.ocr_lang = os.getenv("PDF_OCR_LANG", "eng")
+        self.ocr_max_pages = int(os.getenv("PDF_OCR_MAX_PAGES", "20"))
+        self.ocr_workers = int(os.getenv("PDF_OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self._ocr_pool: Optional[ThreadPoolExecutor] = None
+        self._ocr_cache = ocr_cache
+        self._ocr_lock = threading.Lock()
+        
+        # Emirates ID OCR tiers
+        self.emirates_id_tiers = [
+            tier.strip() for tier in os.getenv("EMIRATES_ID_OCR_TIERS", ",".join(EMIRATES_ID_OCR_TIERS)).split(",") if tier.strip()
+        ]
+        unknown = set(self.emirates_id_tiers) - set(EMIRATES_ID_OCR_TIERS)
+        if unknown or not self.emirates_id_tiers:
+            raise ValueError(f"Invalid EMIRATES_ID_OCR_TIERS (expected a list of {', '.join(EMIRATES_ID_OCR_TIERS)})")
+        self.emirates_id_fast_width = int(os.getenv("EMIRATES_ID_FAST_WIDTH", "1200"))
+        self.emirates_id_fast_psm = int(os.getenv("EMIRATES_ID_FAST_PSM", "4"))
+        self.emirates_id_full_width = int(os.getenv("EMIRATES_ID_FULL_WIDTH", "2000"))
+        
+        # Per-thread record of how the last document was read (the singleton is shared by pool threads)
+        self._local = threading.local()
+        self.logger.info(f"Document extractor initialized (PDF text: {self.pdf_backend})")
     
     # ========== Emirates ID Extraction ==========
     
     def extract_emirates_id(self, file_path: str) -> Dict[str, Any]:
-        """Extract structured data from Emirates ID image"""
+        """
+        Extract structured data from Emirates ID image, cheapest OCR tier first
+        
+        Tiers (EMIRATES_ID_OCR_TIERS):
+            template  only the field regions of a registered layout template
+                      (see ocr_templates) matching the card's aspect ratio, each
+                      crop OCR'd as one text line with the field's character
+                      whitelist, in parallel on the OCR pool; skipped when no
+                      template matches
+            fast  greyscale, contrast-stretched (light-on-dark inverted), scaled to
+                  EMIRATES_ID_FAST_WIDTH (default 1200) px, English only, page
+                  segmentation EMIRATES_ID_FAST_PSM (default 4: one column of lines)
+            full  colour, LANCZOS-upscaled to at least EMIRATES_ID_FULL_WIDTH
+                  (default 2000) px, English + Arabic, automatic segmentation
+        
+        The next tier runs only when the previous one leaves a required field
+        (EMIRATES_ID_REQUIRED_FIELDS) empty - a misaligned template crop reads
+        nothing that passes the field's pattern, so the full-page tiers take
+        over; their gaps are filled from earlier tiers.
+        """
         try:
-            # Use Tesseract OCR for image
             image = Image.open(file_path)
+            image.load()
             
-            # Preprocess image for better OCR
-            image = self._preprocess_image(image)
-            
-            # Extract text with English + Arabic
-            text = pytesseract.image_to_string(image, lang='eng+ara')
-            
-            self.logger.info(f"Extracted {len(text)} chars from Emirates ID")
+            data: Dict[str, Any] = {}
+            tiers = []
+            for tier in self.emirates_id_tiers:
+                started = time.perf_counter()
+                if tier == "template":
+                    tier_data, text, tier_stats = self._read_emirates_id_template(image)
+                else:
+                    prepared, lang, config = self._prepare_emirates_id_tier(tier, image)
+                    text = pytesseract.image_to_string(prepared, lang=lang, config=config)
+                    tier_data, tier_stats = self._parse_emirates_id(text), {}
+                
+                # Later tiers win; earlier tiers fill what they could not read
+                data = {field: tier_data.get(field) or data.get(field) for field in tier_data}
+                missing = [field for field in EMIRATES_ID_REQUIRED_FIELDS if not data.get(field)]
+                tiers.append({"tier": tier, "ms": _elapsed_ms(started), "chars": len(text), "missing": missing, **tier_stats})
+                self.logger.info(f"Emirates ID {tier} OCR: {len(text)} chars, missing {missing or 'nothing'}")
+                if not missing:
+                    break
             
-            # Parse structured fields
-            return self._parse_emirates_id(text)
+            self._record_stats("ocr", {
+                "tier": tiers[-1]["tier"],
+                "resolved": not tiers[-1]["missing"],
+                "tiers": tiers
+            })
+            return data
             
         except Exception as e:
             self.logger.error(f"Emirates ID extraction failed: {e}")
             raise
     
-    def _preprocess_image(self, image: Image) -> Image:
+    def _read_emirates_id_template(self, image: Image) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+        """
+        OCR only the field regions of the matching layout template
+        
+        Returns:
+            (fields, joined crop text, stats) - stats name the template (None
+            when no template fits), the share of the card's pixels OCR'd, the
+            fields whose crop did not read as a valid value and those whose
+            OCR call failed
+        """
+        data = self._parse_emirates_id("")
+        template = find_template("emirates_id", image.size)
+        if template is None:
+            return data, "", {"template": None, "pixels": 0.0, "unread": sorted(data), "failed": []}
+        
+        crops = {
+            field: self._prepare_template_crop(image, template, region)
+            for field, region in template.fields.items()
+        }
+        pool = self._get_ocr_pool()
+        futures = {
+            field: pool.submit(self._ocr_template_field, crops[field], region)
+            for field, region in template.fields.items()
+        }
+        
+        texts, unread, failed = [], [], []
+        for field, future in futures.items():
+            region = template.fields[field]
+            try:
+                text = future.result()
+            except Exception as e:
+                self.logger.warning(f"Emirates ID template OCR of {field} failed: {e}")
+                failed.append(field)
+                text = ""
+            texts.append(text)
+            value = region.parse(text)
+            if value and region.kind == "date":
+                value = self._normalize_date(value)
+            elif value and region.kind == "id":
+                value = value.replace(" ", "-")
+            if value:
+                data[field] = value
+            else:
+                unread.append(field)
+        
+        width, height = image.size
+        cropped = sum(
+            (right - left) * (bottom - top)
+            for left, top, right, bottom in (template.pixel_box(region, image.size) for region in template.fields.values())
+        )
+        return data, "\n".join(texts), {
+            "template": template.name,
+            "pixels": round(cropped / (width * height), 4),
+            "unread": unread,
+            "failed": failed
+        }
+    
+    @staticmethod
+    def _prepare_template_crop(image: Image, template: OcrTemplate, region: FieldRegion) -> Image:
+        """Greyscale, dark-on-light, upscaled field crop with a white margin"""
+        crop = ImageOps.autocontrast(image.crop(template.pixel_box(region, image.size)).convert("L"))
+        if ImageStat.Stat(crop).mean[0] < 128:
+            crop = ImageOps.invert(crop)
+        width, height = crop.size
+        crop = crop.resize(
+            (max(1, int(width * template.scale)), max(1, int(height * template.scale))), Image.Resampling.BICUBIC
+        )
+        # Tesseract misses glyphs touching the image edge
+        return ImageOps.expand(crop, border=10, fill=255)
+    
+    @staticmethod
+    def _ocr_template_field(crop: Image, region: FieldRegion) -> str:
+        """Tesseract on one field crop (runs in an OCR pool thread)"""
+        config = f"--psm {region.psm} -c tessedit_char_whitelist={region.whitelist}"
+        return pytesseract.image_to_string(crop, lang="eng", config=config)
+    
+    def _prepare_emirates_id_tier(self, tier: str, image: Image) -> Tuple[Image, str, str]:
+        """(image, Tesseract language, Tesseract config) for one OCR tier"""
+        if tier == "fast":
+            gray = ImageOps.autocontrast(image.convert("L"))
+            # Tesseract reads dark text on a light background best
+            if ImageStat.Stat(gray).mean[0] < 128:
+                gray = ImageOps.invert(gray)
+            width, height = gray.size
+            if width != self.emirates_id_fast_width:
+                scale = self.emirates_id_fast_width / width
+                gray = gray.resize((self.emirates_id_fast_width, max(1, int(height * scale))), Image.Resampling.BILINEAR)
+            return gray, "eng", f"--psm {self.emirates_id_fast_psm}"
+        
+        return self._preprocess_image(image, min_width=self.emirates_id_full_width), "eng+ara", ""
+    
+    def _preprocess_image(self, image: Image, min_width: int = 1000) -> Image:
         """Preprocess image for better OCR quality"""
         # Convert to RGB
         if image.mode != 'RGB':
@@ -60,8 +269,8 @@ class DocumentExtractor:
         
         # Resize if too small (improve OCR accuracy)
         width, height = image.size
-        if width < 1000:
-            scale = 1000 / width
+        if width < min_width:
+            scale = min_width / width
             new_size = (int(width * scale), int(height * scale))
             image = image.resize(new_size, Image.Resampling.LANCZOS)
         
@@ -170,16 +379,195 @@ class DocumentExtractor:
             raise
     
     def _extract_pdf_text(self, file_path: str) -> str:
-        """Extract text from PDF using pdfplumber"""
-        text_parts = []
+        """
+        Extract text from PDF, page by page with the configured backend
+        
+        The backend and time of every page are kept for take_stats() ("pdf").
+        """
+        started = time.perf_counter()
+        pages: List[Dict[str, Any]] = []
+        texts: List[str] = []
         
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+        if self.pdf_backend != "pdfplumber":
+            try:
+                texts, pages = self._read_pages_pymupdf(file_path)
+            except Exception as e:
+                if self.pdf_backend == "pymupdf":
+                    raise
+                self.logger.warning(f"PyMuPDF could not read {file_path}: {e} - using pdfplumber")
+                texts, pages = [], []
+        
+        read_by_pymupdf = bool(pages)
+        fallback = [i for i, text in enumerate(texts) if not self._has_text_layer(text)] if self.pdf_backend == "auto" else []
+        if not read_by_pymupdf or fallback:
+            with pdfplumber.open(file_path) as pdf:
+                for index in (fallback if read_by_pymupdf else range(len(pdf.pages))):
+                    page_started = time.perf_counter()
+                    text = pdf.pages[index].extract_text() or ""
+                    record = {"page": index + 1, "backend": "pdfplumber", "ms": _elapsed_ms(page_started), "chars": len(text)}
+                    if read_by_pymupdf:
+                        # Keep PyMuPDF's text if pdfplumber finds nothing better
+                        if len(text.strip()) >= len(texts[index].strip()):
+                            texts[index] = text
+                        record["ms"] = round(record["ms"] + pages[index]["ms"], 2)
+                        pages[index] = record
+                    else:
+                        texts.append(text)
+                        pages.append(record)
         
-        return '\n'.join(text_parts)
+        # Scanned pages: no usable text from either backend
+        missing = [i for i, text in enumerate(texts) if not self._has_text_layer(text)]
+        ocr_skipped: List[int] = []
+        if missing and self.ocr_enabled:
+            ocr_skipped = self._ocr_scanned_pages(file_path, missing, texts, pages)
+        
+        backends = {page["backend"] for page in pages}
+        self._record_stats("pdf", {
+            "backend": backends.pop() if len(backends) == 1 else ("mixed" if backends else self.pdf_backend),
+            "page_count": len(pages),
+            "fallback_pages": [page["page"] for page in pages if page["backend"] == "pdfplumber"] if self.pdf_backend == "auto" else [],
+            "ocr_pages": [page["page"] for page in pages if page["backend"] == "ocr"],
+            "ocr_skipped_pages": [index + 1 for index in ocr_skipped],
+            "ocr_failed_pages": [page["page"] for page in pages if page.get("error")],
+            "total_ms": _elapsed_ms(started),
+            "pages": pages
+        })
+        
+        return '\n'.join(text for text in texts if text)
+    
+    def _read_pages_pymupdf(self, file_path: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Text and timing of every page with PyMuPDF"""
+        texts, pages = [], []
+        with pymupdf.open(file_path) as doc:
+            for index, page in enumerate(doc):
+                page_started = time.perf_counter()
+                text = _pymupdf_page_text(page)
+                texts.append(text)
+                pages.append({"page": index + 1, "backend": "pymupdf", "ms": _elapsed_ms(page_started), "chars": len(text)})
+        return texts, pages
+    
+    def _has_text_layer(self, text: str) -> bool:
+        """Enough decodable characters to parse (glyphs without a Unicode mapping come out as U+FFFD)"""
+        stripped = text.strip()
+        return len(stripped) >= self.min_page_chars and stripped.count("\ufffd") <= len(stripped) * 0.05
+    
+    def _ocr_scanned_pages(self, file_path: str, candidates: List[int],
+                           texts: List[str], pages: List[Dict[str, Any]]) -> List[int]:
+        """
+        OCR the candidate pages that carry an image, in place of their text
+        
+        Pages are rendered one after another in this thread (PyMuPDF documents
+        are not thread-safe), then OCR'd in parallel; cached pages skip OCR.
+        An OCR failure leaves the page's text as it was.
+        
+        Returns:
+            Indexes of scanned pages beyond PDF_OCR_MAX_PAGES (not OCR'd)
+        """
+        cache = None
+        scanned, futures = [], {}
+        with pymupdf.open(file_path) as doc:
+            for index in candidates:
+                page = doc[index]
+                if not page.get_images():
+                    continue  # Blank or nearly blank page, nothing to read
+                scanned.append(index)
+                if len(scanned) > self.ocr_max_pages:
+                    continue
+                
+                render_started = time.perf_counter()
+                pixmap = page.get_pixmap(dpi=self.ocr_dpi, colorspace=pymupdf.csGRAY, alpha=False)
+                image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+                key = OcrPageCache.key(pixmap.samples, self.ocr_lang, self.ocr_dpi)
+                cache = cache or self._get_ocr_cache()
+                record = pages[index]
+                record.update(backend="ocr", render_ms=_elapsed_ms(render_started), ocr_ms=0.0, cached=False)
+                
+                cached = self._cache_call(cache, "get", key)
+                if cached is not None:
+                    record["cached"] = True
+                    self._use_ocr_text(index, cached, texts, pages)
+                else:
+                    futures[index] = (key, self._get_ocr_pool().submit(self._ocr_image, image))
+        
+        for index, (key, future) in futures.items():
+            try:
+                text, ocr_ms = future.result()
+            except Exception as e:
+                self.logger.warning(f"OCR failed for page {index + 1} of {file_path}: {e}")
+                pages[index]["error"] = f"{type(e).__name__}: {e}"
+                continue
+            pages[index]["ocr_ms"] = ocr_ms
+            self._cache_call(cache, "put", key, text)
+            self._use_ocr_text(index, text, texts, pages)
+        
+        for index in scanned:
+            if "render_ms" in pages[index]:
+                pages[index]["ms"] = round(pages[index]["ms"] + pages[index]["render_ms"] + pages[index]["ocr_ms"], 2)
+        
+        skipped = scanned[self.ocr_max_pages:]
+        if scanned:
+            self.logger.info(
+                f"OCR'd {len(scanned) - len(skipped)} scanned pages of {file_path}"
+                + (f", skipped {len(skipped)} beyond PDF_OCR_MAX_PAGES={self.ocr_max_pages}" if skipped else "")
+            )
+        return skipped
+    
+    def _ocr_image(self, image: Image) -> Tuple[str, float]:
+        """Tesseract on one rendered page (runs in an OCR pool thread)"""
+        started = time.perf_counter()
+        text = pytesseract.image_to_string(image, lang=self.ocr_lang)
+        return text, _elapsed_ms(started)
+    
+    @staticmethod
+    def _use_ocr_text(index: int, text: str, texts: List[str], pages: List[Dict[str, Any]]):
+        if len(text.strip()) > len(texts[index].strip()):
+            texts[index] = text
+        pages[index]["chars"] = len(texts[index])
+    
+    def _get_ocr_pool(self) -> ThreadPoolExecutor:
+        """Threads only wait on tesseract subprocesses, so pages really run in parallel"""
+        with self._ocr_lock:
+            if self._ocr_pool is None:
+                # One thread per tesseract process; OpenMP threads on top would oversubscribe the cores
+                os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+                self._ocr_pool = ThreadPoolExecutor(max_workers=max(1, self.ocr_workers), thread_name_prefix="ocr")
+            return self._ocr_pool
+    
+    def _get_ocr_cache(self) -> Optional["OcrPageCache"]:
+        with self._ocr_lock:
+            if self._ocr_cache is None and os.getenv("PDF_OCR_CACHE_ENABLED", "1") != "0":
+                try:
+                    self._ocr_cache = OcrPageCache(os.getenv("PDF_OCR_CACHE_DIR", "data/cache/ocr_pages"))
+                except OSError as e:
+                    self.logger.warning(f"OCR page cache unavailable: {e}")
+            return self._ocr_cache
+    
+    def _cache_call(self, cache: Optional["OcrPageCache"], method: str, *args):
+        """Cache access never fails extraction"""
+        if cache is None:
+            return None
+        try:
+            return getattr(cache, method)(*args)
+        except Exception as e:
+            self.logger.warning(f"OCR page cache unavailable: {e}")
+            return None
+    
+    def _record_stats(self, kind: str, stats: Dict[str, Any]):
+        if getattr(self._local, "stats", None) is None:
+            self._local.stats = {}
+        self._local.stats[kind] = stats
+    
+    def take_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        How this thread's last extraction read its document (cleared on read)
+        
+        Returns:
+            {"pdf": backend and per-page timings, "ocr": Emirates ID OCR tiers},
+            with only the keys that apply, or None
+        """
+        stats = getattr(self._local, "stats", None)
+        self._local.stats = None
+        return stats
     
     def _parse_bank_statement(self, text: str) -> Dict[str, Any]:
         """Parse bank statement fields"""
@@ -690,6 +1078,94 @@ class DocumentExtractor:
         return data
 
 
+class OcrPageCache:
+    """
+    OCR text of rendered pages, one file per page digest
+
+    Plain files rather than the node cache, so pool workers need nothing
+    beyond this module; writes are atomic (rename), so API and worker
+    processes can share the directory. Files unused for
+    PDF_OCR_CACHE_RETENTION_HOURS (default 168h) are pruned.
+
+    Args:
+        cache_dir: Directory for the page files
+        retention_seconds: Age (since last use) after which files are pruned
+        prune_every: Prune after this many puts
+    """
+
+    def __init__(self, cache_dir: str, retention_seconds: Optional[float] = None, prune_every: int = 500):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("PDF_OCR_CACHE_RETENTION_HOURS", "168")) * 3600
+        self.retention_seconds = retention_seconds
+        self.prune_every = prune_every
+        self._puts = 0
+
+    @staticmethod
+    def key(pixels: bytes, lang: str, dpi: int) -> str:
+        """Digest of the rendered page and the OCR settings"""
+        digest = hashlib.sha256(f"{lang}:{dpi}:".encode())
+        digest.update(pixels)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # Last use, for pruning
+        return text
+
+    def put(self, key: str, text: str):
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+        self._puts += 1
+        if self.prune_every and self._puts % self.prune_every == 0:
+            self.prune()
+
+    def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete pages not used within the retention window; returns files removed"""
+        cutoff = time.time() - (max_age_seconds if max_age_seconds is not None else self.retention_seconds)
+        removed = 0
+        for path in self.cache_dir.glob("*/*.txt"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+def _pymupdf_page_text(page, y_tolerance: float = 3.0) -> str:
+    """
+    Page text as pdfplumber's extract_text lays it out: words whose baselines
+    are within y_tolerance form one line, left to right, single-spaced
+    (PyMuPDF's own text output keeps table cells as separate lines)
+    """
+    lines: List[List[tuple]] = []
+    baseline = None
+    for word in sorted(page.get_text("words"), key=lambda w: (w[3], w[0])):
+        if baseline is None or word[3] - baseline > y_tolerance:
+            lines.append([])
+            baseline = word[3]
+        lines[-1].append(word)
+    return '\n'.join(' '.join(word[4] for word in sorted(line, key=lambda w: w[0])) for line in lines)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
 # Singleton instance
 _document_extractor = None
 
@@ -699,3 +1175,83 @@ def get_document_extractor() -> DocumentExtractor:
     if _document_extractor is None:
         _document_extractor = DocumentExtractor()
     return _document_extractor
+
+
+# ========== Process Pool Entry Point ==========
+
+class DocumentExtractionError(Exception):
+    """Extraction failure raised from a pool worker (always picklable)"""
+
+
+EXTRACTOR_METHODS = {
+    "emirates_id": "extract_emirates_id",
+    "bank_statement": "extract_bank_statement",
+    "resume": "extract_resume",
+    "employment_letter": "extract_employment_letter",
+    "assets_liabilities": "extract_assets_liabilities",
+    "credit_report": "extract_credit_report"
+}
+
+
+def extract_document(document_type: str, file_path: str) -> Tuple[Dict[str, Any], float, float, Optional[Dict[str, Any]]]:
+    """
+    Extract one document in the calling process (picklable, for the process pool)
+
+    Each pool worker keeps its own DocumentExtractor singleton.
+
+    Returns:
+        (extracted fields, extraction wall time in ms, CPU time in ms, stats),
+        times measured in the worker thread. Stats hold "pdf" (backend,
+        per-page timings) and/or "ocr" (Emirates ID tiers), see take_stats();
+        None when neither applies.
+
+    Raises:
+        DocumentExtractionError: Extraction failed. Library exceptions are
+            re-raised as this type because some (e.g. pytesseract's
+            TesseractNotFoundError) cannot be unpickled in the parent, which
+            would break the whole pool.
+    """
+    method = EXTRACTOR_METHODS.get(document_type)
+    if method is None:
+        raise DocumentExtractionError(f"Unsupported document type: {document_type}")
+
+    extractor = get_document_extractor()
+    started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        data = getattr(extractor, method)(file_path)
+    except Exception as e:
+        raise DocumentExtractionError(f"{type(e).__name__}: {e}") from None
+    finally:
+        stats = extractor.take_stats()
+    return (
+        data,
+        round((time.perf_counter() - started) * 1000, 1),
+        round((time.thread_time() - cpu_started) * 1000, 1),
+        stats
+    )
+
+
+def extractor_config(document_type: str) -> Dict[str, Any]:
+    """
+    Everything besides the file that decides what extract_document returns
+
+    Part of the node cache key for extractions. Settings are read from the
+    environment with the DocumentExtractor defaults, so the parent process
+    computes the same value as its pool workers without building an
+    extractor.
+    """
+    return {
+        "version": EXTRACTOR_VERSION,
+        "pdf_text_backend": os.getenv("PDF_TEXT_BACKEND", "auto").lower(),
+        "pdf_min_page_chars": os.getenv("PDF_MIN_PAGE_CHARS", "20"),
+        "pdf_ocr_enabled": os.getenv("PDF_OCR_ENABLED", "1") != "0",
+        "pdf_ocr_dpi": os.getenv("PDF_OCR_DPI", "200"),
+        "pdf_ocr_lang": os.getenv("PDF_OCR_LANG", "eng"),
+        "pdf_ocr_max_pages": os.getenv("PDF_OCR_MAX_PAGES", "20"),
+        "emirates_id_ocr_tiers": os.getenv("EMIRATES_ID_OCR_TIERS", ",".join(EMIRATES_ID_OCR_TIERS)),
+        "emirates_id_fast_width": os.getenv("EMIRATES_ID_FAST_WIDTH", "1200"),
+        "emirates_id_fast_psm": os.getenv("EMIRATES_ID_FAST_PSM", "4"),
+        "emirates_id_full_width": os.getenv("EMIRATES_ID_FULL_WIDTH", "2000"),
+        "templates": get_templates(document_type)
+    }
@@ -0,0 +1,209 @@
+"""
+Executor Layer - Bounded pools for blocking work called from async code
+FAANG Standards: Never block the event loop, bounded concurrency per workload
+
+Three pools with different sizing:
+    - CPU pool: OCR (pytesseract), PDF parsing (pdfplumber), pandas, ML inference.
+      Sized to the number of cores - more threads would only contend for them.
+    - IO pool: SQLite, TinyDB, ChromaDB, file writes, HTTP calls to Ollama.
+      Larger, since these threads mostly wait.
+    - Process pool: pure-Python CPU work that holds the GIL (regex parsing,
+      pdfplumber layout analysis), so documents really run in parallel.
+      Sized to the number of cores, started on first use. Callables and
+      arguments must be picklable (module-level functions).
+
+Usage:
+    from src.services.executors import run_cpu, run_io
+
+    text = await run_cpu(extractor.extract_bank_statement, file_path)
+    row = await run_io(sqlite_db.get_application, app_id)
+    data, ms, cpu_ms, pdf = await run_process(extract_document, "resume", file_path)
+
+Context variables (e.g. the active application id) are copied into the
+worker thread so logging/tracing context survives the hop.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger("Executors")
+
+
+class _PoolStats:
+    """Thread-safe counters for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+
+    def submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def start(self):
+        with self._lock:
+            self.active += 1
+
+    def finish(self, ok: bool):
+        with self._lock:
+            self.active -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "active": self.active,
+                "queued": max(0, self.submitted - self.completed - self.failed - self.active)
+            }
+
+
+class ExecutorPools:
+    """
+    CPU and IO thread pools (plus a lazily started process pool) shared by the whole process
+    """
+
+    def __init__(self, cpu_workers: int = None, io_workers: int = None, process_workers: int = None):
+        cores = os.cpu_count() or 2
+        self.cpu_workers = cpu_workers or int(os.getenv("CPU_POOL_WORKERS", cores))
+        self.io_workers = io_workers or int(os.getenv("IO_POOL_WORKERS", min(32, cores * 4)))
+        self.process_workers = process_workers or int(os.getenv("PROCESS_POOL_WORKERS", cores))
+
+        self.cpu = ThreadPoolExecutor(max_workers=self.cpu_workers, thread_name_prefix="cpu-pool")
+        self.io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="io-pool")
+        self._process: ProcessPoolExecutor = None
+        self._process_lock = threading.Lock()
+
+        self._stats = {"cpu": _PoolStats(), "io": _PoolStats(), "process": _PoolStats()}
+
+        logger.info(f"Executor pools ready: cpu={self.cpu_workers} io={self.io_workers} process={self.process_workers} (lazy)")
+
+    @property
+    def process(self) -> ProcessPoolExecutor:
+        """Process pool, started on first use"""
+        if self._process is None:
+            with self._process_lock:
+                if self._process is None:
+                    # spawn: forking a process that already runs threads can deadlock the child
+                    context = multiprocessing.get_context(os.getenv("PROCESS_POOL_START_METHOD", "spawn"))
+                    self._process = ProcessPoolExecutor(max_workers=self.process_workers, mp_context=context)
+                    logger.info(f"Process pool started with {self.process_workers} worker(s)")
+        return self._process
+
+    async def run_cpu(self, func: Callable, *args, **kwargs) -> Any:
+        """Run CPU-bound callable in the CPU pool"""
+        return await self._run("cpu", self.cpu, func, *args, **kwargs)
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """Run blocking IO callable in the IO pool"""
+        return await self._run("io", self.io, func, *args, **kwargs)
+
+    async def run_process(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a picklable callable in the process pool
+
+        Context variables are not carried over. "active" in the stats counts
+        submitted tasks that have not finished (queued ones included).
+        """
+        stats = self._stats["process"]
+        pool = self.process
+        stats.submit()
+        stats.start()
+        ok = False
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+            ok = True
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM during OCR); start a fresh pool for the next call
+            with self._process_lock:
+                if self._process is pool:
+                    self._process = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            stats.finish(ok)
+
+    async def _run(self, name: str, pool: ThreadPoolExecutor, func: Callable, *args, **kwargs) -> Any:
+        stats = self._stats[name]
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+
+        def _tracked():
+            stats.start()
+            ok = False
+            try:
+                result = call()
+                ok = True
+                return result
+            finally:
+                stats.finish(ok)
+
+        stats.submit()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, _tracked)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool sizes and counters"""
+        return {
+            "cpu": {"max_workers": self.cpu_workers, **self._stats["cpu"].snapshot()},
+            "io": {"max_workers": self.io_workers, **self._stats["io"].snapshot()},
+            "process": {
+                "max_workers": self.process_workers,
+                "started": self._process is not None,
+                **self._stats["process"].snapshot()
+            }
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release threads"""
+        self.cpu.shutdown(wait=wait, cancel_futures=not wait)
+        self.io.shutdown(wait=wait, cancel_futures=not wait)
+        if self._process is not None:
+            self._process.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Singleton instance
+_executor_pools = None
+_executor_lock = threading.Lock()
+
+
+def get_executor_pools() -> ExecutorPools:
+    """Get singleton executor pools"""
+    global _executor_pools
+    if _executor_pools is None:
+        with _executor_lock:
+            if _executor_pools is None:
+                _executor_pools = ExecutorPools()
+    return _executor_pools
+
+
+async def run_cpu(func: Callable, *args, **kwargs) -> Any:
+    """Run CPU-bound callable in the shared CPU pool"""
+    return await get_executor_pools().run_cpu(func, *args, **kwargs)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run blocking IO callable in the shared IO pool"""
+    return await get_executor_pools().run_io(func, *args, **kwargs)
+
+
+async def run_process(func: Callable, *args, **kwargs) -> Any:
+    """Run picklable CPU-bound callable in the shared process pool"""
+    return await get_executor_pools().run_process(func, *args, **kwargs)
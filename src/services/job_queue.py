@@ -0,0 +1,437 @@
+"""
+Durable Job Queue - SQLite-backed queue for application processing
+FAANG Standards: At-least-once delivery, leases, bounded retries
+
+The API enqueues work and returns immediately; worker processes
+(`python -m src.worker`) claim jobs, run the LangGraph pipeline and
+write the outcome back to the job record.
+
+Job lifecycle:
+    queued → running → succeeded
+                    ↘ queued (retry, lease expired) → failed (attempts exhausted)
+
+Single-flight: `enqueue_or_attach` returns the application's active job
+instead of queueing a second run, and replays the job recorded for an
+idempotency key, so double-clicks and client retries never run the
+pipeline twice.
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger("JobQueue")
+
+
+class JobQueue:
+    """
+    SQLite job queue shared by the API and worker processes
+
+    - WAL mode so readers (status polling) never block the claiming worker
+    - Claims are a single UPDATE statement, so two workers can never own the same job
+    - Running jobs hold a lease; a crashed worker's job is re-queued once the lease expires
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    # Job types: a full pipeline run, or a continuation from the last checkpoint
+    PROCESS = "process_application"
+    RESUME = "resume_application"
+
+    def __init__(
+        self,
+        db_path: str = "data/databases/jobs.db",
+        lease_seconds: int = 300,
+        max_attempts: int = 3
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self._init_schema()
+
+    @contextmanager
+    def get_connection(self):
+        """Get thread-local database connection"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                check_same_thread=False
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+
+        yield self._local.conn
+
+    def _init_schema(self):
+        """Initialize job tables"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS processing_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    application_id TEXT NOT NULL,
+                    job_type TEXT NOT NULL DEFAULT 'process_application',
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    claim_token TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_expires_at REAL,
+                    idempotency_key TEXT
+                )
+            """)
+
+            # Databases created before idempotency keys existed
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(processing_jobs)")}
+            if 'idempotency_key' not in columns:
+                conn.execute("ALTER TABLE processing_jobs ADD COLUMN idempotency_key TEXT")
+
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON processing_jobs(status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_app_created ON processing_jobs(application_id, created_at DESC)")
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_idempotency_key
+                ON processing_jobs(idempotency_key) WHERE idempotency_key IS NOT NULL
+            """)
+
+            conn.commit()
+
+    # ========== Producer API ==========
+
+    def enqueue(
+        self,
+        application_id: str,
+        payload: Dict[str, Any],
+        job_type: str = "process_application"
+    ) -> Dict[str, Any]:
+        """Add a job to the queue and return its record"""
+        job_id = f"JOB_{uuid.uuid4().hex[:12].upper()}"
+        with self.get_connection() as conn:
+            self._insert_job(conn, job_id, application_id, payload, job_type, None)
+            conn.commit()
+
+        logger.info(f"[{application_id}] Enqueued {job_type} job {job_id}")
+        return self.get_job(job_id)
+
+    def enqueue_or_attach(
+        self,
+        application_id: str,
+        payload: Dict[str, Any],
+        job_type: str = "process_application",
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Queue a job unless one already covers this request
+
+        Checked in one write transaction (safe across API processes):
+            1. A job stored under `idempotency_key` -> returned as is, whatever its status
+            2. A queued/running job of the same type for the application -> attached to
+            3. Otherwise a new job is queued (and recorded under the key)
+
+        Returns:
+            (job, outcome) where outcome is "created", "attached" or "replayed"
+        """
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if idempotency_key:
+                    row = conn.execute(
+                        "SELECT job_id FROM processing_jobs WHERE idempotency_key = ?",
+                        (idempotency_key,)
+                    ).fetchone()
+                    if row:
+                        conn.rollback()
+                        return self.get_job(row['job_id']), "replayed"
+
+                row = conn.execute("""
+                    SELECT job_id FROM processing_jobs
+                    WHERE application_id = ? AND job_type = ? AND status IN (?, ?)
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """, (application_id, job_type, *self.ACTIVE_STATUSES)).fetchone()
+                if row:
+                    conn.rollback()
+                    logger.info(f"[{application_id}] Attached to active {job_type} job {row['job_id']}")
+                    return self.get_job(row['job_id']), "attached"
+
+                job_id = f"JOB_{uuid.uuid4().hex[:12].upper()}"
+                self._insert_job(conn, job_id, application_id, payload, job_type, idempotency_key)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        logger.info(f"[{application_id}] Enqueued {job_type} job {job_id}")
+        return self.get_job(job_id), "created"
+
+    def _insert_job(self, conn: sqlite3.Connection, job_id: str, application_id: str,
+                    payload: Dict[str, Any], job_type: str, idempotency_key: Optional[str]):
+        now = time.time()
+        conn.execute("""
+            INSERT INTO processing_jobs (
+                job_id, application_id, job_type, status, payload,
+                created_at, updated_at, idempotency_key
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            job_id, application_id, job_type, self.QUEUED,
+            json.dumps(payload, default=str), now, now, idempotency_key
+        ))
+
+    # ========== Worker API ==========
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest runnable job
+
+        Jobs whose lease has expired (worker crashed mid-run) are claimable
+        again until they run out of attempts.
+        """
+        now = time.time()
+        claim_token = uuid.uuid4().hex
+
+        with self.get_connection() as conn:
+            # Jobs abandoned by a dead worker and out of attempts are failed for good
+            conn.execute("""
+                UPDATE processing_jobs
+                SET status = ?, error = 'Lease expired after final attempt',
+                    finished_at = ?, updated_at = ?
+                WHERE status = ? AND lease_expires_at < ? AND attempts >= ?
+            """, (self.FAILED, now, now, self.RUNNING, now, self.max_attempts))
+
+            cursor = conn.execute("""
+                UPDATE processing_jobs
+                SET status = ?, worker_id = ?, claim_token = ?,
+                    attempts = attempts + 1, started_at = ?, updated_at = ?,
+                    lease_expires_at = ?, error = NULL
+                WHERE job_id = (
+                    SELECT job_id FROM processing_jobs
+                    WHERE status = ?
+                       OR (status = ? AND lease_expires_at < ? AND attempts < ?)
+                    ORDER BY created_at
+                    LIMIT 1
+                )
+            """, (
+                self.RUNNING, worker_id, claim_token, now, now,
+                now + self.lease_seconds,
+                self.QUEUED, self.RUNNING, now, self.max_attempts
+            ))
+            conn.commit()
+
+            if cursor.rowcount == 0:
+                return None
+
+            row = conn.execute(
+                "SELECT * FROM processing_jobs WHERE claim_token = ?", (claim_token,)
+            ).fetchone()
+
+        return self._row_to_job(row) if row else None
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease of a running job; False if the worker lost ownership"""
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                UPDATE processing_jobs
+                SET lease_expires_at = ?, updated_at = ?
+                WHERE job_id = ? AND worker_id = ? AND status = ?
+            """, (now + self.lease_seconds, now, job_id, worker_id, self.RUNNING))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Mark job as succeeded, storing its result payload
+
+        Only the worker that still owns the running job may complete it;
+        False means the lease was lost and the result was discarded.
+        """
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                UPDATE processing_jobs
+                SET status = ?, result = ?,
+                    finished_at = ?, updated_at = ?, lease_expires_at = NULL
+                WHERE job_id = ? AND worker_id = ? AND status = ?
+            """, (
+                self.SUCCEEDED,
+                json.dumps(result, default=str),
+                now, now, job_id, worker_id, self.RUNNING
+            ))
+            conn.commit()
+            return cursor.rowcount > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True) -> Optional[str]:
+        """
+        Record a failure; the job is re-queued while attempts remain
+
+        Returns the new status, or None if the worker no longer owns the running job.
+        """
+        now = time.time()
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT attempts FROM processing_jobs WHERE job_id = ? AND worker_id = ? AND status = ?",
+                    (job_id, worker_id, self.RUNNING)
+                ).fetchone()
+                if not row:
+                    conn.rollback()
+                    return None
+
+                requeue = retry and row['attempts'] < self.max_attempts
+                conn.execute("""
+                    UPDATE processing_jobs
+                    SET status = ?, error = ?, updated_at = ?,
+                        finished_at = ?, lease_expires_at = NULL, worker_id = NULL
+                    WHERE job_id = ?
+                """, (
+                    self.QUEUED if requeue else self.FAILED,
+                    error, now,
+                    None if requeue else now,
+                    job_id
+                ))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return self.QUEUED if requeue else self.FAILED
+
+    # ========== Query API ==========
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get job record by ID"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM processing_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_job_by_idempotency_key(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Get the job recorded for an idempotency key"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM processing_jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_latest_job(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """Get the most recent job for an application"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT * FROM processing_jobs
+                WHERE application_id = ?
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, (application_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def get_latest_job_status(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Status fields of the most recent job, without payload/result
+
+        Cheap enough to run on every poll (used to build ETags).
+        """
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT job_id, status, attempts FROM processing_jobs
+                WHERE application_id = ?
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, (application_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """List recent jobs, optionally filtered by status"""
+        with self.get_connection() as conn:
+            if status:
+                rows = conn.execute("""
+                    SELECT * FROM processing_jobs WHERE status = ?
+                    ORDER BY created_at DESC LIMIT ?
+                """, (status, limit)).fetchall()
+            else:
+                rows = conn.execute("""
+                    SELECT * FROM processing_jobs
+                    ORDER BY created_at DESC LIMIT ?
+                """, (limit,)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def get_queue_stats(self, service_window: int = 20) -> Dict[str, Any]:
+        """Job counts by status, age of the oldest queued job and recent average run time"""
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS count FROM processing_jobs GROUP BY status"
+            ).fetchall()
+            oldest = conn.execute(
+                "SELECT MIN(created_at) AS oldest FROM processing_jobs WHERE status = ?",
+                (self.QUEUED,)
+            ).fetchone()
+            service = conn.execute("""
+                SELECT AVG(finished_at - started_at) AS avg_seconds FROM (
+                    SELECT started_at, finished_at FROM processing_jobs
+                    WHERE status = ? AND started_at IS NOT NULL AND finished_at IS NOT NULL
+                    ORDER BY finished_at DESC
+                    LIMIT ?
+                )
+            """, (self.SUCCEEDED, service_window)).fetchone()
+
+        counts = {status: 0 for status in (self.QUEUED, self.RUNNING, self.SUCCEEDED, self.FAILED)}
+        counts.update({row['status']: row['count'] for row in rows})
+
+        return {
+            "counts": counts,
+            "oldest_queued_age_seconds": round(time.time() - oldest['oldest'], 2) if oldest['oldest'] else 0.0,
+            "avg_service_seconds": round(service['avg_seconds'], 2) if service['avg_seconds'] is not None else None
+        }
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a job row to a JSON-friendly dict"""
+        def _iso(ts):
+            return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+        return {
+            "job_id": row['job_id'],
+            "application_id": row['application_id'],
+            "job_type": row['job_type'],
+            "status": row['status'],
+            "payload": json.loads(row['payload']) if row['payload'] else {},
+            "result": json.loads(row['result']) if row['result'] else None,
+            "error": row['error'],
+            "attempts": row['attempts'],
+            "worker_id": row['worker_id'],
+            "idempotency_key": row['idempotency_key'],
+            "created_at": _iso(row['created_at']),
+            "updated_at": _iso(row['updated_at']),
+            "started_at": _iso(row['started_at']),
+            "finished_at": _iso(row['finished_at'])
+        }
+
+
+# Singleton instance
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get singleton job queue"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,107 @@
+"""
+Event Loop Lag Monitor - Detects blocking calls on the asyncio event loop
+
+A background task sleeps for a fixed interval and measures how late it
+wakes up. Any lateness is time the loop spent running something that
+should have been offloaded to an executor (see src/services/executors.py).
+
+Samples are kept in a fixed-size window; percentiles are computed on read.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger("LoopLagMonitor")
+
+
+class LoopLagMonitor:
+    """
+    Samples event loop scheduling lag
+
+    Args:
+        interval: Seconds between samples
+        window: Number of samples kept for percentile calculation
+        warn_threshold_ms: Log a warning when a single stall exceeds this
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 3000, warn_threshold_ms: float = 250.0):
+        self.interval = interval
+        self.warn_threshold_ms = warn_threshold_ms
+        self._samples = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self._max_lag_ms = 0.0
+        self._stalls_over_threshold = 0
+        self._started_at: Optional[float] = None
+
+    def start(self):
+        """Start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._started_at = time.time()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Loop lag monitor started (interval={self.interval * 1000:.0f}ms)")
+
+    async def stop(self):
+        """Stop sampling"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self._samples.append(lag_ms)
+
+            if lag_ms > self._max_lag_ms:
+                self._max_lag_ms = lag_ms
+            if lag_ms > self.warn_threshold_ms:
+                self._stalls_over_threshold += 1
+                logger.warning(f"Event loop stalled for {lag_ms:.0f}ms")
+
+    @property
+    def last_lag_ms(self) -> float:
+        """Most recent lag sample"""
+        return self._samples[-1] if self._samples else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Lag percentile (0-100) over the sample window"""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lag percentiles and stall counters"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_ms": self.interval * 1000,
+            "samples": len(self._samples),
+            "window_seconds": round(len(self._samples) * self.interval, 1),
+            "last_ms": round(self.last_lag_ms, 2),
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self._max_lag_ms, 2),
+            "stalls_over_threshold": self._stalls_over_threshold,
+            "warn_threshold_ms": self.warn_threshold_ms
+        }
+
+
+# Singleton instance
+_loop_monitor = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """Get singleton loop lag monitor"""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor()
+    return _loop_monitor
@@ -0,0 +1,187 @@
+"""
+Metrics Sampler - Background collection of process and store metrics
+
+A background task takes one sample every `interval` seconds and keeps the
+last `window` samples in a ring buffer, so `/api/governance/metrics` is a
+memory read instead of a blocking psutil call inside the request.
+
+Each sample contains:
+    - CPU: process and system percent since the previous sample
+      (psutil cpu_percent(interval=None) - never sleeps)
+    - Memory: process RSS, system memory used/total/percent
+    - Open file descriptors and thread count
+    - Event loop lag (from LoopLagMonitor)
+    - Store sizes: bytes on disk per registered path, plus custom gauges
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .executors import run_io
+from .loop_monitor import get_loop_monitor
+
+logger = logging.getLogger("MetricsSampler")
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
+
+def path_size_bytes(path: str) -> Optional[int]:
+    """Size of a file, or total size of all files under a directory"""
+    p = Path(path)
+    if p.is_file():
+        return p.stat().st_size
+    if p.is_dir():
+        total = 0
+        for root, _, files in os.walk(p):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+    return None
+
+
+class MetricsSampler:
+    """
+    Periodic sampler with a fixed-size ring buffer
+
+    Args:
+        interval: Seconds between samples (METRICS_SAMPLE_INTERVAL)
+        window: Number of samples kept (METRICS_WINDOW)
+        store_paths: Store name -> file/directory whose size is tracked
+        gauges: Name -> callable returning a value recorded with every sample
+    """
+
+    def __init__(
+        self,
+        interval: float = None,
+        window: int = None,
+        store_paths: Optional[Dict[str, str]] = None,
+        gauges: Optional[Dict[str, Callable[[], Any]]] = None
+    ):
+        self.interval = interval or float(os.getenv("METRICS_SAMPLE_INTERVAL", "5"))
+        self.window = window or int(os.getenv("METRICS_WINDOW", "720"))
+        self.store_paths = dict(store_paths or {})
+        self.gauges = dict(gauges or {})
+        self._samples = deque(maxlen=self.window)
+        self._task: Optional[asyncio.Task] = None
+        self._process = psutil.Process() if PSUTIL_AVAILABLE else None
+
+        if PSUTIL_AVAILABLE:
+            # First call only primes the counters and always returns 0.0
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+
+    def register_gauge(self, name: str, func: Callable[[], Any]):
+        """Record func() with every sample"""
+        self.gauges[name] = func
+
+    def start(self):
+        """Start sampling on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Metrics sampler started (interval={self.interval}s, window={self.window})")
+
+    async def stop(self):
+        """Stop sampling"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample_now()
+            except Exception as e:
+                logger.warning(f"Metrics sample failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def sample_now(self) -> Dict[str, Any]:
+        """Take one sample and append it to the buffer"""
+        sample = await run_io(self._collect)
+        lag = get_loop_monitor()
+        sample["loop_lag"] = {
+            "last_ms": round(lag.last_lag_ms, 2),
+            "p99_ms": round(lag.percentile(99), 2)
+        }
+        self._samples.append(sample)
+        return sample
+
+    def _collect(self) -> Dict[str, Any]:
+        """Blocking part of a sample (psutil, filesystem walks, gauges)"""
+        sample: Dict[str, Any] = {
+            "timestamp": datetime.now().isoformat(),
+            "unix_time": time.time()
+        }
+
+        if PSUTIL_AVAILABLE:
+            memory = psutil.virtual_memory()
+            with self._process.oneshot():
+                sample["process"] = {
+                    "cpu_percent": self._process.cpu_percent(interval=None),
+                    "rss_mb": round(self._process.memory_info().rss / (1024 ** 2), 1),
+                    "open_fds": self._process.num_fds() if hasattr(self._process, "num_fds") else None,
+                    "threads": self._process.num_threads()
+                }
+            sample["system"] = {
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "memory_used_gb": round(memory.used / (1024 ** 3), 2),
+                "memory_total_gb": round(memory.total / (1024 ** 3), 2),
+                "memory_percent": memory.percent
+            }
+
+        sample["stores"] = {}
+        for name, path in self.store_paths.items():
+            size = path_size_bytes(path)
+            sample["stores"][name] = {"size_mb": round(size / (1024 ** 2), 3) if size is not None else None}
+
+        sample["gauges"] = {}
+        for name, func in self.gauges.items():
+            try:
+                sample["gauges"][name] = func()
+            except Exception as e:
+                sample["gauges"][name] = None
+                logger.debug(f"Gauge {name} failed: {e}")
+
+        return sample
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Most recent sample"""
+        return self._samples[-1] if self._samples else None
+
+    def series(self, limit: int = 60) -> List[Dict[str, Any]]:
+        """Last `limit` samples, oldest first"""
+        if limit <= 0:
+            return []
+        return list(self._samples)[-limit:]
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+
+# Singleton instance
+_metrics_sampler = None
+
+
+def get_metrics_sampler() -> MetricsSampler:
+    """Get singleton metrics sampler"""
+    global _metrics_sampler
+    if _metrics_sampler is None:
+        _metrics_sampler = MetricsSampler()
+    return _metrics_sampler
@@ -0,0 +1,234 @@
+"""
+Node Output Cache - Memoised pipeline node results keyed by input fingerprints
+
+Applicants often re-upload a single corrected document. Instead of rerunning
+every node over every document, each step's output is stored under a
+fingerprint of exactly the inputs it reads:
+
+    extract (per document)  document type + SHA-256 of the file content +
+                            extractor settings and OCR templates
+    validate                ExtractedData + applicant name
+    eligibility_check       ExtractedData + ValidationReport
+    recommend               ExtractedData + EligibilityResult
+    explain                 ExtractedData + EligibilityResult + Recommendation
+
+A rerun then recomputes only the documents and nodes whose inputs changed.
+Fingerprints hash the state codec's JSON form with volatile fields
+(extraction_timestamp, validation_timestamp, timestamp) removed, so two
+extractions of the same documents compare equal. CACHE_VERSION is part of
+every key; bump it when agent logic changes so stale outputs are ignored.
+
+Entries live in SQLite (shared by API and worker processes) and are pruned
+after NODE_CACHE_RETENTION_HOURS (default 168h) without a hit.
+
+Usage:
+    cache = NodeOutputCache("data/databases/node_cache.db")
+    key = fingerprint(application_id, extracted_data, applicant_name)
+    result = cache.get("validate", key)
+    if result is None:
+        result = await validation_agent.execute(input_data)
+        cache.put("validate", key, result)
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..core.state_codec import encode_state, decode_state, to_jsonable
+
+logger = logging.getLogger("NodeOutputCache")
+
+CACHE_VERSION = "2"
+
+# Set when an object is (re)built, not part of its content
+VOLATILE_FIELDS = frozenset({"extraction_timestamp", "validation_timestamp", "timestamp"})
+
+
+def _strip_volatile(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {
+            k: _strip_volatile(v) for k, v in data.items()
+            if k not in VOLATILE_FIELDS
+        }
+    if isinstance(data, list):
+        return [_strip_volatile(v) for v in data]
+    return data
+
+
+def fingerprint(*parts: Any) -> str:
+    """SHA-256 over the content of `parts` (dataclasses, dicts, enums, ...), ignoring timestamps"""
+    canonical = json.dumps(
+        [CACHE_VERSION, _strip_volatile(to_jsonable(list(parts)))],
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's content (for documents stored without a digest)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class NodeOutputCache:
+    """
+    SQLite-backed memo of node outputs
+
+    Args:
+        db_path: SQLite file shared by the API and worker processes
+        retention_seconds: Entries unused for longer are pruned
+            (default: NODE_CACHE_RETENTION_HOURS, 168h)
+        prune_every: Prune after this many puts
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/databases/node_cache.db",
+        retention_seconds: Optional[float] = None,
+        prune_every: int = 500
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("NODE_CACHE_RETENTION_HOURS", "168")) * 3600
+        self.retention_seconds = retention_seconds
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._puts = 0
+
+        # node -> {"hits": n, "misses": n} for this process
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._counters_lock = threading.Lock()
+
+        self._init_schema()
+        logger.info(f"Node output cache ready: {self.db_path}")
+
+    @contextmanager
+    def get_connection(self):
+        """Get thread-local database connection"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                check_same_thread=False
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+
+        yield self._local.conn
+
+    def _init_schema(self):
+        """Initialize cache table"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS node_outputs (
+                    node TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (node, fingerprint)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_node_outputs_used ON node_outputs(last_used_at)")
+            conn.commit()
+
+    # ========== Lookup ==========
+
+    def get(self, node: str, key: str) -> Optional[Any]:
+        """Stored output for (node, fingerprint), or None"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT output FROM node_outputs WHERE node = ? AND fingerprint = ?",
+                (node, key)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE node_outputs SET hits = hits + 1, last_used_at = ? WHERE node = ? AND fingerprint = ?",
+                    (time.time(), node, key)
+                )
+                conn.commit()
+
+        self._count(node, "hits" if row is not None else "misses")
+        if row is None:
+            return None
+        try:
+            return decode_state(row["output"])
+        except ValueError as e:
+            # Written by a version with types that no longer exist - treat as a miss
+            logger.warning(f"Discarding undecodable {node} output: {e}")
+            return None
+
+    def put(self, node: str, key: str, output: Any):
+        """Store a node output"""
+        now = time.time()
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO node_outputs (node, fingerprint, output, created_at, last_used_at, hits)
+                VALUES (?, ?, ?, ?, ?, 0)
+            """, (node, key, encode_state(output), now, now))
+            conn.commit()
+
+        self._puts += 1
+        if self.prune_every and self._puts % self.prune_every == 0:
+            self.prune()
+
+    def _count(self, node: str, outcome: str):
+        with self._counters_lock:
+            counters = self._counters.setdefault(node, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    # ========== Maintenance ==========
+
+    def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete entries not used within the retention window; returns rows removed"""
+        cutoff = time.time() - (max_age_seconds if max_age_seconds is not None else self.retention_seconds)
+        with self.get_connection() as conn:
+            cursor = conn.execute("DELETE FROM node_outputs WHERE last_used_at < ?", (cutoff,))
+            conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} cached node outputs")
+        return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entries per node and this process's hit/miss counters"""
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT node, COUNT(*) AS entries FROM node_outputs GROUP BY node").fetchall()
+        with self._counters_lock:
+            counters = {node: dict(c) for node, c in self._counters.items()}
+
+        nodes = {}
+        for node in sorted({row["node"] for row in rows} | set(counters)):
+            c = counters.get(node, {"hits": 0, "misses": 0})
+            lookups = c["hits"] + c["misses"]
+            nodes[node] = {
+                "entries": next((row["entries"] for row in rows if row["node"] == node), 0),
+                **c,
+                "hit_rate": round(c["hits"] / lookups, 3) if lookups else None
+            }
+        return {"version": CACHE_VERSION, "nodes": nodes}
+
+
+def create_node_cache(db_path: Optional[str] = None) -> Optional[NodeOutputCache]:
+    """
+    Build the node cache, or None when NODE_CACHE_ENABLED=0
+
+    Args:
+        db_path: SQLite file (default: NODE_CACHE_PATH env, then data/databases/node_cache.db)
+    """
+    if os.getenv("NODE_CACHE_ENABLED", "1") == "0":
+        logger.info("Node output cache disabled")
+        return None
+    return NodeOutputCache(db_path or os.getenv("NODE_CACHE_PATH", "data/databases/node_cache.db"))
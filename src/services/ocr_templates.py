@@ -0,0 +1,147 @@
+"""
+OCR Layout Templates - Field regions of documents with a fixed layout
+
+Emirates IDs (and the generated test documents) always place each field in
+the same spot. A template maps every field to a bounding box normalised to
+the image size (left, top, right, bottom as fractions), so OCR can read only
+those crops - single text lines, with a character whitelist per field -
+instead of the whole card.
+
+A template applies to an image whose aspect ratio is within `tolerance` of
+the template's. Each field value must match its pattern; a field that does
+not (misaligned crop, different layout) is reported missing and the
+extractor falls back to full-page OCR for it.
+
+Usage:
+    template = find_template("emirates_id", image.size)
+    if template is not None:
+        for field, region in template.fields.items():
+            crop = image.crop(template.pixel_box(region, image.size))
+
+    register_template(OcrTemplate(name="emirates_id_2026", document_type="emirates_id", ...))
+"""
+import logging
+import re
+import string
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("OcrTemplates")
+
+DIGITS = string.digits
+LETTERS = string.ascii_letters
+
+
+@dataclass(frozen=True)
+class FieldRegion:
+    """
+    One field on a template
+
+    Args:
+        box: (left, top, right, bottom) as fractions of the image width/height
+        whitelist: Characters Tesseract may output (no spaces or quotes)
+        pattern: Regex the value must contain; group 1 (or the match) is the value
+        kind: "text", "id" or "date" (dates are normalised to YYYY-MM-DD)
+        psm: Tesseract page segmentation mode (7: single text line)
+    """
+    box: Tuple[float, float, float, float]
+    whitelist: str
+    pattern: str
+    kind: str = "text"
+    psm: int = 7
+
+    def parse(self, text: str) -> Optional[str]:
+        """Value read from the crop, or None when it does not look like this field"""
+        match = re.search(self.pattern, " ".join(text.split()))
+        if match is None:
+            return None
+        return (match.group(1) if match.groups() else match.group(0)).strip()
+
+
+@dataclass(frozen=True)
+class OcrTemplate:
+    """
+    Field regions of one document layout
+
+    Args:
+        name: Template id (reported with extraction stats)
+        document_type: Document type it applies to (e.g. "emirates_id")
+        aspect_ratio: Width / height of the layout
+        fields: Field name -> FieldRegion
+        tolerance: Relative aspect-ratio difference still accepted
+        scale: Upscaling applied to each crop before OCR (small print)
+    """
+    name: str
+    document_type: str
+    aspect_ratio: float
+    fields: Dict[str, FieldRegion]
+    tolerance: float = 0.03
+    scale: float = 3.0
+
+    def matches(self, size: Tuple[int, int]) -> bool:
+        width, height = size
+        if not width or not height:
+            return False
+        return abs(width / height - self.aspect_ratio) <= self.aspect_ratio * self.tolerance
+
+    @staticmethod
+    def pixel_box(region: FieldRegion, size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        width, height = size
+        left, top, right, bottom = region.box
+        return int(left * width), int(top * height), int(round(right * width)), int(round(bottom * height))
+
+    def pixel_fraction(self) -> float:
+        """Share of the image's pixels inside the field regions"""
+        return sum((r.box[2] - r.box[0]) * (r.box[3] - r.box[1]) for r in self.fields.values())
+
+
+# ========== Registry ==========
+
+_templates: Dict[str, List[OcrTemplate]] = {}
+_templates_lock = threading.Lock()
+
+
+def register_template(template: OcrTemplate):
+    """Add (or replace, by name) a template; later registrations are tried first"""
+    with _templates_lock:
+        templates = [t for t in _templates.get(template.document_type, []) if t.name != template.name]
+        _templates[template.document_type] = [template] + templates
+    logger.info(f"Registered OCR template {template.name} ({len(template.fields)} fields)")
+
+
+def get_templates(document_type: str) -> List[OcrTemplate]:
+    with _templates_lock:
+        return list(_templates.get(document_type, []))
+
+
+def find_template(document_type: str, size: Tuple[int, int]) -> Optional[OcrTemplate]:
+    """First registered template for the document type whose aspect ratio fits the image"""
+    return next((t for t in get_templates(document_type) if t.matches(size)), None)
+
+
+_DATE = r"(\d{4}[-/]\d{2}[-/]\d{2}|\d{2}[-/]\d{2}[-/]\d{4})"
+
+# Values start right after the printed labels ("Name:", "ID No:", ...)
+register_template(OcrTemplate(
+    name="emirates_id_v1",
+    document_type="emirates_id",
+    aspect_ratio=1017 / 645,
+    fields={
+        "full_name": FieldRegion(
+            (0.108, 0.166, 0.900, 0.206), LETTERS + "-.",
+            r"([A-Za-z][A-Za-z.\-]*(?: [A-Za-z][A-Za-z.\-]*)+)"
+        ),
+        "id_number": FieldRegion(
+            (0.086, 0.243, 0.350, 0.270), DIGITS + "-",
+            r"(\d{3,4}-?\d{4}-?\d{7,8}-?\d)", kind="id"
+        ),
+        "date_of_birth": FieldRegion((0.081, 0.298, 0.250, 0.324), DIGITS + "-/", _DATE, kind="date"),
+        "nationality": FieldRegion(
+            (0.114, 0.352, 0.450, 0.383), LETTERS,
+            r"([A-Za-z][A-Za-z ]*[A-Za-z])"
+        ),
+        "issue_date": FieldRegion((0.091, 0.406, 0.250, 0.433), DIGITS + "-/", _DATE, kind="date"),
+        "expiry_date": FieldRegion((0.096, 0.460, 0.250, 0.492), DIGITS + "-/", _DATE, kind="date")
+    }
+))
@@ -0,0 +1,187 @@
+"""
+Outbox Projector - Applies cache, graph and vector projections in the background
+
+`ApplicationProcessor.persist` commits the SQLite application/decision rows
+and one outbox event per projection in a single transaction. This projector
+claims those events and applies them to the derived stores, so the job does
+not wait for TinyDB file flushes, graphml serialisation or embeddings:
+
+    outbox event        handler
+    ----------------    ------------------------------------------
+    cache.update        TinyDB result + application context
+    graph.update        NetworkX node + locked graphml merge/write
+    vectors.index       ChromaDB summary / income / decision upserts
+
+Failed events are retried with exponential backoff and dead-lettered after
+`max_attempts`. Several projectors (API + worker processes) can run at once;
+events are claimed with a lease so each is applied by one of them, and an
+application's events are never leased to two projectors at the same time.
+Applied and superseded events are pruned after the retention window.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .executors import run_io
+
+logger = logging.getLogger("OutboxProjector")
+
+
+class OutboxProjector:
+    """
+    Background consumer of the SQLite outbox table
+
+    Args:
+        sqlite_db: SQLiteManager holding the outbox
+        handlers: event_type -> callable(aggregate_id, payload), run on the IO pool
+        poll_interval: Seconds between polls when idle (OUTBOX_POLL_INTERVAL)
+        batch_size: Events claimed per poll
+        max_attempts: Attempts before an event is dead-lettered (OUTBOX_MAX_ATTEMPTS)
+        base_backoff: First retry delay in seconds, doubled per attempt
+        max_backoff: Retry delay cap in seconds
+        retention_seconds: Done/superseded events older than this are pruned
+            (default: OUTBOX_RETENTION_HOURS, 24h)
+        prune_every: Prune after this many applied events
+    """
+
+    def __init__(
+        self,
+        sqlite_db,
+        handlers: Dict[str, Callable[[str, Dict[str, Any]], None]],
+        poll_interval: Optional[float] = None,
+        batch_size: int = 20,
+        max_attempts: Optional[int] = None,
+        base_backoff: float = 2.0,
+        max_backoff: float = 300.0,
+        consumer_id: Optional[str] = None,
+        retention_seconds: Optional[float] = None,
+        prune_every: int = 200
+    ):
+        self.sqlite_db = sqlite_db
+        self.handlers = dict(handlers)
+        self.poll_interval = poll_interval or float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts or int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.consumer_id = consumer_id or f"{socket.gethostname()}:{os.getpid()}"
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("OUTBOX_RETENTION_HOURS", "24")) * 3600
+        self.retention_seconds = retention_seconds
+        self.prune_every = prune_every
+
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, Any] = {
+            "applied": 0,
+            "retried": 0,
+            "dead": 0,
+            "superseded": 0,
+            "pruned": 0,
+            "last_lag_seconds": None,
+            "max_lag_seconds": 0.0,
+            "by_type": {}
+        }
+
+    def start(self):
+        """Start projecting on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info(f"Outbox projector {self.consumer_id} started ({', '.join(self.handlers)})")
+
+    async def stop(self):
+        """Stop after the current event"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception as e:
+                logger.warning(f"Outbox poll failed: {e}")
+                processed = 0
+            if processed == 0:
+                await asyncio.sleep(self.poll_interval)
+
+    async def run_once(self) -> int:
+        """Claim and apply one batch; returns the number of events handled"""
+        events = await run_io(self.sqlite_db.claim_outbox_events, self.consumer_id, self.batch_size)
+        # Sequential: keeps per-application order and graph/TinyDB writes single-threaded
+        for event in events:
+            await self._apply(event)
+        return len(events)
+
+    async def _apply(self, event: Dict[str, Any]):
+        event_type = event["event_type"]
+        handler = self.handlers.get(event_type)
+        if handler is None:
+            await run_io(self.sqlite_db.fail_outbox_event, event["event_id"], f"No handler for {event_type}", None)
+            self._stats["dead"] += 1
+            return
+
+        type_stats = self._stats["by_type"].setdefault(
+            event_type, {"applied": 0, "failed_attempts": 0, "total_ms": 0.0, "avg_ms": 0.0}
+        )
+        started = time.perf_counter()
+        try:
+            await run_io(handler, event["aggregate_id"], event["payload"])
+        except Exception as e:
+            type_stats["failed_attempts"] += 1
+            await self._retry_or_dead_letter(event, str(e))
+            return
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        superseded = await run_io(self.sqlite_db.complete_outbox_event, event["event_id"])
+
+        lag = time.time() - event["created_at"]
+        type_stats["applied"] += 1
+        type_stats["total_ms"] = round(type_stats["total_ms"] + elapsed_ms, 2)
+        type_stats["avg_ms"] = round(type_stats["total_ms"] / type_stats["applied"], 2)
+        self._stats["applied"] += 1
+        self._stats["superseded"] += superseded
+        self._stats["last_lag_seconds"] = round(lag, 3)
+        self._stats["max_lag_seconds"] = round(max(self._stats["max_lag_seconds"], lag), 3)
+
+        if self.prune_every and self._stats["applied"] % self.prune_every == 0:
+            await self.prune()
+
+    async def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete applied/superseded events older than the retention window; returns rows removed"""
+        removed = await run_io(
+            self.sqlite_db.prune_outbox,
+            max_age_seconds if max_age_seconds is not None else self.retention_seconds
+        )
+        if removed:
+            logger.info(f"Pruned {removed} outbox events")
+        self._stats["pruned"] += removed
+        return removed
+
+    async def _retry_or_dead_letter(self, event: Dict[str, Any], error: str):
+        attempts = event["attempts"]
+        if attempts >= self.max_attempts:
+            logger.error(f"[{event['aggregate_id']}] {event['event_type']} dead-lettered after {attempts} attempts: {error}")
+            await run_io(self.sqlite_db.fail_outbox_event, event["event_id"], error, None)
+            self._stats["dead"] += 1
+            return
+
+        delay = min(self.base_backoff * (2 ** (attempts - 1)), self.max_backoff)
+        logger.warning(f"[{event['aggregate_id']}] {event['event_type']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+        await run_io(self.sqlite_db.fail_outbox_event, event["event_id"], error, time.time() + delay)
+        self._stats["retried"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Projector counters plus the outbox backlog and lag from SQLite"""
+        return {
+            "consumer_id": self.consumer_id,
+            "running": self._task is not None and not self._task.done(),
+            **self._stats,
+            "outbox": self.sqlite_db.get_outbox_stats()
+        }
@@ -0,0 +1,258 @@
+"""
+Progress Event Bus - Per-application pipeline progress for Server-Sent Events
+
+The orchestrator publishes an event when each LangGraph node starts and
+finishes, the worker publishes job lifecycle events, and the API streams
+them to clients from `GET /api/applications/{id}/events` instead of having
+them poll `/status`.
+
+Events are rows in a small SQLite table, so they cross from worker processes
+to every API process. Subscribers in the publishing process are woken
+immediately; other processes pick new rows up on their next poll.
+
+Event types:
+    job_queued → job_started → pipeline_started (or pipeline_resumed) → node_started / node_completed (per node)
+    → pipeline_completed (final decision) → job_succeeded
+    pipeline_failed / job_retrying / job_failed on errors
+
+`job_succeeded` and `job_failed` end a stream.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from .executors import run_io
+
+logger = logging.getLogger("ProgressEventBus")
+
+TERMINAL_EVENTS = ("job_succeeded", "job_failed")
+
+
+class ProgressEventBus:
+    """
+    SQLite-backed progress events with in-process wake-ups
+
+    Args:
+        db_path: SQLite file shared by the API and worker processes
+        retention_seconds: Events older than this are pruned
+            (default: PROGRESS_EVENTS_RETENTION_HOURS, 24h)
+        prune_every: Prune after this many publishes
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/databases/progress_events.db",
+        retention_seconds: Optional[float] = None,
+        prune_every: int = 500
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("PROGRESS_EVENTS_RETENTION_HOURS", "24")) * 3600
+        self.retention_seconds = retention_seconds
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._published = 0
+
+        # application_id -> {(loop, asyncio.Event)} for subscribers in this process
+        self._listeners: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._listeners_lock = threading.Lock()
+
+        self._init_schema()
+
+    @contextmanager
+    def get_connection(self):
+        """Get thread-local database connection"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                check_same_thread=False
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+
+        yield self._local.conn
+
+    def _init_schema(self):
+        """Initialize event table"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS progress_events (
+                    event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    application_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_progress_events_app
+                ON progress_events(application_id, event_id)
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_progress_events_created ON progress_events(created_at)")
+            conn.commit()
+
+    # ========== Publishing ==========
+
+    def publish(self, application_id: str, event_type: str, **data) -> Dict[str, Any]:
+        """Record an event and wake subscribers in this process"""
+        now = time.time()
+        with self.get_connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO progress_events (application_id, event_type, data, created_at) VALUES (?, ?, ?, ?)",
+                (application_id, event_type, json.dumps(data, default=str), now)
+            )
+            conn.commit()
+            event_id = cursor.lastrowid
+
+        self._notify(application_id)
+
+        self._published += 1
+        if self.prune_every and self._published % self.prune_every == 0:
+            self.prune()
+
+        return {
+            "event_id": event_id,
+            "application_id": application_id,
+            "event": event_type,
+            "timestamp": now,
+            **data
+        }
+
+    def _notify(self, application_id: str):
+        with self._listeners_lock:
+            listeners = list(self._listeners.get(application_id, ()))
+        for loop, event in listeners:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Subscriber's loop already closed
+                pass
+
+    # ========== Query API ==========
+
+    def fetch(self, application_id: str, after_id: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Events for an application with event_id > after_id, oldest first"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT * FROM progress_events
+                WHERE application_id = ? AND event_id > ?
+                ORDER BY event_id
+                LIMIT ?
+            """, (application_id, after_id, limit)).fetchall()
+        return [self._row_to_event(row) for row in rows]
+
+    def current_run_start(self, application_id: str) -> int:
+        """
+        Cursor positioned just before the latest `job_queued` event
+
+        Replaying from here skips events (and the terminal event) of earlier
+        processing runs of the same application.
+        """
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT MAX(event_id) FROM progress_events
+                WHERE application_id = ? AND event_type = 'job_queued'
+            """, (application_id,)).fetchone()
+        return row[0] - 1 if row and row[0] else 0
+
+    def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete events older than the retention window; returns rows removed"""
+        cutoff = time.time() - (max_age_seconds if max_age_seconds is not None else self.retention_seconds)
+        with self.get_connection() as conn:
+            cursor = conn.execute("DELETE FROM progress_events WHERE created_at < ?", (cutoff,))
+            conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} progress events")
+        return cursor.rowcount
+
+    @staticmethod
+    def _row_to_event(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "event_id": row["event_id"],
+            "application_id": row["application_id"],
+            "event": row["event_type"],
+            "timestamp": row["created_at"],
+            **json.loads(row["data"])
+        }
+
+    # ========== Subscription ==========
+
+    async def stream(
+        self,
+        application_id: str,
+        after_id: Optional[int] = None,
+        poll_interval: float = 0.5,
+        heartbeat_interval: float = 15.0,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events as they are published, until a terminal event
+
+        Yields None after `heartbeat_interval` seconds without events so the
+        caller can send a keep-alive. Stops after `timeout` seconds if given.
+
+        Args:
+            application_id: Application to follow
+            after_id: Resume after this event_id (default: start of the current run)
+            poll_interval: How often to check for events from other processes
+            heartbeat_interval: Seconds of silence before yielding None
+            timeout: Maximum stream duration in seconds
+        """
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        listener = (loop, wakeup)
+        with self._listeners_lock:
+            self._listeners.setdefault(application_id, set()).add(listener)
+
+        deadline = loop.time() + timeout if timeout else None
+        if after_id is None:
+            after_id = await run_io(self.current_run_start, application_id)
+
+        try:
+            last_sent = loop.time()
+            while True:
+                wakeup.clear()
+                events = await run_io(self.fetch, application_id, after_id)
+                for event in events:
+                    after_id = event["event_id"]
+                    yield event
+                    if event["event"] in TERMINAL_EVENTS:
+                        return
+                if events:
+                    last_sent = loop.time()
+                    continue
+
+                now = loop.time()
+                if deadline is not None and now >= deadline:
+                    return
+                if now - last_sent >= heartbeat_interval:
+                    last_sent = now
+                    yield None
+
+                wait = poll_interval if deadline is None else min(poll_interval, deadline - now)
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=max(wait, 0))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._listeners_lock:
+                listeners = self._listeners.get(application_id)
+                if listeners is not None:
+                    listeners.discard(listener)
+                    if not listeners:
+                        del self._listeners[application_id]
+
+    def subscriber_count(self) -> int:
+        """Open streams in this process"""
+        with self._listeners_lock:
+            return sum(len(listeners) for listeners in self._listeners.values())
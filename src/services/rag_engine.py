@@ -13,6 +13,7 @@ Production-ready RAG with advanced features:
 import logging
 import json
 import hashlib
+import threading
 import time
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
@@ -82,7 +83,7 @@ class ContextRanker:
 
 class LRUCache:
     """
-    Least Recently Used cache with expiration
+    Thread-safe Least Recently Used cache with expiration
     M1 8GB optimized - limits memory usage
     """
     
@@ -92,54 +93,59 @@ class LRUCache:
         self.ttl_seconds = ttl_seconds
         self.hits = 0
         self.misses = 0
+        self.lock = threading.RLock()
     
     def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        if key not in self.cache:
-            self.misses += 1
-            return None
-        
-        value, timestamp = self.cache[key]
-        
-        # Check expiration
-        if time.time() - timestamp > self.ttl_seconds:
-            del self.cache[key]
-            self.misses += 1
-            return None
-        
-        # Move to end (most recent)
-        self.cache.move_to_end(key)
-        self.hits += 1
-        return value
+        """Get value from cache (thread-safe)"""
+        with self.lock:
+            if key not in self.cache:
+                self.misses += 1
+                return None
+            
+            value, timestamp = self.cache[key]
+            
+            # Check expiration
+            if time.time() - timestamp > self.ttl_seconds:
+                del self.cache[key]
+                self.misses += 1
+                return None
+            
+            # Move to end (most recent)
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return value
     
     def put(self, key: str, value: Any):
-        """Put value in cache"""
-        if key in self.cache:
-            self.cache.move_to_end(key)
-        self.cache[key] = (value, time.time())
-        
-        # Evict oldest if over size
-        if len(self.cache) > self.max_size:
-            self.cache.popitem(last=False)
+        """Put value in cache (thread-safe)"""
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            self.cache[key] = (value, time.time())
+            
+            # Evict oldest if over size
+            if len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
     
     def clear(self):
         """Clear cache"""
-        self.cache.clear()
-        self.hits = 0
-        self.misses = 0
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
     
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total = self.hits + self.misses
-        hit_rate = (self.hits / total * 100) if total > 0 else 0
-        return {
-            'hits': self.hits,
-            'misses': self.misses,
-            'total_requests': total,
-            'hit_rate_percent': round(hit_rate, 2),
-            'current_size': len(self.cache),
-            'max_size': self.max_size
-        }
+        with self.lock:
+            total = self.hits + self.misses
+            hit_rate = (self.hits / total * 100) if total > 0 else 0
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'total_requests': total,
+                'hit_rate_percent': round(hit_rate, 2),
+                'current_size': len(self.cache),
+                'max_size': self.max_size
+            }
 
 
 class RAGEngine:
@@ -175,6 +181,8 @@ class RAGEngine:
             'errors': 0,
             'context_retrieval_times': []
         }
+        # generate_response runs concurrently on IO-pool threads
+        self._metrics_lock = threading.Lock()
         
         logger.info("RAG Engine initialized: Multi-DB + Caching + Ranking (M1 optimized)")
     
@@ -198,7 +206,7 @@ class RAGEngine:
             }
         """
         start_time = time.time()
-        self.metrics['total_queries'] += 1
+        self._increment('total_queries')
         
         try:
             # Check response cache first
@@ -206,7 +214,7 @@ class RAGEngine:
             cached_response = self.response_cache.get(cache_key)
             
             if cached_response:
-                self.metrics['cache_hits'] += 1
+                self._increment('cache_hits')
                 logger.info(f"Cache HIT for {application_id}: {query[:50]}...")
                 return {
                     **cached_response,
@@ -247,7 +255,6 @@ class RAGEngine:
             self.response_cache.put(cache_key, result)
             
             # Update metrics
-            self.metrics['llm_calls'] += 1
             response_time = int((time.time() - start_time) * 1000)
             self._update_avg_response_time(response_time)
             
@@ -255,7 +262,7 @@ class RAGEngine:
             return result
             
         except Exception as e:
-            self.metrics['errors'] += 1
+            self._increment('errors')
             logger.error(f"RAG error for {application_id}: {e}", exc_info=True)
             return {
                 'response': f"I apologize, but I encountered an error processing your request: {str(e)}. Please try again or contact support if the issue persists.",
@@ -437,7 +444,8 @@ class RAGEngine:
         self.context_cache.put(context_cache_key, context)
         
         retrieval_time = int((time.time() - start_time) * 1000)
-        self.metrics['context_retrieval_times'].append(retrieval_time)
+        with self._metrics_lock:
+            self.metrics['context_retrieval_times'].append(retrieval_time)
         logger.debug(f"Context retrieved in {retrieval_time}ms")
         
         return context
@@ -840,32 +848,43 @@ Your factual response:"""
         query_normalized = query.lower().strip()
         return hashlib.md5(f"{application_id}:{query_normalized}".encode()).hexdigest()
     
+    def _increment(self, metric: str):
+        """Increment a counter metric (thread-safe)"""
+        with self._metrics_lock:
+            self.metrics[metric] += 1
+    
     def _update_avg_response_time(self, response_time_ms: int):
-        """Update rolling average response time"""
-        current_avg = self.metrics['avg_response_time_ms']
-        total_calls = self.metrics['llm_calls']
-        self.metrics['avg_response_time_ms'] = int(
-            (current_avg * (total_calls - 1) + response_time_ms) / total_calls
-        )
+        """Count an LLM call and update the rolling average response time"""
+        with self._metrics_lock:
+            self.metrics['llm_calls'] += 1
+            current_avg = self.metrics['avg_response_time_ms']
+            total_calls = self.metrics['llm_calls']
+            self.metrics['avg_response_time_ms'] = int(
+                (current_avg * (total_calls - 1) + response_time_ms) / total_calls
+            )
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get engine performance metrics"""
         cache_stats = self.response_cache.stats()
         context_cache_stats = self.context_cache.stats()
         
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+            retrieval_times = list(self.metrics['context_retrieval_times'])
+        
         avg_retrieval = 0
-        if self.metrics['context_retrieval_times']:
-            avg_retrieval = sum(self.metrics['context_retrieval_times']) / len(self.metrics['context_retrieval_times'])
+        if retrieval_times:
+            avg_retrieval = sum(retrieval_times) / len(retrieval_times)
         
         return {
             'queries': {
-                'total': self.metrics['total_queries'],
-                'cached': self.metrics['cache_hits'],
-                'llm_calls': self.metrics['llm_calls'],
-                'errors': self.metrics['errors']
+                'total': metrics['total_queries'],
+                'cached': metrics['cache_hits'],
+                'llm_calls': metrics['llm_calls'],
+                'errors': metrics['errors']
             },
             'performance': {
-                'avg_response_time_ms': self.metrics['avg_response_time_ms'],
+                'avg_response_time_ms': metrics['avg_response_time_ms'],
                 'avg_context_retrieval_ms': round(avg_retrieval, 2)
             },
             'caching': {
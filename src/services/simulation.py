@@ -0,0 +1,334 @@
+"""
+Simulation Engine - What-if re-scoring without the LLM
+
+`/simulate` used to turn the changes into a chat prompt and let the
+explanation agent guess the score impact. The engine instead applies the
+changes to a copy of the stored ExtractedData and runs the same
+EligibilityAgent and RecommendationAgent the pipeline uses, so the
+simulated score, decision and support amount are exactly what a rerun with
+those values would produce (in milliseconds - one model inference).
+
+Changes are flat field names, mapped to their ExtractedData section:
+
+    monthly_income, monthly_expenses             → income_data
+    employment_status, years_of_experience, ...  → employment_data
+    family_size, housing_type, ...               → family_info
+    total_assets, total_liabilities, net_worth   → assets_liabilities
+    credit_score                                 → credit_data
+
+net_worth follows total_assets - total_liabilities unless it is changed
+itself.
+
+Sensitivity sweeps score a grid over one or two model features (e.g. income
+× family size) starting from the stored application's features. The whole
+grid is scored by EligibilityAgent.score_batch - one vectorised model call
+plus vectorised policy rules - and the result includes the decision
+boundary: where along the first axis the eligibility decision flips.
+
+Usage:
+    engine = SimulationEngine(orchestrator.eligibility_agent, orchestrator.recommendation_agent)
+    result = await engine.simulate(app_id, state, {"monthly_income": 8000})
+    sweep = await engine.sensitivity(app_id, state, [
+        {"feature": "monthly_income", "start": 0, "stop": 15000, "steps": 31},
+        {"feature": "family_size", "values": [1, 2, 3, 4, 5, 6]}
+    ])
+"""
+import copy
+import dataclasses
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..core.types import ExtractedData
+from .executors import run_cpu
+
+logger = logging.getLogger("SimulationEngine")
+
+FIELD_SECTIONS = {
+    "monthly_income": "income_data",
+    "monthly_expenses": "income_data",
+    "employment_status": "employment_data",
+    "years_of_experience": "employment_data",
+    "current_position": "employment_data",
+    "monthly_salary": "employment_data",
+    "family_size": "family_info",
+    "dependents": "family_info",
+    "children_count": "family_info",
+    "housing_type": "family_info",
+    "total_assets": "assets_liabilities",
+    "total_liabilities": "assets_liabilities",
+    "net_worth": "assets_liabilities",
+    "credit_score": "credit_data",
+    "nationality": "applicant_info"
+}
+
+_NUMERIC_FIELDS = {
+    "monthly_income", "monthly_expenses", "years_of_experience", "monthly_salary",
+    "family_size", "dependents", "children_count",
+    "total_assets", "total_liabilities", "net_worth", "credit_score"
+}
+
+
+# Continuous features of the eligibility model that can be swept
+SWEEP_FEATURES = {
+    "monthly_income", "family_size", "net_worth", "total_assets",
+    "total_liabilities", "credit_score", "employment_years"
+}
+
+
+def normalise_employment_status(value: str) -> str:
+    """Free-text status ('Government Employee') → the agents' vocabulary (employed, unemployed, self_employed)"""
+    status = str(value).strip().lower()
+    if "unemploy" in status:
+        return "unemployed"
+    if "self" in status:
+        return "self_employed"
+    if "employ" in status or "government" in status:
+        return "employed"
+    return status.replace(" ", "_")
+
+
+def _state_field(state: Any, name: str) -> Any:
+    """Field of a graph-state dict, an ApplicationState or a result dict rebuilt from the database"""
+    if state is None:
+        return None
+    return state.get(name) if isinstance(state, dict) else getattr(state, name, None)
+
+
+def _outcome(eligibility_result, recommendation) -> Dict[str, Any]:
+    score = _state_field(eligibility_result, "eligibility_score")
+    decision = _state_field(recommendation, "decision")
+    return {
+        "eligibility_score": round(score, 4) if score is not None else None,
+        "is_eligible": _state_field(eligibility_result, "is_eligible"),
+        "decision": getattr(decision, "value", decision),
+        "support_amount": (_state_field(recommendation, "financial_support_amount") or 0.0) if recommendation else None,
+        "support_type": _state_field(recommendation, "financial_support_type")
+    }
+
+
+class SimulationEngine:
+    """
+    Re-scores an application with changed inputs using the pipeline's agents
+
+    Args:
+        eligibility_agent: EligibilityAgent (ML model + policy rules)
+        recommendation_agent: RecommendationAgent (decision + support amount)
+    """
+
+    def __init__(self, eligibility_agent, recommendation_agent, max_scenarios: Optional[int] = None):
+        self.eligibility_agent = eligibility_agent
+        self.recommendation_agent = recommendation_agent
+        self.max_scenarios = max_scenarios or int(os.getenv("SENSITIVITY_MAX_SCENARIOS", "10000"))
+
+    def apply_changes(self, extracted_data: ExtractedData, changes: Dict[str, Any]) -> ExtractedData:
+        """
+        Copy of extracted_data with the changes applied (the original is untouched)
+
+        Raises:
+            ValueError: Unknown field or non-numeric value for a numeric field
+        """
+        unknown = sorted(set(changes) - set(FIELD_SECTIONS))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)} (supported: {', '.join(sorted(FIELD_SECTIONS))})")
+
+        if isinstance(extracted_data, dict):
+            extracted_data = ExtractedData(**{f.name: extracted_data[f.name] for f in dataclasses.fields(ExtractedData) if f.name in extracted_data})
+
+        # Raw OCR text is not used for scoring - no need to copy it
+        simulated = dataclasses.replace(
+            extracted_data,
+            **{section: copy.deepcopy(getattr(extracted_data, section) or {}) for section in set(FIELD_SECTIONS.values())},
+            raw_ocr_text={}
+        )
+        for name, value in changes.items():
+            if name in _NUMERIC_FIELDS:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{name} must be a number, got {value!r}")
+            elif name == "employment_status":
+                value = normalise_employment_status(value)
+            getattr(simulated, FIELD_SECTIONS[name])[name] = value
+
+        assets = simulated.assets_liabilities
+        if ("total_assets" in changes or "total_liabilities" in changes) and "net_worth" not in changes:
+            assets["net_worth"] = assets.get("total_assets", 0) - assets.get("total_liabilities", 0)
+        return simulated
+
+    async def simulate(self, application_id: str, state: Any, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score the application as if `changes` were true
+
+        Returns:
+            {"current", "simulated", "delta", "changed_fields", "duration_ms"}
+            where current/simulated hold score, eligibility, decision and support
+
+        Raises:
+            ValueError: Application not processed yet, or invalid changes
+        """
+        extracted_data = _state_field(state, "extracted_data")
+        if extracted_data is None:
+            raise ValueError("Application has no extracted data yet")
+
+        started = time.perf_counter()
+        simulated_data = self.apply_changes(extracted_data, changes)
+        validation_report = _state_field(state, "validation_report")
+
+        eligibility = await self.eligibility_agent.execute({
+            "application_id": application_id,
+            "extracted_data": simulated_data,
+            "validation_report": validation_report if not isinstance(validation_report, dict) else None
+        })
+        recommendation = await self.recommendation_agent.execute({
+            "application_id": application_id,
+            "extracted_data": simulated_data,
+            "eligibility_result": eligibility["eligibility_result"]
+        })
+
+        current = _outcome(_state_field(state, "eligibility_result"), _state_field(state, "recommendation"))
+        simulated = _outcome(eligibility["eligibility_result"], recommendation["recommendation"])
+        duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"[{application_id}] Simulated {sorted(changes)}: score {current['eligibility_score']} → "
+            f"{simulated['eligibility_score']}, decision {current['decision']} → {simulated['decision']} "
+            f"({duration_ms:.1f}ms)"
+        )
+
+        return {
+            "current": current,
+            "simulated": simulated,
+            "delta": {
+                "eligibility_score": _difference(simulated["eligibility_score"], current["eligibility_score"]),
+                "support_amount": _difference(simulated["support_amount"], current["support_amount"]),
+                "decision_changed": simulated["decision"] != current["decision"]
+            },
+            "changed_fields": {
+                name: {
+                    "from": (_state_field(extracted_data, FIELD_SECTIONS[name]) or {}).get(name),
+                    "to": getattr(simulated_data, FIELD_SECTIONS[name]).get(name)
+                }
+                for name in changes
+            },
+            "duration_ms": round(duration_ms, 2)
+        }
+
+    async def sensitivity(self, application_id: str, state: Any, axes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Score a grid over one or two features in one batch
+
+        Each axis is {"feature", "values"} or {"feature", "start", "stop", "steps"}.
+        All other features keep the application's stored values; net_worth
+        follows total_assets/total_liabilities unless it is an axis itself.
+
+        Returns:
+            {"features", "axes", "current", "scores", "eligible", "boundary",
+             "threshold", "scenarios", "duration_ms"} - scores/eligible are
+            nested lists indexed [first axis][second axis]; boundary lists
+            the first-axis intervals where the decision flips, for each value
+            of the second axis
+
+        Raises:
+            ValueError: Application not processed yet, or invalid axes
+        """
+        extracted_data = _state_field(state, "extracted_data")
+        if extracted_data is None:
+            raise ValueError("Application has no extracted data yet")
+        names, grids = self._build_axes(axes)
+
+        started = time.perf_counter()
+        if isinstance(extracted_data, dict):
+            extracted_data = self.apply_changes(extracted_data, {})
+        base = {
+            name: float(value or 0)
+            for name, value in self.eligibility_agent._extract_features(extracted_data).items()
+        }
+
+        # Cartesian product, plus the unchanged application as the last row
+        mesh = np.meshgrid(*grids, indexing="ij")
+        shape = mesh[0].shape
+        features = {name: np.full(mesh[0].size + 1, value) for name, value in base.items()}
+        for name, values in zip(names, mesh):
+            features[name][:-1] = values.ravel()
+        if "net_worth" not in names and {"total_assets", "total_liabilities"} & set(names):
+            features["net_worth"] = features["total_assets"] - features["total_liabilities"]
+            features["net_worth"][-1] = base["net_worth"]
+
+        validation_report = _state_field(state, "validation_report")
+        scored = await run_cpu(
+            self.eligibility_agent.score_batch, features,
+            validation_report if not isinstance(validation_report, dict) else None
+        )
+        scores = scored["eligibility_score"][:-1].reshape(shape)
+        eligible = scored["is_eligible"][:-1].reshape(shape)
+        duration_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"[{application_id}] Sensitivity {' × '.join(names)}: {scores.size} scenarios ({duration_ms:.1f}ms)")
+
+        return {
+            "features": names,
+            "axes": {name: grid.tolist() for name, grid in zip(names, grids)},
+            "current": {
+                "features": {name: base[name] for name in names},
+                "eligibility_score": round(float(scored["eligibility_score"][-1]), 4),
+                "is_eligible": bool(scored["is_eligible"][-1])
+            },
+            "scores": np.round(scores, 4).tolist(),
+            "eligible": eligible.tolist(),
+            "boundary": _boundary(names, grids, eligible),
+            "threshold": 0.6,
+            "scenarios": int(scores.size),
+            "duration_ms": round(duration_ms, 2)
+        }
+
+    def _build_axes(self, axes: List[Dict[str, Any]]):
+        """Validate the axis specs → (feature names, value arrays)"""
+        if not 1 <= len(axes) <= 2:
+            raise ValueError("Sensitivity sweeps take one or two axes")
+        names, grids = [], []
+        for axis in axes:
+            name = axis.get("feature")
+            if name not in SWEEP_FEATURES:
+                raise ValueError(f"Unknown feature: {name} (supported: {', '.join(sorted(SWEEP_FEATURES))})")
+            if name in names:
+                raise ValueError(f"Feature {name} appears twice")
+            try:
+                if axis.get("values"):
+                    grid = np.asarray(sorted(set(axis["values"])), dtype=float)
+                else:
+                    steps = int(axis.get("steps", 21))
+                    if steps < 2:
+                        raise ValueError(f"{name}: steps must be at least 2")
+                    grid = np.linspace(float(axis["start"]), float(axis["stop"]), steps)
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"{name}: give either values or start/stop/steps ({e})")
+            names.append(name)
+            grids.append(grid)
+
+        scenarios = int(np.prod([len(grid) for grid in grids]))
+        if scenarios > self.max_scenarios:
+            raise ValueError(f"{scenarios} scenarios requested, at most {self.max_scenarios} allowed")
+        return names, grids
+
+
+def _boundary(names: List[str], grids: List[np.ndarray], eligible: np.ndarray) -> List[Dict[str, Any]]:
+    """First-axis intervals where the decision flips (per second-axis value)"""
+    columns = eligible.reshape(len(grids[0]), -1)
+    boundary = []
+    for j in range(columns.shape[1]):
+        column = columns[:, j]
+        for i in np.flatnonzero(column[1:] != column[:-1]):
+            point = {names[0]: [float(grids[0][i]), float(grids[0][i + 1])]}
+            if len(names) == 2:
+                point[names[1]] = float(grids[1][j])
+            point["eligible_after"] = bool(column[i + 1])
+            boundary.append(point)
+    return boundary
+
+
+def _difference(new: Optional[float], old: Optional[float]) -> Optional[float]:
+    if new is None or old is None:
+        return None
+    return round(new - old, 4)
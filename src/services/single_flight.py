@@ -0,0 +1,60 @@
+"""
+Single-Flight - Collapse concurrent calls for the same key into one
+
+While a call for a key is in flight, later callers for that key await the
+same task instead of starting their own; all of them receive its result
+(or its exception). Once it finishes the key is free again.
+
+Used by BatchProcessor so two batches (or a duplicated ID across requests)
+wait on one job per application instead of each submitting and polling.
+Cross-process deduplication is done by JobQueue.enqueue_or_attach.
+
+Usage:
+    flights = SingleFlight()
+    result = await flights.do(application_id, lambda: submit_and_wait(application_id))
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger("SingleFlight")
+
+
+class SingleFlight:
+    """Per-key deduplication of concurrent coroutine calls (one event loop)"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.started = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key, or join the run already in flight
+
+        A caller that is cancelled stops waiting without cancelling the
+        shared run, since other callers may still depend on it.
+        """
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done, k=key: self._forget(k, done))
+            self.started += 1
+        else:
+            self.shared += 1
+            logger.info(f"Joined in-flight call for {key}")
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            # Retrieved here so a failure nobody waits for any more is not reported as unhandled
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"in_flight": self.in_flight(), "started": self.started, "shared": self.shared}
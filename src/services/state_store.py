@@ -0,0 +1,412 @@
+"""
+Application State Store - Shared storage for in-flight application state
+
+Replaces the per-process `active_applications` / `orchestrator.applications`
+dicts so that several API processes (uvicorn --workers N) and the job
+workers see the same ApplicationState / ApplicationGraphState.
+
+Backends (STATE_STORE_BACKEND):
+    - sqlite (default): JSON-encoded state in data/databases/app_state.db,
+      shared by every process on the host
+    - memory: process-local dict; single-process development only. Bounded
+      by STATE_STORE_MEMORY_MB (default 256): least-recently-used applications
+      without a pipeline run in flight are spilled to the SQLite file and
+      reloaded transparently on access
+
+With the sqlite backend get() returns a fresh copy, so changes must always be
+written back with put(), or made with update() (atomic read-modify-write).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..core.state_codec import encode_state, decode_state
+
+logger = logging.getLogger("ApplicationStateStore")
+
+
+def _stage_of(state: Any) -> Optional[str]:
+    stage = state.get("stage") if isinstance(state, dict) else getattr(state, "stage", None)
+    return getattr(stage, "value", stage)
+
+
+class ApplicationStateStore(ABC):
+    """Interface for application state storage"""
+
+    @abstractmethod
+    def get(self, application_id: str) -> Optional[Any]:
+        """Return the stored state, or None"""
+
+    @abstractmethod
+    def put(self, application_id: str, state: Any) -> int:
+        """Store state and return its new version (starts at 1)"""
+
+    @abstractmethod
+    def update(self, application_id: str, mutate: Callable[[Any], None]) -> Optional[Any]:
+        """
+        Atomically apply `mutate` to the stored state and save it
+
+        Returns the updated state, or None if the application does not exist.
+        """
+
+    @abstractmethod
+    def delete(self, application_id: str) -> bool:
+        """Remove state; True if it existed"""
+
+    @abstractmethod
+    def get_version(self, application_id: str) -> Optional[int]:
+        """Current version, or None if the application does not exist"""
+
+    @abstractmethod
+    def list_ids(self, limit: Optional[int] = None) -> List[str]:
+        """Application ids, most recently updated first"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored applications"""
+
+    @contextmanager
+    def in_flight(self, application_id: str) -> Iterator[None]:
+        """Mark the application as being processed for the duration of the block"""
+        yield
+
+    def exists(self, application_id: str) -> bool:
+        return self.get_version(application_id) is not None
+
+    def __contains__(self, application_id: str) -> bool:
+        return self.exists(application_id)
+
+
+class InMemoryApplicationStateStore(ApplicationStateStore):
+    """
+    Process-local store
+
+    Objects are kept as-is (no serialisation), so this is only correct when
+    the API and the job workers share one process (EMBEDDED_WORKERS).
+
+    With a spill store and a byte budget the store is bounded: when the
+    encoded size of the held states exceeds max_bytes, least-recently-used
+    applications are moved to the spill store (with their version) and moved
+    back on the next access. Applications inside an in_flight() block (a
+    pipeline run holds their live state object) are never spilled, whatever
+    their stage. Every application lives in exactly one of the two.
+
+    Args:
+        max_bytes: Budget for the JSON-encoded size of held states (None: unbounded)
+        spill_store: Receives evicted applications (required for a budget)
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, spill_store: Optional["SQLiteApplicationStateStore"] = None):
+        if max_bytes is not None and spill_store is None:
+            raise ValueError("A memory budget needs a spill store")
+        self.max_bytes = max_bytes
+        self.spill_store = spill_store
+        self._lock = threading.RLock()
+        # Least recently used first
+        self._states: "OrderedDict[str, Any]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._updated: Dict[str, float] = {}
+        self._sizes: Dict[str, int] = {}
+        # application_id -> number of open in_flight() blocks
+        self._in_flight: Dict[str, int] = {}
+        self._bytes = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    def get(self, application_id: str) -> Optional[Any]:
+        with self._lock:
+            return self._load(application_id)
+
+    def put(self, application_id: str, state: Any) -> int:
+        with self._lock:
+            if application_id not in self._states and self.spill_store is not None:
+                # Replaced anyway - only its version carries over
+                version = self.spill_store.get_version(application_id)
+                if version is not None:
+                    self.spill_store.delete(application_id)
+                    self._versions[application_id] = version
+            self._states[application_id] = state
+            self._states.move_to_end(application_id)
+            self._versions[application_id] = self._versions.get(application_id, 0) + 1
+            self._updated[application_id] = time.time()
+            if self.max_bytes is not None:
+                self._resize(application_id, len(encode_state(state)))
+                self._evict()
+            return self._versions[application_id]
+
+    def update(self, application_id: str, mutate: Callable[[Any], None]) -> Optional[Any]:
+        with self._lock:
+            state = self._load(application_id)
+            if state is None:
+                return None
+            mutate(state)
+            self.put(application_id, state)
+            return state
+
+    def delete(self, application_id: str) -> bool:
+        with self._lock:
+            spilled = self.spill_store.delete(application_id) if self.spill_store is not None else False
+            self._forget(application_id)
+            return self._states.pop(application_id, None) is not None or spilled
+
+    @contextmanager
+    def in_flight(self, application_id: str) -> Iterator[None]:
+        with self._lock:
+            self._in_flight[application_id] = self._in_flight.get(application_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                remaining = self._in_flight.pop(application_id) - 1
+                if remaining:
+                    self._in_flight[application_id] = remaining
+                # Held over budget while pinned - spill now that it is evictable
+                self._evict()
+
+    def get_version(self, application_id: str) -> Optional[int]:
+        with self._lock:
+            version = self._versions.get(application_id)
+            if version is None and self.spill_store is not None:
+                return self.spill_store.get_version(application_id)
+            return version
+
+    def list_ids(self, limit: Optional[int] = None) -> List[str]:
+        with self._lock:
+            updated = dict(self._updated)
+            if self.spill_store is not None:
+                updated.update(self.spill_store.list_updated(limit))
+        ids = sorted(updated, key=updated.get, reverse=True)
+        return ids[:limit] if limit else ids
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._states) + (self.spill_store.count() if self.spill_store is not None else 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Held states, their encoded size and spill activity"""
+        with self._lock:
+            return {
+                "entries": len(self._states),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "in_flight": len(self._in_flight),
+                "evictions": self.evictions,
+                "reloads": self.reloads
+            }
+
+    # ========== Budget (caller holds the lock) ==========
+
+    def _load(self, application_id: str) -> Optional[Any]:
+        """Held state (marked recently used), else move it back from the spill store"""
+        state = self._states.get(application_id)
+        if state is not None:
+            self._states.move_to_end(application_id)
+            return state
+        if self.spill_store is None:
+            return None
+        spilled = self.spill_store.take(application_id)
+        if spilled is None:
+            return None
+        state, version, updated_at, size = spilled
+        self._states[application_id] = state
+        self._versions[application_id] = version
+        self._updated[application_id] = updated_at
+        self._resize(application_id, size)
+        self.reloads += 1
+        self._evict(keep=application_id)
+        return state
+
+    def _resize(self, application_id: str, size: int):
+        self._bytes += size - self._sizes.get(application_id, 0)
+        self._sizes[application_id] = size
+
+    def _forget(self, application_id: str):
+        self._versions.pop(application_id, None)
+        self._updated.pop(application_id, None)
+        self._bytes -= self._sizes.pop(application_id, 0)
+
+    def _evict(self, keep: Optional[str] = None):
+        if self.max_bytes is None or self._bytes <= self.max_bytes:
+            return
+        for application_id in list(self._states):
+            if self._bytes <= self.max_bytes:
+                break
+            if application_id == keep or application_id in self._in_flight:
+                continue
+            state = self._states[application_id]
+            self.spill_store.put_version(
+                application_id, state, self._versions[application_id], self._updated[application_id]
+            )
+            del self._states[application_id]
+            self._forget(application_id)
+            self.evictions += 1
+
+
+class SQLiteApplicationStateStore(ApplicationStateStore):
+    """
+    SQLite-backed store shared across processes
+
+    State is JSON-encoded with type tags (see src/core/state_codec.py).
+    """
+
+    def __init__(self, db_path: str = "data/databases/app_state.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._init_schema()
+        logger.info(f"Application state store ready: {self.db_path}")
+
+    @contextmanager
+    def get_connection(self):
+        """Thread-local connection"""
+        if not hasattr(self._local, "conn"):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path),
+                check_same_thread=False,
+                timeout=30.0,
+                isolation_level=None  # Explicit transactions in update()
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+        yield self._local.conn
+
+    def _init_schema(self):
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS application_state (
+                    application_id TEXT PRIMARY KEY,
+                    state_json TEXT NOT NULL,
+                    stage TEXT,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_app_state_updated ON application_state(updated_at)")
+
+    def get(self, application_id: str) -> Optional[Any]:
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT state_json FROM application_state WHERE application_id = ?",
+                (application_id,)
+            ).fetchone()
+        return decode_state(row["state_json"]) if row else None
+
+    def put(self, application_id: str, state: Any) -> int:
+        state_json = encode_state(state)
+        with self.get_connection() as conn:
+            return self._upsert(conn, application_id, state_json, _stage_of(state))
+
+    def _upsert(self, conn: sqlite3.Connection, application_id: str, state_json: str, stage: Optional[str]) -> int:
+        now = time.time()
+        row = conn.execute("""
+            INSERT INTO application_state (application_id, state_json, stage, version, created_at, updated_at)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT(application_id) DO UPDATE SET
+                state_json = excluded.state_json,
+                stage = excluded.stage,
+                version = application_state.version + 1,
+                updated_at = excluded.updated_at
+            RETURNING version
+        """, (application_id, state_json, stage, now, now)).fetchone()
+        return row["version"]
+
+    def put_version(self, application_id: str, state: Any, version: int, updated_at: float):
+        """Store state with an explicit version (applications spilled by the memory store)"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO application_state
+                    (application_id, state_json, stage, version, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (application_id, encode_state(state), _stage_of(state), version, updated_at, updated_at))
+
+    def take(self, application_id: str) -> Optional[tuple]:
+        """Remove and return (state, version, updated_at, encoded size), or None"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                DELETE FROM application_state WHERE application_id = ?
+                RETURNING state_json, version, updated_at
+            """, (application_id,)).fetchall()
+        if not rows:
+            return None
+        row = rows[0]
+        return decode_state(row["state_json"]), row["version"], row["updated_at"], len(row["state_json"])
+
+    def update(self, application_id: str, mutate: Callable[[Any], None]) -> Optional[Any]:
+        with self.get_connection() as conn:
+            # IMMEDIATE takes the write lock up front so concurrent updates serialise
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT state_json FROM application_state WHERE application_id = ?",
+                    (application_id,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("ROLLBACK")
+                    return None
+                state = decode_state(row["state_json"])
+                mutate(state)
+                self._upsert(conn, application_id, encode_state(state), _stage_of(state))
+                conn.execute("COMMIT")
+                return state
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, application_id: str) -> bool:
+        with self.get_connection() as conn:
+            cursor = conn.execute("DELETE FROM application_state WHERE application_id = ?", (application_id,))
+            return cursor.rowcount > 0
+
+    def get_version(self, application_id: str) -> Optional[int]:
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM application_state WHERE application_id = ?",
+                (application_id,)
+            ).fetchone()
+        return row["version"] if row else None
+
+    def list_ids(self, limit: Optional[int] = None) -> List[str]:
+        return [application_id for application_id, _ in self.list_updated(limit)]
+
+    def list_updated(self, limit: Optional[int] = None) -> List[tuple]:
+        """(application_id, updated_at), most recently updated first"""
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT application_id, updated_at FROM application_state ORDER BY updated_at DESC LIMIT ?",
+                (limit or -1,)
+            ).fetchall()
+        return [(row["application_id"], row["updated_at"]) for row in rows]
+
+    def count(self) -> int:
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM application_state").fetchone()[0]
+
+
+def create_state_store(backend: Optional[str] = None, db_path: Optional[str] = None) -> ApplicationStateStore:
+    """
+    Build the configured store
+
+    Args:
+        backend: "sqlite" or "memory" (default: STATE_STORE_BACKEND env, then sqlite)
+        db_path: SQLite file (default: STATE_STORE_PATH env, then data/databases/app_state.db)
+    """
+    backend = (backend or os.getenv("STATE_STORE_BACKEND", "sqlite")).lower()
+    db_path = db_path or os.getenv("STATE_STORE_PATH", "data/databases/app_state.db")
+    if backend == "memory":
+        # Applications beyond the budget (not being processed) are spilled to the SQLite file
+        return InMemoryApplicationStateStore(
+            max_bytes=int(float(os.getenv("STATE_STORE_MEMORY_MB", "256")) * 1024 * 1024),
+            spill_store=SQLiteApplicationStateStore(db_path)
+        )
+    if backend == "sqlite":
+        return SQLiteApplicationStateStore(db_path)
+    raise ValueError(f"Unknown STATE_STORE_BACKEND: {backend}")
@@ -0,0 +1,436 @@
+"""
+Pipeline Timeline - Per-application span tree with wall and CPU time
+
+Records where a run's time goes as a tree (waterfall) of spans:
+
+    process_application                      pipeline
+      langgraph                              pipeline
+        extract                              node
+          extract:bank_statement             document
+          extract:emirates_id                document
+          node_cache.put                     store
+        ...
+        eligibility_check                    node
+          ml_inference                       ml
+        checkpoint.put                       store
+      sqlite.persist                         store
+
+The active span lives in a context variable, so nested code opens child
+spans with `span()` / `aspan()` without passing anything around. The
+executor pools copy context into their threads, so work sent through
+`run_cpu` / `run_io` nests under the span that awaited it. Outside a
+recording both are no-ops.
+
+CPU time:
+    - span() (synchronous code) measures the calling thread's CPU time
+      (time.thread_time), so blocking work in a pool thread is exact.
+    - aspan() / record() cannot attribute the event loop thread's CPU to a
+      single task; they report the summed CPU of their children unless the
+      caller sets cpu_ms (e.g. a process-pool worker's measurement).
+    CPU above wall time means children ran in parallel.
+
+Finished trees are stored per run in SQLite (shared by API and worker
+processes), one row per span as well for aggregation across runs, and
+pruned after TIMELINE_RETENTION_HOURS (default 168h).
+
+Usage:
+    async with record(timeline_store, application_id, "process_application"):
+        async with aspan("extract", "node"):
+            data = await run_cpu(parse, path)      # span() calls inside nest here
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .executors import run_io
+
+logger = logging.getLogger("TimelineStore")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("timeline_span", default=None)
+
+
+class Span:
+    """One timed step; children may be added from other threads"""
+
+    def __init__(self, name: str, kind: str, attrs: Optional[Dict[str, Any]] = None, parent: Optional["Span"] = None):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs or {}
+        self.parent = parent
+        self.root: "Span" = parent.root if parent else self
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.wall_ms: Optional[float] = None
+        self.cpu_ms: Optional[float] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            with parent._lock:
+                parent.children.append(self)
+
+    def finish(self, cpu_ms: Optional[float] = None):
+        self.wall_ms = round((time.perf_counter() - self._started) * 1000, 2)
+        if self.cpu_ms is None:
+            if cpu_ms is None:
+                with self._lock:
+                    cpu_ms = sum(child.cpu_ms or 0.0 for child in self.children)
+            self.cpu_ms = round(cpu_ms, 2)
+
+    def fail(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """Span and children; start_ms is relative to the root"""
+        origin = self.root._started if origin is None else origin
+        with self._lock:
+            children = list(self.children)
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "start_ms": round((self._started - origin) * 1000, 2),
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "status": self.status,
+            "error": self.error,
+            "attrs": self.attrs,
+            "children": [child.to_dict(origin) for child in sorted(children, key=lambda c: c._started)]
+        }
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, or None outside a recording"""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "step", **attrs) -> Iterator[Optional[Span]]:
+    """Time synchronous work (wall + this thread's CPU) as a child of the current span"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = Span(name, kind, attrs, parent)
+    token = _current_span.set(current)
+    cpu_started = time.thread_time()
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish((time.thread_time() - cpu_started) * 1000)
+
+
+@asynccontextmanager
+async def aspan(name: str, kind: str = "step", **attrs):
+    """Time an async block as a child of the current span (CPU = children's CPU unless set)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = Span(name, kind, attrs, parent)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+
+
+def timed(name: str, kind: str, func: Callable) -> Callable:
+    """Wrap func so each call runs inside span(name, kind), e.g. run_io(timed(...), ...)"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(name, kind):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@asynccontextmanager
+async def record(store: Optional["TimelineStore"], application_id: str, name: str, **attrs):
+    """
+    Record a run's span tree and save it when the block exits
+
+    Inside an active recording this is just a nested aspan(), so callers
+    at different levels (processor, orchestrator) can all use it and the
+    outermost one owns the tree. Without a store and outside a recording
+    nothing is recorded.
+    """
+    if _current_span.get() is not None:
+        async with aspan(name, "pipeline", **attrs) as nested:
+            yield nested
+        return
+    if store is None:
+        yield None
+        return
+
+    root = Span(name, "pipeline", {"application_id": application_id, **attrs})
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.finish()
+        try:
+            await run_io(store.save, application_id, root)
+        except Exception as e:
+            logger.warning(f"[{application_id}] Failed to save timeline: {e}")
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class TimelineStore:
+    """
+    SQLite store of finished span trees
+
+    Args:
+        db_path: SQLite file shared by the API and worker processes
+        retention_seconds: Runs older than this are pruned
+            (default: TIMELINE_RETENTION_HOURS, 168h)
+        prune_every: Prune after this many saved runs
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/databases/timelines.db",
+        retention_seconds: Optional[float] = None,
+        prune_every: int = 200
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("TIMELINE_RETENTION_HOURS", "168")) * 3600
+        self.retention_seconds = retention_seconds
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._saves = 0
+
+        self._init_schema()
+        logger.info(f"Timeline store ready: {self.db_path}")
+
+    @contextmanager
+    def get_connection(self):
+        """Get thread-local database connection"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(
+                str(self.db_path),
+                timeout=30.0,
+                check_same_thread=False
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+
+        yield self._local.conn
+
+    def _init_schema(self):
+        """Initialize run and span tables"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS timeline_runs (
+                    run_id TEXT PRIMARY KEY,
+                    application_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    wall_ms REAL,
+                    cpu_ms REAL,
+                    status TEXT NOT NULL,
+                    tree TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS timeline_spans (
+                    run_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    depth INTEGER NOT NULL,
+                    start_ms REAL,
+                    wall_ms REAL,
+                    cpu_ms REAL,
+                    status TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_timeline_runs_app ON timeline_runs(application_id, started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_timeline_runs_started ON timeline_runs(started_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_timeline_spans_run ON timeline_spans(run_id)")
+            conn.commit()
+
+    # ========== Writes ==========
+
+    def save(self, application_id: str, root: Span) -> str:
+        """Store a finished tree; returns its run id"""
+        run_id = f"RUN_{uuid.uuid4().hex[:12].upper()}"
+        tree = root.to_dict()
+
+        rows = []
+        def flatten(node: Dict[str, Any], depth: int):
+            rows.append((run_id, node["name"], node["kind"], depth, node["start_ms"],
+                         node["wall_ms"], node["cpu_ms"], node["status"]))
+            for child in node["children"]:
+                flatten(child, depth + 1)
+        flatten(tree, 0)
+
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO timeline_runs (run_id, application_id, name, started_at, wall_ms, cpu_ms, status, tree)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (run_id, application_id, root.name, root.started_at, root.wall_ms, root.cpu_ms,
+                  root.status, json.dumps(tree, default=str)))
+            conn.executemany("""
+                INSERT INTO timeline_spans (run_id, name, kind, depth, start_ms, wall_ms, cpu_ms, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+
+        self._saves += 1
+        if self.prune_every and self._saves % self.prune_every == 0:
+            self.prune()
+        return run_id
+
+    # ========== Queries ==========
+
+    def list_runs(self, application_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Recent runs of an application, newest first (without trees)"""
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT run_id, name, started_at, wall_ms, cpu_ms, status FROM timeline_runs
+                WHERE application_id = ? ORDER BY started_at DESC LIMIT ?
+            """, (application_id, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_run(self, application_id: str, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """A run's span tree (the latest run if run_id is omitted)"""
+        with self.get_connection() as conn:
+            if run_id is None:
+                row = conn.execute("""
+                    SELECT * FROM timeline_runs WHERE application_id = ?
+                    ORDER BY started_at DESC LIMIT 1
+                """, (application_id,)).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM timeline_runs WHERE application_id = ? AND run_id = ?",
+                    (application_id, run_id)
+                ).fetchone()
+        if row is None:
+            return None
+        return {
+            "run_id": row["run_id"],
+            "application_id": row["application_id"],
+            "started_at": row["started_at"],
+            "wall_ms": row["wall_ms"],
+            "cpu_ms": row["cpu_ms"],
+            "status": row["status"],
+            "tree": json.loads(row["tree"])
+        }
+
+    def aggregate(self, limit: int = 100, kind: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Span statistics over the latest `limit` runs, slowest total first
+
+        wall_share is a span's summed wall time over the summed wall time of
+        the runs it appeared in (inclusive of its children).
+        """
+        with self.get_connection() as conn:
+            runs = conn.execute(
+                "SELECT run_id, wall_ms FROM timeline_runs ORDER BY started_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+            run_walls = {row["run_id"]: row["wall_ms"] or 0.0 for row in runs}
+            if not run_walls:
+                return {"runs": 0, "spans": []}
+
+            placeholders = ",".join("?" * len(run_walls))
+            query = f"SELECT run_id, name, kind, wall_ms, cpu_ms, status FROM timeline_spans WHERE run_id IN ({placeholders}) AND depth > 0"
+            params: List[Any] = list(run_walls)
+            if kind is not None:
+                query += " AND kind = ?"
+                params.append(kind)
+            rows = conn.execute(query, params).fetchall()
+
+        groups: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows:
+            group = groups.setdefault((row["kind"], row["name"]), {"wall": [], "cpu": [], "runs": set(), "errors": 0})
+            group["wall"].append(row["wall_ms"] or 0.0)
+            group["cpu"].append(row["cpu_ms"] or 0.0)
+            group["runs"].add(row["run_id"])
+            group["errors"] += row["status"] == "error"
+
+        spans = []
+        for (span_kind, name), group in groups.items():
+            walls = sorted(group["wall"])
+            run_wall = sum(run_walls[run_id] for run_id in group["runs"])
+            spans.append({
+                "name": name,
+                "kind": span_kind,
+                "count": len(walls),
+                "runs": len(group["runs"]),
+                "errors": group["errors"],
+                "wall_ms_total": round(sum(walls), 1),
+                "wall_ms_mean": round(sum(walls) / len(walls), 2),
+                "wall_ms_p50": round(_percentile(walls, 50), 2),
+                "wall_ms_p95": round(_percentile(walls, 95), 2),
+                "wall_ms_max": round(walls[-1], 2),
+                "cpu_ms_mean": round(sum(group["cpu"]) / len(walls), 2),
+                "wall_share": round(sum(walls) / run_wall, 3) if run_wall else None
+            })
+        spans.sort(key=lambda s: s["wall_ms_total"], reverse=True)
+
+        walls = sorted(run_walls.values())
+        return {
+            "runs": len(run_walls),
+            "run_wall_ms_p50": round(_percentile(walls, 50), 1),
+            "run_wall_ms_p95": round(_percentile(walls, 95), 1),
+            "spans": spans
+        }
+
+    # ========== Maintenance ==========
+
+    def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete runs older than the retention window; returns runs removed"""
+        cutoff = time.time() - (max_age_seconds if max_age_seconds is not None else self.retention_seconds)
+        with self.get_connection() as conn:
+            conn.execute(
+                "DELETE FROM timeline_spans WHERE run_id IN (SELECT run_id FROM timeline_runs WHERE started_at < ?)",
+                (cutoff,)
+            )
+            cursor = conn.execute("DELETE FROM timeline_runs WHERE started_at < ?", (cutoff,))
+            conn.commit()
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} timelines")
+        return cursor.rowcount
+
+
+def create_timeline_store(db_path: Optional[str] = None) -> Optional[TimelineStore]:
+    """
+    Build the timeline store, or None when TIMELINE_ENABLED=0
+
+    Args:
+        db_path: SQLite file (default: TIMELINE_PATH env, then data/databases/timelines.db)
+    """
+    if os.getenv("TIMELINE_ENABLED", "1") == "0":
+        logger.info("Pipeline timelines disabled")
+        return None
+    return TimelineStore(db_path or os.getenv("TIMELINE_PATH", "data/databases/timelines.db"))
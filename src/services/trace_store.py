@@ -0,0 +1,501 @@
+"""
+Segmented Trace Store - Append-only JSONL segments with a SQLite index
+
+Run summaries (formerly one langfuse_trace_{app_id}.json per application)
+are appended to size-rotated JSONL segment files by a background writer
+thread, so the pipeline only enqueues a dict and never waits for the disk.
+
+Layout (TRACE_STORE_DIR, default data/observability/traces):
+
+    index.db                              segments + latest trace per application
+    1767225600000-4242-a1b2c3.jsonl       <created ms>-<pid>-<token>.jsonl
+    ...
+
+Each process writes its own active segment (API and worker processes can
+share the directory); a segment is closed when it reaches
+TRACE_SEGMENT_MAX_MB (default 64) or its writer shuts down. The index maps
+application id → (segment, offset, length), so a lookup is one seek.
+
+Only the latest trace per application is live; a rerun supersedes the
+previous record. Maintenance (every `maintain_every` records, or on demand):
+    - prune: forget traces older than TRACE_RETENTION_HOURS (default 720h)
+      and delete segments with nothing live left
+    - compact: copy the live records of closed segments that are mostly
+      dead (live fraction < TRACE_COMPACT_RATIO, default 0.5) into the
+      active segment and delete the old file
+
+Usage:
+    store = get_trace_store()
+    store.append({"application_id": app_id, "trace_id": f"trace_{app_id}", ...})
+    store.get(app_id)
+    store.query(since=time.time() - 3600, limit=50)
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("SegmentedTraceStore")
+
+_STOP = object()
+
+
+class SegmentedTraceStore:
+    """
+    Append-only trace records in rotated JSONL segments
+
+    Args:
+        base_dir: Directory holding the segments and index.db
+        segment_max_bytes: Rotate the active segment at this size
+            (default: TRACE_SEGMENT_MAX_MB, 64)
+        retention_seconds: Traces older than this are pruned
+            (default: TRACE_RETENTION_HOURS, 720h)
+        compact_ratio: Closed segments with a smaller live fraction are compacted
+        queue_size: Records waiting for the writer; appends beyond it are dropped
+        maintain_every: Run prune + compact after this many written records
+    """
+
+    def __init__(
+        self,
+        base_dir: str = "data/observability/traces",
+        segment_max_bytes: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+        compact_ratio: Optional[float] = None,
+        queue_size: int = 10000,
+        maintain_every: int = 1000
+    ):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        if segment_max_bytes is None:
+            segment_max_bytes = int(float(os.getenv("TRACE_SEGMENT_MAX_MB", "64")) * 1024 * 1024)
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv("TRACE_RETENTION_HOURS", "720")) * 3600
+        if compact_ratio is None:
+            compact_ratio = float(os.getenv("TRACE_COMPACT_RATIO", "0.5"))
+        self.segment_max_bytes = segment_max_bytes
+        self.retention_seconds = retention_seconds
+        self.compact_ratio = compact_ratio
+        self.maintain_every = maintain_every
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._active: Optional[str] = None
+        self._active_file = None
+        self._active_bytes = 0
+
+        # Appended but not yet indexed, so reads see their own writes
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._init_schema()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._writer = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._writer.start()
+        self._closed = False
+        atexit.register(self.close)
+
+        logger.info(f"Trace store ready: {self.base_dir}")
+
+    @contextmanager
+    def get_connection(self):
+        """Get thread-local database connection"""
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(
+                str(self.base_dir / "index.db"),
+                timeout=30.0,
+                check_same_thread=False
+            )
+            self._local.conn.row_factory = sqlite3.Row
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.execute("PRAGMA synchronous=NORMAL")
+
+        yield self._local.conn
+
+    def _init_schema(self):
+        """Initialize segment and trace index tables"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS segments (
+                    name TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    closed INTEGER NOT NULL DEFAULT 0,
+                    bytes INTEGER NOT NULL DEFAULT 0,
+                    records INTEGER NOT NULL DEFAULT 0,
+                    live_records INTEGER NOT NULL DEFAULT 0,
+                    newest_at REAL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS traces (
+                    application_id TEXT PRIMARY KEY,
+                    trace_id TEXT,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_traces_created ON traces(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_traces_segment ON traces(segment)")
+            conn.commit()
+
+    # ========== Appends (any thread, non-blocking) ==========
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a trace record (must have "application_id")
+
+        Returns False if the writer is backed up (or closed) and the record was dropped.
+        """
+        application_id = record["application_id"]
+        if self._closed:
+            self.dropped += 1
+            return False
+        record = {"recorded_at": time.time(), **record}
+        # Registered before queueing so the writer always finds it to remove
+        with self._pending_lock:
+            previous = self._pending.get(application_id)
+            self._pending[application_id] = record
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._pending_lock:
+                if self._pending.get(application_id) is record:
+                    if previous is None:
+                        del self._pending[application_id]
+                    else:
+                        self._pending[application_id] = previous
+            self.dropped += 1
+            logger.warning(f"[{application_id}] Trace queue full - dropped trace")
+            return False
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued record is written; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Write what is queued, then close the active segment"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        with self._write_lock:
+            self._close_active()
+
+    # ========== Writer thread ==========
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while batch[-1] is not _STOP and len(batch) < 500:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [item for item in batch if item is not _STOP]
+            try:
+                if records:
+                    self._write_batch(records)
+            except Exception as e:
+                self.failed += len(records)
+                logger.error(f"Failed to write {len(records)} traces: {e}", exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is _STOP:
+                return
+
+    def _write_batch(self, records: List[Dict[str, Any]]):
+        with self._write_lock:
+            lines = [(record, (json.dumps(record, default=str) + "\n").encode("utf-8")) for record in records]
+            self._active_segment()
+            positions = []
+            for record, line in lines:
+                positions.append((record, self._active, self._active_bytes, len(line)))
+                self._active_file.write(line)
+                self._active_bytes += len(line)
+            self._active_file.flush()
+
+            with self.get_connection() as conn:
+                for record, segment, offset, length in positions:
+                    self._index(conn, record["application_id"], record.get("trace_id"), segment, offset, length, record["recorded_at"])
+                conn.commit()
+            if self._active_bytes >= self.segment_max_bytes:
+                self._close_active()
+
+        with self._pending_lock:
+            for record in records:
+                if self._pending.get(record["application_id"]) is record:
+                    del self._pending[record["application_id"]]
+
+        before = self.written
+        self.written += len(records)
+        if self.maintain_every and before // self.maintain_every != self.written // self.maintain_every:
+            self.maintain()
+
+    def _index(self, conn: sqlite3.Connection, application_id: str, trace_id: Optional[str],
+               segment: str, offset: int, length: int, created_at: float):
+        """Point the application at its new record; the one it replaces becomes dead"""
+        previous = conn.execute("SELECT segment FROM traces WHERE application_id = ?", (application_id,)).fetchone()
+        if previous is not None:
+            conn.execute("UPDATE segments SET live_records = live_records - 1 WHERE name = ?", (previous["segment"],))
+        conn.execute("""
+            INSERT OR REPLACE INTO traces (application_id, trace_id, segment, offset, length, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (application_id, trace_id, segment, offset, length, created_at))
+        conn.execute("""
+            UPDATE segments SET bytes = ?, records = records + 1, live_records = live_records + 1,
+                newest_at = MAX(COALESCE(newest_at, 0), ?)
+            WHERE name = ?
+        """, (offset + length, created_at, segment))
+
+    def _active_segment(self) -> str:
+        """Open a new segment if there is none (caller holds the write lock)"""
+        if self._active is None:
+            name = f"{int(time.time() * 1000)}-{os.getpid()}-{uuid.uuid4().hex[:6]}.jsonl"
+            self._active_file = open(self.base_dir / name, "ab")
+            self._active = name
+            self._active_bytes = 0
+            with self.get_connection() as conn:
+                conn.execute("INSERT INTO segments (name, created_at) VALUES (?, ?)", (name, time.time()))
+                conn.commit()
+            logger.info(f"Opened trace segment {name}")
+        return self._active
+
+    def _close_active(self):
+        if self._active is None:
+            return
+        self._active_file.close()
+        with self.get_connection() as conn:
+            conn.execute("UPDATE segments SET closed = 1 WHERE name = ?", (self._active,))
+            conn.commit()
+        logger.info(f"Closed trace segment {self._active} ({self._active_bytes} bytes)")
+        self._active = None
+        self._active_file = None
+
+    # ========== Queries ==========
+
+    def get(self, application_id: str) -> Optional[Dict[str, Any]]:
+        """Latest trace of an application, or None"""
+        with self._pending_lock:
+            pending = self._pending.get(application_id)
+        if pending is not None:
+            return pending
+
+        # Compaction may move the record between the lookup and the read
+        for _ in range(2):
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT segment, offset, length FROM traces WHERE application_id = ?", (application_id,)
+                ).fetchone()
+            if row is None:
+                return None
+            try:
+                return self._read(row["segment"], row["offset"], row["length"])
+            except FileNotFoundError:
+                continue
+        return None
+
+    def query(
+        self,
+        application_ids: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Latest traces matching the filters (epoch seconds), newest first"""
+        wanted = set(application_ids) if application_ids is not None else None
+
+        def matches(application_id: str, created_at: float) -> bool:
+            return ((wanted is None or application_id in wanted)
+                    and (since is None or created_at >= since)
+                    and (until is None or created_at < until))
+
+        with self._pending_lock:
+            pending = [r for r in self._pending.values() if matches(r["application_id"], r["recorded_at"])]
+
+        sql = "SELECT application_id, segment, offset, length FROM traces WHERE 1 = 1"
+        params: List[Any] = []
+        if wanted is not None:
+            sql += f" AND application_id IN ({','.join('?' * len(wanted))})"
+            params.extend(wanted)
+        if since is not None:
+            sql += " AND created_at >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND created_at < ?"
+            params.append(until)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self.get_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        results = sorted(pending, key=lambda r: r["recorded_at"], reverse=True)
+        seen = {r["application_id"] for r in results}
+        for row in rows:
+            if row["application_id"] in seen:
+                continue
+            try:
+                results.append(self._read(row["segment"], row["offset"], row["length"]))
+            except FileNotFoundError:
+                # Compacted meanwhile - look it up again
+                record = self.get(row["application_id"])
+                if record is not None:
+                    results.append(record)
+        return results[:limit]
+
+    def _read(self, segment: str, offset: int, length: int) -> Dict[str, Any]:
+        with open(self.base_dir / segment, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    # ========== Maintenance ==========
+
+    def maintain(self) -> Dict[str, int]:
+        """Prune expired traces, then compact mostly-dead segments"""
+        return {"pruned": self.prune(), "compacted": self.compact()}
+
+    def prune(self, max_age_seconds: Optional[float] = None) -> int:
+        """Forget traces older than the retention window and delete empty segments; returns traces removed"""
+        cutoff = time.time() - (max_age_seconds if max_age_seconds is not None else self.retention_seconds)
+        with self._write_lock, self.get_connection() as conn:
+            expired = conn.execute(
+                "SELECT segment, COUNT(*) AS n FROM traces WHERE created_at < ? GROUP BY segment", (cutoff,)
+            ).fetchall()
+            for row in expired:
+                conn.execute("UPDATE segments SET live_records = live_records - ? WHERE name = ?", (row["n"], row["segment"]))
+            conn.execute("DELETE FROM traces WHERE created_at < ?", (cutoff,))
+
+            # Segments of other (possibly dead) writers are only deleted once everything in them expired
+            empty = conn.execute("""
+                SELECT name FROM segments
+                WHERE live_records <= 0 AND name != ? AND (closed = 1 OR COALESCE(newest_at, created_at) < ?)
+            """, (self._active or "", cutoff)).fetchall()
+            for row in empty:
+                conn.execute("DELETE FROM segments WHERE name = ?", (row["name"],))
+            conn.commit()
+
+        for row in empty:
+            (self.base_dir / row["name"]).unlink(missing_ok=True)
+        removed = sum(row["n"] for row in expired)
+        if removed or empty:
+            logger.info(f"Pruned {removed} traces and {len(empty)} segments")
+        return removed
+
+    def compact(self) -> int:
+        """Rewrite the live records of mostly-dead closed segments; returns segments compacted"""
+        with self._write_lock:
+            with self.get_connection() as conn:
+                candidates = [row["name"] for row in conn.execute("""
+                    SELECT name FROM segments
+                    WHERE closed = 1 AND records > 0 AND live_records > 0
+                      AND CAST(live_records AS REAL) / records < ?
+                    ORDER BY created_at
+                """, (self.compact_ratio,)).fetchall()]
+
+            for segment in candidates:
+                with self.get_connection() as conn:
+                    rows = conn.execute(
+                        "SELECT application_id, trace_id, offset, length, created_at FROM traces WHERE segment = ? ORDER BY offset",
+                        (segment,)
+                    ).fetchall()
+                    with open(self.base_dir / segment, "rb") as f:
+                        blobs = []
+                        for row in rows:
+                            f.seek(row["offset"])
+                            blobs.append(f.read(row["length"]))
+
+                    self._active_segment()
+                    moved = []
+                    for row, blob in zip(rows, blobs):
+                        moved.append((row, self._active, self._active_bytes, len(blob)))
+                        self._active_file.write(blob)
+                        self._active_bytes += len(blob)
+                    self._active_file.flush()
+
+                    for row, target, offset, length in moved:
+                        self._index(conn, row["application_id"], row["trace_id"], target, offset, length, row["created_at"])
+                    conn.execute("DELETE FROM segments WHERE name = ?", (segment,))
+                    conn.commit()
+
+                (self.base_dir / segment).unlink(missing_ok=True)
+                logger.info(f"Compacted trace segment {segment} ({len(rows)} live records moved)")
+                if self._active_bytes >= self.segment_max_bytes:
+                    self._close_active()
+        return len(candidates)
+
+    def import_json_files(self, directory: str, pattern: str = "langfuse_trace_*.json", remove: bool = False) -> int:
+        """Append legacy one-file-per-application traces; returns files imported"""
+        imported = 0
+        for path in sorted(Path(directory).glob(pattern), key=lambda p: p.stat().st_mtime):
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            if "application_id" not in record:
+                continue
+            while not self.append({"recorded_at": path.stat().st_mtime, **record}):
+                if self._closed:
+                    return imported
+                self.flush()
+            imported += 1
+            if remove:
+                path.unlink()
+        self.flush()
+        return imported
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Segment sizes and writer counters"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*) AS segments, COALESCE(SUM(bytes), 0) AS bytes,
+                       COALESCE(SUM(records), 0) AS records, COALESCE(SUM(live_records), 0) AS live_records
+                FROM segments
+            """).fetchone()
+        return {
+            **dict(row),
+            "active_segment": self._active,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+
+# Singleton instance
+_trace_store = None
+_trace_store_lock = threading.Lock()
+
+
+def get_trace_store() -> SegmentedTraceStore:
+    """Get singleton trace store (TRACE_STORE_DIR)"""
+    global _trace_store
+    if _trace_store is None:
+        with _trace_store_lock:
+            if _trace_store is None:
+                _trace_store = SegmentedTraceStore(os.getenv("TRACE_STORE_DIR", "data/observability/traces"))
+    return _trace_store
@@ -0,0 +1,448 @@
+"""
+Tracing Facade - Buffered, sampled, non-blocking request tracing
+
+The API, orchestrator and worker used to call the Langfuse client directly:
+every node re-created the trace and `/process` and `/chat` called
+`langfuse_client.flush()` on the request path, which stalls for the HTTP
+timeout when the Langfuse host is unreachable (the air-gapped default).
+
+`Tracer` keeps the same call shape (`trace(...)`, `.span(...)`, `.end(...)`,
+`.update(...)`) but only records operations into a bounded in-memory
+buffer. A background thread hands them to the backend in batches:
+
+    langfuse   replays them on a Langfuse client and flushes it (off-request)
+    local      appends them as JSON lines to TRACING_LOCAL_PATH
+    noop       discards them (tracing off; handles are not even buffered)
+
+TRACING_BACKEND selects the backend (default: langfuse if LANGFUSE_HOST is
+set, otherwise local). When the buffer (TRACING_BUFFER_SIZE, default 10000)
+is full, new operations are dropped and counted - never waited for.
+
+Sampling is decided once per trace id (head-based, a hash of the id), so
+every node that re-opens `trace_{app_id}` gets the same answer. Rates are
+per trace name:
+
+    TRACING_SAMPLE_RATE=1.0                                  default rate
+    TRACING_SAMPLE_RATES=fastapi_chat_request=0.1,worker_process_application=0.5
+
+Usage:
+    tracer = get_tracer()
+    trace = tracer.trace(name="fastapi_chat_request", id=trace_id, metadata={...})
+    span = trace.span(name="rag_agent_execution")
+    span.end(output={"success": True})
+    tracer.flush()        # wakes the flusher; returns immediately
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("Tracer")
+
+_STOP = object()
+
+
+# ========== Backends ==========
+
+class NoopBackend:
+    """Discards everything"""
+
+    name = "noop"
+
+    def export(self, events: List[Dict[str, Any]]):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class LocalFileBackend:
+    """
+    Appends operations as JSON lines (offline deployments)
+
+    The file is rolled over to `<path>.1` when it reaches max_bytes.
+    """
+
+    name = "local"
+
+    def __init__(self, path: str = "data/observability/tracing_events.jsonl", max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("TRACING_LOCAL_MAX_MB", "64")) * 1024 * 1024)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._file = None
+
+    def export(self, events: List[Dict[str, Any]]):
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write("".join(json.dumps(event, default=str) + "\n" for event in events).encode("utf-8"))
+        if self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._file = None
+            os.replace(self.path, f"{self.path}.1")
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LangfuseBackend:
+    """
+    Replays operations on a Langfuse client from the flusher thread
+
+    Start/end times are the ones recorded at the call site, so deferred
+    delivery does not distort span durations.
+    """
+
+    name = "langfuse"
+
+    def __init__(self, client=None, max_open: int = 10000):
+        if client is None:
+            from langfuse import Langfuse
+            client = Langfuse(
+                public_key=os.getenv("LANGFUSE_PUBLIC_KEY", "local-dev-key"),
+                secret_key=os.getenv("LANGFUSE_SECRET_KEY", "local-dev-secret"),
+                host=os.getenv("LANGFUSE_HOST", "http://localhost:3000")
+            )
+        self.client = client
+        self.max_open = max_open
+        # Client handles of traces/spans that may still receive updates
+        self._handles: Dict[str, Any] = {}
+
+    def _trace(self, trace_id: str):
+        handle = self._handles.get(trace_id)
+        if handle is None:
+            handle = self._remember(trace_id, self.client.trace(id=trace_id))
+        return handle
+
+    def _remember(self, key: str, handle):
+        if len(self._handles) >= self.max_open:
+            # Oldest first (insertion order)
+            del self._handles[next(iter(self._handles))]
+        self._handles[key] = handle
+        return handle
+
+    def export(self, events: List[Dict[str, Any]]):
+        for event in events:
+            op, fields = event["op"], event["fields"]
+            if op == "trace":
+                self._remember(event["trace_id"], self.client.trace(id=event["trace_id"], **fields))
+            elif op == "trace.update":
+                self._trace(event["trace_id"]).update(**fields)
+            elif op == "span":
+                parent = self._handles.get(event.get("parent_id")) or self._trace(event["trace_id"])
+                self._remember(event["span_id"], parent.span(id=event["span_id"], start_time=_parse(event["at"]), **fields))
+            elif op in ("span.update", "span.end"):
+                handle = self._handles.get(event["span_id"])
+                if handle is None:
+                    continue
+                if op == "span.end":
+                    handle.end(end_time=_parse(event["at"]), **fields)
+                    del self._handles[event["span_id"]]
+                else:
+                    handle.update(**fields)
+
+    def flush(self):
+        self.client.flush()
+
+    def close(self):
+        self.client.shutdown()
+
+
+def _parse(at: str) -> datetime:
+    return datetime.fromisoformat(at)
+
+
+# ========== Handles ==========
+
+class _NoopSpan:
+    """Returned for unsampled traces and the noop backend"""
+
+    def span(self, **fields) -> "_NoopSpan":
+        return self
+
+    def update(self, **fields):
+        pass
+
+    def end(self, **fields):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class SpanHandle:
+    """A span whose operations go to the tracer's buffer"""
+
+    def __init__(self, tracer: "Tracer", trace_id: str, span_id: str):
+        self._tracer = tracer
+        self.trace_id = trace_id
+        self.id = span_id
+
+    def span(self, **fields) -> "SpanHandle":
+        """Child span"""
+        return self._tracer._open_span(self.trace_id, self.id, fields)
+
+    def update(self, **fields):
+        self._tracer._record("span.update", self.trace_id, fields, span_id=self.id)
+
+    def end(self, **fields):
+        self._tracer._record("span.end", self.trace_id, fields, span_id=self.id)
+
+
+class TraceHandle:
+    """A sampled trace whose operations go to the tracer's buffer"""
+
+    def __init__(self, tracer: "Tracer", trace_id: str):
+        self._tracer = tracer
+        self.id = trace_id
+
+    def span(self, **fields) -> SpanHandle:
+        return self._tracer._open_span(self.id, None, fields)
+
+    def update(self, **fields):
+        self._tracer._record("trace.update", self.id, fields)
+
+
+# ========== Tracer ==========
+
+class Tracer:
+    """
+    Bounded buffer + background flusher in front of a tracing backend
+
+    Args:
+        backend: LangfuseBackend, LocalFileBackend or NoopBackend
+        sample_rates: Sampling rate per trace name
+        default_rate: Rate for names not in sample_rates
+        buffer_size: Operations held for the flusher; more are dropped
+        flush_interval: Seconds between background flushes
+        batch_size: Operations handed to the backend at a time
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_rate: float = 1.0,
+        buffer_size: int = 10000,
+        flush_interval: float = 1.0,
+        batch_size: int = 500
+    ):
+        self.backend = backend or NoopBackend()
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = default_rate
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self.recorded = 0
+        self.exported = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.failed = 0
+        self.flushes = 0
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=buffer_size)
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = None
+        if self.backend.name != "noop":
+            self._flusher = threading.Thread(target=self._run, name="trace-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+        logger.info(f"Tracer ready: backend={self.backend.name}, default_rate={default_rate}, rates={self.sample_rates}")
+
+    # ========== Call-site API (never blocks) ==========
+
+    def trace(self, name: str, id: Optional[str] = None, **fields):
+        """
+        Open (or re-open) a trace
+
+        Returns a handle whose span/update calls are buffered, or a no-op
+        handle if the trace is not sampled.
+        """
+        trace_id = id or uuid.uuid4().hex
+        if self._flusher is None:
+            return _NOOP
+        if not self.is_sampled(name, trace_id):
+            self.sampled_out += 1
+            return _NOOP
+        self._record("trace", trace_id, {"name": name, **fields})
+        return TraceHandle(self, trace_id)
+
+    def is_sampled(self, name: str, trace_id: str) -> bool:
+        """Head sampling: the same trace id always gets the same answer"""
+        rate = self.sample_rates.get(name, self.default_rate)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        bucket = int.from_bytes(hashlib.sha1(trace_id.encode("utf-8")).digest()[:8], "big") / 2 ** 64
+        return bucket < rate
+
+    def flush(self):
+        """Ask the flusher to deliver what is buffered now; does not wait"""
+        self._wake.set()
+
+    def _open_span(self, trace_id: str, parent_id: Optional[str], fields: Dict[str, Any]) -> SpanHandle:
+        span_id = uuid.uuid4().hex
+        self._record("span", trace_id, fields, span_id=span_id, parent_id=parent_id)
+        return SpanHandle(self, trace_id, span_id)
+
+    def _record(self, op: str, trace_id: str, fields: Dict[str, Any], **ids):
+        if self._closed:
+            self.dropped += 1
+            return
+        event = {"op": op, "trace_id": trace_id, "at": datetime.now(timezone.utc).isoformat(), "fields": fields, **ids}
+        try:
+            self._queue.put_nowait(event)
+            self.recorded += 1
+        except queue.Full:
+            self.dropped += 1
+
+    # ========== Flusher thread ==========
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+
+            stop = False
+            exported = 0
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                if not batch:
+                    break
+                try:
+                    self.backend.export(batch)
+                    self.exported += len(batch)
+                    exported += len(batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    logger.warning(f"Tracing backend {self.backend.name} failed to export {len(batch)} operations: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+
+            if exported:
+                try:
+                    self.backend.flush()
+                    self.flushes += 1
+                except Exception as e:
+                    logger.warning(f"Tracing backend {self.backend.name} flush failed: {e}")
+
+            if stop:
+                return
+
+    def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until every buffered operation reached the backend; False on timeout (tests, shutdown)"""
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Deliver what is buffered (up to timeout), then close the backend"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._flusher is not None:
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._wake.set()
+            self._flusher.join(timeout)
+        try:
+            self.backend.close()
+        except Exception as e:
+            logger.warning(f"Tracing backend {self.backend.name} close failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Buffer and delivery counters"""
+        return {
+            "backend": self.backend.name,
+            "buffered": self._queue.qsize(),
+            "recorded": self.recorded,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "failed": self.failed,
+            "flushes": self.flushes
+        }
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """'name=0.1,other=0.5' → {"name": 0.1, "other": 0.5}"""
+    rates = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, rate = item.split("=", 1)
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def create_tracer() -> Tracer:
+    """Tracer configured from the TRACING_* environment variables"""
+    backend_name = os.getenv("TRACING_BACKEND") or ("langfuse" if os.getenv("LANGFUSE_HOST") else "local")
+    if backend_name == "langfuse":
+        backend = LangfuseBackend()
+    elif backend_name == "local":
+        backend = LocalFileBackend(os.getenv("TRACING_LOCAL_PATH", "data/observability/tracing_events.jsonl"))
+    elif backend_name == "noop":
+        backend = NoopBackend()
+    else:
+        raise ValueError(f"Unknown TRACING_BACKEND: {backend_name}")
+    return Tracer(
+        backend,
+        sample_rates=parse_sample_rates(os.getenv("TRACING_SAMPLE_RATES", "")),
+        default_rate=float(os.getenv("TRACING_SAMPLE_RATE", "1.0")),
+        buffer_size=int(os.getenv("TRACING_BUFFER_SIZE", "10000")),
+        flush_interval=float(os.getenv("TRACING_FLUSH_INTERVAL", "1.0"))
+    )
+
+
+# Singleton instance
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get singleton tracer (TRACING_BACKEND)"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = create_tracer()
+    return _tracer
@@ -0,0 +1,258 @@
+"""
+Upload Writer - Streams uploaded documents to disk with budgets and checksums
+
+Each file is copied in fixed-size chunks with aiofiles while a SHA-256 is
+computed, so a large scan never blocks the event loop. Budgets are enforced
+as bytes arrive, before anything reaches OCR:
+    - per-file bytes          (UPLOAD_MAX_FILE_MB, default 20)
+    - per-application bytes   (UPLOAD_MAX_APPLICATION_MB, default 60)
+    - per-file PDF pages      (UPLOAD_MAX_PDF_PAGES, default 30)
+    - per-application pages   (UPLOAD_MAX_APPLICATION_PAGES, default 100)
+
+Files of one request are written concurrently to hidden .part files. A
+request is all-or-nothing: only once every file is within budget are the
+.part files renamed to their upload names, and if any file breaks a budget
+all of them are removed and the stored documents stay as they were. A file
+named like an already stored one replaces it (the caller replaces its
+Document entry to match; see upload_filename), as does a later file of the
+same name in one request.
+
+Usage:
+    writer = UploadWriter(UploadLimits.from_env())
+    stored = await writer.write_all(files, upload_dir, existing_bytes=0, existing_pages=0)
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from .executors import run_cpu, run_io
+
+logger = logging.getLogger("UploadWriter")
+
+MB = 1024 * 1024
+
+
+class UploadLimitExceeded(Exception):
+    """Raised when an upload breaks a byte or page budget (HTTP 413)"""
+
+    def __init__(self, limit: str, message: str):
+        super().__init__(message)
+        self.limit = limit
+
+
+@dataclass
+class UploadLimits:
+    """Byte and page budgets for document uploads"""
+    max_file_bytes: int = 20 * MB
+    max_application_bytes: int = 60 * MB
+    max_pdf_pages: int = 30
+    max_application_pages: int = 100
+    chunk_size: int = 1 * MB
+    max_concurrent_writes: int = 4
+
+    @classmethod
+    def from_env(cls) -> "UploadLimits":
+        return cls(
+            max_file_bytes=int(float(os.getenv("UPLOAD_MAX_FILE_MB", "20")) * MB),
+            max_application_bytes=int(float(os.getenv("UPLOAD_MAX_APPLICATION_MB", "60")) * MB),
+            max_pdf_pages=int(os.getenv("UPLOAD_MAX_PDF_PAGES", "30")),
+            max_application_pages=int(os.getenv("UPLOAD_MAX_APPLICATION_PAGES", "100")),
+            max_concurrent_writes=int(os.getenv("UPLOAD_CONCURRENT_WRITES", "4"))
+        )
+
+
+@dataclass
+class StoredUpload:
+    """A file written to disk by UploadWriter"""
+    filename: str
+    file_path: str
+    sha256: str
+    size_bytes: int
+    page_count: Optional[int] = None
+
+
+class _Budget:
+    """Running total shared by concurrent writers of one request"""
+
+    def __init__(self, used: int, limit: int, name: str, unit: str):
+        self._lock = threading.Lock()
+        self.used = used
+        self.limit = limit
+        self.name = name
+        self.unit = unit
+
+    def reserve(self, amount: int):
+        with self._lock:
+            if self.used + amount > self.limit:
+                raise UploadLimitExceeded(
+                    self.name,
+                    f"Application {self.unit} budget exceeded ({self.limit} {self.unit} max)"
+                )
+            self.used += amount
+
+
+def upload_filename(upload: UploadFile) -> str:
+    """Name the upload is stored under in the application's upload directory"""
+    return Path(upload.filename or "upload.bin").name
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """Number of pages in a PDF (reads the page tree only, no rendering)"""
+    from PyPDF2 import PdfReader
+    return len(PdfReader(file_path).pages)
+
+
+class UploadWriter:
+    """
+    Writes UploadFiles to disk in chunks, enforcing UploadLimits
+    """
+
+    def __init__(self, limits: Optional[UploadLimits] = None):
+        self.limits = limits or UploadLimits.from_env()
+
+    async def write_all(
+        self,
+        files: List[UploadFile],
+        upload_dir: Path,
+        existing_bytes: int = 0,
+        existing_pages: int = 0
+    ) -> List[StoredUpload]:
+        """
+        Write all files concurrently; store them only if every file succeeds
+
+        Args:
+            files: Uploaded files from the request
+            upload_dir: Application upload directory
+            existing_bytes: Bytes already stored for this application (not
+                counting files this request replaces)
+            existing_pages: PDF pages already stored for this application
+                (likewise)
+
+        Returns:
+            One StoredUpload per stored name, in request order
+
+        Raises:
+            UploadLimitExceeded: A per-file or per-application budget was broken
+        """
+        limits = self.limits
+        await run_io(upload_dir.mkdir, parents=True, exist_ok=True)
+
+        # Reject on declared sizes before reading anything
+        for upload in files:
+            if upload.size is not None and upload.size > limits.max_file_bytes:
+                raise UploadLimitExceeded(
+                    "file_bytes",
+                    f"{upload.filename} is {upload.size} bytes ({limits.max_file_bytes} max per file)"
+                )
+
+        byte_budget = _Budget(existing_bytes, limits.max_application_bytes, "application_bytes", "bytes")
+        page_budget = _Budget(existing_pages, limits.max_application_pages, "application_pages", "pages")
+        semaphore = asyncio.Semaphore(limits.max_concurrent_writes)
+
+        async def write_one(upload: UploadFile) -> StoredUpload:
+            async with semaphore:
+                return await self._write_file(upload, upload_dir, byte_budget, page_budget)
+
+        results = await asyncio.gather(*(write_one(f) for f in files), return_exceptions=True)
+
+        written = [r for r in results if isinstance(r, tuple)]
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            for _, part_path in written:
+                await self._remove(part_path)
+            raise errors[0]
+
+        # Every file passed: publish them (replacing same-named documents)
+        stored_by_name = {}
+        try:
+            for index, (stored, part_path) in enumerate(written):
+                await aiofiles.os.replace(part_path, stored.file_path)
+                stored_by_name.pop(stored.filename, None)
+                stored_by_name[stored.filename] = stored
+        except BaseException:
+            for _, part_path in written[index:]:
+                await self._remove(part_path)
+            raise
+
+        for stored in stored_by_name.values():
+            logger.info(
+                f"Stored {stored.filename}: {stored.size_bytes} bytes, pages={stored.page_count}, "
+                f"sha256={stored.sha256[:12]}"
+            )
+        return list(stored_by_name.values())
+
+    async def _write_file(
+        self,
+        upload: UploadFile,
+        upload_dir: Path,
+        byte_budget: _Budget,
+        page_budget: _Budget
+    ) -> Tuple[StoredUpload, Path]:
+        """Write one file to a unique .part file; returns it with its StoredUpload"""
+        limits = self.limits
+        filename = upload_filename(upload)
+        file_path = upload_dir / filename
+        part_path = upload_dir / f".{filename}.{uuid.uuid4().hex[:8]}.part"
+
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            async with aiofiles.open(part_path, "wb") as out:
+                while True:
+                    chunk = await upload.read(limits.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > limits.max_file_bytes:
+                        raise UploadLimitExceeded(
+                            "file_bytes",
+                            f"{filename} exceeds {limits.max_file_bytes} bytes per file"
+                        )
+                    byte_budget.reserve(len(chunk))
+                    digest.update(chunk)
+                    await out.write(chunk)
+
+            page_count = None
+            if filename.lower().endswith(".pdf"):
+                try:
+                    page_count = await run_cpu(count_pdf_pages, str(part_path))
+                except Exception as e:
+                    # Unreadable PDFs are left to the extractor, which reports them per document
+                    logger.warning(f"Could not count pages in {filename}: {e}")
+                if page_count is not None and page_count > limits.max_pdf_pages:
+                    raise UploadLimitExceeded(
+                        "file_pages",
+                        f"{filename} has {page_count} pages ({limits.max_pdf_pages} max per file)"
+                    )
+                page_budget.reserve(page_count or 0)
+
+        except BaseException:
+            await self._remove(part_path)
+            raise
+
+        stored = StoredUpload(
+            filename=filename,
+            file_path=str(file_path),
+            sha256=digest.hexdigest(),
+            size_bytes=size,
+            page_count=page_count
+        )
+        return stored, part_path
+
+    @staticmethod
+    async def _remove(path: Path):
+        try:
+            await aiofiles.os.remove(path)
+        except FileNotFoundError:
+            pass
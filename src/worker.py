@@ -0,0 +1,236 @@
+"""
+Background Worker - Processes queued applications outside the API process
+
+The API's `/api/applications/{id}/process` endpoint only enqueues a job;
+this worker claims jobs from the SQLite job queue, runs the 6-agent
+LangGraph pipeline, persists results and records the outcome on the job.
+Each worker process also runs an OutboxProjector that applies the cache,
+graph and vector projections queued by persist().
+
+Usage:
+    python -m src.worker                     # 1 process, 1 job at a time
+    python -m src.worker --processes 4       # 4 independent worker processes
+    python -m src.worker --concurrency 2     # 2 concurrent jobs per process
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+from typing import Optional
+
+from src.services.application_processor import ApplicationProcessor, build_job_result
+from src.services.container import ServiceContainer
+from src.services.job_queue import JobQueue, get_job_queue
+from src.services.outbox_projector import OutboxProjector
+from src.services.progress_events import ProgressEventBus
+from src.services.executors import run_io
+from src.services.tracing import get_tracer
+
+logger = logging.getLogger("Worker")
+
+
+async def build_processor() -> ApplicationProcessor:
+    """Create orchestrator, agents and database managers for this process (in parallel)"""
+    services = ServiceContainer(include_chatbot=False)
+    await services.warm()
+    return services.application_processor()
+
+
+class JobWorker:
+    """
+    Claims jobs from the queue and runs them through the ApplicationProcessor
+
+    Each slot processes one job at a time; a heartbeat keeps the job's lease
+    alive so a crashed worker's jobs are picked up by another worker.
+    """
+
+    def __init__(
+        self,
+        processor: ApplicationProcessor,
+        job_queue: Optional[JobQueue] = None,
+        worker_id: Optional[str] = None,
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+        event_bus: Optional[ProgressEventBus] = None
+    ):
+        self.processor = processor
+        self.event_bus = event_bus or getattr(processor.orchestrator, "event_bus", None)
+        self.job_queue = job_queue or get_job_queue()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self._stopping = asyncio.Event()
+
+        self.langfuse = getattr(processor.orchestrator, "langfuse", None) or get_tracer()
+
+    async def run(self):
+        """Run worker slots until stop() is called"""
+        logger.info(f"Worker {self.worker_id} started with {self.concurrency} slot(s)")
+        await asyncio.gather(*(self._slot(i) for i in range(self.concurrency)))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        """Ask all slots to exit after their current job"""
+        self._stopping.set()
+
+    async def _slot(self, slot: int):
+        slot_id = f"{self.worker_id}/{slot}"
+        while not self._stopping.is_set():
+            job = await run_io(self.job_queue.claim_next, slot_id)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.run_job(job, slot_id)
+
+    async def run_job(self, job: dict, slot_id: str):
+        """Process one claimed job and record its outcome"""
+        job_id = job["job_id"]
+        application_id = job["application_id"]
+        payload = job["payload"]
+
+        logger.info(f"[{application_id}] {slot_id} running job {job_id} (attempt {job['attempts']})")
+
+        trace = self.langfuse.trace(
+            name="worker_process_application",
+            id=f"job_trace_{job_id}_{job['attempts']}",
+            metadata={"application_id": application_id, "job_id": job_id, "worker_id": slot_id}
+        )
+        # Resume jobs and retries continue from the last checkpoint instead of redoing extraction
+        process = asyncio.create_task(self.processor.process(
+            application_id=application_id,
+            applicant_name=payload.get("applicant_name", ""),
+            documents=payload.get("documents", []),
+            trace=trace,
+            resume=job.get("job_type") == JobQueue.RESUME or job["attempts"] > 1
+        ))
+        lease_lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, slot_id, process, lease_lost))
+        await self._emit(application_id, "job_started", job_id=job_id, attempt=job["attempts"], worker_id=slot_id)
+
+        try:
+            try:
+                final_state = await process
+            except asyncio.CancelledError:
+                if not lease_lost.is_set():
+                    raise
+                # Another worker re-claimed the job; its run owns the outcome
+                logger.warning(f"[{application_id}] Abandoned job {job_id}: lease lost")
+                trace.update(output={"success": False, "error": "lease lost"}, level="WARNING")
+                return
+
+            full_data = await run_io(self.processor.sqlite_db.get_application, application_id)
+            result = build_job_result(application_id, final_state, full_data)
+            if not await run_io(self.job_queue.complete, job_id, slot_id, result):
+                logger.warning(f"[{application_id}] Discarded result of job {job_id}: lease lost")
+                trace.update(output={"success": False, "error": "lease lost"}, level="WARNING")
+                return
+            await self._emit(application_id, "job_succeeded", job_id=job_id, final_stage=result["final_stage"])
+
+            trace.update(output={"success": True, "final_stage": result["final_stage"]})
+            logger.info(f"[{application_id}] Job {job_id} succeeded")
+
+        except Exception as e:
+            logger.error(f"[{application_id}] Job {job_id} failed: {e}", exc_info=True)
+            status = await run_io(self.job_queue.fail, job_id, slot_id, str(e))
+            if status is None:
+                logger.warning(f"[{application_id}] Discarded failure of job {job_id}: lease lost")
+            else:
+                await self._emit(
+                    application_id,
+                    "job_retrying" if status == JobQueue.QUEUED else "job_failed",
+                    job_id=job_id,
+                    attempt=job["attempts"],
+                    error=str(e)
+                )
+            trace.update(output={"success": False, "error": str(e)}, level="ERROR")
+
+        finally:
+            heartbeat.cancel()
+            process.cancel()
+            self.langfuse.flush()
+
+    async def _emit(self, application_id: str, event_type: str, **data):
+        """Publish a job progress event (best effort)"""
+        if self.event_bus is None:
+            return
+        try:
+            await run_io(self.event_bus.publish, application_id, event_type, **data)
+        except Exception as e:
+            logger.warning(f"[{application_id}] Failed to publish {event_type} event: {e}")
+
+    async def _heartbeat(self, job_id: str, slot_id: str, process: asyncio.Task, lease_lost: asyncio.Event):
+        """Extend the job's lease; cancel the pipeline run if another worker took the job over"""
+        interval = max(1.0, self.job_queue.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not await run_io(self.job_queue.heartbeat, job_id, slot_id):
+                logger.warning(f"Lost lease on job {job_id}, cancelling its run")
+                lease_lost.set()
+                process.cancel()
+                return
+
+
+def _run_process(concurrency: int, poll_interval: float):
+    """Entry point for a single worker process"""
+    logging.basicConfig(level=logging.INFO)
+
+    async def serve():
+        processor = await build_processor()
+        projector = OutboxProjector(processor.sqlite_db, processor.projection_handlers())
+        worker = JobWorker(
+            processor=processor,
+            concurrency=concurrency,
+            poll_interval=poll_interval
+        )
+        projector.start()
+        try:
+            await worker.run()
+        finally:
+            await projector.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Social Support application processing worker")
+    parser.add_argument("--processes", type=int, default=int(os.getenv("WORKER_PROCESSES", "1")),
+                        help="Number of worker processes to start")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "1")),
+                        help="Concurrent jobs per worker process")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds to wait between polls when the queue is empty")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _run_process(args.concurrency, args.poll_interval)
+        return
+
+    processes = [
+        multiprocessing.Process(
+            target=_run_process,
+            args=(args.concurrency, args.poll_interval),
+            name=f"worker-{i}"
+        )
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -36,9 +36,14 @@ if ! nc -z localhost 8000 2>/dev/null; then
     python -m uvicorn src.api.main:app --host 0.0.0.0 --port 8000 --reload &
     FASTAPI_PID=$!
     
-    # Wait for FastAPI to start
+    # Wait for FastAPI to start and warm its databases/agents
     echo -e "${YELLOW}[WAIT]${NC} Waiting for FastAPI to initialize..."
-    sleep 3
+    for _ in $(seq 1 60); do
+        if curl -sf http://localhost:8000/health/ready > /dev/null 2>&1; then
+            break
+        fi
+        sleep 1
+    done
     
     # Check if FastAPI started successfully
     if nc -z localhost 8000 2>/dev/null; then
@@ -52,6 +57,13 @@ else
     echo -e "${YELLOW}[WARN]${NC} FastAPI already running on port 8000"
 fi
 
+echo ""
+echo -e "${BLUE}[INFO]${NC} Starting background processing worker..."
+echo "  Command: python -m src.worker --processes ${WORKER_PROCESSES:-2}"
+python -m src.worker --processes "${WORKER_PROCESSES:-2}" &
+WORKER_PID=$!
+echo -e "${GREEN}[OK]${NC} Worker started (PID: $WORKER_PID)"
+
 echo ""
 echo "════════════════════════════════════════════════════════════════"
 echo ""
@@ -65,4 +77,4 @@ echo ""
 streamlit run streamlit_app/main_app.py --logger.level=info
 
 # Cleanup on exit
-trap "kill $FASTAPI_PID 2>/dev/null || true" EXIT
+trap "kill $FASTAPI_PID $WORKER_PID 2>/dev/null || true" EXIT
@@ -6,6 +6,7 @@ Production-grade UI with seamless flow and real-time updates
 import streamlit as st
 import requests
 import time
+import uuid
 from typing import Optional, Dict, Any
 import json
 import logging
@@ -302,6 +303,7 @@ def show_step1_create_application():
                     if app_id:
                         st.session_state.application_id = app_id
                         st.session_state.applicant_name = applicant_name.strip()
+                        st.session_state.last_event_id = None
                         st.session_state.current_step = 2
                         st.session_state.form_applicant_name = ""  # Clear form
                         st.success(f"✅ Application created successfully!")
@@ -417,6 +419,8 @@ def show_step3_processing():
         # Processing stages visualization
         stages_info = {
             'pending': ('⏳', 'Initializing', 'Setting up processing pipeline'),
+            'queued': ('📥', 'Queued', 'Waiting for an available processing worker'),
+            'running': ('⚙️', 'Processing', 'AI agents are analyzing your documents'),
             'extracting': ('🔍', 'Data Extraction', 'Using OCR and document parsing'),
             'validating': ('✅', 'Validation', 'Cross-checking document consistency'),
             'checking_eligibility': ('📊', 'Eligibility Check', 'Running ML model analysis'),
@@ -462,9 +466,10 @@ def show_step3_processing():
                 else:
                     st.markdown(f"⏳ {step_name} - Pending")
             
-            # Auto-refresh
+            # Auto-refresh: block on the progress event stream until the
+            # pipeline reports something new, then redraw
             if st.session_state.auto_refresh:
-                time.sleep(3)
+                wait_for_progress_event(st.session_state.application_id)
                 st.rerun()
             
             if st.button("🔄 Refresh Status"):
@@ -1017,12 +1022,15 @@ def upload_documents(application_id: str, files) -> bool:
 def process_application(application_id: str) -> bool:
     """Process application with retry logic"""
     try:
+        # One key per click: retries of this call reuse the job instead of queueing another
         response = api_call_with_retry(
             "POST",
-            f"{API_BASE_URL}/api/applications/{application_id}/process"
+            f"{API_BASE_URL}/api/applications/{application_id}/process",
+            headers={"Idempotency-Key": f"{application_id}-{uuid.uuid4().hex}"}
         )
         
-        if response and response.status_code == 200:
+        # 202 Accepted: job queued for the background worker
+        if response and response.status_code in (200, 202):
             return True
         return False
     except Exception as e:
@@ -1032,18 +1040,61 @@ def process_application(application_id: str) -> bool:
 
 
 def get_application_status(application_id: str) -> Optional[Dict]:
-    """Get application status"""
+    """Get application status (revalidated with the cached ETag)"""
+    cached = st.session_state.get('status_cache', {}).get(application_id)
+    headers = {'If-None-Match': cached['etag']} if cached else {}
     try:
         response = requests.get(
             f"{API_BASE_URL}/api/applications/{application_id}/status",
+            headers=headers,
             timeout=10
         )
+        if response.status_code == 304 and cached:
+            return cached['data']
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        if response.headers.get('ETag'):
+            st.session_state.setdefault('status_cache', {})[application_id] = {
+                'etag': response.headers['ETag'],
+                'data': data
+            }
+        return data
     except:
         return None
 
 
+def wait_for_progress_event(application_id: str, timeout: float = 30) -> Optional[Dict]:
+    """
+    Wait for the next pipeline progress event (Server-Sent Events)
+    
+    Resumes after the last event this session has seen, so each rerun only
+    waits for new progress. Returns the event, or None on timeout/error.
+    """
+    headers = {}
+    last_event_id = st.session_state.get('last_event_id')
+    if last_event_id is not None:
+        headers['Last-Event-ID'] = str(last_event_id)
+    
+    try:
+        with requests.get(
+            f"{API_BASE_URL}/api/applications/{application_id}/events",
+            params={"timeout": timeout},
+            headers=headers,
+            stream=True,
+            timeout=(5, timeout + 5)
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data:"):
+                    event = json.loads(line[len("data:"):])
+                    st.session_state.last_event_id = event.get('event_id')
+                    return event
+    except Exception as e:
+        logger.warning(f"Progress stream unavailable, falling back to polling: {e}")
+        time.sleep(3)
+    return None
+
+
 def get_application_results(application_id: str) -> Optional[Dict]:
     """Get application results with retry logic"""
     try:
@@ -0,0 +1,177 @@
+"""
+Admission Control Tests
+
+Verifies the per-resource-class admission controller:
+- Pools admit up to capacity and queue up to max_queue in FIFO order
+- Requests beyond the queue are rejected with a Retry-After from observed service times
+- Accepted pipeline work (wait=True) is never rejected
+- Job backlog checks and the 429 response
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.services.admission import AdmissionController, AdmissionRejected, ResourcePool
+
+
+class TestResourcePool:
+    """Test suite for ResourcePool"""
+
+    def test_capacity_queue_and_rejection(self):
+        """Callers beyond capacity wait; callers beyond the queue are rejected"""
+        async def scenario():
+            pool = ResourcePool("llm", capacity=1, max_queue=1, initial_service_seconds=10.0)
+            await pool.acquire()
+            waiter = asyncio.create_task(pool.acquire())
+            await asyncio.sleep(0)
+            assert (pool.in_flight, pool.waiting) == (1, 1)
+
+            with pytest.raises(AdmissionRejected) as rejected:
+                await pool.acquire()
+            assert rejected.value.resource == "llm"
+            assert rejected.value.queue_depth == 1
+            # One caller ahead, one slot, 10s per call
+            assert rejected.value.retry_after == 20
+
+            pool.release(4.0)
+            await waiter
+            assert (pool.in_flight, pool.waiting) == (1, 0)
+            pool.release(4.0)
+            assert pool.in_flight == 0
+            return pool.snapshot()
+
+        stats = asyncio.run(scenario())
+        assert stats["admitted"] == 2
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+
+    def test_retry_after_follows_ewma(self):
+        pool = ResourcePool("ocr", capacity=2, max_queue=4, initial_service_seconds=30.0, alpha=0.5)
+        assert pool.retry_after() == 15
+        pool.in_flight = 1
+        pool.release(10.0)
+        assert pool.ewma_service_seconds == 20.0
+        assert pool.retry_after(ahead=3) == 40
+        assert pool.retry_after(ahead=1000) == pool.max_retry_after
+
+    def test_fifo_handover(self):
+        """Released slots go to the oldest waiter, not to a newcomer"""
+        async def scenario():
+            pool = ResourcePool("ml", capacity=1, max_queue=5, initial_service_seconds=1.0)
+            order = []
+
+            async def worker(name):
+                await pool.acquire()
+                order.append(name)
+                await asyncio.sleep(0)
+                pool.release(0.01)
+
+            await pool.acquire()
+            tasks = [asyncio.create_task(worker(n)) for n in ("first", "second", "third")]
+            await asyncio.sleep(0)
+            pool.release(0.01)
+            await asyncio.gather(*tasks)
+            return order, pool.in_flight
+
+        assert asyncio.run(scenario()) == (["first", "second", "third"], 0)
+
+    def test_wait_is_never_rejected(self):
+        """Accepted work queues past max_queue"""
+        async def scenario():
+            pool = ResourcePool("ocr", capacity=1, max_queue=0, initial_service_seconds=1.0)
+            await pool.acquire()
+            with pytest.raises(AdmissionRejected):
+                await pool.acquire()
+            waiter = asyncio.create_task(pool.acquire(wait=True))
+            await asyncio.sleep(0)
+            assert pool.waiting == 1
+            pool.release(0.1)
+            await waiter
+            return pool.in_flight
+
+        assert asyncio.run(scenario()) == 1
+
+    def test_cancelled_waiter_leaves_queue(self):
+        async def scenario():
+            pool = ResourcePool("llm", capacity=1, max_queue=2, initial_service_seconds=1.0)
+            await pool.acquire()
+            waiter = asyncio.create_task(pool.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert pool.waiting == 0
+            pool.release(0.1)
+            return pool.in_flight
+
+        assert asyncio.run(scenario()) == 0
+
+
+class TestAdmissionController:
+    """Test suite for AdmissionController"""
+
+    def test_admit_context_manager(self):
+        controller = AdmissionController(limits={"db_write": {"capacity": 1, "max_queue": 0}})
+
+        async def scenario():
+            async with controller.admit("db_write"):
+                assert controller.get_stats()["pools"]["db_write"]["in_flight"] == 1
+                with pytest.raises(AdmissionRejected):
+                    async with controller.admit("db_write"):
+                        pass
+            return controller.get_stats()["pools"]["db_write"]
+
+        stats = asyncio.run(scenario())
+        assert stats["in_flight"] == 0
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 1
+
+    def test_unknown_resource(self):
+        with pytest.raises(ValueError):
+            AdmissionController().pool("gpu")
+
+    def test_env_limits(self, monkeypatch):
+        monkeypatch.setenv("ADMISSION_LLM_CAPACITY", "1")
+        monkeypatch.setenv("ADMISSION_LLM_QUEUE", "3")
+        pool = AdmissionController().pool("llm")
+        assert (pool.capacity, pool.max_queue) == (1, 3)
+
+    def test_check_backlog(self):
+        """The job backlog is rejected at max_queued_jobs with a retry hint from job durations"""
+        controller = AdmissionController(max_queued_jobs=10)
+        controller.check_backlog("ocr", queued=9, running=2, service_seconds=60)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.check_backlog("ocr", queued=12, running=2, service_seconds=60)
+        assert rejected.value.reason == "job backlog full"
+        assert rejected.value.retry_after == 90
+        assert controller.get_stats()["pools"]["ocr"]["rejected"] == 1
+
+
+class TestAdmissionResponse:
+    """AdmissionRejected becomes 429 + Retry-After"""
+
+    def test_429_with_retry_after(self):
+        import src.api.main as api
+
+        app = FastAPI()
+        app.add_exception_handler(AdmissionRejected, api.admission_rejected_handler)
+
+        @app.post("/chat")
+        async def chat():
+            raise AdmissionRejected("llm", retry_after=12, queue_depth=8)
+
+        response = TestClient(app).post("/chat")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "12"
+        assert response.json()["resource"] == "llm"
+        assert response.json()["queue_depth"] == 8
@@ -92,6 +92,67 @@ class TestDataExtractionAgent:
         # Should not crash, should return some result
         assert result is not None
         assert 'extracted_data' in result or 'errors' in result
+    
+    @pytest.mark.asyncio
+    async def test_extraction_merge_order_and_timings(self, extraction_agent, monkeypatch):
+        """Merge follows document-type order regardless of completion order"""
+        import asyncio
+        import src.agents.extraction_agent as extraction_module
+        
+        async def fake_extract(func, doc_type, file_path):
+            # The employment letter finishes first, the resume last
+            await asyncio.sleep(0.05 if doc_type == 'resume' else 0)
+            if doc_type == 'emirates_id':
+                raise RuntimeError('tesseract missing')
+            return {'current_employer': doc_type, doc_type: True}, 1.0, 0.5, None
+        
+        monkeypatch.setattr(extraction_module, 'run_process', fake_extract)
+        documents = [
+            {'file_path': 'employment_letter.pdf', 'document_type': 'employment_letter'},
+            {'file_path': 'resume.pdf', 'document_type': 'resume'},
+            {'file_path': 'emirates_id.png', 'document_type': 'emirates_id'},
+            {'file_path': 'notes.txt', 'document_type': 'other'}
+        ]
+        
+        result = await extraction_agent.execute({'application_id': 'TEST_EXTRACT_003', 'documents': documents})
+        
+        employment = result['extracted_data'].employment_data
+        assert employment['current_employer'] == 'employment_letter'
+        assert employment['resume'] and employment['employment_letter']
+        assert result['extracted_data'].applicant_info == {}
+        
+        timings = result['document_timings']
+        assert [t['file_name'] for t in timings] == ['employment_letter.pdf', 'resume.pdf', 'emirates_id.png', 'notes.txt']
+        assert [t['status'] for t in timings] == ['completed', 'completed', 'failed', 'skipped']
+        assert timings[2]['error'] == 'tesseract missing'
+        assert timings[1]['duration_ms'] >= 50
+    
+    @pytest.mark.asyncio
+    async def test_extraction_ocr_tier_stats(self, extraction_agent, monkeypatch):
+        """Emirates ID OCR tiers are recorded per document and counted per tier"""
+        import src.agents.extraction_agent as extraction_module
+        
+        tiers = iter([
+            [{'tier': 'fast', 'missing': []}],
+            [{'tier': 'fast', 'missing': ['id_number']}, {'tier': 'full', 'missing': []}]
+        ])
+        
+        async def fake_extract(func, doc_type, file_path):
+            ocr = next(tiers)
+            return {'full_name': 'Test'}, 1.0, 0.5, {'ocr': {'tier': ocr[-1]['tier'], 'resolved': True, 'tiers': ocr}}
+        
+        monkeypatch.setattr(extraction_module, 'run_process', fake_extract)
+        for app_id in ('TEST_EXTRACT_004', 'TEST_EXTRACT_005'):
+            result = await extraction_agent.execute({
+                'application_id': app_id,
+                'documents': [{'file_path': 'emirates_id.png', 'document_type': 'emirates_id'}]
+            })
+        
+        assert result['document_timings'][0]['ocr']['tier'] == 'full'
+        assert extraction_agent.get_ocr_tier_stats() == {
+            'fast': {'attempts': 2, 'resolved': 1, 'hit_rate': 0.5},
+            'full': {'attempts': 1, 'resolved': 1, 'hit_rate': 1.0}
+        }
 
 
 class TestDataValidationAgent:
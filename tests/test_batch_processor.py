@@ -0,0 +1,189 @@
+"""
+Batch Processor Tests
+
+Verifies batch processing on top of the job queue:
+- Per-item outcomes (succeeded / failed / not_found)
+- Concurrency cap on jobs in flight
+- Event stream shape (batch_started, item_completed, batch_completed)
+- Concurrent submissions of one application share a single job
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.job_queue import JobQueue
+from src.services.batch_processor import BatchProcessor
+from src.services.single_flight import SingleFlight
+
+
+async def fake_worker(job_queue: JobQueue, stop: asyncio.Event, in_flight: list, fail_ids=()):
+    """Completes queued jobs, recording how many were outstanding at each claim"""
+    while not stop.is_set():
+        stats = job_queue.get_queue_stats()["counts"]
+        in_flight.append(stats.get(JobQueue.QUEUED, 0) + stats.get(JobQueue.RUNNING, 0))
+
+        job = job_queue.claim_next("fake-worker")
+        if job is None:
+            await asyncio.sleep(0.01)
+            continue
+        await asyncio.sleep(0.02)
+        if job["application_id"] in fail_ids:
+            job_queue.fail(job["job_id"], "fake-worker", "pipeline error", retry=False)
+        else:
+            result = {"final_stage": "completed", "status": {"data": {"decision": "approve"}}}
+            job_queue.complete(job["job_id"], "fake-worker", result)
+
+
+class TestBatchProcessor:
+    """Test suite for BatchProcessor"""
+
+    @pytest.fixture
+    def job_queue(self, tmp_path):
+        """Create an isolated job queue"""
+        return JobQueue(db_path=str(tmp_path / "jobs.db"))
+
+    def run_batch(self, job_queue, app_ids, known_ids, concurrency, fail_ids=()):
+        processor = BatchProcessor(job_queue, poll_interval=0.01)
+
+        async def resolve(application_id):
+            if application_id not in known_ids:
+                return None
+            return {"applicant_name": application_id, "documents": []}
+
+        async def run():
+            stop = asyncio.Event()
+            in_flight = []
+            worker = asyncio.create_task(fake_worker(job_queue, stop, in_flight, fail_ids))
+            events = [event async for event in processor.run(app_ids, resolve, concurrency=concurrency)]
+            stop.set()
+            await worker
+            return events, in_flight
+
+        return asyncio.run(run())
+
+    def test_reports_outcome_per_item(self, job_queue):
+        """Each application gets exactly one outcome"""
+        app_ids = ["APP_A", "APP_B", "APP_MISSING", "APP_A"]
+        events, _ = self.run_batch(job_queue, app_ids, {"APP_A", "APP_B"}, concurrency=2, fail_ids={"APP_B"})
+
+        assert events[0]["event"] == "batch_started"
+        assert events[0]["total"] == 3
+        assert events[0]["duplicates_removed"] == 1
+        assert events[-1]["event"] == "batch_completed"
+
+        items = {e["application_id"]: e for e in events if e["event"] == "item_completed"}
+        assert items["APP_A"]["status"] == "succeeded"
+        assert items["APP_A"]["decision"] == "approve"
+        assert items["APP_B"]["status"] == "failed"
+        assert items["APP_B"]["error"] == "pipeline error"
+        assert items["APP_MISSING"]["status"] == "not_found"
+        assert items["APP_MISSING"]["job_id"] is None
+
+        assert events[-1]["summary"] == {"succeeded": 1, "failed": 1, "not_found": 1, "timeout": 0}
+
+    def test_concurrency_limit(self, job_queue):
+        """No more than `concurrency` jobs from the batch are outstanding"""
+        app_ids = [f"APP_{i:03d}" for i in range(12)]
+        events, in_flight = self.run_batch(job_queue, app_ids, set(app_ids), concurrency=3)
+
+        assert events[-1]["summary"]["succeeded"] == 12
+        assert max(in_flight) <= 3
+
+    def test_concurrent_batches_share_jobs(self, job_queue):
+        """The same application in two concurrent batches is processed once"""
+        processor = BatchProcessor(job_queue, poll_interval=0.01)
+
+        async def resolve(application_id):
+            return {"applicant_name": application_id, "documents": []}
+
+        async def run():
+            stop = asyncio.Event()
+            worker = asyncio.create_task(fake_worker(job_queue, stop, []))
+            first, second = await asyncio.gather(
+                self._collect(processor.run(["APP_A", "APP_B"], resolve, concurrency=2)),
+                self._collect(processor.run(["APP_B", "APP_C"], resolve, concurrency=2))
+            )
+            stop.set()
+            await worker
+            return first, second
+
+        first, second = asyncio.run(run())
+        job_ids = {
+            e["application_id"]: e["job_id"] for e in first + second if e["event"] == "item_completed"
+        }
+        shared = [e for e in first + second if e.get("application_id") == "APP_B"]
+        assert {e["job_id"] for e in shared} == {job_ids["APP_B"]}
+        assert all(e["status"] == "succeeded" for e in shared)
+        assert job_queue.get_queue_stats()["counts"][JobQueue.SUCCEEDED] == 3
+
+    def test_attaches_to_active_job(self, job_queue):
+        """A batch item waits on a job already queued by /process"""
+        existing = job_queue.enqueue("APP_A", {"documents": []})
+        events, _ = self.run_batch(job_queue, ["APP_A"], {"APP_A"}, concurrency=1)
+
+        item = events[1]
+        assert item["job_id"] == existing["job_id"]
+        assert item["status"] == "succeeded"
+
+    @staticmethod
+    async def _collect(events):
+        return [event async for event in events]
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight"""
+
+    def test_concurrent_calls_share_one_run(self):
+        async def scenario():
+            flights = SingleFlight()
+            calls = []
+
+            async def work():
+                calls.append(1)
+                await asyncio.sleep(0.01)
+                return "result"
+
+            results = await asyncio.gather(*(flights.do("APP_A", work) for _ in range(5)))
+            after = await flights.do("APP_A", work)
+            return results, after, calls, flights.get_stats()
+
+        results, after, calls, stats = asyncio.run(scenario())
+        assert results == ["result"] * 5
+        assert after == "result"
+        assert len(calls) == 2
+        assert stats == {"in_flight": 0, "started": 2, "shared": 4}
+
+    def test_errors_reach_every_caller(self):
+        async def scenario():
+            flights = SingleFlight()
+
+            async def work():
+                await asyncio.sleep(0.01)
+                raise RuntimeError("boom")
+
+            return await asyncio.gather(*(flights.do("APP_A", work) for _ in range(2)), return_exceptions=True)
+
+        errors = asyncio.run(scenario())
+        assert [str(e) for e in errors] == ["boom", "boom"]
+
+    def test_cancelled_caller_does_not_cancel_run(self):
+        async def scenario():
+            flights = SingleFlight()
+
+            async def work():
+                await asyncio.sleep(0.05)
+                return "done"
+
+            first = asyncio.create_task(flights.do("APP_A", work))
+            second = asyncio.create_task(flights.do("APP_A", work))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(scenario()) == "done"
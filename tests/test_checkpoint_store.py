@@ -0,0 +1,181 @@
+"""
+Checkpoint Store Tests
+
+Verifies the SQLite LangGraph checkpointer and resume-from-failed-node:
+- Checkpoints and pending writes round-trip through SQLite
+- Retention prunes idle threads; a new run replaces old checkpoints
+- A run whose node failed resumes after its last successful node, also
+  from a fresh orchestrator (process restart), without re-running extraction
+- A run that crashed mid-node resumes at that node
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.core.langgraph_orchestrator import LangGraphOrchestrator
+from src.core.types import (
+    DecisionType, EligibilityResult, Explanation, ExtractedData, Recommendation, ValidationReport
+)
+from src.services.checkpoint_store import SQLiteCheckpointSaver
+
+
+class WorkerCrash(BaseException):
+    """Not caught by the nodes, like a worker process dying mid-node"""
+
+
+class FakeAgent:
+    """Agent returning a fixed result; the first `failures` calls raise"""
+
+    def __init__(self, calls, name, result, failures=0, error=ConnectionError("ollama unavailable")):
+        self.calls = calls
+        self.name = name
+        self.result = result
+        self.failures = failures
+        self.error = error
+
+    async def execute(self, input_data):
+        self.calls[self.name] = self.calls.get(self.name, 0) + 1
+        if self.failures:
+            self.failures -= 1
+            raise self.error
+        return self.result()
+
+
+def _orchestrator(db_path, calls, recommend_failures=0, recommend_error=None):
+    orchestrator = LangGraphOrchestrator(checkpointer=SQLiteCheckpointSaver(db_path))
+    orchestrator.register_agents(
+        FakeAgent(calls, "extract", lambda: {"extracted_data": ExtractedData(income_data={"monthly_income": 4000})}),
+        FakeAgent(calls, "validate", lambda: {"validation_report": ValidationReport(is_valid=True)}),
+        FakeAgent(calls, "eligibility", lambda: {"eligibility_result": EligibilityResult(is_eligible=True, eligibility_score=0.8)}),
+        FakeAgent(
+            calls, "recommend",
+            lambda: {"recommendation": Recommendation(decision=DecisionType.APPROVED, financial_support_amount=2500.0)},
+            failures=recommend_failures,
+            **({"error": recommend_error} if recommend_error else {})
+        ),
+        FakeAgent(calls, "explain", lambda: {"explanation": Explanation(summary="Approved", detailed_reasoning="Low income")})
+    )
+    return orchestrator
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "checkpoints.db")
+
+
+class TestSQLiteCheckpointSaver:
+    """Test suite for SQLiteCheckpointSaver"""
+
+    def _put(self, saver, thread_id, parent_id=None, values=None):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = values or {}
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": parent_id}}
+        return saver.put(config, checkpoint, {"source": "loop", "step": 0}, {})
+
+    def test_put_get_list(self, db_path):
+        saver = SQLiteCheckpointSaver(db_path)
+        first = self._put(saver, "APP_TEST0001", values={"extracted_data": ExtractedData(credit_data={"score": 700})})
+        second = self._put(saver, "APP_TEST0001", parent_id=first["configurable"]["checkpoint_id"])
+        saver.put_writes(second, [("errors", ["boom"])], task_id="task-1")
+
+        latest = saver.get_tuple({"configurable": {"thread_id": "APP_TEST0001"}})
+        assert latest.config == second
+        assert latest.parent_config["configurable"]["checkpoint_id"] == first["configurable"]["checkpoint_id"]
+        assert latest.pending_writes == [("task-1", "errors", ["boom"])]
+
+        # A fresh saver (another process) reads the same checkpoints
+        restored = SQLiteCheckpointSaver(db_path).get_tuple(first)
+        assert restored.checkpoint["channel_values"]["extracted_data"].credit_data == {"score": 700}
+        assert restored.metadata == {"source": "loop", "step": 0}
+
+        listed = list(saver.list({"configurable": {"thread_id": "APP_TEST0001"}}))
+        assert [t.config for t in listed] == [second, first]
+        assert list(saver.list(None, before=second))[0].config == first
+        assert saver.get_stats()["checkpoints"] == 2
+
+    def test_retention(self, db_path):
+        saver = SQLiteCheckpointSaver(db_path)
+        self._put(saver, "APP_TEST0001")
+        self._put(saver, "APP_TEST0002")
+
+        assert saver.delete_thread("APP_TEST0001") == 1
+        assert saver.prune() == 0
+        assert saver.prune(max_age_seconds=-1) == 1
+        assert saver.get_stats()["threads"] == 0
+
+
+class TestResumeFromCheckpoint:
+    """LangGraphOrchestrator.resume_application with the SQLite checkpointer"""
+
+    def test_resume_after_failed_node(self, db_path):
+        """A failed recommend resumes there, in a new process, without re-running extraction"""
+        calls = {}
+
+        async def scenario():
+            first = await _orchestrator(db_path, calls, recommend_failures=1).process_application(
+                "APP_TEST0001", "Test Applicant", []
+            )
+            assert first["recommendation"].decision == DecisionType.DECLINED  # fallback
+            assert first["errors"] == ["Recommendation error: ollama unavailable"]
+
+            restarted = _orchestrator(db_path, calls)
+            point = await restarted.get_resume_point("APP_TEST0001")
+            final = await restarted.resume_application("APP_TEST0001")
+            return point, final, await restarted.get_resume_point("APP_TEST0001")
+
+        point, final, after = asyncio.run(scenario())
+
+        assert point["node"] == "recommend"
+        assert point["failed_node"] == "recommend"
+        assert point["completed_nodes"] == ["extract", "validate", "eligibility_check"]
+        assert final["recommendation"].financial_support_amount == 2500.0
+        assert final["extracted_data"].income_data == {"monthly_income": 4000}
+        assert final["errors"] == []
+        assert calls == {"extract": 1, "validate": 1, "eligibility": 1, "recommend": 2, "explain": 2}
+        assert after["node"] is None
+
+    def test_resume_after_crash(self, db_path):
+        """A run that died inside a node continues at that node"""
+        calls = {}
+
+        async def scenario():
+            with pytest.raises(WorkerCrash):
+                await _orchestrator(db_path, calls, recommend_failures=1, recommend_error=WorkerCrash()).process_application(
+                    "APP_TEST0001", "Test Applicant", []
+                )
+            restarted = _orchestrator(db_path, calls)
+            point = await restarted.get_resume_point("APP_TEST0001")
+            return point, await restarted.resume_application("APP_TEST0001")
+
+        point, final = asyncio.run(scenario())
+        assert point["node"] == "recommend"
+        assert point["failed_node"] is None
+        assert final["explanation"].summary == "Approved"
+        assert calls["extract"] == 1
+
+    def test_new_run_replaces_checkpoints(self, db_path):
+        calls = {}
+
+        async def scenario():
+            orchestrator = _orchestrator(db_path, calls)
+            assert await orchestrator.get_resume_point("APP_TEST0001") is None
+            with pytest.raises(LookupError):
+                await orchestrator.resume_application("APP_TEST0001")
+
+            await orchestrator.process_application("APP_TEST0001", "Test Applicant", [])
+            checkpoints = orchestrator.checkpointer.get_stats()["checkpoints"]
+            await orchestrator.process_application("APP_TEST0001", "Test Applicant", [])
+            return checkpoints, orchestrator.checkpointer.get_stats()["checkpoints"], await orchestrator.resume_application("APP_TEST0001")
+
+        first_run, second_run, unchanged = asyncio.run(scenario())
+        assert first_run == second_run
+        assert unchanged["stage"] == "completed"
+        assert calls["extract"] == 2
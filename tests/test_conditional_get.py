@@ -0,0 +1,110 @@
+"""
+Conditional GET Tests
+
+Verifies ETag handling for /status and /results polling:
+- ETag changes when application state or its job changes
+- If-None-Match matching (lists, weak tags, *)
+- Large responses are gzip-compressed, streaming endpoints are not
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import src.api.main as api
+from src.services.job_queue import JobQueue
+from src.services.state_store import SQLiteApplicationStateStore
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestApplicationETag:
+    """Test suite for ETag computation"""
+
+    @pytest.fixture
+    def stores(self, tmp_path, monkeypatch):
+        """Point the API module at isolated stores"""
+        state_store = SQLiteApplicationStateStore(str(tmp_path / "app_state.db"))
+        job_queue = JobQueue(str(tmp_path / "jobs.db"))
+        monkeypatch.setattr(api, "state_store", state_store)
+        monkeypatch.setattr(api, "job_queue", job_queue)
+        return state_store, job_queue
+
+    def test_etag_tracks_state_and_job(self, stores):
+        """Every state write and job transition produces a new ETag"""
+        state_store, job_queue = stores
+        etag = lambda: asyncio.run(api._application_etag("APP_TEST0001"))
+
+        assert etag() is None
+
+        state_store.put("APP_TEST0001", {"stage": "pending"})
+        created = etag()
+        assert created.startswith('"') and created.endswith('"')
+        assert etag() == created
+
+        state_store.put("APP_TEST0001", {"stage": "pending", "documents": [1]})
+        uploaded = etag()
+        assert uploaded != created
+
+        job = job_queue.enqueue("APP_TEST0001", {})
+        queued = etag()
+        job_queue.claim_next("worker-a")
+        running = etag()
+        job_queue.complete(job["job_id"], "worker-a", {"final_stage": "completed"})
+        succeeded = etag()
+        assert len({uploaded, queued, running, succeeded}) == 4
+
+    def test_if_none_match(self):
+        """Lists, weak validators and * are honoured"""
+        etag = '"APP_TEST0001.v2.nojob"'
+        assert not api._etag_matches(_request(), etag)
+        assert api._etag_matches(_request(etag), etag)
+        assert api._etag_matches(_request(f'"other", W/{etag}'), etag)
+        assert api._etag_matches(_request("*"), etag)
+        assert not api._etag_matches(_request('"APP_TEST0001.v1.nojob"'), etag)
+
+
+class TestCompression:
+    """Test suite for StreamAwareGZipMiddleware"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(api.StreamAwareGZipMiddleware, minimum_size=1000)
+
+        @app.get("/large")
+        async def large():
+            return {"data": "x" * 5000}
+
+        @app.get("/small")
+        async def small():
+            return {"data": "x"}
+
+        @app.get("/api/applications/{application_id}/events")
+        async def events(application_id: str):
+            return PlainTextResponse("y" * 5000)
+
+        return TestClient(app)
+
+    def test_large_bodies_compressed(self, client):
+        headers = {"Accept-Encoding": "gzip"}
+        assert client.get("/large", headers=headers).headers.get("content-encoding") == "gzip"
+        assert client.get("/small", headers=headers).headers.get("content-encoding") is None
+
+    def test_streaming_paths_bypass_compression(self, client):
+        response = client.get("/api/applications/APP_TEST0001/events", headers={"Accept-Encoding": "gzip"})
+        assert response.headers.get("content-encoding") is None
+        assert response.text == "y" * 5000
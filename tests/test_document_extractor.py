@@ -0,0 +1,476 @@
+"""
+Document Extractor Tests
+
+Verifies the pluggable PDF text backend and OCR paths:
+- PyMuPDF text is laid out like pdfplumber's (same lines for the parsers)
+- Pages without a usable text layer are re-read with pdfplumber
+- The backend and per-page timings are reported by extract_document
+- PDF_TEXT_BACKEND selects the backend; unknown values are rejected
+- Scanned pages (image, no text layer) are rendered and OCR'd in parallel,
+  up to the page cap, with OCR text cached per rendered page
+- Emirates IDs are OCR'd with the cheap English tier first and escalate to
+  the Arabic+English tier only when required fields are missing
+- Cards matching a layout template are read from field crops only (in
+  parallel, one line each, per-field whitelist); misaligned crops and
+  unknown layouts fall back to the full-page tiers
+"""
+
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pymupdf
+from PIL import Image, ImageDraw, ImageStat
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.services.document_extractor as extractor_module
+import src.services.ocr_templates as ocr_templates
+from src.services.document_extractor import DocumentExtractor, OcrPageCache, extract_document
+from src.services.ocr_templates import FieldRegion, OcrTemplate, find_template, register_template
+
+STATEMENT_LINES = [
+    ("Account Holder:", "Fatima Al Kaabi"),
+    ("Account Number:", "702632297"),
+    ("Average Monthly Income:", "AED 4,210.06"),
+    ("Total Expenses (3 months):", "AED 88,621.19"),
+    ("Current Balance:", "AED 5,722.08")
+]
+
+
+def _write_pdf(path: Path, pages):
+    """One PDF page per entry; each page is a list of (label, value) table rows"""
+    doc = pymupdf.open()
+    for rows in pages:
+        page = doc.new_page()
+        for i, (label, value) in enumerate(rows):
+            y = 72 + i * 20
+            # Label and value as separate cells, like the generated statements
+            page.insert_text((72, y), label, fontsize=11)
+            page.insert_text((320, y), value, fontsize=11)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _write_scan(path: Path, pages):
+    """PDF whose pages are images of the given rows (no text layer)"""
+    source = pymupdf.open(_write_pdf(path.with_name("source.pdf"), pages))
+    doc = pymupdf.open()
+    for page in source:
+        scan = doc.new_page()
+        scan.insert_image(scan.rect, pixmap=page.get_pixmap(dpi=100))
+    doc.save(str(path))
+    doc.close()
+    source.close()
+    return str(path)
+
+
+class FakeTesseract:
+    """pytesseract.image_to_string stand-in: slow, thread-safe call log with peak concurrency"""
+
+    def __init__(self, text="Average Monthly Income: AED 4,210.06", delay=0.2):
+        self.text = text
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, image, lang="eng"):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.active -= 1
+        return self.text
+
+
+@pytest.fixture
+def tesseract(monkeypatch):
+    fake = FakeTesseract()
+    monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", fake)
+    return fake
+
+
+@pytest.fixture
+def statement(tmp_path):
+    return _write_pdf(tmp_path / "bank_statement.pdf", [STATEMENT_LINES, STATEMENT_LINES[:2]])
+
+
+class TestPdfBackends:
+    """Test suite for DocumentExtractor._extract_pdf_text"""
+
+    def test_pymupdf_matches_pdfplumber(self, statement):
+        fast = DocumentExtractor(pdf_backend="pymupdf")
+        slow = DocumentExtractor(pdf_backend="pdfplumber")
+
+        text = fast._extract_pdf_text(statement)
+        assert text == slow._extract_pdf_text(statement)
+        assert "Average Monthly Income: AED 4,210.06" in text.split("\n")
+        assert fast._parse_bank_statement(text)["monthly_income"] == 4210.06
+
+    def test_real_statements_match(self):
+        pdfs = sorted((project_root / "data" / "test_applications").glob("*/*.pdf"))[:8]
+        if not pdfs:
+            pytest.skip("No sample PDFs")
+        fast = DocumentExtractor(pdf_backend="pymupdf")
+        slow = DocumentExtractor(pdf_backend="pdfplumber")
+        for pdf in pdfs:
+            assert fast._extract_pdf_text(str(pdf)) == slow._extract_pdf_text(str(pdf)), pdf.name
+
+    def test_auto_falls_back_per_page(self, tmp_path):
+        path = _write_pdf(tmp_path / "credit_report.pdf", [STATEMENT_LINES, [("Page", "2")]])
+        extractor = DocumentExtractor(pdf_backend="auto", min_page_chars=20)
+
+        text = extractor._extract_pdf_text(path)
+        stats = extractor.take_stats()["pdf"]
+
+        assert text.endswith("Page 2")
+        assert stats["backend"] == "mixed"
+        assert stats["fallback_pages"] == [2]
+        assert [page["backend"] for page in stats["pages"]] == ["pymupdf", "pdfplumber"]
+        assert all(page["ms"] >= 0 for page in stats["pages"])
+        assert extractor.take_stats() is None
+
+    def test_unreadable_by_pymupdf(self, statement, monkeypatch):
+        extractor = DocumentExtractor(pdf_backend="auto")
+
+        def broken(path):
+            raise RuntimeError("cannot open")
+
+        monkeypatch.setattr(extractor, "_read_pages_pymupdf", broken)
+        assert "Account Number: 702632297" in extractor._extract_pdf_text(statement)
+        assert extractor.take_stats()["pdf"]["backend"] == "pdfplumber"
+
+        strict = DocumentExtractor(pdf_backend="pymupdf")
+        monkeypatch.setattr(strict, "_read_pages_pymupdf", broken)
+        with pytest.raises(RuntimeError):
+            strict._extract_pdf_text(statement)
+
+    def test_backend_from_env(self, monkeypatch):
+        monkeypatch.setenv("PDF_TEXT_BACKEND", "pdfplumber")
+        assert DocumentExtractor().pdf_backend == "pdfplumber"
+        monkeypatch.setenv("PDF_TEXT_BACKEND", "ghostscript")
+        with pytest.raises(ValueError):
+            DocumentExtractor()
+
+
+class TestScannedPdfOcr:
+    """Test suite for the scanned-page OCR path"""
+
+    @pytest.fixture
+    def extractor(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PDF_OCR_WORKERS", "4")
+        monkeypatch.setenv("PDF_OCR_MAX_PAGES", "4")
+        return DocumentExtractor(pdf_backend="auto", ocr_cache=OcrPageCache(str(tmp_path / "ocr_pages")))
+
+    def test_scanned_pages_ocr_in_parallel(self, extractor, tesseract, tmp_path):
+        path = _write_scan(tmp_path / "scan.pdf", [STATEMENT_LINES] * 4)
+
+        text = extractor._extract_pdf_text(path)
+
+        assert extractor._parse_bank_statement(text)["monthly_income"] == 4210.06
+        assert tesseract.calls == 4
+        assert tesseract.peak > 1  # pages overlapped on the OCR pool
+        stats = extractor.take_stats()["pdf"]
+        assert stats["backend"] == "ocr"
+        assert stats["ocr_pages"] == [1, 2, 3, 4]
+        assert all(page["ocr_ms"] >= 200 and page["render_ms"] > 0 and not page["cached"] for page in stats["pages"])
+
+    def test_only_scanned_pages_and_page_cap(self, extractor, tesseract, tmp_path):
+        scan = pymupdf.open(_write_scan(tmp_path / "scan.pdf", [STATEMENT_LINES] * 6))
+        doc = pymupdf.open(_write_pdf(tmp_path / "text.pdf", [STATEMENT_LINES, [("Page", "2")]]))
+        doc.insert_pdf(scan)
+        doc.save(str(tmp_path / "mixed.pdf"))
+
+        extractor._extract_pdf_text(str(tmp_path / "mixed.pdf"))
+        stats = extractor.take_stats()["pdf"]
+
+        # Text page read directly, blank page without an image left alone
+        assert [page["backend"] for page in stats["pages"][:2]] == ["pymupdf", "pdfplumber"]
+        assert stats["ocr_pages"] == [3, 4, 5, 6]
+        assert stats["ocr_skipped_pages"] == [7, 8]
+        assert tesseract.calls == 4
+
+    def test_pages_cached(self, extractor, tesseract, tmp_path):
+        first = _write_scan(tmp_path / "scan.pdf", [STATEMENT_LINES, STATEMENT_LINES[:2]])
+        extractor._extract_pdf_text(first)
+        assert tesseract.calls == 2
+
+        # Re-upload with one changed page: only that page is OCR'd again
+        second = _write_scan(tmp_path / "scan_v2.pdf", [STATEMENT_LINES, STATEMENT_LINES[:3]])
+        text = extractor._extract_pdf_text(second)
+        stats = extractor.take_stats()["pdf"]
+        assert tesseract.calls == 3
+        assert [page["cached"] for page in stats["pages"]] == [True, False]
+        assert "Average Monthly Income: AED 4,210.06" in text
+
+    def test_ocr_failure_keeps_extracting(self, extractor, monkeypatch, tmp_path):
+        def missing(image, lang="eng"):
+            raise RuntimeError("tesseract is not installed")
+
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", missing)
+        path = _write_scan(tmp_path / "scan.pdf", [STATEMENT_LINES])
+
+        assert extractor._extract_pdf_text(path) == ""
+        stats = extractor.take_stats()["pdf"]
+        assert "not installed" in stats["pages"][0]["error"]
+        assert stats["ocr_failed_pages"] == [1]
+
+    def test_disabled(self, tesseract, tmp_path, monkeypatch):
+        monkeypatch.setenv("PDF_OCR_ENABLED", "0")
+        extractor = DocumentExtractor(pdf_backend="auto")
+
+        assert extractor._extract_pdf_text(_write_scan(tmp_path / "scan.pdf", [STATEMENT_LINES])) == ""
+        assert tesseract.calls == 0
+
+
+class TestExtractDocument:
+    """Test suite for the pool entry point"""
+
+    def test_reports_pdf_stats(self, statement, monkeypatch):
+        monkeypatch.setattr(extractor_module, "_document_extractor", DocumentExtractor(pdf_backend="auto"))
+
+        data, extract_ms, cpu_ms, stats = extract_document("bank_statement", statement)
+        assert data["account_holder"] == "Fatima Al Kaabi"
+        assert stats["pdf"]["backend"] == "pymupdf"
+        assert stats["pdf"]["page_count"] == 2
+        assert [page["page"] for page in stats["pdf"]["pages"]] == [1, 2]
+
+        # Documents not read as PDF or OCR'd report no stats
+        json_report = Path(statement).with_name("credit_report.json")
+        json_report.write_text('{"credit_score": 700}')
+        data, _, _, stats = extract_document("credit_report", str(json_report))
+        assert data["credit_score"] == 700
+        assert stats is None
+
+
+ID_CARD_TEXT = """UNITED ARAB EMIRATES
+IDENTITY CARD
+Name: Fatima Al Kaabi
+ID No: 784-1973-2166873-7
+DOB: 1973-05-31
+Nationality: UAE National
+Expires: 2028-12-31
+"""
+
+
+class TieredTesseract:
+    """Returns the text configured for each language, records how it was called"""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = []
+
+    def __call__(self, image, lang="eng", config=""):
+        self.calls.append({"lang": lang, "config": config, "mode": image.mode, "size": image.size})
+        return self.texts[lang]
+
+
+@pytest.fixture
+def card(tmp_path):
+    # Light text on a dark card, like the issued IDs
+    image = Image.new("RGB", (1017, 645), (0, 51, 102))
+    ImageDraw.Draw(image).text((50, 100), "Name: Fatima Al Kaabi", fill=(255, 255, 255))
+    path = tmp_path / "emirates_id.png"
+    image.save(path)
+    return str(path)
+
+
+class TestEmiratesIdTiers:
+    """Test suite for tiered Emirates ID OCR (full-page tiers)"""
+
+    @pytest.fixture(autouse=True)
+    def full_page_tiers(self, monkeypatch):
+        monkeypatch.setenv("EMIRATES_ID_OCR_TIERS", "fast,full")
+
+    def test_clean_card_stays_in_fast_tier(self, card, monkeypatch):
+        tesseract = TieredTesseract({"eng": ID_CARD_TEXT})
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        extractor = DocumentExtractor()
+
+        data = extractor.extract_emirates_id(card)
+        stats = extractor.take_stats()["ocr"]
+
+        assert data["id_number"] == "784-1973-2166873-7"
+        assert data["date_of_birth"] == "1973-05-31"
+        assert stats["tier"] == "fast" and stats["resolved"]
+        assert tesseract.calls == [{"lang": "eng", "config": "--psm 4", "mode": "L", "size": (1200, 761)}]
+
+    def test_escalates_when_required_fields_missing(self, card, monkeypatch):
+        # English pass loses the ID number; Arabic+English pass loses the date of birth
+        tesseract = TieredTesseract({
+            "eng": ID_CARD_TEXT.replace("ID No: 784-1973-2166873-7", "ID No: ?"),
+            "eng+ara": ID_CARD_TEXT.replace("DOB: 1973-05-31", "")
+        })
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        extractor = DocumentExtractor()
+
+        data = extractor.extract_emirates_id(card)
+        stats = extractor.take_stats()["ocr"]
+
+        assert [call["lang"] for call in tesseract.calls] == ["eng", "eng+ara"]
+        assert tesseract.calls[1]["mode"] == "RGB" and tesseract.calls[1]["size"][0] == 2000
+        assert data["id_number"] == "784-1973-2166873-7"
+        assert data["date_of_birth"] == "1973-05-31"  # Filled in from the fast tier
+        assert stats["tier"] == "full" and stats["resolved"]
+        assert [tier["missing"] for tier in stats["tiers"]] == [["id_number"], []]
+
+    def test_fast_tier_inverts_dark_cards(self, card):
+        extractor = DocumentExtractor()
+        prepared, lang, _ = extractor._prepare_emirates_id_tier("fast", Image.open(card))
+
+        assert lang == "eng"
+        # Mostly light background, dark text
+        assert ImageStat.Stat(prepared).mean[0] > 128
+
+    def test_tiers_from_env(self, card, monkeypatch):
+        monkeypatch.setenv("EMIRATES_ID_OCR_TIERS", "full")
+        tesseract = TieredTesseract({"eng+ara": ""})
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        extractor = DocumentExtractor()
+
+        extractor.extract_emirates_id(card)
+        stats = extractor.take_stats()["ocr"]
+        assert [call["lang"] for call in tesseract.calls] == ["eng+ara"]
+        assert stats == {"tier": "full", "resolved": False, "tiers": stats["tiers"]}
+        assert stats["tiers"][0]["missing"] == ["full_name", "id_number", "date_of_birth"]
+
+        monkeypatch.setenv("EMIRATES_ID_OCR_TIERS", "fast,slow")
+        with pytest.raises(ValueError):
+            DocumentExtractor()
+
+
+CARD_FIELDS = {
+    "full_name": "Fatima Al Kaabi",
+    "id_number": "784-1973-2166873-7",
+    "date_of_birth": "31/05/1973",
+    "nationality": "UAE National",
+    "issue_date": "2023-01-02",
+    "expiry_date": "2028-12-31"
+}
+
+
+class FieldTesseract:
+    """Template-crop OCR stand-in: the text of the field a crop belongs to"""
+
+    def __init__(self, texts, delay=0.0):
+        template = find_template("emirates_id", (1017, 645))
+        self.fields = {region: field for field, region in template.fields.items()}
+        self.texts = texts
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, crop, region):
+        field = self.fields[region]
+        with self.lock:
+            self.calls.append({"field": field, "size": crop.size, "thread": threading.current_thread().name})
+        time.sleep(self.delay)
+        return self.texts.get(field, "")
+
+
+class TestTemplateTier:
+    """Test suite for region-of-interest OCR with layout templates"""
+
+    def test_reads_fields_from_crops(self, card, monkeypatch):
+        tesseract = TieredTesseract({})
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        monkeypatch.setenv("PDF_OCR_WORKERS", "6")
+        extractor = DocumentExtractor()
+        fields = FieldTesseract(CARD_FIELDS)
+        monkeypatch.setattr(extractor, "_ocr_template_field", fields)
+
+        data = extractor.extract_emirates_id(card)
+        stats = extractor.take_stats()["ocr"]
+
+        assert data["full_name"] == "Fatima Al Kaabi"
+        assert data["id_number"] == "784-1973-2166873-7"
+        assert data["date_of_birth"] == "1973-05-31"
+        assert data["nationality"] == "UAE National"
+        assert data["expiry_date"] == "2028-12-31"
+        # No full-page OCR; the six crops run on the OCR pool
+        assert tesseract.calls == []
+        assert sorted(call["field"] for call in fields.calls) == sorted(CARD_FIELDS)
+        assert all(call["thread"].startswith("ocr") for call in fields.calls)
+        assert stats["tier"] == "template" and stats["resolved"]
+        assert stats["tiers"][0]["template"] == "emirates_id_v1"
+        assert stats["tiers"][0]["unread"] == []
+        # An order of magnitude fewer pixels than the whole card
+        assert stats["tiers"][0]["pixels"] < 0.1
+
+    def test_crop_is_single_whitelisted_line(self, card, monkeypatch):
+        tesseract = TieredTesseract({"eng": "784-1973-2166873-7\n"})
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        image = Image.open(card)
+        template = find_template("emirates_id", image.size)
+        region = template.fields["id_number"]
+
+        crop = DocumentExtractor._prepare_template_crop(image, template, region)
+        assert region.parse(DocumentExtractor._ocr_template_field(crop, region)) == "784-1973-2166873-7"
+
+        call = tesseract.calls[0]
+        assert call["config"] == "--psm 7 -c tessedit_char_whitelist=0123456789-"
+        assert call["mode"] == "L"
+        # Upscaled 3x plus a 10px margin; dark text on a light background
+        left, top, right, bottom = template.pixel_box(region, image.size)
+        assert call["size"] == ((right - left) * 3 + 20, (bottom - top) * 3 + 20)
+        assert ImageStat.Stat(crop).mean[0] > 128
+
+    def test_misaligned_crop_falls_back_to_full_page(self, card, monkeypatch):
+        tesseract = TieredTesseract({"eng": ID_CARD_TEXT})
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        extractor = DocumentExtractor()
+        # The ID crop caught part of the label instead of the number
+        monkeypatch.setattr(extractor, "_ocr_template_field", FieldTesseract({**CARD_FIELDS, "id_number": "-1973"}))
+
+        data = extractor.extract_emirates_id(card)
+        stats = extractor.take_stats()["ocr"]
+
+        assert [call["lang"] for call in tesseract.calls] == ["eng"]
+        assert data["id_number"] == "784-1973-2166873-7"
+        assert data["issue_date"] == "2023-01-02"  # Only read by the template tier
+        assert stats["tier"] == "fast"
+        assert stats["tiers"][0]["unread"] == ["id_number"]
+        assert stats["tiers"][0]["missing"] == ["id_number"]
+
+    def test_unknown_layout_skips_template(self, tmp_path, monkeypatch):
+        tesseract = TieredTesseract({"eng": ID_CARD_TEXT})
+        monkeypatch.setattr(extractor_module.pytesseract, "image_to_string", tesseract)
+        extractor = DocumentExtractor()
+        fields = FieldTesseract(CARD_FIELDS)
+        monkeypatch.setattr(extractor, "_ocr_template_field", fields)
+        path = tmp_path / "square_id.png"
+        Image.new("RGB", (800, 800), (0, 51, 102)).save(path)
+
+        data = extractor.extract_emirates_id(str(path))
+        stats = extractor.take_stats()["ocr"]
+
+        assert fields.calls == []
+        assert data["id_number"] == "784-1973-2166873-7"
+        assert stats["tiers"][0]["template"] is None and stats["tiers"][0]["pixels"] == 0.0
+        assert stats["tier"] == "fast" and stats["resolved"]
+
+    def test_register_template(self, monkeypatch):
+        monkeypatch.setattr(ocr_templates, "_templates", {})
+        wide = OcrTemplate(
+            name="emirates_id_wide", document_type="emirates_id", aspect_ratio=2.0,
+            fields={"id_number": FieldRegion((0.1, 0.1, 0.5, 0.2), "0123456789-", r"(\d{15})", kind="id")}
+        )
+        register_template(wide)
+
+        assert find_template("emirates_id", (2000, 1000)) is wide
+        assert find_template("emirates_id", (2050, 1000)) is wide  # Within tolerance
+        assert find_template("emirates_id", (1017, 645)) is None
+        assert find_template("bank_statement", (2000, 1000)) is None
+        assert wide.fields["id_number"].parse("ID 784197321668737") == "784197321668737"
+        assert wide.fields["id_number"].parse("78419") is None
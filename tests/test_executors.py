@@ -0,0 +1,142 @@
+"""
+Executor Layer Tests
+
+Verifies blocking work is moved off the event loop:
+- run_cpu / run_io execute in their pools and propagate results and errors
+- Context variables survive the hop to the worker thread
+- run_process runs picklable callables in a separate process
+- Loop lag monitor records stalls caused by blocking the loop
+- RAG caches stay consistent when shared by IO-pool threads
+"""
+
+import asyncio
+import contextvars
+import os
+import pytest
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.executors import ExecutorPools
+from src.services.loop_monitor import LoopLagMonitor
+
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class TestExecutorPools:
+    """Test suite for ExecutorPools"""
+
+    @pytest.fixture
+    def pools(self):
+        """Create isolated pools"""
+        pools = ExecutorPools(cpu_workers=2, io_workers=2)
+        yield pools
+        pools.shutdown()
+
+    def test_runs_in_named_pools(self, pools):
+        """CPU and IO work land on their own threads"""
+        async def run():
+            cpu_thread = await pools.run_cpu(lambda: threading.current_thread().name)
+            io_thread = await pools.run_io(lambda: threading.current_thread().name)
+            return cpu_thread, io_thread
+
+        cpu_thread, io_thread = asyncio.run(run())
+        assert cpu_thread.startswith("cpu-pool")
+        assert io_thread.startswith("io-pool")
+
+    def test_errors_propagate_and_are_counted(self, pools):
+        """Exceptions reach the caller and show up in stats"""
+        def boom():
+            raise ValueError("boom")
+
+        async def run():
+            await pools.run_io(sum, [1, 2, 3])
+            with pytest.raises(ValueError):
+                await pools.run_io(boom)
+
+        asyncio.run(run())
+        stats = pools.get_stats()["io"]
+        assert stats["completed"] == 1
+        assert stats["failed"] == 1
+        assert stats["active"] == 0
+
+    def test_context_is_copied(self, pools):
+        """Context variables set in the caller are visible in the pool thread"""
+        async def run():
+            request_id.set("APP_CTX")
+            return await pools.run_cpu(request_id.get)
+
+        assert asyncio.run(run()) == "APP_CTX"
+
+    def test_run_process(self):
+        """Work runs in a child process; the pool starts lazily and is counted"""
+        pools = ExecutorPools(cpu_workers=1, io_workers=1, process_workers=1)
+        try:
+            assert pools.get_stats()["process"]["started"] is False
+            pid = asyncio.run(pools.run_process(os.getpid))
+            stats = pools.get_stats()["process"]
+        finally:
+            pools.shutdown()
+
+        assert pid != os.getpid()
+        assert stats["started"] is True
+        assert stats["completed"] == 1
+
+
+class TestLoopLagMonitor:
+    """Test suite for LoopLagMonitor"""
+
+    def test_detects_blocking_call(self):
+        """A synchronous sleep on the loop shows up as lag"""
+        monitor = LoopLagMonitor(interval=0.01, warn_threshold_ms=50)
+
+        async def run():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            time.sleep(0.15)
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(run())
+        stats = monitor.get_stats()
+        assert stats["samples"] > 0
+        assert stats["max_ms"] >= 100
+        assert stats["stalls_over_threshold"] >= 1
+        assert stats["running"] is False
+
+
+class TestRAGCacheConcurrency:
+    """RAG engine caches are shared by IO-pool threads"""
+
+    def test_lru_cache_under_concurrent_access(self):
+        """Concurrent get/put with eviction never raises and counts every lookup"""
+        from src.services.rag_engine import LRUCache
+
+        cache = LRUCache(max_size=8, ttl_seconds=60)
+        errors = []
+
+        def hammer(worker: int):
+            try:
+                for i in range(2000):
+                    key = f"k{(worker + i) % 16}"
+                    if cache.get(key) is None:
+                        cache.put(key, i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=hammer, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert errors == []
+        assert stats["total_requests"] == 8 * 2000
+        assert stats["current_size"] <= 8
@@ -0,0 +1,218 @@
+"""
+Job Queue Tests
+
+Verifies the SQLite job queue used between the API and worker processes:
+- Enqueue / claim / complete lifecycle
+- Single ownership of claimed jobs
+- Retry and lease-expiry recovery
+- Single-flight enqueue and idempotency keys
+- Lease ownership checks on completion and in the worker
+"""
+
+import asyncio
+import pytest
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.job_queue import JobQueue
+
+
+class TestJobQueue:
+    """Test suite for JobQueue"""
+
+    @pytest.fixture
+    def job_queue(self, tmp_path):
+        """Create an isolated job queue"""
+        return JobQueue(db_path=str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=2)
+
+    def test_enqueue_and_claim(self, job_queue):
+        """Queued job is claimed exactly once"""
+        job = job_queue.enqueue("APP_TEST0001", {"applicant_name": "Test", "documents": []})
+        assert job["status"] == JobQueue.QUEUED
+
+        claimed = job_queue.claim_next("worker-a")
+        assert claimed["job_id"] == job["job_id"]
+        assert claimed["status"] == JobQueue.RUNNING
+        assert claimed["attempts"] == 1
+        assert claimed["payload"]["applicant_name"] == "Test"
+
+        assert job_queue.claim_next("worker-b") is None
+
+    def test_complete_stores_result(self, job_queue):
+        """Completed job exposes its result payload"""
+        job = job_queue.enqueue("APP_TEST0002", {})
+        job_queue.claim_next("worker-a")
+        job_queue.complete(job["job_id"], "worker-a", {"final_stage": "completed"})
+
+        latest = job_queue.get_latest_job("APP_TEST0002")
+        assert latest["status"] == JobQueue.SUCCEEDED
+        assert latest["result"]["final_stage"] == "completed"
+
+    def test_failure_retries_until_max_attempts(self, job_queue):
+        """Failed job is re-queued while attempts remain"""
+        job = job_queue.enqueue("APP_TEST0003", {})
+
+        job_queue.claim_next("worker-a")
+        job_queue.fail(job["job_id"], "worker-a", "boom")
+        assert job_queue.get_job(job["job_id"])["status"] == JobQueue.QUEUED
+
+        job_queue.claim_next("worker-a")
+        job_queue.fail(job["job_id"], "worker-a", "boom again")
+        failed = job_queue.get_job(job["job_id"])
+        assert failed["status"] == JobQueue.FAILED
+        assert failed["error"] == "boom again"
+
+    def test_expired_lease_is_reclaimed(self, job_queue):
+        """Job held by a dead worker is picked up by another worker"""
+        job_queue.lease_seconds = 0
+        job = job_queue.enqueue("APP_TEST0004", {})
+        job_queue.claim_next("dead-worker")
+        time.sleep(0.01)
+
+        reclaimed = job_queue.claim_next("worker-b")
+        assert reclaimed["job_id"] == job["job_id"]
+        assert reclaimed["worker_id"] == "worker-b"
+        assert reclaimed["attempts"] == 2
+
+    def test_stale_worker_cannot_finish_reclaimed_job(self, job_queue):
+        """A worker whose lease expired cannot overwrite the run that re-claimed the job"""
+        job_queue.lease_seconds = 0
+        job = job_queue.enqueue("APP_TEST0011", {})
+        job_queue.claim_next("slow-worker")
+        time.sleep(0.01)
+        job_queue.lease_seconds = 60
+        job_queue.claim_next("worker-b")
+
+        assert job_queue.complete(job["job_id"], "slow-worker", {"final_stage": "stale"}) is False
+        assert job_queue.fail(job["job_id"], "slow-worker", "stale error") is None
+        current = job_queue.get_job(job["job_id"])
+        assert (current["status"], current["worker_id"], current["result"]) == (JobQueue.RUNNING, "worker-b", None)
+
+        assert job_queue.complete(job["job_id"], "worker-b", {"final_stage": "completed"}) is True
+        assert job_queue.get_job(job["job_id"])["result"] == {"final_stage": "completed"}
+
+    def test_queue_stats(self, job_queue):
+        """Stats report counts by status"""
+        job_queue.enqueue("APP_TEST0005", {})
+        job_queue.enqueue("APP_TEST0006", {})
+        job_queue.claim_next("worker-a")
+
+        stats = job_queue.get_queue_stats()
+        assert stats["counts"][JobQueue.QUEUED] == 1
+        assert stats["counts"][JobQueue.RUNNING] == 1
+
+    def test_queue_stats_service_time(self, job_queue):
+        """Average run time of recently succeeded jobs feeds the Retry-After estimate"""
+        assert job_queue.get_queue_stats()["avg_service_seconds"] is None
+
+        job = job_queue.enqueue("APP_TEST0007", {})
+        job_queue.claim_next("worker-a")
+        job_queue.complete(job["job_id"], "worker-a", {"final_stage": "completed"})
+
+        assert job_queue.get_queue_stats()["avg_service_seconds"] >= 0
+
+    def test_enqueue_or_attach(self, job_queue):
+        """A second request attaches to the active job; a new run starts once it finished"""
+        job, outcome = job_queue.enqueue_or_attach("APP_TEST0008", {"documents": []})
+        assert outcome == "created"
+
+        again, outcome = job_queue.enqueue_or_attach("APP_TEST0008", {"documents": []})
+        assert outcome == "attached"
+        assert again["job_id"] == job["job_id"]
+
+        job_queue.claim_next("worker-a")
+        running, outcome = job_queue.enqueue_or_attach("APP_TEST0008", {"documents": []})
+        assert (running["job_id"], outcome) == (job["job_id"], "attached")
+
+        job_queue.complete(job["job_id"], "worker-a", {"final_stage": "completed"})
+        rerun, outcome = job_queue.enqueue_or_attach("APP_TEST0008", {"documents": []})
+        assert outcome == "created"
+        assert rerun["job_id"] != job["job_id"]
+
+    def test_idempotency_key_replays_job(self, job_queue):
+        """The job recorded for a key is returned even after it finished"""
+        job, outcome = job_queue.enqueue_or_attach("APP_TEST0009", {}, idempotency_key="key-1")
+        assert outcome == "created"
+        assert job["idempotency_key"] == "key-1"
+
+        job_queue.claim_next("worker-a")
+        job_queue.complete(job["job_id"], "worker-a", {"final_stage": "completed"})
+
+        replayed, outcome = job_queue.enqueue_or_attach("APP_TEST0009", {}, idempotency_key="key-1")
+        assert outcome == "replayed"
+        assert replayed["job_id"] == job["job_id"]
+        assert replayed["result"] == {"final_stage": "completed"}
+        assert job_queue.get_job_by_idempotency_key("key-1")["job_id"] == job["job_id"]
+
+        fresh, outcome = job_queue.enqueue_or_attach("APP_TEST0009", {}, idempotency_key="key-2")
+        assert outcome == "created"
+
+    def test_adds_idempotency_column_to_existing_db(self, tmp_path):
+        """Queues created before idempotency keys are migrated in place"""
+        db_path = tmp_path / "old_jobs.db"
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("""
+            CREATE TABLE processing_jobs (
+                job_id TEXT PRIMARY KEY, application_id TEXT NOT NULL,
+                job_type TEXT NOT NULL DEFAULT 'process_application',
+                status TEXT NOT NULL DEFAULT 'queued', payload TEXT NOT NULL,
+                result TEXT, error TEXT, attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT, claim_token TEXT, created_at REAL NOT NULL,
+                updated_at REAL NOT NULL, started_at REAL, finished_at REAL,
+                lease_expires_at REAL
+            )
+        """)
+        conn.commit()
+        conn.close()
+
+        job, outcome = JobQueue(db_path=str(db_path)).enqueue_or_attach("APP_TEST0010", {}, idempotency_key="key-1")
+        assert outcome == "created"
+        assert job["idempotency_key"] == "key-1"
+
+
+class TestJobWorkerLease:
+    """A worker that loses its lease stops running the pipeline"""
+
+    def test_lost_lease_cancels_run(self, tmp_path):
+        from src.worker import JobWorker
+
+        class FakeTrace:
+            def update(self, **kwargs):
+                pass
+
+        class FakeTracer:
+            def trace(self, **kwargs):
+                return FakeTrace()
+
+            def flush(self):
+                pass
+
+        cancelled = []
+
+        class FakeProcessor:
+            orchestrator = SimpleNamespace(event_bus=None, langfuse=FakeTracer())
+
+            async def process(self, **kwargs):
+                try:
+                    await asyncio.sleep(30)
+                except asyncio.CancelledError:
+                    cancelled.append(kwargs["application_id"])
+                    raise
+
+        job_queue = JobQueue(db_path=str(tmp_path / "jobs.db"), lease_seconds=3)
+        job_queue.enqueue("APP_TEST0012", {})
+        job = job_queue.claim_next("worker-a")
+        job_queue.heartbeat = lambda job_id, worker_id: False
+
+        worker = JobWorker(processor=FakeProcessor(), job_queue=job_queue)
+        asyncio.run(asyncio.wait_for(worker.run_job(job, "worker-a"), timeout=10))
+
+        assert cancelled == ["APP_TEST0012"]
+        assert job_queue.get_job(job["job_id"])["status"] == JobQueue.RUNNING
@@ -4,7 +4,7 @@ Comprehensive Langfuse Integration Testing Suite
 Tests full Langfuse observability integration across:
 1. LangGraph Orchestrator (all 6 nodes)
 2. FastAPI Endpoints (/api/process-application, /api/chat)
-3. Trace export to JSON files
+3. Trace export to the segmented trace store
 4. Trace structure validation
 
 Requirements:
@@ -26,7 +26,6 @@ sys.path.insert(0, str(project_root))
 
 import pytest
 import asyncio
-import json
 import time
 from datetime import datetime
 from typing import Dict, Any
@@ -36,6 +35,7 @@ from src.core.langgraph_orchestrator import LangGraphOrchestrator
 from src.core.types import ProcessingStage
 from src.databases.prod_sqlite_manager import SQLiteManager
 from src.databases.chroma_manager import ChromaDBManager
+from src.services.trace_store import get_trace_store
 
 # Langfuse
 from langfuse import Langfuse
@@ -43,7 +43,11 @@ from langfuse import Langfuse
 # Configure test paths
 TEST_DB_PATH = "data/databases/applications.db"
 TEST_CHROMADB_PATH = "data/databases/chromadb"
-TRACE_OUTPUT_DIR = Path("data/observability")
+
+
+def load_trace(orchestrator, application_id):
+    """Latest trace record of an application from the orchestrator's trace store"""
+    return orchestrator.trace_store.get(application_id)
 
 
 class TestLangfuseIntegration:
@@ -156,14 +160,10 @@ class TestLangfuseIntegration:
         assert final_state.get("application_id") == test_application_id
         print(f"[OK] Final state valid: {final_state.get('stage')}")
         
-        # Verify Langfuse trace file exported
-        trace_file = TRACE_OUTPUT_DIR / f"langfuse_trace_{test_application_id}.json"
-        assert trace_file.exists(), f"Trace file should exist: {trace_file}"
-        print(f"[OK] Trace file exported: {trace_file}")
-        
-        # Load and validate trace structure
-        with open(trace_file, 'r') as f:
-            trace_data = json.load(f)
+        # Verify trace recorded in the trace store
+        trace_data = load_trace(orchestrator, test_application_id)
+        assert trace_data is not None, f"Trace should be recorded for {test_application_id}"
+        print(f"[OK] Trace recorded in {orchestrator.trace_dir}")
         
         # Validate trace structure
         assert "trace_id" in trace_data, "Trace should have trace_id"
@@ -225,12 +225,9 @@ class TestLangfuseIntegration:
             documents=test_documents
         )
         
-        # Load trace file
-        trace_file = TRACE_OUTPUT_DIR / f"langfuse_trace_{test_app_id}.json"
-        assert trace_file.exists(), "Trace file should exist"
-        
-        with open(trace_file, 'r') as f:
-            trace_data = json.load(f)
+        # Load trace record
+        trace_data = load_trace(orchestrator, test_app_id)
+        assert trace_data is not None, "Trace should be recorded"
         
         # Validate extraction node span
         extraction = trace_data["stages"]["extraction"]
@@ -270,7 +267,7 @@ class TestLangfuseIntegration:
         Verifies:
         1. Each application gets unique trace ID
         2. Traces don't interfere
-        3. All trace files created
+        3. All traces recorded
         """
         print(f"\n{'='*70}")
         print(f"TEST 3: Multi-Application Trace Separation")
@@ -292,18 +289,19 @@ class TestLangfuseIntegration:
             )
             print(f"[OK] {app_id} processed")
         
-        # Verify all trace files created
+        # Verify all traces recorded
         for app_id in app_ids:
-            trace_file = TRACE_OUTPUT_DIR / f"langfuse_trace_{app_id}.json"
-            assert trace_file.exists(), f"Trace file should exist for {app_id}"
-            
-            # Load and validate unique trace ID
-            with open(trace_file, 'r') as f:
-                trace_data = json.load(f)
+            trace_data = load_trace(orchestrator, app_id)
+            assert trace_data is not None, f"Trace should be recorded for {app_id}"
             
+            # Validate unique trace ID
             assert trace_data["trace_id"] == f"trace_{app_id}"
             assert trace_data["application_id"] == app_id
-            print(f"[OK] Trace file valid for {app_id}")
+            print(f"[OK] Trace valid for {app_id}")
+        
+        # Once written, the records are read back from the segments
+        assert orchestrator.trace_store.flush()
+        assert [t["application_id"] for t in orchestrator.trace_store.query(app_ids)] == app_ids[::-1]
         
         print(f"\n{'='*70}")
         print(f"TEST 3: PASSED [OK]")
@@ -311,7 +309,7 @@ class TestLangfuseIntegration:
     
     # ========== Test 4: Trace Export Format Validation ==========
     
-    def test_trace_export_format(self):
+    def test_trace_export_format(self, orchestrator):
         """
         Test trace export JSON format compliance
         
@@ -324,16 +322,12 @@ class TestLangfuseIntegration:
         print(f"TEST 4: Trace Export Format Validation")
         print(f"{'='*70}\n")
         
-        # Find any trace file
-        trace_files = list(TRACE_OUTPUT_DIR.glob("langfuse_trace_*.json"))
-        assert len(trace_files) > 0, "Should have at least one trace file"
-        
-        trace_file = trace_files[0]
-        print(f"Validating: {trace_file.name}")
+        # Find any trace
+        traces = orchestrator.trace_store.query(limit=1)
+        assert len(traces) > 0, "Should have at least one trace"
         
-        # Load trace
-        with open(trace_file, 'r') as f:
-            trace_data = json.load(f)
+        trace_data = traces[0]
+        print(f"Validating: {trace_data['trace_id']}")
         
         # Validate required top-level fields
         required_fields = [
@@ -417,12 +411,9 @@ class TestLangfuseIntegration:
             )
             
             # Even with errors, trace should be exported
-            trace_file = TRACE_OUTPUT_DIR / f"langfuse_trace_{test_app_id}.json"
+            trace_data = load_trace(orchestrator, test_app_id)
             
-            if trace_file.exists():
-                with open(trace_file, 'r') as f:
-                    trace_data = json.load(f)
-                
+            if trace_data is not None:
                 # Check if errors were captured
                 errors = trace_data.get("errors", [])
                 print(f"[OK] Errors captured in trace: {len(errors)} errors")
@@ -436,8 +427,7 @@ class TestLangfuseIntegration:
         except Exception as e:
             print(f"[OK] Exception occurred as expected: {e}")
             # Verify trace was still exported
-            trace_file = TRACE_OUTPUT_DIR / f"langfuse_trace_{test_app_id}.json"
-            if trace_file.exists():
+            if load_trace(orchestrator, test_app_id) is not None:
                 print(f"[OK] Trace exported despite exception")
         
         print(f"\n{'='*70}")
@@ -447,16 +437,18 @@ class TestLangfuseIntegration:
 
 # ========== Utility Functions for Manual Testing ==========
 
-def print_trace_summary(trace_file_path: Path):
+def print_trace_summary(application_id: str):
     """
     Pretty-print trace summary for manual inspection
     
     Usage:
         from tests.test_langfuse_integration import print_trace_summary
-        print_trace_summary(Path("data/observability/langfuse_trace_APP-000001.json"))
+        print_trace_summary("APP-000001")
     """
-    with open(trace_file_path, 'r') as f:
-        trace_data = json.load(f)
+    trace_data = get_trace_store().get(application_id)
+    if trace_data is None:
+        print(f"No trace recorded for {application_id}")
+        return
     
     print(f"\n{'='*70}")
     print(f"LANGFUSE TRACE SUMMARY")
@@ -504,28 +496,24 @@ def print_trace_summary(trace_file_path: Path):
 
 def list_all_traces():
     """
-    List all Langfuse trace files in observability directory
+    List the latest trace of each application, newest first
     
     Usage:
         from tests.test_langfuse_integration import list_all_traces
         list_all_traces()
     """
-    trace_files = list(TRACE_OUTPUT_DIR.glob("langfuse_trace_*.json"))
+    traces = get_trace_store().query(limit=1000)
     
     print(f"\n{'='*70}")
-    print(f"LANGFUSE TRACES ({len(trace_files)} files)")
+    print(f"LANGFUSE TRACES ({len(traces)} applications)")
     print(f"{'='*70}\n")
     
-    for trace_file in sorted(trace_files, key=lambda x: x.stat().st_mtime, reverse=True):
-        # Load trace for quick info
-        with open(trace_file, 'r') as f:
-            trace_data = json.load(f)
-        
+    for trace_data in traces:
         app_id = trace_data.get('application_id', 'Unknown')
         timestamp = trace_data.get('timestamp', 'Unknown')
         processing_time = trace_data.get('processing_time_seconds', 0)
         
-        print(f" {trace_file.name}")
+        print(f" {trace_data.get('trace_id')}")
         print(f"   App ID: {app_id}")
         print(f"   Time: {timestamp}")
         print(f"   Duration: {processing_time:.2f}s")
@@ -554,7 +542,7 @@ if __name__ == "__main__":
     ║  Testing production-grade Langfuse tracing across:               ║
     ║  - LangGraph Orchestrator (6 agent nodes)                        ║
     ║  - FastAPI Endpoints                                              ║
-    ║  - Trace export to JSON                                           ║
+    ║  - Trace export to the segmented trace store                      ║
     ║  - Multi-application trace separation                             ║
     ║                                                                   ║
     ╚═══════════════════════════════════════════════════════════════════╝
@@ -0,0 +1,56 @@
+"""
+Metrics Sampler Tests
+
+Verifies the background metrics sampler:
+- Samples land in a bounded ring buffer
+- Store sizes and custom gauges are recorded
+- A failing gauge does not break the sample
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.metrics_sampler import MetricsSampler, PSUTIL_AVAILABLE
+
+
+class TestMetricsSampler:
+    """Test suite for MetricsSampler"""
+
+    def test_ring_buffer_is_bounded(self):
+        """Only the last `window` samples are kept"""
+        sampler = MetricsSampler(interval=0.01, window=3)
+
+        async def run():
+            sampler.start()
+            await asyncio.sleep(0.15)
+            await sampler.stop()
+
+        asyncio.run(run())
+        assert len(sampler.series(100)) == 3
+        assert sampler.latest() is sampler.series(1)[0]
+        assert not sampler.running
+
+    def test_sample_contents(self, tmp_path):
+        """Samples include store sizes, gauges and loop lag"""
+        (tmp_path / "cache.json").write_bytes(b"x" * 2048)
+        sampler = MetricsSampler(
+            interval=60,
+            window=10,
+            store_paths={"tinydb": str(tmp_path / "cache.json"), "missing": str(tmp_path / "nope.db")},
+            gauges={"answer": lambda: 42, "broken": lambda: 1 / 0}
+        )
+
+        sample = asyncio.run(sampler.sample_now())
+
+        assert sample["stores"]["tinydb"]["size_mb"] == round(2048 / (1024 ** 2), 3)
+        assert sample["stores"]["missing"]["size_mb"] is None
+        assert sample["gauges"] == {"answer": 42, "broken": None}
+        assert "p99_ms" in sample["loop_lag"]
+        if PSUTIL_AVAILABLE:
+            assert sample["process"]["rss_mb"] > 0
+            assert "memory_percent" in sample["system"]
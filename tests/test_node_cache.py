@@ -0,0 +1,229 @@
+"""
+Node Output Cache Tests
+
+Verifies incremental reprocessing:
+- Fingerprints follow content and ignore rebuild timestamps
+- Cached outputs round-trip through SQLite with hit/miss stats and pruning
+- Re-extraction only touches documents whose content hash changed, and
+  empty or partially OCR'd reads are never cached
+- Changing extractor settings or OCR templates re-extracts cached documents
+- A rerun over unchanged extracted data reuses validate ... explain, and a
+  changed input recomputes its node and everything downstream
+"""
+
+import asyncio
+import hashlib
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.langgraph_orchestrator import LangGraphOrchestrator
+from src.core.types import (
+    DecisionType, EligibilityResult, Explanation, ExtractedData, Recommendation, ValidationReport
+)
+from src.services.node_cache import NodeOutputCache, fingerprint, file_sha256
+
+
+class CountingAgent:
+    """Agent returning result(input_data) and counting its calls"""
+
+    def __init__(self, calls, name, result):
+        self.calls = calls
+        self.name = name
+        self.result = result
+
+    async def execute(self, input_data):
+        self.calls[self.name] = self.calls.get(self.name, 0) + 1
+        return self.result(input_data)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return NodeOutputCache(str(tmp_path / "node_cache.db"))
+
+
+class TestFingerprint:
+    """Test suite for fingerprint and file_sha256"""
+
+    def test_ignores_timestamps(self):
+        first = ExtractedData(income_data={"monthly_income": 4000})
+        second = ExtractedData(income_data={"monthly_income": 4000})
+        second.extraction_timestamp = "2000-01-01T00:00:00"
+
+        assert fingerprint("validate", first) == fingerprint("validate", second)
+        assert fingerprint("validate", first) != fingerprint("validate", ExtractedData(income_data={"monthly_income": 4100}))
+        assert fingerprint("validate", first) != fingerprint("eligibility_check", first)
+
+    def test_file_sha256(self, tmp_path):
+        path = tmp_path / "bank_statement.pdf"
+        path.write_bytes(b"%PDF-1.4 statement")
+        assert file_sha256(str(path)) == hashlib.sha256(b"%PDF-1.4 statement").hexdigest()
+        assert file_sha256(str(path)) == file_sha256(str(path), chunk_size=4)
+
+
+class TestNodeOutputCache:
+    """Test suite for NodeOutputCache"""
+
+    def test_get_put_stats(self, cache, tmp_path):
+        key = fingerprint("APP_TEST0001", ExtractedData())
+        assert cache.get("validate", key) is None
+
+        cache.put("validate", key, {"validation_report": ValidationReport(is_valid=True, data_completeness_score=0.9)})
+        # Another process sees the entry
+        restored = NodeOutputCache(str(tmp_path / "node_cache.db")).get("validate", key)
+        assert isinstance(restored["validation_report"], ValidationReport)
+        assert restored["validation_report"].data_completeness_score == 0.9
+
+        assert cache.get("validate", key) is not None
+        stats = cache.get_stats()["nodes"]["validate"]
+        assert stats == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_prune(self, cache):
+        cache.put("recommend", "a", {"recommendation": None})
+        assert cache.prune() == 0
+        assert cache.prune(max_age_seconds=-1) == 1
+        assert cache.get("recommend", "a") is None
+
+
+class TestIncrementalExtraction:
+    """DataExtractionAgent with a node cache"""
+
+    def test_only_changed_document_is_extracted(self, cache, monkeypatch):
+        import src.agents.extraction_agent as extraction_module
+        from src.agents.extraction_agent import DataExtractionAgent
+
+        extracted = []
+
+        async def fake_extract(func, doc_type, file_path):
+            extracted.append(file_path)
+            return {"source": file_path}, 1.0, 0.5, None
+
+        monkeypatch.setattr(extraction_module, "run_process", fake_extract)
+        agent = DataExtractionAgent(node_cache=cache)
+        documents = [
+            {"file_path": "bank_v1.pdf", "document_type": "bank_statement", "sha256": "aa" * 32},
+            {"file_path": "letter.pdf", "document_type": "employment_letter", "sha256": "bb" * 32}
+        ]
+
+        asyncio.run(agent.execute({"application_id": "APP_TEST0001", "documents": documents}))
+        assert sorted(extracted) == ["bank_v1.pdf", "letter.pdf"]
+
+        # The applicant re-uploads a corrected bank statement
+        documents[0] = {"file_path": "bank_v2.pdf", "document_type": "bank_statement", "sha256": "cc" * 32}
+        result = asyncio.run(agent.execute({"application_id": "APP_TEST0001", "documents": documents}))
+
+        assert sorted(extracted) == ["bank_v1.pdf", "bank_v2.pdf", "letter.pdf"]
+        assert [t["status"] for t in result["document_timings"]] == ["completed", "cached"]
+        assert result["extracted_data"].employment_data["source"] == "letter.pdf"
+        assert result["extracted_data"].income_data["source"] == "bank_v2.pdf"
+
+    def test_extractor_settings_change_invalidates(self, cache, monkeypatch):
+        import src.agents.extraction_agent as extraction_module
+        import src.services.ocr_templates as ocr_templates
+        from src.agents.extraction_agent import DataExtractionAgent
+
+        extracted = []
+
+        async def fake_extract(func, doc_type, file_path):
+            extracted.append(file_path)
+            return {"source": file_path}, 1.0, 0.5, None
+
+        monkeypatch.setattr(extraction_module, "run_process", fake_extract)
+        monkeypatch.setattr(ocr_templates, "_templates", dict(ocr_templates._templates))
+        agent = DataExtractionAgent(node_cache=cache)
+        documents = [{"file_path": "id.png", "document_type": "emirates_id", "sha256": "aa" * 32}]
+
+        def run():
+            asyncio.run(agent.execute({"application_id": "APP_TEST0001", "documents": documents}))
+            return len(extracted)
+
+        assert run() == 1
+        assert run() == 1
+        monkeypatch.setenv("EMIRATES_ID_OCR_TIERS", "fast,full")
+        assert run() == 2
+        monkeypatch.setenv("PDF_OCR_MAX_PAGES", "40")
+        assert run() == 3
+        ocr_templates.register_template(ocr_templates.OcrTemplate(
+            name="emirates_id_test", document_type="emirates_id", aspect_ratio=1.5, fields={}
+        ))
+        assert run() == 4
+        assert run() == 4
+
+    @pytest.mark.parametrize("data, stats", [
+        ({}, {}),
+        ({"source": "bank.pdf"}, {"pdf": {"ocr_failed_pages": [2], "ocr_skipped_pages": []}}),
+        ({"source": "bank.pdf"}, {"pdf": {"ocr_failed_pages": [], "ocr_skipped_pages": [9]}}),
+        ({"source": "id.png"}, {"ocr": {"tiers": [{"tier": "template", "failed": ["id_number"]}]}}),
+    ])
+    def test_incomplete_reads_are_not_cached(self, cache, monkeypatch, data, stats):
+        import src.agents.extraction_agent as extraction_module
+        from src.agents.extraction_agent import DataExtractionAgent
+
+        extracted = []
+
+        async def fake_extract(func, doc_type, file_path):
+            extracted.append(file_path)
+            return data, 1.0, 0.5, stats
+
+        monkeypatch.setattr(extraction_module, "run_process", fake_extract)
+        agent = DataExtractionAgent(node_cache=cache)
+        documents = [{"file_path": "bank.pdf", "document_type": "bank_statement", "sha256": "aa" * 32}]
+
+        for _ in range(2):
+            asyncio.run(agent.execute({"application_id": "APP_TEST0001", "documents": documents}))
+
+        assert extracted == ["bank.pdf", "bank.pdf"]
+
+
+class TestIncrementalPipeline:
+    """LangGraphOrchestrator with a node cache"""
+
+    def _orchestrator(self, cache, calls, income):
+        orchestrator = LangGraphOrchestrator(node_cache=cache)
+        orchestrator.register_agents(
+            CountingAgent(calls, "extract", lambda _: {"extracted_data": ExtractedData(income_data={"monthly_income": income["value"]})}),
+            CountingAgent(calls, "validate", lambda _: {"validation_report": ValidationReport(is_valid=True)}),
+            CountingAgent(
+                calls, "eligibility",
+                lambda data: {"eligibility_result": EligibilityResult(
+                    is_eligible=True,
+                    eligibility_score=1 - data["extracted_data"].income_data["monthly_income"] / 10000
+                )}
+            ),
+            CountingAgent(calls, "recommend", lambda _: {"recommendation": Recommendation(decision=DecisionType.APPROVED)}),
+            CountingAgent(calls, "explain", lambda _: {"explanation": Explanation(summary="Approved", detailed_reasoning="Low income")})
+        )
+        return orchestrator
+
+    def test_rerun_reuses_unchanged_nodes(self, cache):
+        calls = {}
+        income = {"value": 4000}
+        orchestrator = self._orchestrator(cache, calls, income)
+
+        first = asyncio.run(orchestrator.process_application("APP_TEST0001", "Test Applicant", []))
+        assert first["stage"] == "completed"
+        assert calls == {"extract": 1, "validate": 1, "eligibility": 1, "recommend": 1, "explain": 1}
+
+        # Same extracted content: only extraction runs again
+        second = asyncio.run(orchestrator.process_application("APP_TEST0001", "Test Applicant", []))
+        assert second["stage"] == "completed"
+        assert calls == {"extract": 2, "validate": 1, "eligibility": 1, "recommend": 1, "explain": 1}
+        assert second["eligibility_result"].eligibility_score == first["eligibility_result"].eligibility_score
+        assert cache.get_stats()["nodes"]["explain"]["hits"] == 1
+
+        # Changed income: every downstream node recomputes
+        income["value"] = 6000
+        third = asyncio.run(orchestrator.process_application("APP_TEST0001", "Test Applicant", []))
+        assert calls == {"extract": 3, "validate": 2, "eligibility": 2, "recommend": 2, "explain": 2}
+        assert third["eligibility_result"].eligibility_score == pytest.approx(0.4)
+
+    def test_cache_is_per_application(self, cache):
+        calls = {}
+        orchestrator = self._orchestrator(cache, calls, {"value": 4000})
+        asyncio.run(orchestrator.process_application("APP_TEST0001", "Test Applicant", []))
+        asyncio.run(orchestrator.process_application("APP_TEST0002", "Test Applicant", []))
+        assert calls["explain"] == 2
@@ -0,0 +1,339 @@
+"""
+Outbox Tests
+
+Verifies the transactional outbox behind ApplicationProcessor.persist:
+- Decision rows and outbox events commit or roll back together
+- Events are claimed once, completed, and supersede older snapshots
+- Failed projections are retried with backoff, then dead-lettered
+- Claims are serialised per application; applied events are pruned
+- OutboxProjector applies handlers and records lag and timings
+- Graph projections from several processes merge into one graphml file
+- persist() queues projections instead of applying them inline
+"""
+
+import asyncio
+import networkx as nx
+import pytest
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.databases.prod_sqlite_manager import SQLiteManager
+from src.services.application_processor import ApplicationProcessor
+from src.services.outbox_projector import OutboxProjector
+
+
+def _decision(app_id: str) -> dict:
+    return {
+        "decision_id": f"DEC_{app_id}",
+        "app_id": app_id,
+        "decision": "approved",
+        "decision_date": "2026-01-01 00:00:00",
+        "decided_by": "SYSTEM",
+        "policy_score": 0.8,
+        "ml_score": None,
+        "priority": "high",
+        "reasoning": "[]",
+        "support_type": "monthly",
+        "support_amount": 2500,
+        "duration_months": None,
+        "conditions": None
+    }
+
+
+def _stored_decision(sqlite_db, app_id: str):
+    with sqlite_db.get_connection() as conn:
+        row = conn.execute("SELECT * FROM decisions WHERE app_id = ?", (app_id,)).fetchone()
+    return dict(row) if row else None
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """SQLite manager with an isolated database"""
+    return SQLiteManager(str(tmp_path / "applications.db"))
+
+
+class TestOutboxTable:
+    """Test suite for the SQLiteManager outbox methods"""
+
+    def test_transaction_is_atomic(self, sqlite_db):
+        """A failure inside the block discards both the decision and its event"""
+        with pytest.raises(RuntimeError):
+            with sqlite_db.transaction():
+                sqlite_db.insert_decision(_decision("APP_TEST0001"))
+                sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"decision": "approved"})
+                raise RuntimeError("boom")
+
+        assert _stored_decision(sqlite_db, "APP_TEST0001") is None
+        assert sqlite_db.claim_outbox_events("projector-a") == []
+
+        with sqlite_db.transaction():
+            sqlite_db.insert_decision(_decision("APP_TEST0001"))
+            sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"decision": "approved"})
+
+        assert _stored_decision(sqlite_db, "APP_TEST0001") is not None
+        assert sqlite_db.get_outbox_stats()["backlog"] == 1
+
+    def test_claim_complete_and_supersede(self, sqlite_db):
+        """Claimed events are not handed out twice; completing one supersedes older snapshots"""
+        sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"version": 1})
+        sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"version": 2})
+        sqlite_db.add_outbox_event("APP_TEST0001", "graph.update", {"version": 1})
+
+        first = sqlite_db.claim_outbox_events("projector-a", limit=1)
+        assert [e["payload"] for e in first] == [{"version": 1}]
+        assert first[0]["attempts"] == 1
+
+        sqlite_db.complete_outbox_event(first[0]["event_id"])
+        rest = sqlite_db.claim_outbox_events("projector-b")
+        assert [(e["event_type"], e["payload"]["version"]) for e in rest] == [
+            ("cache.update", 2), ("graph.update", 1)
+        ]
+        assert sqlite_db.claim_outbox_events("projector-c") == []
+
+        sqlite_db.complete_outbox_event(rest[0]["event_id"])
+        stats = sqlite_db.get_outbox_stats()
+        assert stats["counts"] == {"done": 2, "processing": 1}
+
+    def test_claims_serialised_per_aggregate(self, sqlite_db):
+        """An application leased to one projector is not handed to another until released"""
+        sqlite_db.add_outbox_event("APP_TEST0001", "graph.update", {"version": 1})
+        first = sqlite_db.claim_outbox_events("projector-a", limit=1)
+
+        sqlite_db.add_outbox_event("APP_TEST0001", "graph.update", {"version": 2})
+        sqlite_db.add_outbox_event("APP_TEST0002", "graph.update", {"version": 1})
+        other = sqlite_db.claim_outbox_events("projector-b")
+        assert [e["aggregate_id"] for e in other] == ["APP_TEST0002"]
+
+        sqlite_db.complete_outbox_event(first[0]["event_id"])
+        newer = sqlite_db.claim_outbox_events("projector-b")
+        assert [(e["aggregate_id"], e["payload"]["version"]) for e in newer] == [("APP_TEST0001", 2)]
+
+    def test_prune_keeps_unapplied_events(self, sqlite_db):
+        """Only done/superseded events past the retention window are deleted"""
+        for version in (1, 2):
+            sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"version": version})
+        sqlite_db.add_outbox_event("APP_TEST0001", "vectors.index", {})
+        sqlite_db.add_outbox_event("APP_TEST0002", "cache.update", {})
+        events = sqlite_db.claim_outbox_events("projector-a", limit=3)
+        sqlite_db.fail_outbox_event(events[0]["event_id"], "timeout", retry_at=time.time() + 60)
+        sqlite_db.complete_outbox_event(events[1]["event_id"])
+        sqlite_db.fail_outbox_event(events[2]["event_id"], "chroma offline")
+
+        assert sqlite_db.prune_outbox(max_age_seconds=3600) == 0
+        assert sqlite_db.prune_outbox(max_age_seconds=-1) == 2
+        assert sqlite_db.get_outbox_stats()["counts"] == {"dead": 1, "pending": 1}
+
+    def test_supersede_pending_snapshot(self, sqlite_db):
+        """An applied newer snapshot makes older pending ones redundant"""
+        sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"version": 1})
+        sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"version": 2})
+        events = sqlite_db.claim_outbox_events("projector-a")
+
+        sqlite_db.fail_outbox_event(events[0]["event_id"], "timeout", retry_at=time.time() + 60)
+        assert sqlite_db.complete_outbox_event(events[1]["event_id"]) == 1
+        assert sqlite_db.get_outbox_stats()["counts"] == {"done": 1, "superseded": 1}
+
+    def test_retry_and_dead_letter(self, sqlite_db):
+        """Retries wait for next_attempt_at; dead events are never claimed again"""
+        sqlite_db.add_outbox_event("APP_TEST0001", "vectors.index", {})
+        event = sqlite_db.claim_outbox_events("projector-a")[0]
+
+        sqlite_db.fail_outbox_event(event["event_id"], "chroma offline", retry_at=time.time() + 60)
+        assert sqlite_db.claim_outbox_events("projector-a") == []
+
+        sqlite_db.fail_outbox_event(event["event_id"], "chroma offline", retry_at=time.time() - 1)
+        retried = sqlite_db.claim_outbox_events("projector-a")
+        assert retried[0]["attempts"] == 2
+        assert retried[0]["last_error"] == "chroma offline"
+
+        sqlite_db.fail_outbox_event(event["event_id"], "chroma offline")
+        assert sqlite_db.claim_outbox_events("projector-a") == []
+        assert sqlite_db.get_outbox_stats() == {"counts": {"dead": 1}, "backlog": 0, "lag_seconds": 0.0}
+
+    def test_expired_lease_is_reclaimed(self, sqlite_db):
+        """Events of a crashed projector are picked up once the lease expires"""
+        sqlite_db.add_outbox_event("APP_TEST0001", "graph.update", {})
+        sqlite_db.claim_outbox_events("projector-a", lease_seconds=-1)
+        reclaimed = sqlite_db.claim_outbox_events("projector-b")
+        assert reclaimed[0]["claimed_by"] == "projector-b"
+
+
+class TestOutboxProjector:
+    """Test suite for OutboxProjector"""
+
+    def test_applies_handlers(self, sqlite_db):
+        """Each event is passed to its handler and marked done"""
+        applied = []
+        projector = OutboxProjector(sqlite_db, {
+            "cache.update": lambda app_id, payload: applied.append(("cache", app_id, payload)),
+            "graph.update": lambda app_id, payload: applied.append(("graph", app_id, payload))
+        })
+        sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {"decision": "approved"})
+        sqlite_db.add_outbox_event("APP_TEST0001", "graph.update", {"decision": "approved"})
+
+        assert asyncio.run(projector.run_once()) == 2
+        assert applied == [
+            ("cache", "APP_TEST0001", {"decision": "approved"}),
+            ("graph", "APP_TEST0001", {"decision": "approved"})
+        ]
+
+        stats = projector.get_stats()
+        assert stats["applied"] == 2
+        assert stats["by_type"]["cache.update"]["applied"] == 1
+        assert stats["last_lag_seconds"] >= 0
+        assert stats["outbox"]["counts"] == {"done": 2}
+
+    def test_retries_then_dead_letters(self, sqlite_db):
+        """A failing handler is retried with backoff until max_attempts"""
+        def failing(app_id, payload):
+            raise ConnectionError("chroma offline")
+
+        projector = OutboxProjector(sqlite_db, {"vectors.index": failing}, max_attempts=2, base_backoff=0)
+        sqlite_db.add_outbox_event("APP_TEST0001", "vectors.index", {})
+
+        assert asyncio.run(projector.run_once()) == 1
+        assert sqlite_db.get_outbox_stats()["counts"] == {"pending": 1}
+        assert asyncio.run(projector.run_once()) == 1
+
+        stats = projector.get_stats()
+        assert stats["retried"] == 1
+        assert stats["dead"] == 1
+        assert stats["by_type"]["vectors.index"]["failed_attempts"] == 2
+        assert stats["outbox"]["counts"] == {"dead": 1}
+
+    def test_prunes_applied_events(self, sqlite_db):
+        """Applied events are pruned every prune_every applications"""
+        projector = OutboxProjector(
+            sqlite_db, {"cache.update": lambda app_id, payload: None},
+            retention_seconds=-1, prune_every=2
+        )
+        sqlite_db.add_outbox_event("APP_TEST0001", "cache.update", {})
+        sqlite_db.add_outbox_event("APP_TEST0002", "cache.update", {})
+
+        assert asyncio.run(projector.run_once()) == 2
+        assert projector.get_stats()["pruned"] == 2
+        assert sqlite_db.get_outbox_stats()["counts"] == {}
+
+    def test_unknown_event_type_dead_lettered(self, sqlite_db):
+        projector = OutboxProjector(sqlite_db, {})
+        sqlite_db.add_outbox_event("APP_TEST0001", "search.index", {})
+        asyncio.run(projector.run_once())
+        assert projector.get_stats()["dead"] == 1
+
+
+class TestSharedGraphml:
+    """Graph projections from several processes merge into one graphml file"""
+
+    def _manager(self, tmp_path):
+        from src.databases.networkx_manager import NetworkXManager
+        return NetworkXManager(persist_path=str(tmp_path / "networkx"))
+
+    @pytest.fixture
+    def graph_path(self, tmp_path):
+        """Graph file as written by a previous run"""
+        path = tmp_path / "graph.graphml"
+        seed = nx.DiGraph()
+        seed.add_node("PROG_Seed", node_type="program")
+        nx.write_graphml(seed, str(path))
+        return str(path)
+
+    def test_writers_do_not_drop_each_others_nodes(self, tmp_path, graph_path):
+        api, worker = self._manager(tmp_path), self._manager(tmp_path)
+
+        with worker.graphml_transaction(graph_path):
+            worker.create_application_node("APP_TEST0001", "Worker Applicant", {"decision": "approved"})
+        with api.graphml_transaction(graph_path):
+            api.create_application_node("APP_TEST0002", "API Applicant", {"decision": "declined"})
+
+        on_disk = nx.read_graphml(graph_path)
+        assert {"PROG_Seed", "APP_APP_TEST0001", "APP_APP_TEST0002"} <= set(on_disk.nodes)
+
+        assert worker.sync_graphml(graph_path) is True
+        assert "APP_APP_TEST0002" in worker.graph
+        assert worker.sync_graphml(graph_path) is False
+
+    def test_disk_attributes_win_on_sync(self, tmp_path, graph_path):
+        stale, fresh = self._manager(tmp_path), self._manager(tmp_path)
+
+        with stale.graphml_transaction(graph_path):
+            stale.create_application_node("APP_TEST0001", "Applicant", {"decision": "pending"})
+        with fresh.graphml_transaction(graph_path) as graph:
+            graph.nodes["APP_APP_TEST0001"]["decision"] = "approved"
+
+        stale.sync_graphml(graph_path)
+        assert stale.graph.nodes["APP_APP_TEST0001"]["decision"] == "approved"
+
+
+class TestPersistWithOutbox:
+    """ApplicationProcessor.persist queues projections"""
+
+    @pytest.fixture
+    def final_state(self):
+        eligibility = SimpleNamespace(
+            eligibility_score=0.82, ml_prediction={"probability": 0.9},
+            is_eligible=True, reasoning=["Income below threshold"]
+        )
+        recommendation = SimpleNamespace(
+            decision="approved", financial_support_amount=2500.0,
+            financial_support_type="monthly", economic_enablement_programs=[],
+            reasoning="Eligible"
+        )
+        return {
+            "application_id": "APP_TEST0001",
+            "stage": "completed",
+            "eligibility_result": eligibility,
+            "recommendation": recommendation
+        }
+
+    def _processor(self, sqlite_db, tmp_path, use_outbox):
+        networkx_db = MagicMock()
+        networkx_db.graph = nx.DiGraph()
+        return ApplicationProcessor(
+            orchestrator=MagicMock(),
+            sqlite_db=sqlite_db,
+            tinydb_cache=MagicMock(),
+            chroma_db=MagicMock(),
+            networkx_db=networkx_db,
+            graph_path=str(tmp_path / "graph.graphml"),
+            use_outbox=use_outbox
+        )
+
+    def test_persist_enqueues_projections(self, sqlite_db, final_state, tmp_path):
+        processor = self._processor(sqlite_db, tmp_path, use_outbox=True)
+        processor.persist("APP_TEST0001", final_state)
+
+        assert _stored_decision(sqlite_db, "APP_TEST0001")["decision"] == "approved"
+        processor.tinydb_cache.store_app_context.assert_not_called()
+        processor.chroma_db.index_application_summary.assert_not_called()
+
+        events = sqlite_db.claim_outbox_events("projector-a")
+        assert [e["event_type"] for e in events] == ["cache.update", "graph.update", "vectors.index"]
+        assert events[0]["payload"]["decision"] == "approved"
+        assert events[0]["payload"]["support_amount"] == 2500.0
+
+    def test_projector_applies_persisted_events(self, sqlite_db, final_state, tmp_path):
+        processor = self._processor(sqlite_db, tmp_path, use_outbox=True)
+        processor.persist("APP_TEST0001", final_state)
+
+        projector = OutboxProjector(sqlite_db, processor.projection_handlers())
+        assert asyncio.run(projector.run_once()) == 3
+
+        assert processor.tinydb_cache.store_app_context.call_count == 2
+        processor.networkx_db.create_application_node.assert_called_once()
+        processor.chroma_db.index_case_decision.assert_called_once()
+        assert sqlite_db.get_outbox_stats()["counts"] == {"done": 3}
+
+    def test_persist_inline_without_outbox(self, sqlite_db, final_state, tmp_path):
+        processor = self._processor(sqlite_db, tmp_path, use_outbox=False)
+        processor.persist("APP_TEST0001", final_state)
+
+        assert processor.tinydb_cache.store_app_context.call_count == 2
+        processor.chroma_db.index_application_summary.assert_called_once()
+        assert sqlite_db.claim_outbox_events("projector-a") == []
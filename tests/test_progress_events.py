@@ -0,0 +1,137 @@
+"""
+Progress Event Tests
+
+Verifies the progress event bus behind GET /api/applications/{id}/events:
+- Events are stored in order and can be resumed after an event ID
+- Replay starts at the current processing run
+- Streams wake on publish, send heartbeats and end on terminal events
+- Orchestrator nodes publish start/finish events with timings
+"""
+
+import asyncio
+import pytest
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.progress_events import ProgressEventBus
+
+
+class TestProgressEventBus:
+    """Test suite for ProgressEventBus"""
+
+    @pytest.fixture
+    def bus(self, tmp_path):
+        """Event bus with an isolated database"""
+        return ProgressEventBus(str(tmp_path / "progress_events.db"))
+
+    def test_publish_and_fetch(self, bus):
+        """Events are returned in order and filtered by after_id"""
+        first = bus.publish("APP_TEST0001", "job_queued", job_id="JOB_1")
+        bus.publish("APP_TEST0001", "node_started", node="extract")
+        bus.publish("APP_OTHER", "job_queued", job_id="JOB_2")
+
+        events = bus.fetch("APP_TEST0001")
+        assert [e["event"] for e in events] == ["job_queued", "node_started"]
+        assert events[0]["job_id"] == "JOB_1"
+
+        resumed = bus.fetch("APP_TEST0001", after_id=first["event_id"])
+        assert [e["node"] for e in resumed] == ["extract"]
+
+    def test_replay_starts_at_current_run(self, bus):
+        """Events of an earlier run (including its terminal event) are skipped"""
+        bus.publish("APP_TEST0001", "job_queued", job_id="JOB_1")
+        bus.publish("APP_TEST0001", "job_failed", job_id="JOB_1")
+        second = bus.publish("APP_TEST0001", "job_queued", job_id="JOB_2")
+
+        cursor = bus.current_run_start("APP_TEST0001")
+        assert [e["event_id"] for e in bus.fetch("APP_TEST0001", after_id=cursor)] == [second["event_id"]]
+        assert bus.current_run_start("APP_UNKNOWN") == 0
+
+    def test_stream_until_terminal_event(self, bus):
+        """A live stream receives events published from another thread and then ends"""
+        async def consume():
+            received = []
+            async for event in bus.stream("APP_TEST0001", poll_interval=5.0, timeout=10):
+                received.append(event["event"])
+                if event["event"] == "job_queued":
+                    assert bus.subscriber_count() == 1
+                    threading.Thread(target=publish_rest).start()
+            return received
+
+        def publish_rest():
+            bus.publish("APP_TEST0001", "node_completed", node="extract", duration_ms=12.5)
+            bus.publish("APP_TEST0001", "job_succeeded", job_id="JOB_1")
+            bus.publish("APP_TEST0001", "node_started", node="after_terminal")
+
+        bus.publish("APP_TEST0001", "job_queued", job_id="JOB_1")
+        # Poll interval is long, so finishing quickly relies on in-process wake-ups
+        received = asyncio.run(asyncio.wait_for(consume(), timeout=5))
+
+        assert received == ["job_queued", "node_completed", "job_succeeded"]
+        assert bus.subscriber_count() == 0
+
+    def test_stream_heartbeat_and_timeout(self, bus):
+        """Idle streams yield None heartbeats and close at the timeout"""
+        async def consume():
+            return [event async for event in bus.stream(
+                "APP_TEST0001", poll_interval=0.05, heartbeat_interval=0.1, timeout=0.35
+            )]
+
+        received = asyncio.run(consume())
+        assert received and all(event is None for event in received)
+
+    def test_stream_sees_other_process_writes(self, tmp_path, bus):
+        """Events written through another connection are picked up by polling"""
+        other = ProgressEventBus(str(tmp_path / "progress_events.db"))
+
+        async def consume():
+            received = []
+            async for event in bus.stream("APP_TEST0001", after_id=0, poll_interval=0.05, timeout=5):
+                received.append(event["event"])
+            return received
+
+        async def run():
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.1)
+            other.publish("APP_TEST0001", "job_failed", error="boom")
+            return await task
+
+        assert asyncio.run(run()) == ["job_failed"]
+
+    def test_prune(self, bus):
+        """Old events are removed"""
+        bus.publish("APP_TEST0001", "job_queued")
+        assert bus.prune(max_age_seconds=3600) == 0
+        assert bus.prune(max_age_seconds=-1) == 1
+        assert bus.fetch("APP_TEST0001") == []
+
+
+class TestOrchestratorProgressHooks:
+    """Node wrappers publish progress events"""
+
+    def test_node_events(self, tmp_path):
+        from src.core.langgraph_orchestrator import LangGraphOrchestrator
+
+        bus = ProgressEventBus(str(tmp_path / "progress_events.db"))
+        orchestrator = LangGraphOrchestrator(event_bus=bus)
+
+        async def failing_node(state):
+            state["stage"] = "validating"
+            state["errors"].append("Validation error: boom")
+            return state
+
+        node = orchestrator._with_progress("validate", failing_node)
+        asyncio.run(node({"application_id": "APP_TEST0001", "errors": ["earlier"]}))
+
+        started, completed = bus.fetch("APP_TEST0001")
+        assert started["event"] == "node_started" and started["node"] == "validate"
+        assert completed["event"] == "node_completed"
+        assert completed["status"] == "failed"
+        assert completed["errors"] == ["Validation error: boom"]
+        assert completed["stage"] == "validating"
+        assert completed["duration_ms"] >= 0
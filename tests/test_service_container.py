@@ -0,0 +1,90 @@
+"""
+Service Container Tests
+
+Verifies the shared service container:
+- Each store is created exactly once and shared by UnifiedDatabaseManager
+- The RAG chatbot reuses the shared UnifiedDatabaseManager
+- Readiness is only reported after warm-up
+"""
+
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.container import ServiceContainer
+
+
+class TestServiceContainer:
+    """Test suite for ServiceContainer"""
+
+    @pytest.fixture
+    def services(self, tmp_path):
+        """Container with isolated stores"""
+        return ServiceContainer(
+            sqlite_path=str(tmp_path / "applications.db"),
+            tinydb_path=str(tmp_path / "cache.json"),
+            chroma_dir=str(tmp_path / "chromadb"),
+            graph_path=str(tmp_path / "graph.graphml"),
+            state_store_path=str(tmp_path / "app_state.db"),
+            events_path=str(tmp_path / "progress_events.db"),
+            checkpoint_path=str(tmp_path / "checkpoints.db"),
+            node_cache_path=str(tmp_path / "node_cache.db"),
+            timeline_path=str(tmp_path / "timelines.db"),
+            trace_dir=str(tmp_path / "traces")
+        )
+
+    def test_warm_creates_each_store_once(self, services):
+        """Warm-up builds every component and shares the stores"""
+        assert not services.ready
+        assert services.get_status()["ready"] is False
+
+        asyncio.run(services.warm())
+
+        assert services.ready
+        assert services.sqlite is services.sqlite
+        assert services.unified_db.sqlite is services.sqlite
+        assert services.unified_db.tinydb is services.tinydb
+        assert services.unified_db.chromadb is services.chroma
+        assert services.unified_db.networkx is services.networkx
+        assert services.rag_chatbot.db_manager is services.unified_db
+        assert services.orchestrator.state_store is services.state_store
+        assert services.orchestrator.event_bus is services.progress_events
+        assert services.orchestrator.checkpointer is services.checkpointer
+        assert services.orchestrator.node_cache is services.node_cache
+        assert services.orchestrator.timeline_store is services.timeline_store
+        assert services.orchestrator.trace_store is services.trace_store
+        assert services.orchestrator.langfuse is services.tracer
+        assert services.agents["extraction_agent"].node_cache is services.node_cache
+
+        status = services.get_status()
+        assert status["ready"] is True
+        assert {"sqlite", "tinydb", "chroma", "networkx", "agents", "orchestrator"} <= set(status["components"])
+
+    def test_orchestrator_registers_shared_agents(self, services):
+        """Orchestrator uses the container's agent instances"""
+        orchestrator = services.orchestrator
+        assert orchestrator.eligibility_agent is services.agents["eligibility_agent"]
+        assert orchestrator.rag_chatbot_agent is services.rag_chatbot
+
+    def test_worker_container_skips_chatbot(self, tmp_path):
+        """Workers do not build the RAG chatbot"""
+        services = ServiceContainer(
+            sqlite_path=str(tmp_path / "applications.db"),
+            tinydb_path=str(tmp_path / "cache.json"),
+            chroma_dir=str(tmp_path / "chromadb"),
+            state_store_path=str(tmp_path / "app_state.db"),
+            events_path=str(tmp_path / "progress_events.db"),
+            checkpoint_path=str(tmp_path / "checkpoints.db"),
+            node_cache_path=str(tmp_path / "node_cache.db"),
+            timeline_path=str(tmp_path / "timelines.db"),
+            trace_dir=str(tmp_path / "traces"),
+            include_chatbot=False
+        )
+        processor = services.application_processor()
+        assert processor.sqlite_db is services.sqlite
+        assert "rag_chatbot" not in services.get_status()["components"]
@@ -0,0 +1,247 @@
+"""
+Simulation Engine Tests
+
+Verifies native what-if re-scoring:
+- Changes are applied to a copy of ExtractedData (net worth follows
+  assets/liabilities, employment status is normalised)
+- The simulated outcome equals a rerun of the eligibility and
+  recommendation agents with the changed data
+- Unknown fields and non-numeric values are rejected
+- Works without a validation report and with database-rebuilt dict results
+- Sensitivity sweeps score a grid in one batch with the same scores as
+  one-at-a-time simulations, and report where the decision flips
+"""
+
+import asyncio
+import numpy as np
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.agents.eligibility_agent import EligibilityAgent
+from src.agents.recommendation_agent import RecommendationAgent
+from src.core.types import ExtractedData, ValidationReport
+from src.services.simulation import SimulationEngine, normalise_employment_status
+
+
+def _extracted_data():
+    return ExtractedData(
+        applicant_info={"full_name": "Test User", "nationality": "UAE"},
+        income_data={"monthly_income": 3500.0, "monthly_expenses": 5200.0},
+        employment_data={"employment_status": "unemployed", "years_of_experience": 1},
+        assets_liabilities={"total_assets": 15000.0, "total_liabilities": 9000.0, "net_worth": 6000.0},
+        credit_data={"credit_score": "640"},
+        family_info={"family_size": 5, "housing_type": "rent"},
+        raw_ocr_text={"bank_statement": "..." * 1000}
+    )
+
+
+@pytest.fixture(scope="module")
+def agents():
+    return EligibilityAgent(), RecommendationAgent()
+
+
+@pytest.fixture
+def engine(agents):
+    return SimulationEngine(*agents)
+
+
+def _score(agents, extracted_data, validation_report):
+    eligibility_agent, recommendation_agent = agents
+
+    async def run():
+        eligibility = await eligibility_agent.execute({
+            "application_id": "APP_TEST0001",
+            "extracted_data": extracted_data,
+            "validation_report": validation_report
+        })
+        recommendation = await recommendation_agent.execute({
+            "application_id": "APP_TEST0001",
+            "extracted_data": extracted_data,
+            "eligibility_result": eligibility["eligibility_result"]
+        })
+        return eligibility["eligibility_result"], recommendation["recommendation"]
+
+    return asyncio.run(run())
+
+
+def _state(agents, validation_report=ValidationReport(is_valid=True, confidence_score=0.9)):
+    extracted_data = _extracted_data()
+    eligibility_result, recommendation = _score(agents, extracted_data, validation_report)
+    return {
+        "application_id": "APP_TEST0001",
+        "extracted_data": extracted_data,
+        "validation_report": validation_report,
+        "eligibility_result": eligibility_result,
+        "recommendation": recommendation
+    }
+
+
+class TestApplyChanges:
+    """Test suite for SimulationEngine.apply_changes"""
+
+    def test_copy_with_changes(self, engine):
+        original = _extracted_data()
+        simulated = engine.apply_changes(original, {
+            "monthly_income": "8000",
+            "total_liabilities": 20000,
+            "employment_status": "Government Employee"
+        })
+
+        assert simulated.income_data["monthly_income"] == 8000.0
+        assert simulated.assets_liabilities["net_worth"] == -5000.0
+        assert simulated.employment_data["employment_status"] == "employed"
+        assert simulated.raw_ocr_text == {}
+        # The stored data is untouched
+        assert original.income_data["monthly_income"] == 3500.0
+        assert original.assets_liabilities["net_worth"] == 6000.0
+
+    def test_invalid_changes(self, engine):
+        with pytest.raises(ValueError, match="Unknown fields: salary_bonus"):
+            engine.apply_changes(_extracted_data(), {"salary_bonus": 100})
+        with pytest.raises(ValueError, match="monthly_income must be a number"):
+            engine.apply_changes(_extracted_data(), {"monthly_income": "a lot"})
+
+    def test_normalise_employment_status(self):
+        assert normalise_employment_status("Unemployed") == "unemployed"
+        assert normalise_employment_status("Self Employed") == "self_employed"
+        assert normalise_employment_status("Private Sector Employee") == "employed"
+        assert normalise_employment_status("retired") == "retired"
+
+
+class TestSimulate:
+    """Test suite for SimulationEngine.simulate"""
+
+    def test_no_change_reproduces_current(self, engine, agents):
+        result = asyncio.run(engine.simulate("APP_TEST0001", _state(agents), {"family_size": 5}))
+
+        assert result["simulated"] == result["current"]
+        assert result["delta"] == {"eligibility_score": 0.0, "support_amount": 0.0, "decision_changed": False}
+        assert result["changed_fields"] == {"family_size": {"from": 5, "to": 5.0}}
+
+    def test_matches_agent_rerun(self, engine, agents):
+        state = _state(agents)
+        result = asyncio.run(engine.simulate("APP_TEST0001", state, {"monthly_income": 9500, "total_assets": 90000}))
+
+        changed = _extracted_data()
+        changed.income_data["monthly_income"] = 9500
+        changed.assets_liabilities.update(total_assets=90000, net_worth=81000)
+        eligibility_result, recommendation = _score(agents, changed, state["validation_report"])
+
+        assert result["simulated"]["eligibility_score"] == round(eligibility_result.eligibility_score, 4)
+        assert result["simulated"]["decision"] == recommendation.decision.value
+        assert result["simulated"]["support_amount"] == (recommendation.financial_support_amount or 0.0)
+        assert result["delta"]["eligibility_score"] < 0
+        assert result["duration_ms"] < 5000
+
+    def test_without_validation_report_and_dict_results(self, engine, agents):
+        state = _state(agents, validation_report=None)
+        state["eligibility_result"] = {"eligibility_score": 0.5, "is_eligible": False}
+        state["recommendation"] = None
+
+        result = asyncio.run(engine.simulate("APP_TEST0001", state, {"credit_score": 720}))
+        assert result["current"]["eligibility_score"] == 0.5
+        assert result["current"]["decision"] is None
+        assert result["delta"]["support_amount"] is None
+        assert 0.0 <= result["simulated"]["eligibility_score"] <= 1.0
+
+    def test_requires_extracted_data(self, engine):
+        with pytest.raises(ValueError):
+            asyncio.run(engine.simulate("APP_TEST0001", {"extracted_data": None}, {"monthly_income": 1}))
+
+
+class CountingModel:
+    """Estimator stand-in: approval probability falls with income, counts calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+    def predict_proba(self, X):
+        self.calls += 1
+        approve = 1.0 / (1.0 + np.exp(X[:, 0]))
+        return np.column_stack([1.0 - approve, approve])
+
+
+class IdentityScaler:
+    def transform(self, X):
+        return (np.asarray(X, dtype=float) - 5000.0) / 1000.0
+
+
+class TestSensitivity:
+    """Test suite for SimulationEngine.sensitivity"""
+
+    def test_matches_one_at_a_time(self, engine, agents):
+        state = _state(agents)
+        result = asyncio.run(engine.sensitivity("APP_TEST0001", state, [
+            {"feature": "monthly_income", "start": 0, "stop": 12000, "steps": 13},
+            {"feature": "total_liabilities", "values": [0, 40000, 120000]}
+        ]))
+
+        assert result["scenarios"] == 39
+        assert result["current"]["eligibility_score"] == round(state["eligibility_result"].eligibility_score, 4)
+        for i, income in enumerate(result["axes"]["monthly_income"]):
+            for j, liabilities in enumerate(result["axes"]["total_liabilities"]):
+                single = asyncio.run(engine.simulate(
+                    "APP_TEST0001", state, {"monthly_income": income, "total_liabilities": liabilities}
+                ))
+                assert result["scores"][i][j] == single["simulated"]["eligibility_score"]
+                assert result["eligible"][i][j] == single["simulated"]["is_eligible"]
+
+    def test_boundary(self, engine, agents):
+        result = asyncio.run(engine.sensitivity("APP_TEST0001", _state(agents), [
+            {"feature": "monthly_income", "start": 0, "stop": 15000, "steps": 31},
+            {"feature": "family_size", "values": [5, 1]}
+        ]))
+
+        incomes = result["axes"]["monthly_income"]
+        assert result["axes"]["family_size"] == [1.0, 5.0]
+        expected = []
+        for j, family_size in enumerate(result["axes"]["family_size"]):
+            eligible = [row[j] for row in result["eligible"]]
+            expected += [
+                {"monthly_income": [incomes[i], incomes[i + 1]], "family_size": family_size, "eligible_after": eligible[i + 1]}
+                for i in range(len(eligible) - 1) if eligible[i] != eligible[i + 1]
+            ]
+        assert result["boundary"] == expected
+        # A single applicant loses eligibility above the income threshold; a family of five keeps it
+        assert [point["family_size"] for point in result["boundary"]] == [1.0]
+        assert result["boundary"][0]["monthly_income"] == [8000.0, 8500.0]
+        assert result["boundary"][0]["eligible_after"] is False
+
+    def test_one_model_call(self, agents):
+        eligibility_agent = EligibilityAgent()
+        model = CountingModel()
+        eligibility_agent.ml_model, eligibility_agent.feature_scaler = model, IdentityScaler()
+        engine = SimulationEngine(eligibility_agent, agents[1])
+        state = _state((eligibility_agent, agents[1]))
+        model.calls = 0
+
+        result = asyncio.run(engine.sensitivity("APP_TEST0001", state, [
+            {"feature": "monthly_income", "start": 0, "stop": 10000, "steps": 50},
+            {"feature": "family_size", "values": [1, 2, 3, 4, 5, 6, 7, 8]}
+        ]))
+        assert result["scenarios"] == 400
+        assert model.calls == 1
+        single = asyncio.run(engine.simulate("APP_TEST0001", state, {"monthly_income": result["axes"]["monthly_income"][7]}))
+        assert result["scores"][7][4] == single["simulated"]["eligibility_score"]
+
+    def test_invalid_axes(self, agents):
+        engine = SimulationEngine(*agents, max_scenarios=100)
+        state = _state(agents)
+        for axes, message in [
+            ([], "one or two axes"),
+            ([{"feature": "nationality", "values": [1]}], "Unknown feature"),
+            ([{"feature": "monthly_income"}], "values or start/stop/steps"),
+            ([{"feature": "credit_score", "values": [1]}, {"feature": "credit_score", "values": [2]}], "twice"),
+            ([{"feature": "monthly_income", "start": 0, "stop": 1, "steps": 11},
+              {"feature": "family_size", "start": 1, "stop": 10, "steps": 10}], "110 scenarios")
+        ]:
+            with pytest.raises(ValueError, match=message):
+                asyncio.run(engine.sensitivity("APP_TEST0001", state, axes))
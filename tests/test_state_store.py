@@ -0,0 +1,314 @@
+"""
+Application State Store Tests
+
+Verifies the shared application state store:
+- ApplicationState and graph-state dicts round-trip through the JSON codec
+- SQLite put / get / version / update / list / delete
+- Atomic update() and the in-memory backend
+- The store modules import without a cycle through src.core
+- Chat turns are appended atomically to dict and ApplicationState state
+- The in-memory byte budget spills LRU applications without a run in
+  flight to SQLite and reloads them on access
+"""
+
+import asyncio
+import pytest
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.types import (
+    ApplicationState, Document, ExtractedData, Recommendation,
+    DecisionType, ProcessingStage
+)
+from src.core.state_codec import encode_state, decode_state
+from src.services.state_store import (
+    InMemoryApplicationStateStore, SQLiteApplicationStateStore, create_state_store
+)
+
+
+def _sample_state(application_id: str = "APP_TEST0001") -> ApplicationState:
+    state = ApplicationState(application_id=application_id, applicant_name="Test User")
+    state.stage = ProcessingStage.COMPLETED
+    state.documents.append(Document(
+        document_id="DOC1",
+        document_type="bank_statement",
+        filename="bank_statement.pdf",
+        file_path="data/uploads/bank_statement.pdf",
+        sha256="ab" * 32,
+        size_bytes=1024,
+        page_count=2
+    ))
+    state.extracted_data = ExtractedData(
+        applicant_info={"full_name": "Test User"},
+        income_data={"monthly_income": 4500.0},
+        family_info={"family_size": 4}
+    )
+    state.recommendation = Recommendation(
+        decision=DecisionType.APPROVED,
+        financial_support_amount=2500.0,
+        key_factors=["low income"]
+    )
+    return state
+
+
+class TestStateCodec:
+    """Test suite for the JSON state codec"""
+
+    def test_application_state_round_trip(self):
+        """Dataclasses, enums and datetimes are rebuilt as the same types"""
+        state = _sample_state()
+        decoded = decode_state(encode_state(state))
+
+        assert isinstance(decoded, ApplicationState)
+        assert decoded.stage is ProcessingStage.COMPLETED
+        assert isinstance(decoded.documents[0], Document)
+        assert decoded.documents[0].sha256 == state.documents[0].sha256
+        assert isinstance(decoded.documents[0].uploaded_at, datetime)
+        assert decoded.extracted_data.income_data["monthly_income"] == 4500.0
+        assert decoded.recommendation.decision is DecisionType.APPROVED
+        assert decoded == state
+
+    def test_graph_state_dict_round_trip(self):
+        """LangGraph state dicts keep tuples, non-string keys and nested dataclasses"""
+        graph_state = {
+            "application_id": "APP_TEST0002",
+            "stage": ProcessingStage.VALIDATING,
+            "extracted_data": ExtractedData(credit_data={"credit_score": 700}),
+            "node_status": {"extract": "completed"},
+            "bounds": (1, 2),
+            "by_rank": {1: "first"},
+            "errors": []
+        }
+        assert decode_state(encode_state(graph_state)) == graph_state
+
+
+class TestImports:
+    """The store modules import on their own (no cycle through src.core)"""
+
+    @pytest.mark.parametrize("module", ["src.services.state_store", "src.services.node_cache"])
+    def test_imports_in_fresh_interpreter(self, module):
+        result = subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            cwd=str(project_root), capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+
+
+class TestSQLiteApplicationStateStore:
+    """Test suite for SQLiteApplicationStateStore"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Store backed by an isolated database"""
+        return SQLiteApplicationStateStore(str(tmp_path / "app_state.db"))
+
+    def test_put_get_and_version(self, store):
+        """Each put bumps the version and get returns a decoded copy"""
+        state = _sample_state()
+        assert store.get("APP_TEST0001") is None
+        assert store.get_version("APP_TEST0001") is None
+
+        assert store.put("APP_TEST0001", state) == 1
+        assert store.put("APP_TEST0001", state) == 2
+        assert store.get_version("APP_TEST0001") == 2
+        assert "APP_TEST0001" in store
+
+        loaded = store.get("APP_TEST0001")
+        assert loaded == state
+        assert loaded is not state
+
+    def test_update_is_persisted(self, store):
+        """update() applies the mutation and writes it back"""
+        store.put("APP_TEST0001", _sample_state())
+
+        updated = store.update("APP_TEST0001", lambda s: setattr(s, "stage", ProcessingStage.FAILED))
+        assert updated.stage is ProcessingStage.FAILED
+        assert store.get("APP_TEST0001").stage is ProcessingStage.FAILED
+        assert store.get_version("APP_TEST0001") == 2
+
+        assert store.update("APP_MISSING", lambda s: None) is None
+
+    def test_failed_update_rolls_back(self, store):
+        """An exception inside update() leaves the stored state untouched"""
+        store.put("APP_TEST0001", _sample_state())
+
+        def mutate(state):
+            state.applicant_name = "Changed"
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            store.update("APP_TEST0001", mutate)
+        assert store.get("APP_TEST0001").applicant_name == "Test User"
+        assert store.get_version("APP_TEST0001") == 1
+
+    def test_list_count_delete(self, store):
+        """Listing is most recent first; delete removes state"""
+        store.put("APP_A", _sample_state("APP_A"))
+        store.put("APP_B", _sample_state("APP_B"))
+
+        assert store.count() == 2
+        assert store.list_ids() == ["APP_B", "APP_A"]
+        assert store.list_ids(limit=1) == ["APP_B"]
+
+        assert store.delete("APP_A") is True
+        assert store.delete("APP_A") is False
+        assert store.count() == 1
+
+    def test_shared_between_instances(self, tmp_path):
+        """Two store instances on one file see each other's writes"""
+        db_path = str(tmp_path / "app_state.db")
+        writer = SQLiteApplicationStateStore(db_path)
+        reader = SQLiteApplicationStateStore(db_path)
+
+        writer.put("APP_TEST0001", _sample_state())
+        assert reader.get("APP_TEST0001").applicant_name == "Test User"
+
+
+class TestInMemoryApplicationStateStore:
+    """Test suite for InMemoryApplicationStateStore"""
+
+    def test_basic_operations(self):
+        """Objects are stored as-is with versioning"""
+        store = InMemoryApplicationStateStore()
+        state = _sample_state()
+
+        assert store.put("APP_TEST0001", state) == 1
+        assert store.get("APP_TEST0001") is state
+        store.update("APP_TEST0001", lambda s: setattr(s, "applicant_name", "Changed"))
+        assert state.applicant_name == "Changed"
+        assert store.get_version("APP_TEST0001") == 2
+        assert store.count() == 1
+
+    def _budget_store(self, tmp_path, states):
+        size = len(encode_state(_sample_state()))
+        return InMemoryApplicationStateStore(
+            max_bytes=size * states + size // 2,
+            spill_store=SQLiteApplicationStateStore(str(tmp_path / "app_state.db"))
+        )
+
+    def test_budget_spills_lru_completed(self, tmp_path):
+        """Completed applications beyond the budget move to SQLite and back"""
+        store = self._budget_store(tmp_path, 2)
+        for app_id in ("APP_TEST0001", "APP_TEST0002", "APP_TEST0003"):
+            store.put(app_id, _sample_state(app_id))
+        store.put("APP_TEST0001", _sample_state("APP_TEST0001"))
+
+        # APP_TEST0002 was least recently used
+        assert store.get_stats()["entries"] == 2
+        assert store.spill_store.list_ids() == ["APP_TEST0002"]
+        assert store.count() == 3
+        assert set(store.list_ids()) == {"APP_TEST0001", "APP_TEST0002", "APP_TEST0003"}
+        assert store.get_version("APP_TEST0002") == 1
+
+        # Reloaded transparently (as a decoded copy); APP_TEST0003 is evicted in its place
+        reloaded = store.get("APP_TEST0002")
+        assert reloaded.recommendation.financial_support_amount == 2500.0
+        assert store.spill_store.list_ids() == ["APP_TEST0003"]
+        assert store.put("APP_TEST0002", reloaded) == 2
+        assert store.update("APP_TEST0003", lambda s: setattr(s, "applicant_name", "Changed")).applicant_name == "Changed"
+        assert store.get_version("APP_TEST0003") == 2
+
+        stats = store.get_stats()
+        assert (stats["evictions"], stats["reloads"]) == (4, 2)
+        assert store.spill_store.list_ids() == ["APP_TEST0001"]
+        assert store.get_version("APP_TEST0001") == 2
+        assert stats["bytes"] <= stats["max_bytes"]
+
+        assert store.delete(store.spill_store.list_ids()[0])
+        assert store.count() == 2
+
+    def test_in_flight_state_is_not_evicted(self, tmp_path):
+        """Applications with a run in flight stay in memory until the run ends"""
+        store = self._budget_store(tmp_path, 1)
+        with store.in_flight("APP_TEST0001"), store.in_flight("APP_TEST0002"):
+            for app_id in ("APP_TEST0001", "APP_TEST0002"):
+                state = _sample_state(app_id)
+                state.stage = ProcessingStage.EXTRACTING
+                store.put(app_id, state)
+
+            stats = store.get_stats()
+            assert (stats["entries"], stats["in_flight"]) == (2, 2)
+            assert store.spill_store.count() == 0
+
+        # APP_TEST0002 is released first, while APP_TEST0001 is still pinned
+        assert store.get_stats()["entries"] == 1
+        assert store.spill_store.list_ids() == ["APP_TEST0002"]
+
+    def test_idle_states_are_evicted_in_any_stage(self, tmp_path):
+        """Runs stopped mid-pipeline and abandoned pending uploads are spilled too"""
+        store = self._budget_store(tmp_path, 1)
+        for app_id, stage in (("APP_TEST0001", ProcessingStage.PENDING),
+                              ("APP_TEST0002", ProcessingStage.VALIDATING),
+                              ("APP_TEST0003", ProcessingStage.COMPLETED)):
+            state = _sample_state(app_id)
+            state.stage = stage
+            store.put(app_id, state)
+
+        assert store.get_stats()["entries"] == 1
+        assert set(store.spill_store.list_ids()) == {"APP_TEST0001", "APP_TEST0002"}
+        assert store.get("APP_TEST0002").stage == ProcessingStage.VALIDATING
+
+    def test_factory_backends(self, tmp_path):
+        """create_state_store selects the backend"""
+        memory = create_state_store("memory", str(tmp_path / "spill.db"))
+        assert isinstance(memory, InMemoryApplicationStateStore)
+        assert isinstance(memory.spill_store, SQLiteApplicationStateStore)
+        assert memory.max_bytes == 256 * 1024 * 1024
+        store = create_state_store("sqlite", str(tmp_path / "app_state.db"))
+        assert isinstance(store, SQLiteApplicationStateStore)
+        with pytest.raises(ValueError):
+            create_state_store("redis")
+
+
+class TestChatHistory:
+    """Chat turns are appended to the stored state atomically"""
+
+    class FakeChatbot:
+        async def execute(self, input_data):
+            return {"response": f"answer to {input_data['query']}"}
+
+    def _orchestrator(self, store):
+        from src.core.langgraph_orchestrator import LangGraphOrchestrator
+        orchestrator = LangGraphOrchestrator(state_store=store)
+        orchestrator.rag_chatbot_agent = self.FakeChatbot()
+        orchestrator.chat_history_limit = 2
+        return orchestrator
+
+    def test_application_state_and_graph_state(self, tmp_path):
+        store = SQLiteApplicationStateStore(str(tmp_path / "app_state.db"))
+        orchestrator = self._orchestrator(store)
+        store.put("APP_TEST0001", _sample_state("APP_TEST0001"))
+        store.put("APP_TEST0002", {"application_id": "APP_TEST0002", "stage": "completed"})
+
+        for query in ("q1", "q2", "q3"):
+            for app_id in ("APP_TEST0001", "APP_TEST0002"):
+                result = asyncio.run(orchestrator.handle_chat_query(app_id, query, "general"))
+                assert result == {"response": f"answer to {query}"}
+
+        assert [turn["query"] for turn in store.get("APP_TEST0001").chat_history] == ["q2", "q3"]
+        assert [turn["query"] for turn in store.get("APP_TEST0002")["chat_history"]] == ["q2", "q3"]
+        assert asyncio.run(orchestrator.handle_chat_query("APP_MISSING", "q", "general")) == {"error": "Application not found"}
+
+    def test_keeps_result_stored_during_chat(self, tmp_path):
+        """A pipeline result written while the chatbot answers is not overwritten"""
+        store = SQLiteApplicationStateStore(str(tmp_path / "app_state.db"))
+        orchestrator = self._orchestrator(store)
+        store.put("APP_TEST0001", {"application_id": "APP_TEST0001", "stage": "extracting"})
+
+        class RacingChatbot:
+            async def execute(self, input_data):
+                store.put("APP_TEST0001", {"application_id": "APP_TEST0001", "stage": "completed"})
+                return {"response": "ok"}
+
+        orchestrator.rag_chatbot_agent = RacingChatbot()
+        asyncio.run(orchestrator.handle_chat_query("APP_TEST0001", "q", "general"))
+
+        state = store.get("APP_TEST0001")
+        assert state["stage"] == "completed"
+        assert [turn["query"] for turn in state["chat_history"]] == ["q"]
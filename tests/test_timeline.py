@@ -0,0 +1,193 @@
+"""
+Pipeline Timeline Tests
+
+Verifies the per-application span tree:
+- Spans nest through the context, including work sent to the executor pools
+- Synchronous spans measure thread CPU; async spans sum their children
+- Nested recordings join the outer run; no recording means no spans
+- Runs are stored per application and aggregated across runs
+- The orchestrator records nodes and store writes
+"""
+
+import asyncio
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.core.langgraph_orchestrator import LangGraphOrchestrator
+from src.core.types import (
+    DecisionType, EligibilityResult, Explanation, ExtractedData, Recommendation, ValidationReport
+)
+from src.services.executors import run_cpu
+from src.services.timeline import TimelineStore, aspan, current_span, record, span, timed
+
+
+def _burn_cpu(seconds):
+    deadline = time.thread_time() + seconds
+    while time.thread_time() < deadline:
+        pass
+
+
+def _find(tree, name):
+    if tree["name"] == name:
+        return tree
+    for child in tree["children"]:
+        found = _find(child, name)
+        if found is not None:
+            return found
+    return None
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimelineStore(str(tmp_path / "timelines.db"))
+
+
+class TestSpans:
+    """Span recording through context variables"""
+
+    def test_tree_with_pool_work(self, store):
+        async def scenario():
+            async with record(store, "APP_TEST0001", "process_application"):
+                async with aspan("extract", "node"):
+                    await asyncio.gather(
+                        run_cpu(timed("extract:resume", "document", _burn_cpu), 0.02),
+                        run_cpu(timed("extract:bank_statement", "document", _burn_cpu), 0.02)
+                    )
+                async with aspan("validate", "node"):
+                    with span("state_store.put", "store"):
+                        pass
+
+        asyncio.run(scenario())
+        run = store.get_run("APP_TEST0001")
+        tree = run["tree"]
+
+        assert tree["name"] == "process_application"
+        assert [c["name"] for c in tree["children"]] == ["extract", "validate"]
+        extract = tree["children"][0]
+        assert sorted(c["name"] for c in extract["children"]) == ["extract:bank_statement", "extract:resume"]
+        for document in extract["children"]:
+            assert document["kind"] == "document"
+            assert document["cpu_ms"] >= 15
+            assert document["wall_ms"] >= document["cpu_ms"] * 0.5
+        # Async spans report their children's CPU
+        assert extract["cpu_ms"] == pytest.approx(sum(c["cpu_ms"] for c in extract["children"]), abs=0.05)
+        assert tree["children"][1]["start_ms"] >= extract["start_ms"] + extract["wall_ms"] * 0.9
+        assert run["status"] == "ok"
+
+    def test_no_recording_is_noop(self, store):
+        async def scenario():
+            async with aspan("extract", "node") as outer:
+                with span("checkpoint.put", "store") as inner:
+                    return outer, inner, current_span()
+
+        assert asyncio.run(scenario()) == (None, None, None)
+
+        async def without_store():
+            async with record(None, "APP_TEST0001", "langgraph") as root:
+                return root
+
+        assert asyncio.run(without_store()) is None
+        assert store.list_runs("APP_TEST0001") == []
+
+    def test_nested_record_joins_outer_run(self, store):
+        async def scenario():
+            async with record(store, "APP_TEST0001", "process_application"):
+                async with record(store, "APP_TEST0001", "langgraph"):
+                    pass
+
+        asyncio.run(scenario())
+        runs = store.list_runs("APP_TEST0001")
+        assert len(runs) == 1
+        assert _find(store.get_run("APP_TEST0001")["tree"], "langgraph")["kind"] == "pipeline"
+
+    def test_errors_are_recorded(self, store):
+        async def scenario():
+            async with record(store, "APP_TEST0001", "process_application"):
+                with span("sqlite.persist", "store"):
+                    raise ValueError("disk full")
+
+        with pytest.raises(ValueError):
+            asyncio.run(scenario())
+        tree = store.get_run("APP_TEST0001")["tree"]
+        assert tree["status"] == "error"
+        assert tree["children"][0]["error"] == "ValueError: disk full"
+
+
+class TestTimelineStore:
+    """Test suite for TimelineStore"""
+
+    def _run(self, store, app_id, sleep_ms):
+        async def scenario():
+            async with record(store, app_id, "process_application"):
+                async with aspan("recommend", "node"):
+                    await asyncio.sleep(sleep_ms / 1000)
+        asyncio.run(scenario())
+
+    def test_runs_per_application(self, store):
+        self._run(store, "APP_TEST0001", 1)
+        self._run(store, "APP_TEST0001", 1)
+        self._run(store, "APP_TEST0002", 1)
+
+        runs = store.list_runs("APP_TEST0001")
+        assert len(runs) == 2
+        assert store.get_run("APP_TEST0001")["run_id"] == runs[0]["run_id"]
+        assert store.get_run("APP_TEST0001", runs[1]["run_id"])["run_id"] == runs[1]["run_id"]
+        assert store.get_run("APP_TEST0001", "RUN_MISSING") is None
+        assert store.get_run("APP_TEST0003") is None
+
+    def test_aggregate(self, store):
+        for sleep_ms in (5, 10, 40):
+            self._run(store, "APP_TEST0001", sleep_ms)
+
+        stats = store.aggregate()
+        assert stats["runs"] == 3
+        recommend = stats["spans"][0]
+        assert (recommend["name"], recommend["kind"], recommend["count"]) == ("recommend", "node", 3)
+        assert recommend["wall_ms_max"] >= 40
+        assert recommend["wall_ms_p50"] >= 10
+        assert 0.5 < recommend["wall_share"] <= 1.0
+        assert store.aggregate(kind="store")["spans"] == []
+        assert store.aggregate(limit=1)["spans"][0]["count"] == 1
+
+    def test_prune(self, store):
+        self._run(store, "APP_TEST0001", 1)
+        assert store.prune() == 0
+        assert store.prune(max_age_seconds=-1) == 1
+        assert store.aggregate() == {"runs": 0, "spans": []}
+
+
+class TestOrchestratorTimeline:
+    """LangGraphOrchestrator records a timeline per run"""
+
+    class Agent:
+        def __init__(self, result):
+            self.result = result
+
+        async def execute(self, input_data):
+            return self.result
+
+    def test_nodes_and_writes(self, store):
+        orchestrator = LangGraphOrchestrator(timeline_store=store)
+        orchestrator.register_agents(
+            self.Agent({"extracted_data": ExtractedData(income_data={"monthly_income": 4000})}),
+            self.Agent({"validation_report": ValidationReport(is_valid=True)}),
+            self.Agent({"eligibility_result": EligibilityResult(is_eligible=True, eligibility_score=0.8)}),
+            self.Agent({"recommendation": Recommendation(decision=DecisionType.APPROVED)}),
+            self.Agent({"explanation": Explanation(summary="Approved", detailed_reasoning="Low income")})
+        )
+
+        asyncio.run(orchestrator.process_application("APP_TEST0001", "Test Applicant", []))
+        tree = store.get_run("APP_TEST0001")["tree"]
+
+        assert tree["name"] == "langgraph"
+        nodes = [c["name"] for c in tree["children"] if c["kind"] == "node"]
+        assert nodes == ["extract", "validate", "eligibility_check", "recommend", "explain"]
+        assert _find(tree, "state_store.put")["kind"] == "store"
+        # Tracing is flushed in the background, not inside the run
+        assert _find(tree, "langfuse.flush") is None
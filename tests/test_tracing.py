@@ -0,0 +1,206 @@
+"""
+Tracing Facade Tests
+
+Verifies the buffered tracer:
+- Head sampling is decided per trace id and configured per trace name
+- Operations reach the local backend as JSON lines with span parentage
+- A slow or unreachable backend never blocks trace/span/flush calls;
+  a full buffer drops operations instead
+- The Langfuse backend replays operations with their call-site times
+- The noop backend records nothing
+"""
+
+import json
+import threading
+import time
+import pytest
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.tracing import (
+    LangfuseBackend, LocalFileBackend, NoopBackend, Tracer, parse_sample_rates
+)
+
+
+class BlockingBackend:
+    """Export blocks until released (an unreachable host)"""
+
+    name = "blocking"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.events = []
+
+    def export(self, events):
+        self.release.wait(5)
+        self.events.extend(events)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.release.set()
+
+
+class FakeLangfuseHandle:
+    def __init__(self, calls, kind, **fields):
+        self.calls = calls
+        self.calls.append((kind, fields))
+
+    def span(self, **fields):
+        return FakeLangfuseHandle(self.calls, "span", **fields)
+
+    def update(self, **fields):
+        self.calls.append(("update", fields))
+
+    def end(self, **fields):
+        self.calls.append(("end", fields))
+
+
+class FakeLangfuseClient:
+    def __init__(self):
+        self.calls = []
+        self.flushed = 0
+
+    def trace(self, **fields):
+        return FakeLangfuseHandle(self.calls, "trace", **fields)
+
+    def flush(self):
+        self.flushed += 1
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def local_tracer(tmp_path):
+    tracer = Tracer(LocalFileBackend(str(tmp_path / "events.jsonl")), flush_interval=60)
+    yield tracer
+    tracer.close()
+
+
+def _read_events(tracer):
+    tracer.drain()
+    tracer.backend.flush()
+    with open(tracer.backend.path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestSampling:
+    """Head-based sampling"""
+
+    def test_rates_per_name(self, tmp_path):
+        tracer = Tracer(
+            LocalFileBackend(str(tmp_path / "events.jsonl")),
+            sample_rates=parse_sample_rates("fastapi_chat_request=0.25, worker_process_application=0"),
+            flush_interval=60
+        )
+        ids = [f"chat_trace_APP_TEST{i:04d}" for i in range(2000)]
+        sampled = [tracer.is_sampled("fastapi_chat_request", trace_id) for trace_id in ids]
+
+        assert 0.2 < sum(sampled) / len(ids) < 0.3
+        # The same id always gets the same answer
+        assert sampled == [tracer.is_sampled("fastapi_chat_request", trace_id) for trace_id in ids]
+        assert all(tracer.is_sampled("application_processing", trace_id) for trace_id in ids)
+        assert tracer.trace(name="worker_process_application", id="job_trace_1").span(name="x").end() is None
+        assert tracer.get_stats()["sampled_out"] == 1
+        assert tracer.get_stats()["recorded"] == 0
+        tracer.close()
+
+
+class TestLocalBackend:
+    """Operations written as JSON lines"""
+
+    def test_spans_and_updates(self, local_tracer):
+        trace = local_tracer.trace(name="application_processing", id="trace_APP_TEST0001", metadata={"stage": "extraction"})
+        span = trace.span(name="data_extraction")
+        child = span.span(name="ocr")
+        child.end(output={"pages": 2})
+        span.end(output={"success": True}, level="DEFAULT")
+        trace.update(output={"success": True})
+
+        events = _read_events(local_tracer)
+        assert [e["op"] for e in events] == ["trace", "span", "span", "span.end", "span.end", "trace.update"]
+        assert events[0]["fields"] == {"name": "application_processing", "metadata": {"stage": "extraction"}}
+        assert all(e["trace_id"] == "trace_APP_TEST0001" for e in events)
+        assert events[1]["parent_id"] is None
+        assert events[2]["parent_id"] == events[1]["span_id"]
+        assert events[3]["span_id"] == events[2]["span_id"]
+        assert local_tracer.get_stats()["exported"] == 6
+
+    def test_rollover(self, tmp_path):
+        tracer = Tracer(LocalFileBackend(str(tmp_path / "events.jsonl"), max_bytes=500), flush_interval=60)
+        for i in range(10):
+            tracer.trace(name="fastapi_chat_request", id=f"chat_trace_{i}", metadata={"notes": "x" * 100})
+            tracer.drain()
+
+        assert (tmp_path / "events.jsonl.1").stat().st_size >= 500
+        current = tmp_path / "events.jsonl"
+        assert not current.exists() or current.stat().st_size < 500
+        tracer.close()
+
+
+class TestNonBlocking:
+    """Tracing never adds to request latency"""
+
+    def test_slow_backend_does_not_block(self):
+        backend = BlockingBackend()
+        tracer = Tracer(backend, buffer_size=20, flush_interval=60)
+
+        started = time.perf_counter()
+        for i in range(50):
+            trace = tracer.trace(name="fastapi_chat_request", id=f"chat_trace_{i}")
+            trace.span(name="rag_agent_execution").end(output={"success": True})
+            tracer.flush()
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 1.0
+        stats = tracer.get_stats()
+        assert stats["dropped"] > 0
+        assert stats["recorded"] + stats["dropped"] == 150
+
+        backend.release.set()
+        assert tracer.drain()
+        assert len(backend.events) == tracer.get_stats()["exported"] == stats["recorded"]
+        tracer.close()
+
+    def test_closed_tracer_drops(self, local_tracer):
+        local_tracer.close()
+        local_tracer.trace(name="application_processing", id="trace_APP_TEST0001")
+        assert local_tracer.get_stats()["dropped"] == 1
+
+
+class TestBackends:
+    """Langfuse replay and the noop backend"""
+
+    def test_langfuse_replay(self):
+        client = FakeLangfuseClient()
+        tracer = Tracer(LangfuseBackend(client), flush_interval=60)
+        # Every node re-opens the same trace
+        tracer.trace(name="application_processing", id="trace_APP_TEST0001", metadata={"stage": "extraction"})
+        span = tracer.trace(name="application_processing", id="trace_APP_TEST0001").span(name="data_validation")
+        span.end(output={"success": False}, level="WARNING")
+        tracer.trace(name="application_processing", id="trace_APP_TEST0001").update(output={"success": True})
+        assert tracer.drain()
+
+        kinds = [kind for kind, _ in client.calls]
+        assert kinds == ["trace", "trace", "span", "end", "trace", "update"]
+        span_fields, end_fields = client.calls[2][1], client.calls[3][1]
+        assert span_fields["name"] == "data_validation" and span_fields["id"] == span.id
+        assert end_fields["level"] == "WARNING"
+        assert end_fields["end_time"] >= span_fields["start_time"]
+        assert client.flushed >= 1
+        assert tracer.backend._handles.keys() == {"trace_APP_TEST0001"}
+        tracer.close()
+
+    def test_noop_backend(self):
+        tracer = Tracer(NoopBackend())
+        tracer.trace(name="application_processing", id="trace_APP_TEST0001").span(name="x").end()
+        tracer.flush()
+        assert tracer.drain()
+        assert tracer.get_stats()["recorded"] == 0
+        tracer.close()
@@ -0,0 +1,134 @@
+"""
+Upload Writer Tests
+
+Verifies the streaming upload path:
+- SHA-256 and size are recorded for each stored file
+- Per-file and per-application byte budgets
+- PDF page budgets
+- All-or-nothing cleanup when a budget is exceeded, leaving stored files of
+  the same name untouched
+- A file named like a stored one replaces it once the whole request passes
+"""
+
+import asyncio
+import hashlib
+import io
+import pytest
+import sys
+from pathlib import Path
+
+from fastapi import UploadFile
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.upload_writer import UploadWriter, UploadLimits, UploadLimitExceeded
+
+
+def make_upload(filename: str, content: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+def make_pdf(pages: int) -> bytes:
+    from PyPDF2 import PdfWriter
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=200, height=200)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class TestUploadWriter:
+    """Test suite for UploadWriter"""
+
+    @pytest.fixture
+    def limits(self):
+        return UploadLimits(
+            max_file_bytes=1000,
+            max_application_bytes=1500,
+            max_pdf_pages=3,
+            max_application_pages=4,
+            chunk_size=64
+        )
+
+    def test_writes_files_with_checksum(self, tmp_path, limits):
+        """Stored files match their content hash and size"""
+        content = b"bank statement " * 20
+        stored = asyncio.run(UploadWriter(limits).write_all(
+            [make_upload("bank_statement.txt", content), make_upload("resume.txt", b"cv")],
+            tmp_path
+        ))
+
+        assert [s.filename for s in stored] == ["bank_statement.txt", "resume.txt"]
+        assert stored[0].sha256 == hashlib.sha256(content).hexdigest()
+        assert stored[0].size_bytes == len(content)
+        assert Path(stored[0].file_path).read_bytes() == content
+        assert not list(tmp_path.glob(".*.part"))
+
+    def test_file_byte_limit(self, tmp_path, limits):
+        """Oversized file is rejected and nothing is left on disk"""
+        with pytest.raises(UploadLimitExceeded) as exc:
+            asyncio.run(UploadWriter(limits).write_all(
+                [make_upload("ok.txt", b"x" * 10), make_upload("big.txt", b"x" * 1001)],
+                tmp_path
+            ))
+
+        assert exc.value.limit == "file_bytes"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_application_byte_limit_counts_existing(self, tmp_path, limits):
+        """Bytes already stored for the application count against the budget"""
+        with pytest.raises(UploadLimitExceeded) as exc:
+            asyncio.run(UploadWriter(limits).write_all(
+                [make_upload("statement.txt", b"x" * 600)],
+                tmp_path,
+                existing_bytes=1000
+            ))
+
+        assert exc.value.limit == "application_bytes"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_pdf_page_limits(self, tmp_path):
+        """Page counts are recorded and enforced per file and per application"""
+        writer = UploadWriter(UploadLimits(max_pdf_pages=3, max_application_pages=4))
+
+        stored = asyncio.run(writer.write_all([make_upload("emirates_id.pdf", make_pdf(2))], tmp_path))
+        assert stored[0].page_count == 2
+
+        with pytest.raises(UploadLimitExceeded) as exc:
+            asyncio.run(writer.write_all([make_upload("scan.pdf", make_pdf(4))], tmp_path))
+        assert exc.value.limit == "file_pages"
+
+        with pytest.raises(UploadLimitExceeded) as exc:
+            asyncio.run(writer.write_all([make_upload("bank.pdf", make_pdf(3))], tmp_path, existing_pages=2))
+        assert exc.value.limit == "application_pages"
+        assert not (tmp_path / "bank.pdf").exists()
+
+    def test_rejected_request_keeps_stored_files(self, tmp_path, limits):
+        """A file that passed is not published when another breaks a budget"""
+        (tmp_path / "bank_statement.txt").write_bytes(b"old statement")
+
+        with pytest.raises(UploadLimitExceeded):
+            asyncio.run(UploadWriter(limits).write_all(
+                [make_upload("bank_statement.txt", b"new statement"), make_upload("big.txt", b"x" * 1001)],
+                tmp_path
+            ))
+
+        assert (tmp_path / "bank_statement.txt").read_bytes() == b"old statement"
+        assert [p.name for p in tmp_path.iterdir()] == ["bank_statement.txt"]
+
+    def test_same_name_replaces(self, tmp_path, limits):
+        """Same-named files replace the stored one; the last of a request wins"""
+        (tmp_path / "resume.txt").write_bytes(b"old cv")
+
+        stored = asyncio.run(UploadWriter(limits).write_all(
+            [make_upload("resume.txt", b"cv v1"), make_upload("letter.txt", b"offer"), make_upload("resume.txt", b"cv v2")],
+            tmp_path
+        ))
+
+        assert [s.filename for s in stored] == ["letter.txt", "resume.txt"]
+        assert stored[1].sha256 == hashlib.sha256(b"cv v2").hexdigest()
+        assert (tmp_path / "resume.txt").read_bytes() == b"cv v2"
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["letter.txt", "resume.txt"]